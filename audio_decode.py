@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+壓縮音頻串流解碼 - 以 ffmpeg 子行程管道解碼 mp3、m4a 等格式，不寫出完整的中間 WAV 文件
+
+ffmpeg 將音頻解碼並重新取樣成各階段需要的格式後寫到 stdout，由呼叫端逐塊讀取：
+本地 Whisper 模型使用 16 kHz 單聲道 PCM；OpenAI Whisper API 不接受的格式轉成
+16 kHz 單聲道 mp3 在記憶體中上傳。WAV 文件不經過 ffmpeg。
+"""
+
+import logging
+import os
+import shutil
+import subprocess
+import tempfile
+import wave
+from typing import Iterator, List
+
+logger = logging.getLogger(__name__)
+
+FFMPEG = os.getenv('FFMPEG_BINARY', 'ffmpeg')
+FFPROBE = os.getenv('FFPROBE_BINARY', 'ffprobe')
+WHISPER_SAMPLE_RATE = 16000
+CHUNK_BYTES = 64 * 1024
+# OpenAI Whisper API 可直接接受的副檔名
+OPENAI_UPLOAD_FORMATS = ('flac', 'm4a', 'mp3', 'mp4', 'mpeg', 'mpga', 'oga', 'ogg', 'wav', 'webm')
+
+
+class AudioDecodeError(RuntimeError):
+    """ffmpeg 未安裝或解碼失敗"""
+
+
+def extension(path: str) -> str:
+    return os.path.splitext(path)[1].lower().lstrip('.')
+
+
+def needs_decoding(path: str) -> bool:
+    """非 WAV 文件需要經由 ffmpeg 解碼"""
+    return extension(path) != 'wav'
+
+
+def ffmpeg_available() -> bool:
+    return shutil.which(FFMPEG) is not None
+
+
+def usable_formats(formats: List[str]) -> List[str]:
+    """未安裝 ffmpeg 時只保留 wav，並提示略過的格式"""
+    if ffmpeg_available():
+        return list(formats)
+    skipped = [fmt for fmt in formats if fmt != 'wav']
+    if skipped:
+        logger.warning(f"⚠️  未安裝 ffmpeg，略過 {', '.join('.' + fmt for fmt in skipped)} 文件")
+    return [fmt for fmt in formats if fmt == 'wav']
+
+
+def decode_command(path: str, sample_rate: int = WHISPER_SAMPLE_RATE, channels: int = 1,
+                   output_format: str = 's16le', codec_args: List[str] = None,
+                   duration: float = None) -> List[str]:
+    """ffmpeg 命令：解碼 path（duration 指定時只取開頭幾秒）並以指定採樣率與聲道數寫到 stdout"""
+    limit = ['-t', f"{duration:g}"] if duration else []
+    return [FFMPEG, '-nostdin', '-hide_banner', '-loglevel', 'error', '-i', path, '-vn', *limit,
+            '-ac', str(channels), '-ar', str(sample_rate), *(codec_args or []), '-f', output_format, 'pipe:1']
+
+
+def iter_output(command: List[str], chunk_bytes: int = CHUNK_BYTES) -> Iterator[bytes]:
+    """執行 ffmpeg 並逐塊產生 stdout 內容；提前停止迭代時結束子行程
+
+    stderr 寫到暫存文件而不是管道，輸出大量訊息時也不會因管道寫滿而卡住。
+    """
+    if shutil.which(command[0]) is None:
+        raise AudioDecodeError(f"找不到 {command[0]}，無法解碼壓縮音頻")
+    with tempfile.TemporaryFile() as stderr:
+        process = subprocess.Popen(command, stdin=subprocess.DEVNULL, stdout=subprocess.PIPE, stderr=stderr)
+        try:
+            while True:
+                chunk = process.stdout.read(chunk_bytes)
+                if not chunk:
+                    break
+                yield chunk
+            if process.wait() != 0:
+                stderr.seek(0)
+                error = stderr.read().decode('utf-8', 'replace').strip()
+                raise AudioDecodeError(f"ffmpeg 解碼失敗 ({process.returncode}): {error[-500:]}")
+        finally:
+            if process.poll() is None:
+                process.kill()
+                process.wait()
+            process.stdout.close()
+
+
+def iter_pcm(path: str, sample_rate: int = WHISPER_SAMPLE_RATE, channels: int = 1,
+             chunk_bytes: int = CHUNK_BYTES, duration: float = None) -> Iterator[bytes]:
+    """逐塊產生 16-bit little-endian PCM"""
+    return iter_output(decode_command(path, sample_rate, channels, duration=duration), chunk_bytes)
+
+
+def write_leading_window(path: str, seconds: float, output_path: str) -> str:
+    """將音頻開頭 seconds 秒寫成 WAV（WAV 保留原格式，壓縮格式解碼為 16 kHz 單聲道），只讀取需要的部分"""
+    with wave.open(output_path, 'wb') as output:
+        if not needs_decoding(path):
+            with wave.open(path, 'rb') as source:
+                output.setparams(source.getparams())
+                output.writeframes(source.readframes(int(seconds * source.getframerate())))
+        else:
+            output.setnchannels(1)
+            output.setsampwidth(2)
+            output.setframerate(WHISPER_SAMPLE_RATE)
+            for chunk in iter_pcm(path, WHISPER_SAMPLE_RATE, 1, duration=seconds):
+                output.writeframes(chunk)
+    return output_path
+
+
+def decode_whisper_input(path: str, duration: float = None):
+    """解碼為 Whisper 模型使用的 16 kHz 單聲道 float32 陣列
+
+    依探測到的長度（未指定時以 ffprobe 讀取）預先配置陣列，每塊 PCM 直接轉換寫入，
+    不保留完整的 int16 副本；長度超出預估時以倍數擴充，最後裁成實際長度。
+    """
+    import numpy as np
+    if duration is None:
+        duration = ffprobe_duration(path)
+    audio = np.empty(int((duration or 0) * WHISPER_SAMPLE_RATE) + WHISPER_SAMPLE_RATE, dtype=np.float32)
+    filled = 0
+    remainder = b''
+    for chunk in iter_pcm(path, WHISPER_SAMPLE_RATE, 1):
+        if remainder:
+            chunk = remainder + chunk
+        # 管道可能在樣本中間分塊，剩下的奇數位元組併入下一塊
+        usable = len(chunk) - len(chunk) % 2
+        remainder = chunk[usable:]
+        samples = np.frombuffer(chunk, dtype=np.int16, count=usable // 2)
+        end = filled + len(samples)
+        if end > len(audio):
+            grown = np.empty(max(end, 2 * len(audio)), dtype=np.float32)
+            grown[:filled] = audio[:filled]
+            audio = grown
+        window = audio[filled:end]
+        window[:] = samples
+        window *= 1.0 / 32768.0
+        filled = end
+    if filled < len(audio) * 0.9:
+        # 預估長度偏差過大時不保留多餘的空間
+        return audio[:filled].copy()
+    return audio[:filled]
+
+
+def encode_for_upload(path: str, bitrate: str = '32k') -> bytes:
+    """轉成 16 kHz 單聲道 mp3（語音識別足夠，上傳量遠小於原始文件）"""
+    command = decode_command(path, WHISPER_SAMPLE_RATE, 1, 'mp3', ['-c:a', 'libmp3lame', '-b:a', bitrate])
+    return b''.join(iter_output(command))
+
+
+def ffprobe_duration(path: str):
+    """以 ffprobe 讀取容器中的長度（秒），無法取得時返回 None"""
+    if shutil.which(FFPROBE) is None:
+        return None
+    try:
+        completed = subprocess.run([FFPROBE, '-v', 'error', '-show_entries', 'format=duration',
+                                    '-of', 'default=noprint_wrappers=1:nokey=1', path],
+                                   stdin=subprocess.DEVNULL, capture_output=True, timeout=30)
+        return float(completed.stdout.strip()) if completed.returncode == 0 else None
+    except (OSError, ValueError, subprocess.TimeoutExpired):
+        return None
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+音頻長度探測 - 只讀取文件標頭，不解碼音頻內容
+
+WAV 以標準函式庫 wave 讀取標頭；其他格式（或 wave 不支援的 WAV 變體）改用
+soundfile 讀取，soundfile 不支援的容器（m4a 等）再以 ffprobe 讀取，
+仍無法判斷時依文件大小以典型位元率估算。
+"""
+
+import logging
+import os
+import wave
+from typing import Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# 無法讀取標頭時的估算位元率（位元組 / 秒）
+ESTIMATED_BYTES_PER_SECOND = {
+    'wav': 44100 * 2 * 2,      # 44.1kHz 16-bit 立體聲
+    'mp3': 128 * 1000 // 8,    # 128 kbps
+    'm4a': 128 * 1000 // 8,
+}
+DEFAULT_BYTES_PER_SECOND = 128 * 1000 // 8
+
+
+def _wav_duration(path: str) -> Optional[float]:
+    try:
+        with wave.open(path, 'rb') as wav_file:
+            rate = wav_file.getframerate()
+            return wav_file.getnframes() / rate if rate else None
+    except (wave.Error, EOFError):
+        return None
+
+
+def _soundfile_duration(path: str) -> Optional[float]:
+    try:
+        import soundfile
+        info = soundfile.info(path)
+    except Exception:
+        return None
+    return info.frames / info.samplerate if info.samplerate else None
+
+
+def probe_duration(path: str, size: int = None) -> Tuple[Optional[float], str]:
+    """返回 (長度秒數, 探測方式)；方式為 header、soundfile、ffprobe 或 estimate"""
+    extension = os.path.splitext(path)[1].lower().lstrip('.')
+    if extension == 'wav':
+        duration = _wav_duration(path)
+        if duration is not None:
+            return duration, 'header'
+    duration = _soundfile_duration(path)
+    if duration is not None:
+        return duration, 'soundfile'
+    if extension != 'wav':
+        from audio_decode import ffprobe_duration
+        duration = ffprobe_duration(path)
+        if duration is not None:
+            return duration, 'ffprobe'
+    try:
+        size = os.path.getsize(path) if size is None else size
+    except OSError:
+        return None, 'estimate'
+    return size / ESTIMATED_BYTES_PER_SECOND.get(extension, DEFAULT_BYTES_PER_SECOND), 'estimate'
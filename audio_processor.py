@@ -1,100 +1,470 @@
 import asyncio
-import edge_tts
-from pydub import AudioSegment
-from deep_translator import GoogleTranslator
 import os
 import re
 import json
-from typing import List, Dict, Tuple
-import soundfile as sf
-import numpy as np
+import time
+import hashlib
+import importlib.util
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager, nullcontext
+import wave
+import logging
+from typing import List, Dict, Tuple, AsyncIterator, Awaitable, Callable, Optional, TYPE_CHECKING
 from datetime import datetime
-from dotenv import load_dotenv
+from metrics import MetricsRegistry
+from log_manager import ProgressReporter
+from runtime_config import RuntimeConfig
+from dialogue_rules import QUESTION, RESPONSE, TRANSITION, DialogueRules
+from speech_markup import SpeechPlan, SpeechRewriter
+from http_transport import shared_transport
+from tts_session import MAX_REQUEST_BYTES, TTSSessionPool
+from local_transcriber import LocalModelError, LocalTranscriber, faster_whisper_available
+from audio_decode import (OPENAI_UPLOAD_FORMATS, encode_for_upload, extension, ffmpeg_available, needs_decoding,
+                          write_leading_window)
+from audio_probe import probe_duration
+from segment_model import Segment, SegmentAudio, as_segment, as_segment_audio
+from transcript_store import (STORE_SUFFIX as TRANSCRIPT_STORE_SUFFIX, format_timestamp, load_transcript,
+                              parse_timestamp, write_transcript_store)
 
-# 載入環境變數
-load_dotenv()
+# 服務商 SDK 與音頻函式庫在首次使用時才載入，避免 --help / --preview 等路徑付出匯入成本
+if TYPE_CHECKING:
+    from pydub import AudioSegment
 
-# 新增 API 支援
-try:
-    import openai
-    OPENAI_AVAILABLE = True
-except ImportError:
-    OPENAI_AVAILABLE = False
+def _module_available(name: str) -> bool:
+    """檢查套件是否已安裝（不實際匯入）"""
+    try:
+        return importlib.util.find_spec(name) is not None
+    except ModuleNotFoundError:
+        return False
 
-try:
-    import google.generativeai as genai
-    GEMINI_AVAILABLE = True
-except ImportError:
-    GEMINI_AVAILABLE = False
 
-class AudioProcessor:
+OPENAI_AVAILABLE = _module_available('openai')
+GEMINI_AVAILABLE = _module_available('google.generativeai')
+
+_env_loaded = False
+
+
+def load_environment():
+    """載入 .env 環境變數（只執行一次）"""
+    global _env_loaded
+    if not _env_loaded:
+        from dotenv import load_dotenv
+        load_dotenv()
+        _env_loaded = True
+
+
+def _audio_segment():
+    """延遲載入 pydub.AudioSegment"""
+    from pydub import AudioSegment
+    return AudioSegment
+
+logger = logging.getLogger(__name__)
+
+# 串流管線各階段之間的佇列容量（限制記憶體中待處理的片段數量）
+PIPELINE_QUEUE_SIZE = int(os.getenv('PIPELINE_QUEUE_SIZE', '4'))
+
+_STAGE_DONE = object()
+
+# 渲染清單：記錄每段的內容雜湊與輸出位置，供增量重新渲染
+RENDER_MANIFEST_NAME = "render_manifest.json"
+RENDER_MANIFEST_VERSION = 2
+
+# 翻譯與語音合成快取的最大項目數（performance.cache_enabled 啟用時）
+CACHE_MAX_ENTRIES = 4096
+TTS_CACHE_MAX_ENTRIES = 256
+# 只快取較短的合成音頻（重複出現的多半是簡短回應）
+TTS_CACHE_MAX_BYTES = 256 * 1024
+
+
+class _StageFailure:
+    """包裝上游階段拋出的例外，交由下游重新拋出"""
+    def __init__(self, error: BaseException):
+        self.error = error
+
+
+async def buffered_stage(source: AsyncIterator, maxsize: int = PIPELINE_QUEUE_SIZE) -> AsyncIterator:
+    """在背景任務中執行上游階段，並透過有界佇列將結果交給下游
+
+    上游最多領先下游 maxsize 個片段，使相鄰階段可以同時處理不同片段。
+    """
+    queue = asyncio.Queue(maxsize=max(1, maxsize))
+
+    async def pump():
+        try:
+            async for item in source:
+                await queue.put(item)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            await queue.put(_StageFailure(e))
+            return
+        finally:
+            await source.aclose()
+        await queue.put(_STAGE_DONE)
+
+    task = asyncio.create_task(pump())
+    try:
+        while True:
+            item = await queue.get()
+            if item is _STAGE_DONE:
+                break
+            if isinstance(item, _StageFailure):
+                raise item.error
+            yield item
+    finally:
+        if not task.done():
+            task.cancel()
+            try:
+                await task
+            except (asyncio.CancelledError, Exception):
+                pass
+
+
+async def ordered_concurrent(source: AsyncIterator, func: Callable[[int, Dict], Awaitable],
+                             limit: int = 1) -> AsyncIterator:
+    """以最多 limit 個並行工作處理上游項目，並依原本的順序輸出結果"""
+    pending = deque()
+    try:
+        index = 0
+        async for item in source:
+            pending.append(asyncio.ensure_future(func(index, item)))
+            index += 1
+            if len(pending) >= max(1, limit):
+                yield await pending.popleft()
+        while pending:
+            yield await pending.popleft()
+    finally:
+        for task in pending:
+            task.cancel()
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+
+
+class PipelineStats:
+    """串流管線的時間統計：首段音頻延遲與穩態吞吐量"""
+
     def __init__(self):
+        self.started_at = time.perf_counter()
+        self.first_audio_at = None
+        self.finished_at = None
+        self.segments_transcribed = 0
+        self.segments_synthesized = 0
+        self.transcription_rtf = None
+
+    def mark_audio(self):
+        """記錄一個片段已寫入輸出音頻"""
+        if self.first_audio_at is None:
+            self.first_audio_at = time.perf_counter()
+        self.segments_synthesized += 1
+
+    def finish(self):
+        self.finished_at = time.perf_counter()
+
+    def as_dict(self) -> Dict:
+        finished_at = self.finished_at or time.perf_counter()
+        time_to_first_audio = None
+        steady_state = None
+        if self.first_audio_at is not None:
+            time_to_first_audio = self.first_audio_at - self.started_at
+            # 穩態吞吐量只計算首段音頻之後的片段，排除管線暖機時間
+            steady_window = finished_at - self.first_audio_at
+            if self.segments_synthesized > 1 and steady_window > 0:
+                steady_state = (self.segments_synthesized - 1) / steady_window
+        return {
+            'total_elapsed': round(finished_at - self.started_at, 3),
+            'time_to_first_audio': round(time_to_first_audio, 3) if time_to_first_audio is not None else None,
+            'steady_state_segments_per_sec': round(steady_state, 3) if steady_state is not None else None,
+            'segments_transcribed': self.segments_transcribed,
+            'segments_synthesized': self.segments_synthesized,
+            'transcription_rtf': round(self.transcription_rtf, 3) if self.transcription_rtf is not None else None,
+        }
+
+
+class StreamingWavWriter:
+    """逐段寫入 WAV 文件，避免在記憶體中累積完整的合併音頻
+
+    位置以取樣幀計算，供重新渲染時精確拼接。
+    """
+
+    def __init__(self, path: str, params: Tuple[int, int, int] = None):
+        self.path = path
+        self._wav = None
+        self.channels = None
+        self.sample_width = None
+        self.frame_rate = None
+        self.frames = 0
+        if params:
+            self._open(*params)
+
+    def _open(self, channels: int, sample_width: int, frame_rate: int):
+        self.channels = channels
+        self.sample_width = sample_width
+        self.frame_rate = frame_rate
+        self._wav = wave.open(self.path, 'wb')
+        self._wav.setnchannels(channels)
+        self._wav.setsampwidth(sample_width)
+        self._wav.setframerate(frame_rate)
+
+    def append(self, audio: 'AudioSegment') -> Tuple[int, int]:
+        """附加一段音頻，返回 (起始幀, 幀數)"""
+        if self._wav is None:
+            self._open(audio.channels, audio.sample_width, audio.frame_rate)
+        else:
+            # 統一格式，確保所有片段能直接串接
+            audio = (audio.set_frame_rate(self.frame_rate)
+                          .set_channels(self.channels)
+                          .set_sample_width(self.sample_width))
+        return self.write_raw(audio.raw_data)
+
+    def append_silence(self, duration_ms: int):
+        """附加靜音（必須在第一段音頻之後呼叫）"""
+        if self._wav is None or duration_ms <= 0:
+            return
+        frame_count = int(self.frame_rate * duration_ms / 1000)
+        # 8-bit WAV 為無號取樣，靜音值是 0x80
+        silence = b'\x80' if self.sample_width == 1 else b'\x00'
+        self.write_raw(silence * frame_count * self.channels * self.sample_width)
+
+    def write_raw(self, data: bytes) -> Tuple[int, int]:
+        """直接寫入與目前格式相同的原始幀資料"""
+        offset = self.frames
+        frame_count = len(data) // (self.channels * self.sample_width)
+        self._wav.writeframesraw(data)
+        self.frames += frame_count
+        return offset, frame_count
+
+    def frames_to_ms(self, frames: int) -> int:
+        return int(round(frames * 1000 / self.frame_rate)) if self.frame_rate else 0
+
+    @property
+    def duration_ms(self) -> int:
+        return self.frames_to_ms(self.frames)
+
+    def close(self) -> bool:
+        """完成寫入，返回是否有寫入任何音頻"""
+        if self._wav is None:
+            return False
+        self._wav.close()
+        return True
+
+
+class AudioProcessor:
+    def __init__(self, metrics: MetricsRegistry = None, config: RuntimeConfig = None):
         """初始化音頻處理器"""
+        load_environment()
+        # 執行期配置（--config 載入；未設定的項目沿用環境變數）
+        self.config = config or RuntimeConfig()
+        # 指標收集（批次處理時由 BatchProcessor 共用同一個註冊表）
+        self.metrics = metrics or MetricsRegistry()
+        # 效能分析器（--profile 模式下由 CLI 設定）
+        self.profiler = None
+        # 批次處理時跨文件共用的資源排程器（由 BatchProcessor 設定）
+        self.scheduler = None
+        # 是否輸出逐段進度（限速輸出，可由 PROGRESS_REPORTING 或 processing.progress_reporting 關閉）
+        if self.config.processing.progress_reporting is not None:
+            self.progress_reporting = self.config.processing.progress_reporting
+        else:
+            self.progress_reporting = os.getenv('PROGRESS_REPORTING', 'true').lower() != 'false'
+        # 對話特徵規則（dialogue.rules）預先編譯一次
+        self.dialogue_rules = DialogueRules.from_config(self.config.dialogue.rules)
+        self.speech_rewriter = SpeechRewriter.from_config(self.config)
+        # 各服務商共用的 keep-alive 連線池（每個行程一個）
+        self.http = shared_transport(self.config.network, self.metrics)
+        # 完成後將逐字稿加入全文檢索索引（未設定時不索引）
+        self.search_index = self.config.output.search_index or os.getenv('SEARCH_INDEX')
+        
         # 載入環境變數
         self.openai_api_key = os.getenv('OPENAI_API_KEY')
         self.gemini_api_key = os.getenv('GEMINI_API_KEY') or os.getenv('GOOGLE_API_KEY')
         
         # 設定翻譯提供商
-        self.translation_provider = os.getenv('TRANSLATION_PROVIDER', 'google').lower()
+        self.translation_provider = (self.config.translation.provider
+                                     or os.getenv('TRANSLATION_PROVIDER', 'google')).lower()
         
         # 初始化翻譯器
         self._init_translators()
         
+        # 語音識別後端：OpenAI Whisper API 或本地 faster-whisper 模型
+        self.transcription_backend = (self.config.whisper.backend
+                                      or os.getenv('TRANSCRIPTION_BACKEND', 'openai')).lower()
+        self._local_transcriber = None
+        # 指定本地後端時不改用需上傳音頻與計費的 OpenAI API
+        if self.transcription_backend == 'local' and not faster_whisper_available():
+            raise LocalModelError("whisper.backend 為 local 但未安裝 faster-whisper，"
+                                  "請執行 pip install faster-whisper 或改用 openai 後端")
+        
         # 中文語音設定 - 使用更自然的聲音
+        voices = self.config.tts.voices
         self.chinese_voices = {
-            'female': os.getenv('EDGE_TTS_VOICE_FEMALE', 'zh-TW-HsiaoChenNeural'),
-            'male': os.getenv('EDGE_TTS_VOICE_MALE', 'zh-TW-YunJheNeural')
+            'female': voices.female or os.getenv('EDGE_TTS_VOICE_FEMALE', 'zh-TW-HsiaoChenNeural'),
+            'male': voices.male or os.getenv('EDGE_TTS_VOICE_MALE', 'zh-TW-YunJheNeural')
         }
         
-        print(f"🔧 音頻處理器初始化完成")
-        print(f"   翻譯提供商: {self.translation_provider}")
-        print(f"   女性聲音: {self.chinese_voices['female']}")
-        print(f"   男性聲音: {self.chinese_voices['male']}")
+        # 重複出現的短句（"Yeah."、"Right."）直接使用快取結果
+        self._translation_cache = OrderedDict()
+        self._tts_cache = OrderedDict()
+        
+        # 處理期間共用的 Edge TTS 長駐連線（tts.session_pool_size 為 0 時每段各自連線）
+        self._tts_pool: Optional[TTSSessionPool] = None
+        self._tts_pool_users = 0
+        
+        logger.info("🔧 音頻處理器初始化完成")
+        logger.info(f"   翻譯提供商: {self.translation_provider}")
+        logger.info(f"   語音識別: {self.transcription_backend}")
+        logger.info(f"   女性聲音: {self.chinese_voices['female']}")
+        logger.info(f"   男性聲音: {self.chinese_voices['male']}")
     
     def _init_translators(self):
-        """初始化翻譯器"""
-        self.translator = GoogleTranslator(source='en', target='zh-tw')
+        """檢查翻譯服務設定；客戶端在首次使用時才建立"""
+        self._translator = None
+        self._openai_client = None
+        self._gemini_model = None
         
         # 從環境變數獲取模型名稱
         self.openai_model = os.getenv('OPENAI_MODEL', 'o1-mini')
         self.gemini_model_name = os.getenv('GEMINI_MODEL', 'gemini-2.0-flash-exp')
         
-        # 初始化 OpenAI
-        if self.openai_api_key and OPENAI_AVAILABLE:
-            self.openai_client = openai.OpenAI(api_key=self.openai_api_key)
-            print(f"✅ OpenAI 客戶端初始化完成 (模型: {self.openai_model})")
-        else:
-            self.openai_client = None
-            if self.translation_provider == 'openai':
-                print("⚠️  OpenAI API 金鑰未設定，將使用 Google 翻譯")
-                self.translation_provider = 'google'
+        if not (self.openai_api_key and OPENAI_AVAILABLE) and self.translation_provider == 'openai':
+            logger.warning("⚠️  OpenAI API 金鑰未設定，將使用 Google 翻譯")
+            self.translation_provider = 'google'
         
-        # 初始化 Gemini
-        if self.gemini_api_key and GEMINI_AVAILABLE:
+        if not (self.gemini_api_key and GEMINI_AVAILABLE) and self.translation_provider == 'gemini':
+            logger.warning("⚠️  Gemini API 金鑰未設定，將使用 Google 翻譯")
+            self.translation_provider = 'google'
+    
+    @property
+    def translator(self):
+        """Google 翻譯器（延遲建立）"""
+        if self._translator is None:
+            self._translator = self.http.google_translator(self.config.translation.source_language,
+                                                           self.config.translation.target_language)
+        return self._translator
+    
+    @property
+    def openai_client(self):
+        """OpenAI 客戶端（延遲建立），未設定金鑰時為 None"""
+        if self._openai_client is None and self.openai_api_key and OPENAI_AVAILABLE:
+            import openai
+            self._openai_client = openai.OpenAI(api_key=self.openai_api_key,
+                                                http_client=self.http.openai_http_client())
+            logger.info(f"✅ OpenAI 客戶端初始化完成 (模型: {self.openai_model})")
+        return self._openai_client
+    
+    @openai_client.setter
+    def openai_client(self, client):
+        self._openai_client = client
+    
+    @property
+    def local_transcriber(self) -> LocalTranscriber:
+        """本地語音識別器（延遲建立）；模型在首次轉錄時載入，之後跨文件重用"""
+        if self._local_transcriber is None:
+            whisper = self.config.whisper
+            self._local_transcriber = LocalTranscriber(
+                whisper, model_dir=whisper.model_dir or os.getenv('WHISPER_MODEL_DIR'),
+                num_workers=self.config.processing.resource_limits.transcription)
+        return self._local_transcriber
+    
+    @property
+    def gemini_model(self):
+        """Gemini 模型（延遲建立），只在選用 Gemini 翻譯時才會被存取"""
+        if self._gemini_model is None and self.gemini_api_key and GEMINI_AVAILABLE:
+            import google.generativeai as genai
             genai.configure(api_key=self.gemini_api_key)
-            self.gemini_model = genai.GenerativeModel(self.gemini_model_name)
-            print(f"✅ Gemini 客戶端初始化完成 (模型: {self.gemini_model_name})")
+            self._gemini_model = genai.GenerativeModel(self.gemini_model_name)
+            logger.info(f"✅ Gemini 客戶端初始化完成 (模型: {self.gemini_model_name})")
+        return self._gemini_model
+    
+    @gemini_model.setter
+    def gemini_model(self, model):
+        self._gemini_model = model
+    
+    def warm_up(self):
+        """預先載入音頻函式庫並建立所選服務商的客戶端（供長駐的工作行程使用）"""
+        _audio_segment()
+        if self.translation_provider == 'gemini':
+            self.gemini_model
+        elif self.translation_provider == 'google':
+            self.translator
+        if self.transcription_backend == 'local':
+            self.local_transcriber.model
         else:
-            self.gemini_model = None
-            if self.translation_provider == 'gemini':
-                print("⚠️  Gemini API 金鑰未設定，將使用 Google 翻譯")
-                self.translation_provider = 'google'
+            self.openai_client
+    
+    def _profile(self, stage: str):
+        """在效能分析模式下標記同步程式區段所屬的階段"""
+        if self.profiler is None:
+            return nullcontext()
+        return self.profiler.stage(stage)
+    
+    def _progress(self, label: str, total: int = None) -> ProgressReporter:
+        """建立限速的進度回報器"""
+        return ProgressReporter(logger, label, total, enabled=self.progress_reporting)
+    
+    def _slot(self, resource: str):
+        """在批次排程器中佔用一個資源名額；單獨處理時不限制"""
+        if self.scheduler is None:
+            return nullcontext()
+        return self.scheduler.slot(resource)
+    
+    def _window(self, resource: str, default: int) -> int:
+        """單一文件同時送出的請求數；有排程器時由其公平分配，可放寬到資源容量"""
+        if self.scheduler is None:
+            return default
+        return max(default, self.scheduler.capacity(resource))
+    
+    def _run_stage(self, stage: str, func, *args):
+        """在執行緒中執行同步階段工作，並套用效能分析標記"""
+        with self._profile(stage):
+            return func(*args)
+    
+    def _cache_get(self, cache: OrderedDict, key, name: str):
+        """讀取快取（performance.cache_enabled 關閉時永遠未命中）"""
+        if not self.config.performance.cache_enabled:
+            return None
+        value = cache.get(key)
+        if value is not None:
+            cache.move_to_end(key)
+            self.metrics.inc('podcast_cache_hits_total', cache=name)
+        return value
+    
+    def _cache_put(self, cache: OrderedDict, key, value, max_entries: int = CACHE_MAX_ENTRIES):
+        if not self.config.performance.cache_enabled:
+            return
+        cache[key] = value
+        if len(cache) > max_entries:
+            cache.popitem(last=False)
     
     def translate_with_ai(self, text: str, context: Dict = None) -> str:
         """使用 AI 模型進行智能翻譯"""
         if self.translation_provider == 'openai' and self.openai_client:
-            return self._translate_with_openai(text, context)
+            provider, provider_name, translate = 'openai', 'OpenAI', self._translate_with_openai
         elif self.translation_provider == 'gemini' and self.gemini_model:
-            return self._translate_with_gemini(text, context)
+            provider, provider_name, translate = 'gemini', 'Gemini', self._translate_with_gemini
         else:
             # 回退到 Google 翻譯
+            return self._translate_with_google(text)
+        
+        try:
+            with self.metrics.provider_call(provider, 'translation'):
+                return translate(text, context)
+        except Exception as e:
+            if not self.config.processing.error_recovery:
+                self.metrics.inc('podcast_provider_errors_total', provider=provider, operation='translation')
+                raise
+            logger.warning(f"⚠️  {provider_name} 翻譯失敗，使用備用翻譯: {e}")
+            self.metrics.inc('podcast_provider_errors_total', provider=provider, operation='translation')
+            self.metrics.inc('podcast_fallbacks_total', stage='translation', source=provider, target='google')
+            return self._translate_with_google(text)
+    
+    def _translate_with_google(self, text: str) -> str:
+        """使用 Google 翻譯"""
+        with self.metrics.provider_call('google', 'translation'):
             return self.translator.translate(text)
     
     def _translate_with_openai(self, text: str, context: Dict = None) -> str:
-        """使用 OpenAI o1-mini 進行翻譯"""
-        try:
-            # 構建提示詞
-            system_prompt = """你是一個專業的英文到繁體中文翻譯專家，專門處理 Podcast 對話內容。
+        """使用 OpenAI o1-mini 進行翻譯，失敗時拋出例外由呼叫端回退"""
+        # 構建提示詞
+        system_prompt = """你是一個專業的英文到繁體中文翻譯專家，專門處理 Podcast 對話內容。
 
 翻譯要求：
 1. 保持對話的自然性和口語化特色
@@ -105,37 +475,34 @@ class AudioProcessor:
 
 請直接返回翻譯結果，不要添加任何解釋。"""
 
-            user_prompt = f"請將以下英文對話翻譯成自然的繁體中文：\n\n{text}"
-            
-            # 如果有上下文信息，添加到提示中
-            if context:
-                if context.get('is_question'):
-                    user_prompt += "\n\n注意：這是一個問句，請確保翻譯後保持疑問語氣。"
-                elif context.get('is_response'):
-                    user_prompt += "\n\n注意：這是對前面問題的回應，請使用自然的回答語氣。"
-                elif context.get('is_transition'):
-                    user_prompt += "\n\n注意：這是話題轉換，請使用適當的轉場表達。"
-            
-            response = self.openai_client.chat.completions.create(
-                model=self.openai_model,
-                messages=[
-                    {"role": "user", "content": f"{system_prompt}\n\n{user_prompt}"}
-                ],
-                max_completion_tokens=1000,
-                temperature=0.3
-            )
-            
-            return response.choices[0].message.content.strip()
-            
-        except Exception as e:
-            print(f"⚠️  OpenAI 翻譯失敗，使用備用翻譯: {e}")
-            return self.translator.translate(text)
+        user_prompt = f"請將以下英文對話翻譯成自然的繁體中文：\n\n{text}"
+        
+        # 如果有上下文信息，添加到提示中
+        if context:
+            if context.get('is_question'):
+                user_prompt += "\n\n注意：這是一個問句，請確保翻譯後保持疑問語氣。"
+            elif context.get('is_response'):
+                user_prompt += "\n\n注意：這是對前面問題的回應，請使用自然的回答語氣。"
+            elif context.get('is_transition'):
+                user_prompt += "\n\n注意：這是話題轉換，請使用適當的轉場表達。"
+            if context.get('previous_text'):
+                user_prompt += f"\n\n前一句原文（僅供參考，不需翻譯）：{context['previous_text']}"
+        
+        response = self.openai_client.chat.completions.create(
+            model=self.openai_model,
+            messages=[
+                {"role": "user", "content": f"{system_prompt}\n\n{user_prompt}"}
+            ],
+            max_completion_tokens=1000,
+            temperature=0.3
+        )
+        
+        return response.choices[0].message.content.strip()
     
     def _translate_with_gemini(self, text: str, context: Dict = None) -> str:
-        """使用 Gemini 2.0 Flash Preview 進行翻譯"""
-        try:
-            # 構建提示詞
-            prompt = f"""你是一個專業的英文到繁體中文翻譯專家，專門處理 Podcast 對話內容。
+        """使用 Gemini 2.0 Flash Preview 進行翻譯，失敗時拋出例外由呼叫端回退"""
+        # 構建提示詞
+        prompt = f"""你是一個專業的英文到繁體中文翻譯專家，專門處理 Podcast 對話內容。
 
 翻譯要求：
 1. 保持對話的自然性和口語化特色
@@ -150,63 +517,91 @@ class AudioProcessor:
 
 請直接返回翻譯結果，不要添加任何解釋。"""
 
-            # 如果有上下文信息，添加到提示中
-            if context:
-                if context.get('is_question'):
-                    prompt += "\n\n注意：這是一個問句，請確保翻譯後保持疑問語氣。"
-                elif context.get('is_response'):
-                    prompt += "\n\n注意：這是對前面問題的回應，請使用自然的回答語氣。"
-                elif context.get('is_transition'):
-                    prompt += "\n\n注意：這是話題轉換，請使用適當的轉場表達。"
-            
-            response = self.gemini_model.generate_content(prompt)
-            return response.text.strip()
-            
-        except Exception as e:
-            print(f"⚠️  Gemini 翻譯失敗，使用備用翻譯: {e}")
-            return self.translator.translate(text)
+        # 如果有上下文信息，添加到提示中
+        if context:
+            if context.get('is_question'):
+                prompt += "\n\n注意：這是一個問句，請確保翻譯後保持疑問語氣。"
+            elif context.get('is_response'):
+                prompt += "\n\n注意：這是對前面問題的回應，請使用自然的回答語氣。"
+            elif context.get('is_transition'):
+                prompt += "\n\n注意：這是話題轉換，請使用適當的轉場表達。"
+            if context.get('previous_text'):
+                prompt += f"\n\n前一句原文（僅供參考，不需翻譯）：{context['previous_text']}"
+        
+        response = self.gemini_model.generate_content(prompt)
+        return response.text.strip()
     
-    def load_audio(self, file_path: str) -> AudioSegment:
+    def load_audio(self, file_path: str) -> 'AudioSegment':
         """載入音頻文件"""
         try:
-            audio = AudioSegment.from_wav(file_path)
-            print(f"✅ 成功載入音頻: {file_path}")
-            print(f"   時長: {len(audio)/1000:.2f} 秒")
-            print(f"   採樣率: {audio.frame_rate} Hz")
+            if file_path.lower().endswith('.wav'):
+                audio = _audio_segment().from_wav(file_path)
+            else:
+                audio = _audio_segment().from_file(file_path)
+            logger.info(f"✅ 成功載入音頻: {file_path}")
+            logger.info(f"   時長: {len(audio)/1000:.2f} 秒")
+            logger.info(f"   採樣率: {audio.frame_rate} Hz")
             return audio
         except Exception as e:
-            print(f"❌ 載入音頻失敗: {e}")
+            logger.error(f"❌ 載入音頻失敗: {e}")
             return None
     
+    def check_input_audio(self, file_path: str) -> bool:
+        """確認輸入音頻可讀取；WAV 直接載入，壓縮格式只探測長度而不解碼"""
+        if not needs_decoding(file_path):
+            return self.load_audio(file_path) is not None
+        if not ffmpeg_available():
+            logger.error(f"❌ 處理 .{extension(file_path)} 文件需要 ffmpeg，請先安裝或改用 WAV")
+            return False
+        duration, method = probe_duration(file_path)
+        logger.info(f"✅ 壓縮音頻將以 ffmpeg 串流解碼: {file_path}")
+        if duration is not None:
+            logger.info(f"   時長: {duration:.2f} 秒 ({method})")
+        return True
+    
     def transcribe_with_timestamps(self, audio_path: str) -> Dict:
-        """使用 OpenAI Whisper API 進行語音識別，保留時間戳"""
+        """語音識別並保留時間戳；依 whisper.backend 使用本地模型或 OpenAI Whisper API"""
+        if self.transcription_backend == 'local':
+            return self._transcribe_local(audio_path)
         try:
-            print("🎯 開始語音識別...")
+            logger.info("🎯 開始語音識別...")
             
             if not self.openai_client:
-                print("❌ OpenAI 客戶端未初始化，無法進行語音識別")
+                logger.error("❌ OpenAI 客戶端未初始化，無法進行語音識別")
                 return None
             
             # 使用 OpenAI Whisper API
-            with open(audio_path, "rb") as audio_file:
-                transcript = self.openai_client.audio.transcriptions.create(
-                    model="whisper-1",
-                    file=audio_file,
-                    response_format="verbose_json",
-                    timestamp_granularities=["segment"]
-                )
+            whisper = self.config.whisper
+            options = {'temperature': whisper.temperature}
+            if whisper.language:
+                options['language'] = whisper.language
+            if extension(audio_path) in OPENAI_UPLOAD_FORMATS:
+                audio_file = open(audio_path, "rb")
+            else:
+                # API 不接受的格式以 ffmpeg 管道轉成 16 kHz mp3，在記憶體中上傳
+                name = os.path.splitext(os.path.basename(audio_path))[0] + '.mp3'
+                audio_file = (name, encode_for_upload(audio_path))
+            with self.metrics.provider_call('openai', 'whisper'):
+                try:
+                    transcript = self.openai_client.audio.transcriptions.create(
+                        model="whisper-1",
+                        file=audio_file,
+                        response_format="verbose_json",
+                        timestamp_granularities=["segment", "word"] if whisper.word_timestamps else ["segment"],
+                        **options
+                    )
+                finally:
+                    if not isinstance(audio_file, tuple):
+                        audio_file.close()
             
-            # 轉換格式以符合原有的結構
+            # 轉換格式以符合原有的結構（SDK 版本不同，片段可能是物件或字典）
             segments = []
             for segment in transcript.segments:
-                segments.append({
-                    'start': segment['start'],
-                    'end': segment['end'],
-                    'text': segment['text'].strip(),
-                    'words': []  # OpenAI API 不提供詞級時間戳
-                })
+                if not isinstance(segment, dict):
+                    segment = {'start': segment.start, 'end': segment.end, 'text': segment.text}
+                segments.append(Segment(segment['start'], segment['end'], segment['text'].strip()))
             
-            print(f"✅ 語音識別完成，共 {len(segments)} 個片段")
+            logger.info(f"✅ 語音識別完成，共 {len(segments)} 個片段")
             return {
                 'text': transcript.text,
                 'segments': segments,
@@ -214,303 +609,851 @@ class AudioProcessor:
             }
             
         except Exception as e:
-            print(f"❌ 語音識別失敗: {e}")
-            # 如果 OpenAI API 失敗，嘗試使用簡單的分段方法
-            return self._fallback_transcription(audio_path)
+            return self._transcription_failed(audio_path, 'openai', e)
+    
+    def _transcribe_local(self, audio_path: str) -> Dict:
+        """使用本地 Whisper 模型進行語音識別，並回報即時率（RTF）"""
+        try:
+            logger.info("🎯 開始本地語音識別...")
+            with self.metrics.provider_call('local', 'whisper'):
+                transcription = self.local_transcriber.transcribe(audio_path)
+            rtf = transcription['rtf']
+            if rtf is not None:
+                self.metrics.observe('podcast_transcription_rtf', rtf, backend='local')
+            logger.info(f"✅ 語音識別完成，共 {len(transcription['segments'])} 個片段"
+                        f"（音頻 {transcription['duration']:.1f}s，耗時 {transcription['elapsed']:.1f}s"
+                        + (f"，RTF {rtf:.2f}）" if rtf is not None else "）"))
+            return transcription
+        except Exception as e:
+            return self._transcription_failed(audio_path, 'local', e)
     
-    def detect_speakers_and_dialogue(self, segments: List[Dict]) -> List[Dict]:
+    def _transcription_failed(self, audio_path: str, provider: str, error: Exception) -> Optional[Dict]:
+        """記錄語音識別失敗；error_recovery 開啟時改用固定長度分段"""
+        logger.error(f"❌ 語音識別失敗: {error}")
+        self.metrics.inc('podcast_provider_errors_total', provider=provider, operation='whisper')
+        if not self.config.processing.error_recovery:
+            return None
+        self.metrics.inc('podcast_fallbacks_total', stage='transcription', source=provider, target='fixed_segments')
+        # 如果語音識別失敗，嘗試使用簡單的分段方法
+        return self._fallback_transcription(audio_path)
+    
+    def _classify_segment(self, segment: Dict, index: int, previous_speaker: Optional[str],
+                          flags: int = None) -> Segment:
+        """分析單一片段的對話特徵並決定說話者（就地更新 Segment，字典會先轉換）
+
+        flags 為 DialogueRules 預先算好的旗標遮罩；未提供時就地分析。
+        """
+        segment = as_segment(segment)
+        text = segment.text.strip()
+        dialogue = self.config.dialogue
+        
+        # 檢測對話特徵（dialogue.dialogue_enhancement 關閉時略過）
+        if not dialogue.dialogue_enhancement:
+            flags = 0
+        elif flags is None:
+            flags = self.dialogue_rules.analyze(text)
+        is_question = bool(flags & QUESTION)
+        is_response = bool(flags & RESPONSE)
+        is_transition = bool(flags & TRANSITION)
+        
+        # 簡單的說話者檢測（基於對話模式）
+        if not dialogue.speaker_detection:
+            # 簡化模式：兩位主持人輪流發言
+            speaker = 'A' if index % 2 == 0 else 'B'
+        elif index == 0:
+            speaker = 'A'
+        elif is_question and previous_speaker == 'A':
+            speaker = 'B'
+        elif is_response and previous_speaker == 'B':
+            speaker = 'A'
+        else:
+            # 保持前一個說話者，除非有明顯的轉換
+            speaker = previous_speaker or 'A'
+            if len(text) > 100 and index > 0:  # 長句子可能是說話者轉換
+                speaker = 'B' if speaker == 'A' else 'A'
+        
+        segment.speaker = speaker
+        segment.is_question = is_question
+        segment.is_response = is_response
+        segment.is_transition = is_transition
+        return segment
+    
+    def detect_speakers_and_dialogue(self, segments: List[Dict]) -> List[Segment]:
         """檢測對話模式並標記說話者"""
+        segments = [as_segment(segment) for segment in segments]
         dialogue_segments = []
         
-        for i, segment in enumerate(segments):
-            text = segment['text'].strip()
-            
-            # 檢測對話特徵
-            is_question = text.endswith('?') or any(word in text.lower() for word in ['what', 'how', 'why', 'when', 'where', 'who'])
-            is_response = any(word in text.lower() for word in ['well', 'actually', 'so', 'yeah', 'right', 'exactly'])
-            is_transition = any(phrase in text.lower() for phrase in ['speaking of', 'by the way', 'another thing', 'also'])
-            
-            # 簡單的說話者檢測（基於對話模式）
-            if i == 0:
-                speaker = 'A'
-            elif is_question and dialogue_segments and dialogue_segments[-1]['speaker'] == 'A':
-                speaker = 'B'
-            elif is_response and dialogue_segments and dialogue_segments[-1]['speaker'] == 'B':
-                speaker = 'A'
-            else:
-                # 保持前一個說話者，除非有明顯的轉換
-                speaker = dialogue_segments[-1]['speaker'] if dialogue_segments else 'A'
-                if len(text) > 100 and i > 0:  # 長句子可能是說話者轉換
-                    speaker = 'B' if speaker == 'A' else 'A'
-            
-            dialogue_segments.append({
-                **segment,
-                'speaker': speaker,
-                'is_question': is_question,
-                'is_response': is_response,
-                'is_transition': is_transition
-            })
+        # 整批一次計算對話特徵旗標
+        if self.config.dialogue.dialogue_enhancement:
+            masks = self.dialogue_rules.analyze_batch([segment.text for segment in segments])
+        else:
+            masks = [0] * len(segments)
+        
+        for i, (segment, flags) in enumerate(zip(segments, masks)):
+            previous_speaker = dialogue_segments[-1].speaker if dialogue_segments else None
+            dialogue_segments.append(self._classify_segment(segment, i, previous_speaker, flags))
         
-        print(f"✅ 對話分析完成，檢測到 {len(set(seg['speaker'] for seg in dialogue_segments))} 個說話者")
+        logger.info(f"✅ 對話分析完成，檢測到 {len(set(seg.speaker for seg in dialogue_segments))} 個說話者")
         return dialogue_segments
     
-    def translate_with_context(self, segments: List[Dict]) -> List[Dict]:
-        """翻譯文本，保持對話的自然性"""
-        translated_segments = []
-        
-        print("🌐 開始翻譯...")
-        print(f"   使用翻譯提供商: {self.translation_provider}")
-        
-        for i, segment in enumerate(segments):
-            try:
-                original_text = segment['text']
-                
-                # 保留對話的自然表達
-                # 預處理：保留語氣詞和對話標記
-                text_to_translate = original_text
-                
-                # 準備上下文信息
+    def _translate_segment(self, segment: Dict, index: int, previous_text: str = None) -> Segment:
+        """翻譯單一片段（就地更新 Segment）；失敗時 error_recovery 開啟則保留原文，否則拋出例外"""
+        segment = as_segment(segment)
+        try:
+            original_text = segment.text
+            translation = self.config.translation
+            
+            # 保留對話的自然表達
+            # 預處理：保留語氣詞和對話標記
+            text_to_translate = original_text
+            
+            # 準備上下文信息（translation.preserve_dialogue 關閉時不提供對話特徵）
+            context = None
+            if translation.preserve_dialogue:
                 context = {
                     'is_question': segment.get('is_question', False),
                     'is_response': segment.get('is_response', False),
                     'is_transition': segment.get('is_transition', False),
                     'speaker': segment.get('speaker', 'A')
                 }
-                
-                # 使用 AI 翻譯（如果可用）或回退到 Google 翻譯
+                if translation.context_aware and previous_text:
+                    context['previous_text'] = previous_text
+            
+            # 使用 AI 翻譯（如果可用）或回退到 Google 翻譯；相同原文與對話特徵直接使用快取
+            cache_key = (self.translation_provider, text_to_translate,
+                         tuple(sorted((k, v) for k, v in (context or {}).items() if k != 'previous_text')))
+            translated = self._cache_get(self._translation_cache, cache_key, 'translation')
+            if translated is None:
                 translated = self.translate_with_ai(text_to_translate, context)
-                
-                # 後處理：調整中文表達使其更自然
-                translated = self.enhance_chinese_dialogue(translated, segment)
-                
-                translated_segments.append({
-                    **segment,
-                    'original_text': original_text,
-                    'translated_text': translated
-                })
-                
-                print(f"   {i+1}/{len(segments)} - 翻譯完成")
-                
-            except Exception as e:
-                print(f"❌ 翻譯第 {i+1} 段失敗: {e}")
-                translated_segments.append({
-                    **segment,
-                    'original_text': segment['text'],
-                    'translated_text': segment['text']  # 保留原文
-                })
-        
-        print("✅ 翻譯完成")
+                self._cache_put(self._translation_cache, cache_key, translated)
+            
+            # 後處理：調整中文表達使其更自然
+            if translation.enhance_naturalness:
+                translated = self.speech_rewriter.enhance(
+                    translated, getattr(segment, 'is_question', False), getattr(segment, 'is_response', False),
+                    getattr(segment, 'is_transition', False))
+            
+            segment.original_text = original_text
+            segment.translated_text = translated
+            
+        except Exception as e:
+            logger.error(f"❌ 翻譯第 {index+1} 段失敗: {e}")
+            if not self.config.processing.error_recovery:
+                raise
+            segment.original_text = segment.text
+            segment.translated_text = segment.text  # 保留原文
+        return segment
+    
+    def translate_with_context(self, segments: List[Dict]) -> List[Segment]:
+        """翻譯文本，保持對話的自然性"""
+        translated_segments = []
+        
+        logger.info("🌐 開始翻譯...")
+        logger.info(f"   使用翻譯提供商: {self.translation_provider}")
+        
+        progress = self._progress("翻譯完成", len(segments))
+        for i, segment in enumerate(segments):
+            previous_text = segments[i - 1]['text'] if i > 0 else None
+            translated_segments.append(self._translate_segment(segment, i, previous_text))
+            progress.update()
+        progress.finish()
+        
+        logger.info("✅ 翻譯完成")
         return translated_segments
     
     def enhance_chinese_dialogue(self, translated_text: str, segment: Dict) -> str:
-        """增強中文對話的自然性"""
-        text = translated_text
-        
-        # 根據對話類型調整表達
-        if segment.get('is_question'):
-            # 問句調整
-            if not text.endswith('？') and not text.endswith('?'):
-                text += '？'
-            # 添加自然的問句開頭
-            question_starters = ['那麼', '所以', '那', '嗯']
-            if not any(text.startswith(starter) for starter in question_starters):
-                if '什麼' in text or '怎麼' in text:
-                    text = '那' + text
-        
-        elif segment.get('is_response'):
-            # 回應調整
-            response_starters = ['嗯', '對', '是的', '沒錯', '確實']
-            if not any(text.startswith(starter) for starter in response_starters):
-                text = '嗯，' + text
-        
-        elif segment.get('is_transition'):
-            # 轉場調整
-            transition_words = ['說到這個', '順便說一下', '另外', '還有']
-            if not any(phrase in text for phrase in transition_words):
-                text = '說到這個，' + text
-        
-        # 添加自然的語氣詞
-        if len(text) > 50 and '，' in text:
-            # 在長句中間添加語氣詞
-            parts = text.split('，')
-            if len(parts) > 1:
-                parts[0] += '呢'
-                text = '，'.join(parts)
-        
-        return text
+        """增強中文對話的自然性（規則見 speech_markup.SpeechRewriter）"""
+        return self.speech_rewriter.enhance(translated_text, bool(segment.get('is_question')),
+                                            bool(segment.get('is_response')), bool(segment.get('is_transition')))
+    
+    async def _synthesize_segment(self, segment: Segment, index: int, output_dir: str) -> Optional[SegmentAudio]:
+        """生成單一片段的中文語音，失敗時返回 None"""
+        try:
+            # 選擇聲音（根據說話者）
+            voice = self.chinese_voices['female'] if segment.speaker == 'A' else self.chinese_voices['male']
+            
+            # 依對話類型決定語速與音高；停頓在長駐連線上以 SSML 插入，否則由標點產生
+            plan = self.plan_speech(segment)
+            text, rate, pitch = self.speech_rewriter.edge_arguments(plan)
+            markup = self._speech_markup(plan)
+            
+            # 生成語音文件；相同聲音、文字與語調的短句直接寫出快取的音頻內容
+            output_file = os.path.join(output_dir, f"segment_{index:03d}_{segment.speaker}.wav")
+            cache_key = (voice, markup or text, rate, pitch)
+            cached_audio = self._cache_get(self._tts_cache, cache_key, 'tts')
+            if cached_audio is not None:
+                with open(output_file, 'wb') as f:
+                    f.write(cached_audio)
+            else:
+                async with self._slot('tts'):
+                    await self._synthesize_to_file(text, voice, output_file, rate, pitch, markup)
+                if self.config.performance.cache_enabled and os.path.getsize(output_file) <= TTS_CACHE_MAX_BYTES:
+                    with open(output_file, 'rb') as f:
+                        self._cache_put(self._tts_cache, cache_key, f.read(), TTS_CACHE_MAX_ENTRIES)
+            
+            self.metrics.inc('podcast_segments_total', stage='tts')
+            return SegmentAudio(output_file, index, segment.start, segment.end, segment.speaker)
+            
+        except Exception as e:
+            logger.error(f"❌ 生成第 {index+1} 段語音失敗: {e}")
+            self.metrics.inc('podcast_provider_errors_total', provider='edge', operation='tts')
+            return None
+    
+    def _speech_markup(self, plan: SpeechPlan) -> Optional[str]:
+        """含 <break> 停頓的 SSML 內容；只有長駐連線能送出 SSML，其他情況返回 None"""
+        if self._tts_pool is None or not plan.breaks:
+            return None
+        markup = self.speech_rewriter.ssml_body(plan)
+        # 過長的內容需要切成多個請求，改送純文字以免切斷標記
+        return markup if len(markup.encode('utf-8')) <= MAX_REQUEST_BYTES else None
+    
+    async def _synthesize_to_file(self, text: str, voice: str, output_file: str,
+                                  rate: Optional[str] = None, pitch: Optional[str] = None,
+                                  markup: Optional[str] = None):
+        """呼叫 Edge TTS 將文字合成為音頻文件（未指定語速與音高時取自 tts.speech_rate / speech_pitch）
+
+        在 tts_sessions() 內時使用共用的長駐連線，並送出 markup（含停頓的 SSML 內容）；
+        否則每次以 edge_tts.Communicate 建立新的連線，只能送出純文字 text。
+        """
+        rate = rate or self.config.edge_rate
+        pitch = pitch or self.config.edge_pitch
+        with self.metrics.provider_call('edge', 'tts'):
+            if self._tts_pool is not None:
+                if markup:
+                    audio = await self._tts_pool.synthesize(markup, voice, rate, pitch, markup=True)
+                else:
+                    audio = await self._tts_pool.synthesize(text, voice, rate, pitch)
+                with open(output_file, 'wb') as f:
+                    f.write(audio)
+                return
+            import edge_tts
+            communicate = edge_tts.Communicate(text, voice, rate=rate, pitch=pitch)
+            await communicate.save(output_file)
+    
+    @asynccontextmanager
+    async def tts_sessions(self):
+        """在區塊內共用 Edge TTS 長駐連線；同時進行的處理共用同一個連線池，最後一個離開時關閉"""
+        if self.config.tts.session_pool_size <= 0:
+            yield None
+            return
+        if self._tts_pool is None:
+            self._tts_pool = TTSSessionPool.from_config(self.config, self.metrics)
+        pool = self._tts_pool
+        self._tts_pool_users += 1
+        try:
+            yield pool
+        finally:
+            self._tts_pool_users -= 1
+            if self._tts_pool_users == 0:
+                self._tts_pool = None
+                stats = pool.stats()
+                if stats['requests']:
+                    logger.debug(f"🔌 TTS 連線池: {stats['connections']} 次連線（平均 {stats['mean_connect_ms']} ms），"
+                                 f"{stats['requests']} 個請求（平均 {stats['mean_synthesis_ms']} ms），"
+                                 f"重新連線 {stats['reconnects']} 次")
+                await pool.close()
     
     async def generate_chinese_audio(self, segments: List[Dict], output_dir: str) -> str:
         """生成中文語音"""
         os.makedirs(output_dir, exist_ok=True)
         audio_files = []
         
-        print("🎤 開始生成中文語音...")
+        logger.info("🎤 開始生成中文語音...")
         
-        for i, segment in enumerate(segments):
-            try:
-                # 選擇聲音（根據說話者）
-                voice = self.chinese_voices['female'] if segment['speaker'] == 'A' else self.chinese_voices['male']
-                
-                # 調整語音參數以更自然
-                text = segment['translated_text']
-                
-                # 添加適當的停頓標記
-                text = self.add_speech_marks(text, segment)
-                
-                # 生成語音文件
-                output_file = os.path.join(output_dir, f"segment_{i:03d}_{segment['speaker']}.wav")
-                
-                communicate = edge_tts.Communicate(text, voice)
-                await communicate.save(output_file)
-                
-                audio_files.append({
-                    'file': output_file,
-                    'start': segment['start'],
-                    'end': segment['end'],
-                    'speaker': segment['speaker'],
-                    'duration': segment['end'] - segment['start']
-                })
-                
-                print(f"   {i+1}/{len(segments)} - 語音生成完成")
-                
-            except Exception as e:
-                print(f"❌ 生成第 {i+1} 段語音失敗: {e}")
+        progress = self._progress("語音生成完成", len(segments))
+        async with self.tts_sessions():
+            for i, segment in enumerate(segments):
+                audio_info = await self._synthesize_segment(as_segment(segment), i, output_dir)
+                if audio_info:
+                    audio_files.append(audio_info)
+                progress.update()
+        progress.finish()
         
         # 合併音頻文件
         final_audio_path = await self.merge_audio_segments(audio_files, output_dir)
-        print("✅ 中文語音生成完成")
+        logger.info("✅ 中文語音生成完成")
         return final_audio_path
     
-    def add_speech_marks(self, text: str, segment: Dict) -> str:
-        """添加語音標記以改善自然度"""
-        # 添加停頓
-        if segment.get('is_question'):
-            text = text.replace('？', '<break time="500ms"/>？')
-        
-        # 在逗號後添加短暫停頓
-        text = text.replace('，', '，<break time="300ms"/>')
-        
-        # 在句號後添加停頓
-        text = text.replace('。', '。<break time="500ms"/>')
-        
-        # 調整語速和音調
-        if segment.get('is_question'):
-            text = f'<prosody rate="0.9" pitch="+5%">{text}</prosody>'
-        elif segment.get('is_response'):
-            text = f'<prosody rate="1.0" pitch="-2%">{text}</prosody>'
+    def plan_speech(self, segment: Segment) -> SpeechPlan:
+        """依對話類型產生語音計畫（停頓位置與語速 / 音高調整）"""
+        return self.speech_rewriter.plan(segment.translated_text, getattr(segment, 'is_question', False),
+                                         getattr(segment, 'is_response', False), segment.text)
+    
+    def _pause_after(self, audio_info: SegmentAudio) -> int:
+        """計算片段之後的間隔（毫秒），模擬自然對話"""
+        pause = self.config.dialogue.pause_duration
+        if not self.config.dialogue.natural_flow:
+            return pause.medium
+        return min(pause.long, max(pause.short, int(audio_info.duration * 100)))
+    
+    def _mix_segment(self, writer: StreamingWavWriter, audio_info: SegmentAudio, previous_info: Optional[SegmentAudio]):
+        """將一個語音片段附加到輸出音頻"""
+        with self.metrics.time('podcast_stage_seconds', stage='mix'), self._profile('mix'):
+            # 載入音頻片段（Edge TTS 輸出的實際編碼由 pydub 自動判斷）
+            segment_audio = _audio_segment().from_file(audio_info.file)
+            
+            # 添加適當的間隔（模擬自然對話）
+            if previous_info is not None:
+                writer.append_silence(self._pause_after(previous_info))
+            
+            audio_info.offset_frames, audio_info.length_frames = writer.append(segment_audio)
+        self.metrics.inc('podcast_segments_total', stage='mix')
         
-        return text
+        # output.create_segments 關閉時，片段寫入輸出音頻後即刪除（temp_cleanup 關閉時保留）
+        if not self.config.output.create_segments and self.config.processing.temp_cleanup:
+            os.remove(audio_info.file)
+    
+    async def _mix_in_thread(self, writer: StreamingWavWriter, audio_info: SegmentAudio,
+                             previous_info: Optional[SegmentAudio]):
+        """在執行緒中解碼並附加片段，不阻塞同時進行的翻譯與語音合成
+
+        被取消時仍等待這次寫入結束，避免與關閉寫入器同時操作同一個文件。
+        """
+        mixing = asyncio.ensure_future(asyncio.to_thread(self._mix_segment, writer, audio_info, previous_info))
+        try:
+            await asyncio.shield(mixing)
+        except asyncio.CancelledError:
+            await asyncio.gather(mixing, return_exceptions=True)
+            raise
     
     async def merge_audio_segments(self, audio_files: List[Dict], output_dir: str) -> str:
         """合併音頻片段"""
         try:
-            combined = AudioSegment.empty()
+            final_path = os.path.join(output_dir, "chinese_podcast_final.wav")
+            writer = self._create_writer(final_path)
             
-            for audio_info in audio_files:
-                # 載入音頻片段
-                segment_audio = AudioSegment.from_wav(audio_info['file'])
-                
-                # 添加到合併音頻
-                combined += segment_audio
-                
-                # 添加適當的間隔（模擬自然對話）
-                if audio_info != audio_files[-1]:  # 不是最後一個片段
-                    silence_duration = min(1000, max(300, int(audio_info['duration'] * 100)))
-                    combined += AudioSegment.silent(duration=silence_duration)
+            previous_info = None
+            for audio_info in map(as_segment_audio, audio_files):
+                await self._mix_in_thread(writer, audio_info, previous_info)
+                previous_info = audio_info
             
-            # 輸出最終文件
-            final_path = os.path.join(output_dir, "chinese_podcast_final.wav")
-            combined.export(final_path, format="wav")
+            if not writer.close():
+                logger.error("❌ 音頻合併失敗: 沒有可合併的片段")
+                return None
             
-            print(f"✅ 音頻合併完成: {final_path}")
+            logger.info(f"✅ 音頻合併完成: {final_path}")
             return final_path
             
         except Exception as e:
-            print(f"❌ 音頻合併失敗: {e}")
+            logger.error(f"❌ 音頻合併失敗: {e}")
             return None
     
-    def save_transcript(self, segments: List[Dict], output_path: str):
-        """保存逐字稿"""
+    def _create_writer(self, path: str) -> StreamingWavWriter:
+        """建立輸出音頻寫入器；設定 audio.sample_rate 時統一輸出格式"""
+        audio = self.config.audio
+        if audio.sample_rate:
+            return StreamingWavWriter(path, (audio.channels or 1, 2, audio.sample_rate))
+        return StreamingWavWriter(path)
+    
+    def _format_timestamp(self, seconds: float) -> str:
+        """依 output.timestamp_format 格式化逐字稿時間"""
+        return format_timestamp(seconds, self.config.output.timestamp_format)
+    
+    def _parse_timestamp(self, value: str) -> float:
+        """解析逐字稿時間（支援 '12.34s' 與 '12340ms'）"""
+        return parse_timestamp(value)
+    
+    def _transcript_entry(self, segment: Segment) -> Dict:
+        """將片段轉換為逐字稿格式"""
+        segment = as_segment(segment)
+        return {
+            'start_time': self._format_timestamp(segment.start),
+            'end_time': self._format_timestamp(segment.end),
+            'speaker': segment.speaker,
+            'original_text': segment.original_text,
+            'translated_text': segment.translated_text,
+            'dialogue_type': segment.dialogue_type()
+        }
+    
+    def _transcript_data(self, segments: List[Dict], preview: Dict = None) -> Dict:
+        transcript_data = {
+            'timestamp': datetime.now().isoformat(),
+            'total_segments': len(segments),
+            'segments': [self._transcript_entry(segment) for segment in segments]
+        }
+        if preview is not None:
+            transcript_data['preview'] = preview
+        return transcript_data
+    
+    def _write_transcript_json(self, transcript_data: Dict, output_path: str):
+        """先寫入暫存檔再取代，中斷時既有文件仍是完整的 JSON"""
+        temp_path = output_path + '.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(transcript_data, f, ensure_ascii=False, indent=2)
+        os.replace(temp_path, output_path)
+    
+    def save_transcript(self, segments: List[Dict], output_path: str, preview: Dict = None):
+        """保存逐字稿（副檔名為 .ptc 時寫成欄式格式）；preview 為預覽模式的停止條件與狀態"""
         try:
-            transcript_data = {
-                'timestamp': datetime.now().isoformat(),
-                'total_segments': len(segments),
-                'segments': []
-            }
-            
-            for segment in segments:
-                transcript_data['segments'].append({
-                    'start_time': f"{segment['start']:.2f}s",
-                    'end_time': f"{segment['end']:.2f}s",
-                    'speaker': segment['speaker'],
-                    'original_text': segment['original_text'],
-                    'translated_text': segment['translated_text'],
-                    'dialogue_type': {
-                        'is_question': segment.get('is_question', False),
-                        'is_response': segment.get('is_response', False),
-                        'is_transition': segment.get('is_transition', False)
-                    }
-                })
+            transcript_data = self._transcript_data(segments, preview)
             
-            with open(output_path, 'w', encoding='utf-8') as f:
-                json.dump(transcript_data, f, ensure_ascii=False, indent=2)
+            if output_path.endswith(TRANSCRIPT_STORE_SUFFIX):
+                write_transcript_store(transcript_data, output_path)
+            else:
+                self._write_transcript_json(transcript_data, output_path)
             
-            print(f"✅ 逐字稿已保存: {output_path}")
+            logger.info(f"✅ 逐字稿已保存: {output_path}")
             
         except Exception as e:
-            print(f"❌ 保存逐字稿失敗: {e}")
+            logger.error(f"❌ 保存逐字稿失敗: {e}")
     
-    async def process_audio_complete(self, input_wav_path: str, output_dir: str = "output") -> Dict:
-        """完整的音頻處理流程"""
-        print("🚀 開始完整音頻處理流程...")
+    def segment_content_hash(self, entry: Dict, timing: bool = True) -> str:
+        """計算逐字稿片段中影響語音合成與其後停頓的內容雜湊
+
+        起訖時間決定片段之後的停頓長度，因此也納入雜湊；timing 為 False 時
+        只計算第 1 版渲染清單使用的內容欄位。
+        """
+        dialogue_type = entry.get('dialogue_type', {})
+        speaker = entry['speaker']
+        voice = self.chinese_voices['female'] if speaker == 'A' else self.chinese_voices['male']
+        fields = [
+            speaker,
+            voice,
+            entry['translated_text'],
+            dialogue_type.get('is_question', False),
+            dialogue_type.get('is_response', False),
+            dialogue_type.get('is_transition', False)
+        ]
+        if timing:
+            fields += [round(self._parse_timestamp(entry['start_time']), 3),
+                       round(self._parse_timestamp(entry['end_time']), 3)]
+        payload = json.dumps(fields, ensure_ascii=False)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()[:16]
+    
+    def save_render_manifest(self, segments: List[Segment], mixed: Dict[int, SegmentAudio],
+                             writer: StreamingWavWriter, output_dir: str) -> str:
+        """保存渲染清單：每段的內容雜湊與其在輸出音頻中的位置，供重新渲染使用"""
+        manifest = {
+            'version': RENDER_MANIFEST_VERSION,
+            'timestamp': datetime.now().isoformat(),
+            'chinese_audio': os.path.basename(writer.path),
+            'frame_rate': writer.frame_rate,
+            'segments': []
+        }
+        for i, segment in enumerate(segments):
+            audio_info = mixed.get(i)
+            manifest['segments'].append({
+                'index': i,
+                'hash': self.segment_content_hash(self._transcript_entry(segment)),
+                'file': os.path.basename(audio_info.file) if audio_info else None,
+                'offset_frames': audio_info.offset_frames if audio_info else None,
+                'length_frames': audio_info.length_frames if audio_info else None,
+                'pause_after_ms': self._pause_after(audio_info) if audio_info else None
+            })
+        
+        manifest_path = os.path.join(output_dir, RENDER_MANIFEST_NAME)
+        with open(manifest_path, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, ensure_ascii=False, indent=2)
+        return manifest_path
+    
+    async def rerender(self, output_dir: str, transcript_path: str = None) -> Dict:
+        """根據編輯後的逐字稿重新渲染音頻
+
+        以內容雜湊比對上次的渲染清單，只重新合成有變更的片段，
+        並將其拼接回既有的輸出音頻，其他時間範圍直接複製原始幀。
+        """
+        started_at = time.perf_counter()
+        if not transcript_path:
+            # 只輸出欄式逐字稿時改用 transcript.ptc
+            transcript_path = os.path.join(output_dir, "transcript.json")
+            store_path = os.path.join(output_dir, "transcript" + TRANSCRIPT_STORE_SUFFIX)
+            if not os.path.exists(transcript_path) and os.path.exists(store_path):
+                transcript_path = store_path
+        manifest_path = os.path.join(output_dir, RENDER_MANIFEST_NAME)
+        
+        logger.info("🔁 開始增量重新渲染...")
+        
+        if not os.path.exists(manifest_path):
+            logger.error(f"❌ 找不到渲染清單: {manifest_path}，請先執行完整處理流程")
+            return None
+        
+        with open(manifest_path, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+        entries = load_transcript(transcript_path)['segments']
+        
+        previous = manifest['segments']
+        if len(entries) != len(previous):
+            logger.error(f"❌ 片段數量已變更 ({len(previous)} → {len(entries)})，無法增量渲染，請重新完整處理")
+            return None
+        
+        final_path = os.path.join(output_dir, manifest['chinese_audio'])
+        if not os.path.exists(final_path):
+            logger.error(f"❌ 找不到既有輸出音頻: {final_path}")
+            return None
+        
+        # 1. 以內容雜湊找出有變更的片段（第 1 版清單的雜湊不含起訖時間，只能比對內容）
+        new_hashes = [self.segment_content_hash(entry) for entry in entries]
+        if manifest.get('version', 1) < 2:
+            compared = [self.segment_content_hash(entry, timing=False) for entry in entries]
+        else:
+            compared = new_hashes
+        changed = [i for i, entry in enumerate(previous) if entry['hash'] != compared[i]]
+        
+        if not changed:
+            logger.info("✅ 逐字稿沒有變更，無需重新渲染")
+            return {
+                'chinese_audio': final_path,
+                'changed_segments': [],
+                'elapsed': round(time.perf_counter() - started_at, 3)
+            }
+        
+        logger.info(f"   有變更的片段: {', '.join(str(i + 1) for i in changed)}")
+        
+        # 2. 只重新合成有變更的片段，與完整處理相同最多同時合成 processing.concurrent_limit 段
+        async def changed_segments():
+            for i in changed:
+                yield i
+
+        async def synthesize(_, i: int) -> Optional[SegmentAudio]:
+            return await self._synthesize_segment(self._segment_from_transcript_entry(entries[i]), i, output_dir)
+
+        limit = self._window('tts', self.config.processing.concurrent_limit)
+        async with self.tts_sessions():
+            synthesized = [info async for info in ordered_concurrent(changed_segments(), synthesize, limit)]
+        new_audio = {i: info for i, info in zip(changed, synthesized) if info}
         
-        # 1. 載入音頻
-        audio = self.load_audio(input_wav_path)
-        if not audio:
+        # 3. 將新片段拼接進既有音頻
+        temp_path = final_path + '.rerender.tmp'
+        try:
+            await asyncio.to_thread(self._splice_segments, final_path, temp_path, previous, new_audio)
+            os.replace(temp_path, final_path)
+        except Exception as e:
+            logger.error(f"❌ 拼接音頻失敗: {e}")
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
             return None
         
-        # 2. 語音識別
-        transcription = self.transcribe_with_timestamps(input_wav_path)
+        # 4. 更新渲染清單（一律寫入含起訖時間的雜湊）
+        for i, entry in enumerate(previous):
+            entry['hash'] = new_hashes[i]
+            if i in new_audio:
+                entry['file'] = os.path.basename(new_audio[i].file)
+        manifest['version'] = RENDER_MANIFEST_VERSION
+        manifest['timestamp'] = datetime.now().isoformat()
+        with open(manifest_path, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, ensure_ascii=False, indent=2)
+        
+        failed = [i for i in changed if i not in new_audio]
+        result = {
+            'chinese_audio': final_path,
+            'changed_segments': changed,
+            'failed_segments': failed,
+            'elapsed': round(time.perf_counter() - started_at, 3)
+        }
+        logger.info(f"✅ 重新渲染完成: {final_path}")
+        logger.info(f"   重新合成 {len(new_audio)} 段，耗時 {result['elapsed']:.2f} 秒")
+        return result
+    
+    def _segment_from_transcript_entry(self, entry: Dict) -> Segment:
+        """將逐字稿片段還原為處理流程使用的格式"""
+        dialogue_type = entry.get('dialogue_type', {})
+        segment = Segment(self._parse_timestamp(entry['start_time']), self._parse_timestamp(entry['end_time']),
+                          entry.get('original_text', ''))
+        segment.speaker = entry['speaker']
+        segment.is_question = dialogue_type.get('is_question', False)
+        segment.is_response = dialogue_type.get('is_response', False)
+        segment.is_transition = dialogue_type.get('is_transition', False)
+        segment.original_text = entry.get('original_text', '')
+        segment.translated_text = entry['translated_text']
+        return segment
+    
+    def _splice_segments(self, source_path: str, target_path: str,
+                         placements: List[Dict], new_audio: Dict[int, SegmentAudio]):
+        """將新合成的片段替換進既有音頻，並就地更新 placements 中的幀位置"""
+        with wave.open(source_path, 'rb') as source:
+            params = (source.getnchannels(), source.getsampwidth(), source.getframerate())
+            writer = StreamingWavWriter(target_path, params)
+            cursor = 0
+            previous_pause = None
+            # 上一個片段重新合成時，其後的停頓依新片段重新產生，不複製原有的停頓
+            regap = False
+            
+            try:
+                for entry in placements:
+                    index = entry['index']
+                    placed = entry['offset_frames'] is not None
+                    
+                    if placed:
+                        if regap:
+                            source.setpos(entry['offset_frames'])
+                            writer.append_silence(previous_pause)
+                        else:
+                            # 複製上一片段結尾到本片段開頭之間的原始幀（即停頓）
+                            writer.write_raw(source.readframes(entry['offset_frames'] - cursor))
+                        cursor = entry['offset_frames'] + entry['length_frames']
+                        if index in new_audio:
+                            source.setpos(cursor)
+                            segment_audio = _audio_segment().from_file(new_audio[index].file)
+                            entry['offset_frames'], entry['length_frames'] = writer.append(segment_audio)
+                            entry['pause_after_ms'] = self._pause_after(new_audio[index])
+                        else:
+                            entry['offset_frames'], _ = writer.write_raw(source.readframes(entry['length_frames']))
+                        previous_pause = entry['pause_after_ms']
+                        regap = index in new_audio
+                    elif index in new_audio:
+                        # 先前合成失敗的片段：插入在前一片段之後
+                        if writer.frames:
+                            writer.append_silence(previous_pause or self._pause_after(new_audio[index]))
+                        segment_audio = _audio_segment().from_file(new_audio[index].file)
+                        entry['offset_frames'], entry['length_frames'] = writer.append(segment_audio)
+                        entry['pause_after_ms'] = self._pause_after(new_audio[index])
+                        previous_pause = entry['pause_after_ms']
+                        regap = True
+                
+                # 複製最後一個片段之後的剩餘幀
+                writer.write_raw(source.readframes(source.getnframes() - cursor))
+            finally:
+                writer.close()
+    
+    async def stream_transcription(self, audio_path: str, stats: PipelineStats = None) -> AsyncIterator[Dict]:
+        """串流階段 1：語音識別，逐段輸出轉錄片段"""
+        async with self._slot('transcription'):
+            with self.metrics.time('podcast_stage_seconds', stage='transcription'):
+                transcription = await asyncio.to_thread(
+                    self._run_stage, 'transcription', self.transcribe_with_timestamps, audio_path)
         if not transcription:
+            return
+        if stats:
+            stats.transcription_rtf = transcription.get('rtf')
+        self.metrics.inc('podcast_segments_total', len(transcription['segments']), stage='transcription')
+        for segment in transcription['segments']:
+            if stats:
+                stats.segments_transcribed += 1
+            yield segment
+    
+    async def stream_dialogue(self, segments: AsyncIterator[Dict]) -> AsyncIterator[Dict]:
+        """串流階段 2：對話分析，依序標記說話者"""
+        previous_speaker = None
+        speakers = set()
+        index = 0
+        async for segment in segments:
+            with self.metrics.time('podcast_stage_seconds', stage='dialogue'), self._profile('dialogue'):
+                dialogue_segment = self._classify_segment(segment, index, previous_speaker)
+            previous_speaker = dialogue_segment.speaker
+            speakers.add(previous_speaker)
+            index += 1
+            yield dialogue_segment
+        logger.info(f"✅ 對話分析完成，檢測到 {len(speakers)} 個說話者")
+    
+    async def stream_translations(self, segments: AsyncIterator[Dict]) -> AsyncIterator[Dict]:
+        """串流階段 3：翻譯，同步 API 呼叫在執行緒中進行以免阻塞事件迴圈"""
+        logger.info("🌐 開始翻譯...")
+        logger.info(f"   使用翻譯提供商: {self.translation_provider}")
+        progress = self._progress("翻譯完成")
+        # translation.batch_translate 啟用時，同時送出最多 concurrent_limit 個翻譯請求
+        limit = self.config.processing.concurrent_limit if self.config.translation.batch_translate else 1
+        limit = self._window('translation', limit)
+        
+        async def with_previous_text() -> AsyncIterator[Tuple[Dict, Optional[str]]]:
+            previous_text = None
+            async for segment in segments:
+                yield segment, previous_text
+                previous_text = segment.text
+        
+        async def translate(index: int, item: Tuple[Dict, Optional[str]]) -> Dict:
+            segment, previous_text = item
+            async with self._slot('translation'):
+                with self.metrics.time('podcast_stage_seconds', stage='translation'):
+                    translated = await asyncio.to_thread(
+                        self._run_stage, 'translation', self._translate_segment, segment, index, previous_text)
+            self.metrics.inc('podcast_segments_total', stage='translation')
+            return translated
+        
+        async for translated in ordered_concurrent(with_previous_text(), translate, limit):
+            progress.update()
+            yield translated
+        progress.finish()
+        logger.info("✅ 翻譯完成")
+    
+    async def stream_synthesis(self, segments: AsyncIterator[Dict], output_dir: str) -> AsyncIterator[Dict]:
+        """串流階段 4：語音合成，逐段輸出音頻片段資訊"""
+        logger.info("🎤 開始生成中文語音...")
+        progress = self._progress("語音生成完成")
+        
+        async def synthesize(index: int, segment: Dict) -> Optional[Dict]:
+            with self.metrics.time('podcast_stage_seconds', stage='tts'):
+                return await self._synthesize_segment(segment, index, output_dir)
+        
+        # 同時合成最多 processing.concurrent_limit 個片段（批次排程時放寬到 TTS 容量），依原順序交給混音
+        limit = self._window('tts', self.config.processing.concurrent_limit)
+        async with self.tts_sessions():
+            async for audio_info in ordered_concurrent(segments, synthesize, limit):
+                progress.update()
+                if audio_info:
+                    yield audio_info
+        progress.finish()
+        logger.info("✅ 中文語音生成完成")
+    
+    async def _collect(self, segments: AsyncIterator[Dict], sink: List[Dict]) -> AsyncIterator[Dict]:
+        """將經過的片段記錄到 sink，供逐字稿使用"""
+        async for segment in segments:
+            sink.append(segment)
+            yield segment
+    
+    async def stream_preview(self, input_path: str, transcript_path: str) -> AsyncIterator[Segment]:
+        """預覽模式：邊翻譯邊輸出片段，達到 preview.segments 或 preview.seconds 即停止
+        
+        停止後不再將片段送入翻譯；preview.window_seconds 設定時只轉錄音頻開頭。
+        每段翻譯完成後以原子方式更新 transcript_path，中途停止時仍是有效的部分逐字稿。
+        """
+        preview = self.config.preview
+        state = {'segments': preview.segments, 'seconds': preview.seconds,
+                 'window_seconds': preview.window_seconds, 'complete': False}
+        source = input_path
+        window_path = None
+        if preview.window_seconds:
+            window_path = os.path.join(os.path.dirname(os.path.abspath(transcript_path)), '.preview_window.wav')
+            source = await asyncio.to_thread(write_leading_window, input_path, preview.window_seconds, window_path)
+            logger.info(f"✂️  只轉錄開頭 {preview.window_seconds:g} 秒")
+        
+        async def leading(segments: AsyncIterator[Segment]) -> AsyncIterator[Segment]:
+            count = 0
+            try:
+                async for segment in segments:
+                    if count >= preview.segments or (preview.seconds is not None
+                                                     and segment.start >= preview.seconds):
+                        return
+                    count += 1
+                    yield segment
+                state['complete'] = True
+            finally:
+                await segments.aclose()
+        
+        previews = []
+        try:
+            transcribed = buffered_stage(self.stream_transcription(source))
+            dialogue = buffered_stage(self.stream_dialogue(leading(transcribed)))
+            async for segment in self.stream_translations(dialogue):
+                previews.append(segment)
+                self._write_transcript_json(self._transcript_data(previews, state), transcript_path)
+                yield segment
+        finally:
+            # 中途停止時也保留最後一次完整寫入的內容與停止原因
+            self.save_transcript(previews, transcript_path, preview=state)
+            if window_path and os.path.exists(window_path):
+                os.remove(window_path)
+    
+    async def process_audio_complete(self, input_wav_path: str, output_dir: str = "output") -> Dict:
+        """完整的音頻處理流程
+
+        各階段以有界佇列串接：第 N 段翻譯時，第 N+1 段正在分析，
+        第 N-1 段正在合成並寫入輸出音頻。
+        """
+        logger.info("🚀 開始完整音頻處理流程...")
+        os.makedirs(output_dir, exist_ok=True)
+        stats = PipelineStats()
+        
+        # 1. 檢查音頻（壓縮格式只讀取標頭，之後由各階段經 ffmpeg 管道串流解碼）
+        if not self.check_input_audio(input_wav_path):
             return None
+        self.metrics.inc('podcast_bytes_in_total', os.path.getsize(input_wav_path), kind='input_audio')
         
-        # 3. 對話分析
-        dialogue_segments = self.detect_speakers_and_dialogue(transcription['segments'])
+        # 2-5. 語音識別 → 對話分析 → 翻譯 → 語音合成，串流執行
+        translated_segments = []
+        transcribed = buffered_stage(self.stream_transcription(input_wav_path, stats))
+        dialogue = buffered_stage(self.stream_dialogue(transcribed))
+        translated = buffered_stage(self._collect(self.stream_translations(dialogue), translated_segments))
+        synthesized = buffered_stage(self.stream_synthesis(translated, output_dir))
         
-        # 4. 翻譯
-        translated_segments = self.translate_with_context(dialogue_segments)
+        # 6. 邊合成邊合併音頻
+        chinese_audio_path = os.path.join(output_dir, "chinese_podcast_final.wav")
+        writer = self._create_writer(chinese_audio_path)
+        previous_info = None
+        mixed = {}
+        try:
+            async for audio_info in synthesized:
+                try:
+                    await self._mix_in_thread(writer, audio_info, previous_info)
+                except Exception as e:
+                    logger.error(f"❌ 合併第 {audio_info['index']+1} 段音頻失敗: {e}")
+                    continue
+                previous_info = audio_info
+                mixed[audio_info['index']] = audio_info
+                stats.mark_audio()
+        finally:
+            with self.metrics.time('podcast_stage_seconds', stage='export'), self._profile('export'):
+                has_audio = writer.close()
+        stats.finish()
+        pipeline_stats = stats.as_dict()
+        if pipeline_stats['time_to_first_audio'] is not None:
+            self.metrics.observe('podcast_time_to_first_audio_seconds', pipeline_stats['time_to_first_audio'])
         
-        # 5. 生成中文語音
-        chinese_audio_path = await self.generate_chinese_audio(translated_segments, output_dir)
+        if stats.segments_transcribed == 0:
+            logger.error("❌ 語音識別失敗")
+            return None
         
-        # 6. 保存逐字稿
-        transcript_path = os.path.join(output_dir, "transcript.json")
-        self.save_transcript(translated_segments, transcript_path)
+        if has_audio:
+            logger.info(f"✅ 音頻合併完成: {chinese_audio_path}")
+        else:
+            logger.error("❌ 音頻合併失敗: 沒有可合併的片段")
+            chinese_audio_path = None
+        
+        # 7. 保存逐字稿（增量重新渲染需要逐字稿，因此關閉 create_transcript 時也不保存渲染清單）
+        transcript_path = None
+        if self.config.output.create_transcript:
+            transcript_format = self.config.output.transcript_format
+            paths = []
+            if transcript_format in ('json', 'both'):
+                paths.append(os.path.join(output_dir, "transcript.json"))
+            if transcript_format in ('columnar', 'both'):
+                paths.append(os.path.join(output_dir, "transcript" + TRANSCRIPT_STORE_SUFFIX))
+            transcript_path = paths[0]
+            with self.metrics.time('podcast_stage_seconds', stage='export'), self._profile('export'):
+                for path in paths:
+                    self.save_transcript(translated_segments, path)
+                if has_audio:
+                    self.save_render_manifest(translated_segments, mixed, writer, output_dir)
+        for kind, path in (('chinese_audio', chinese_audio_path), ('transcript', transcript_path)):
+            if path and os.path.exists(path):
+                self.metrics.inc('podcast_bytes_out_total', os.path.getsize(path), kind=kind)
+        
+        # 8. 更新全文檢索索引
+        if transcript_path and self.search_index:
+            with self.metrics.time('podcast_stage_seconds', stage='index'):
+                await asyncio.to_thread(self.index_transcript, transcript_path, input_wav_path)
         
         result = {
             'original_audio': input_wav_path,
             'chinese_audio': chinese_audio_path,
             'transcript': transcript_path,
             'segments_count': len(translated_segments),
-            'total_duration': sum(seg['end'] - seg['start'] for seg in translated_segments)
+            'total_duration': sum(seg.duration for seg in translated_segments),
+            'pipeline_stats': pipeline_stats
         }
         
-        print("🎉 音頻處理完成！")
-        print(f"   原始音頻: {input_wav_path}")
-        print(f"   中文音頻: {chinese_audio_path}")
-        print(f"   逐字稿: {transcript_path}")
-        print(f"   總時長: {result['total_duration']:.2f} 秒")
+        logger.info("🎉 音頻處理完成！")
+        logger.info(f"   原始音頻: {input_wav_path}")
+        logger.info(f"   中文音頻: {chinese_audio_path}")
+        logger.info(f"   逐字稿: {transcript_path}")
+        logger.info(f"   總時長: {result['total_duration']:.2f} 秒")
+        if pipeline_stats['time_to_first_audio'] is not None:
+            logger.info(f"   首段音頻延遲: {pipeline_stats['time_to_first_audio']:.2f} 秒")
+        if pipeline_stats['steady_state_segments_per_sec'] is not None:
+            logger.info(f"   穩態吞吐量: {pipeline_stats['steady_state_segments_per_sec']:.2f} 段/秒")
         
         return result
     
+    def index_transcript(self, transcript_path: str, source: str = None) -> int:
+        """將逐字稿加入全文檢索索引；索引失敗不影響處理結果"""
+        from transcript_index import TranscriptIndex
+        
+        try:
+            count = TranscriptIndex(self.search_index).index_transcript(transcript_path, source=source)
+        except Exception as e:
+            logger.warning(f"⚠️ 更新全文檢索索引失敗: {e}")
+            return 0
+        logger.info(f"🔎 已索引 {count} 個片段: {self.search_index}")
+        return count
+    
     def _fallback_transcription(self, audio_path: str) -> Dict:
-        """備用轉錄方法，當 OpenAI API 不可用時使用"""
+        """備用轉錄方法，當語音識別服務不可用時使用"""
         try:
-            print("⚠️  使用備用轉錄方法...")
+            logger.warning("⚠️  使用備用轉錄方法...")
             
-            # 載入音頻並創建簡單的分段
-            audio = AudioSegment.from_wav(audio_path)
-            duration = len(audio) / 1000.0  # 轉換為秒
+            # 從標頭取得長度並創建簡單的分段
+            duration, _ = probe_duration(audio_path)
+            if duration is None:
+                raise ValueError(f"無法取得音頻長度: {audio_path}")
             
             # 創建假的分段（每30秒一段）
             segments = []
@@ -521,14 +1464,9 @@ class AudioProcessor:
                 start_time = i * segment_duration
                 end_time = min((i + 1) * segment_duration, duration)
                 
-                segments.append({
-                    'start': start_time,
-                    'end': end_time,
-                    'text': f"[音頻片段 {i+1}] 請手動添加轉錄內容",
-                    'words': []
-                })
+                segments.append(Segment(start_time, end_time, f"[音頻片段 {i+1}] 請手動添加轉錄內容"))
             
-            print(f"✅ 備用轉錄完成，共 {len(segments)} 個片段")
+            logger.info(f"✅ 備用轉錄完成，共 {len(segments)} 個片段")
             return {
                 'text': "請手動添加完整轉錄內容",
                 'segments': segments,
@@ -536,5 +1474,5 @@ class AudioProcessor:
             }
             
         except Exception as e:
-            print(f"❌ 備用轉錄也失敗: {e}")
+            logger.error(f"❌ 備用轉錄也失敗: {e}")
             return None 
\ No newline at end of file
@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+批次處理日誌 - 只附加的 JSONL 紀錄，每次狀態變更都以 fsync 寫入磁碟
+
+中斷（當機或 Ctrl-C）後重新執行時，依日誌略過已完成且輸出仍有效的文件，
+批次報告也由日誌推導，不會因為中斷而遺失已完成的結果。
+"""
+
+import json
+import os
+import threading
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional
+
+JOURNAL_NAME = "batch_journal.jsonl"
+
+# 文件狀態
+STARTED = 'started'
+SUCCEEDED = 'success'
+FAILED = 'failed'
+INTERRUPTED = 'interrupted'
+
+
+def _file_fingerprint(path: str) -> Dict:
+    """輸入文件的大小與修改時間，用於判斷文件是否在上次處理後被替換"""
+    stat = os.stat(path)
+    return {'size': stat.st_size, 'mtime': round(stat.st_mtime, 3)}
+
+
+class BatchJournal:
+    """批次處理的狀態日誌（執行緒安全）"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._entries: Dict[str, Dict] = {}
+        self._file = None
+        self._load()
+
+    def _load(self):
+        """讀取既有紀錄；最後一行若因當機而不完整則略過"""
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                self._entries[record['file']] = record
+
+    def _open(self):
+        if self._file is None:
+            directory = os.path.dirname(os.path.abspath(self.path))
+            os.makedirs(directory, exist_ok=True)
+            created = not os.path.exists(self.path)
+            torn = not created and self._ends_without_newline()
+            self._file = open(self.path, 'a', encoding='utf-8')
+            if torn:
+                # 當機時寫到一半的最後一行：先換行，新紀錄不會接在不完整的內容後面
+                self._file.write('\n')
+            if created and hasattr(os, 'O_DIRECTORY'):
+                # 新建文件時同步目錄項目，確保日誌文件本身在當機後仍存在
+                fd = os.open(directory, os.O_RDONLY | os.O_DIRECTORY)
+                try:
+                    os.fsync(fd)
+                finally:
+                    os.close(fd)
+        return self._file
+
+    def _ends_without_newline(self) -> bool:
+        with open(self.path, 'rb') as f:
+            f.seek(0, os.SEEK_END)
+            if f.tell() == 0:
+                return False
+            f.seek(-1, os.SEEK_END)
+            return f.read(1) != b'\n'
+
+    def append(self, input_file: str, state: str, **fields) -> Dict:
+        """附加一筆狀態紀錄並立即寫入磁碟"""
+        record = {
+            'time': datetime.now().isoformat(),
+            'file': os.path.abspath(input_file),
+            'state': state,
+            **fields
+        }
+        line = json.dumps(record, ensure_ascii=False, default=str) + '\n'
+        with self._lock:
+            f = self._open()
+            f.write(line)
+            f.flush()
+            os.fsync(f.fileno())
+            self._entries[record['file']] = record
+        return record
+
+    def mark_started(self, input_file: str, output_dir: str, batch_id: str) -> Dict:
+        return self.append(input_file, STARTED, output_dir=output_dir, batch_id=batch_id,
+                           input=_file_fingerprint(input_file))
+
+    def mark_finished(self, input_file: str, result: Dict, batch_id: str) -> Dict:
+        """記錄文件的最終結果（狀態取自 result['status']）"""
+        state = SUCCEEDED if result.get('status') == SUCCEEDED else FAILED
+        return self.append(input_file, state, batch_id=batch_id,
+                           input=_file_fingerprint(input_file), result=result)
+
+    def mark_interrupted(self, input_file: str, batch_id: str) -> Dict:
+        return self.append(input_file, INTERRUPTED, batch_id=batch_id)
+
+    def latest(self, input_file: str) -> Optional[Dict]:
+        return self._entries.get(os.path.abspath(input_file))
+
+    def is_completed(self, input_file: str) -> bool:
+        """文件是否已成功處理、輸入未變更，且輸出文件仍然存在"""
+        record = self.latest(input_file)
+        if not record or record['state'] != SUCCEEDED:
+            return False
+        try:
+            if record.get('input') != _file_fingerprint(input_file):
+                return False
+        except OSError:
+            return False
+        result = record.get('result') or {}
+        if not result.get('chinese_audio'):
+            return False
+        for path in (result['chinese_audio'], result.get('transcript')):
+            if path and not (os.path.exists(path) and os.path.getsize(path) > 0):
+                return False
+        return True
+
+    def successful_results(self) -> List[Dict]:
+        """所有文件最近一次成功的結果（用於估算處理速率）"""
+        return [record['result'] for record in self._entries.values() if record['state'] == SUCCEEDED]
+
+    def results(self, input_files: Iterable[str]) -> List[Dict]:
+        """依文件順序返回各文件最新的結果（尚無最終結果者標記為未完成）"""
+        results = []
+        for input_file in input_files:
+            record = self.latest(input_file)
+            if record and record['state'] in (SUCCEEDED, FAILED):
+                results.append(record['result'])
+            else:
+                results.append({
+                    'input_file': input_file,
+                    'status': record['state'] if record else 'pending',
+                    'processed_at': record['time'] if record else None
+                })
+        return results
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
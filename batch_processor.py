@@ -4,38 +4,141 @@
 """
 
 import asyncio
+import logging
+import multiprocessing
 import os
-import glob
+import hashlib
+import heapq
+import socket
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from typing import List, Dict
-from audio_processor import AudioProcessor
+from typing import AsyncIterator, Callable, Iterator, List, Dict, Tuple
+from audio_processor import AudioProcessor, load_environment
+from audio_decode import usable_formats
+from audio_probe import probe_duration
+from metrics import MetricsRegistry
+from log_manager import job_context, setup_logging, setup_logging_from_config
+from profiling import add_profile_arguments, create_profiler
+from runtime_config import ConfigError, RuntimeConfig, add_config_argument, load_config
+from scheduler import ResourceScheduler, start_shared_capacity
+from batch_journal import JOURNAL_NAME, BatchJournal
+from folder_watcher import FolderWatcher
+from job_queue import DEFAULT_LEASE_SECONDS, FINISHED_STATES, JobQueue, open_queue
 import json
 from datetime import datetime
 
+logger = logging.getLogger(__name__)
+
+# 工作行程中常駐的批次處理器（由 _init_worker 建立，跨多個文件重複使用）
+_worker_batch = None
+
+
+def predict_makespan(durations: List[float], slots: int) -> float:
+    """依序把文件分給最早空出的處理名額，返回整批完成的時間（與 durations 同單位）"""
+    finish_times = [0.0] * max(1, slots)
+    for duration in durations:
+        heapq.heappush(finish_times, heapq.heappop(finish_times) + duration)
+    return max(finish_times)
+
+
+def processing_rate(results: List[Dict]) -> float:
+    """從過去的結果估算每秒音頻需要的處理秒數；沒有可用資料時返回 None"""
+    usable = [r for r in results if r.get('processing_seconds') and r.get('input_duration')]
+    audio_seconds = sum(r['input_duration'] for r in usable)
+    if not audio_seconds:
+        return None
+    return sum(r['processing_seconds'] for r in usable) / audio_seconds
+
+
+def _init_worker(config: RuntimeConfig, processor_factory: Callable, log_level: int, limits: Dict[str, int],
+                 shared_capacity):
+    """工作行程初始化：建立處理器並預先載入函式庫與服務商客戶端"""
+    global _worker_batch
+    setup_logging(logging.getLevelName(log_level))
+    _worker_batch = BatchProcessor(config, processor_factory=processor_factory)
+    _worker_batch.processor.warm_up()
+    # 名額向主行程啟動的 SharedCapacity 取得，所有行程合計不超過服務商上限
+    _worker_batch.scheduler = ResourceScheduler(limits, shared=shared_capacity)
+
+
+def _process_in_worker(input_file: str, output_base_dir: str) -> Tuple[Dict, Dict]:
+    """在工作行程中處理單一文件，返回結果與本次的指標"""
+    metrics = MetricsRegistry()
+    _worker_batch.metrics = _worker_batch.processor.metrics = metrics
+    # 行程共用的 HTTP 傳輸層也改記到本次的指標，請求與連線計數才會併入主行程
+    _worker_batch.processor.http.metrics = metrics
+    _worker_batch.scheduler.metrics = metrics
+    _worker_batch.processor.scheduler = _worker_batch.scheduler
+    result = asyncio.run(_worker_batch.process_single_file(input_file, output_base_dir))
+    result['worker_pid'] = os.getpid()
+    return result, metrics.to_dict()
+
+
 class BatchProcessor:
-    def __init__(self):
-        self.processor = AudioProcessor()
+    def __init__(self, config: RuntimeConfig = None, workers: int = 0,
+                 processor_factory: Callable = AudioProcessor, resume: bool = True):
+        """初始化批次處理器
+
+        workers 大於 0 時，每個文件在獨立的工作行程中處理（spawn），
+        processor_factory 必須可被 pickle，用於在工作行程中建立處理器。
+        resume 為 True 時略過批次日誌中已完成且輸出仍有效的文件。
+        """
+        self.config = config or RuntimeConfig()
+        self.workers = workers
+        self.resume = resume
+        self.processor_factory = processor_factory
+        self.metrics = MetricsRegistry()
+        self.processor = processor_factory(metrics=self.metrics, config=self.config)
+        self.scheduler = None
+        # 工作行程模式下跨行程共用的資源名額（批次結束時保存統計）
+        self.shared_capacity = None
+        self._capacity_manager = None
+        self._shared_stats = None
         self.results = []
+        self.job_order = self.config.processing.job_order
+        self.file_durations: Dict[str, float] = {}
     
-    def find_wav_files(self, input_dir: str) -> List[str]:
-        """尋找目錄中的所有 .wav 文件"""
-        wav_files = []
+    def iter_audio_files(self, input_dir: str) -> Iterator[Tuple[str, float]]:
+        """以單次 os.scandir 走訪目錄（含子目錄），邊走訪邊從標頭探測長度
         
-        # 支援多種模式
-        patterns = [
-            os.path.join(input_dir, "*.wav"),
-            os.path.join(input_dir, "**/*.wav")
-        ]
-        
-        for pattern in patterns:
-            wav_files.extend(glob.glob(pattern, recursive=True))
-        
-        # 去重並排序
-        wav_files = sorted(list(set(wav_files)))
+        副檔名取自 audio.input_format（壓縮格式需要 ffmpeg），與 glob 相同略過隱藏文件與目錄。
+        """
+        extensions = tuple(f".{fmt.lower()}" for fmt in usable_formats(self.config.audio.input_format))
+        stack = [input_dir]
+        while stack:
+            try:
+                entries = os.scandir(stack.pop())
+            except OSError:
+                continue
+            with entries:
+                for entry in entries:
+                    if entry.name.startswith('.'):
+                        continue
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(entry.path)
+                    elif entry.name.lower().endswith(extensions) and entry.is_file():
+                        duration, _ = probe_duration(entry.path, entry.stat().st_size)
+                        yield entry.path, duration or 0.0
+    
+    def order_files(self, durations: Dict[str, float]) -> List[str]:
+        """依 job_order 排序：longest 長文件優先（縮短整批時間）、shortest 短文件優先（降低平均等待）、name 依檔名"""
+        if self.job_order == 'longest':
+            return sorted(durations, key=lambda path: (-durations[path], path))
+        if self.job_order == 'shortest':
+            return sorted(durations, key=lambda path: (durations[path], path))
+        return sorted(durations)
+    
+    def find_wav_files(self, input_dir: str) -> List[str]:
+        """尋找目錄中的所有音頻文件，依 job_order 排序後返回"""
+        self.file_durations = dict(self.iter_audio_files(input_dir))
+        wav_files = self.order_files(self.file_durations)
         
-        print(f"🔍 在 {input_dir} 中找到 {len(wav_files)} 個 .wav 文件")
+        logger.info(f"🔍 在 {input_dir} 中找到 {len(wav_files)} 個音頻文件"
+                    f"（共 {sum(self.file_durations.values()) / 60:.1f} 分鐘，順序: {self.job_order}）")
         for i, file in enumerate(wav_files, 1):
-            print(f"   {i}. {os.path.basename(file)}")
+            logger.info(f"   {i}. {os.path.basename(file)} ({self.file_durations[file] / 60:.1f} 分鐘)")
         
         return wav_files
     
@@ -44,8 +147,20 @@ class BatchProcessor:
         file_name = Path(input_file).stem
         output_dir = os.path.join(output_base_dir, file_name)
         
-        print(f"\n🎯 處理文件: {os.path.basename(input_file)}")
-        print(f"📁 輸出目錄: {output_dir}")
+        logger.info(f"\n🎯 處理文件: {os.path.basename(input_file)}")
+        logger.info(f"📁 輸出目錄: {output_dir}")
+        
+        started_at = time.perf_counter()
+        with job_context(job=file_name):
+            result = await self._process_file(input_file, output_dir)
+        result['processing_seconds'] = round(time.perf_counter() - started_at, 3)
+        self.metrics.observe('podcast_file_seconds', result['processing_seconds'])
+        self.metrics.inc('podcast_files_total', status=result['status'])
+        return result
+    
+    async def _process_file(self, input_file: str, output_dir: str) -> Dict:
+        """執行單個文件的處理流程並整理結果"""
+        file_name = Path(input_file).stem
         
         try:
             result = await self.processor.process_audio_complete(input_file, output_dir)
@@ -56,7 +171,7 @@ class BatchProcessor:
                 result['status'] = 'success'
                 result['processed_at'] = datetime.now().isoformat()
                 
-                print(f"✅ {file_name} 處理完成")
+                logger.info(f"✅ {file_name} 處理完成")
                 return result
             else:
                 error_result = {
@@ -66,7 +181,7 @@ class BatchProcessor:
                     'error': 'Processing failed',
                     'processed_at': datetime.now().isoformat()
                 }
-                print(f"❌ {file_name} 處理失敗")
+                logger.error(f"❌ {file_name} 處理失敗")
                 return error_result
                 
         except Exception as e:
@@ -77,86 +192,516 @@ class BatchProcessor:
                 'error': str(e),
                 'processed_at': datetime.now().isoformat()
             }
-            print(f"❌ {file_name} 處理錯誤: {e}")
+            logger.error(f"❌ {file_name} 處理錯誤: {e}")
             return error_result
     
-    async def process_batch(self, input_dir: str, output_dir: str, max_concurrent: int = 2) -> Dict:
-        """批次處理多個文件"""
-        print("🚀 開始批次處理...")
-        print("=" * 60)
+    async def process_batch(self, input_dir: str, output_dir: str, max_concurrent: int = None) -> Dict:
+        """批次處理多個文件（max_concurrent 預設取自 processing.concurrent_limit）"""
+        if not max_concurrent:
+            # 未使用配置文件時維持原本的預設並發數
+            max_concurrent = self.config.processing.concurrent_limit if self.config.source else 2
+        logger.info("🚀 開始批次處理...")
+        logger.info("=" * 60)
         
-        # 尋找所有 .wav 文件
+        # 尋找所有音頻文件
         wav_files = self.find_wav_files(input_dir)
         
         if not wav_files:
-            print("❌ 沒有找到 .wav 文件")
+            logger.error("❌ 沒有找到音頻文件")
             return {'status': 'no_files', 'results': []}
         
         # 建立輸出目錄
         os.makedirs(output_dir, exist_ok=True)
+        batch_id = datetime.now().strftime("%Y%m%d_%H%M%S")
+        started_at = datetime.now().isoformat()
         
-        # 使用信號量限制並發數量
-        semaphore = asyncio.Semaphore(max_concurrent)
+        # 每個文件的狀態變更都寫入日誌；中斷後重新執行時略過已完成的文件
+        journal = BatchJournal(os.path.join(output_dir, JOURNAL_NAME))
+        resumed = [path for path in wav_files if self.resume and journal.is_completed(path)]
+        pending = [path for path in wav_files if path not in resumed]
+        if resumed:
+            logger.info(f"⏭️  略過 {len(resumed)} 個先前已完成的文件")
+            self.metrics.inc('podcast_files_total', len(resumed), status='resumed')
         
-        async def process_with_semaphore(file_path):
-            async with semaphore:
-                return await self.process_single_file(file_path, output_dir)
+        in_flight = set()
         
-        # 並發處理所有文件
-        print(f"\n🔄 開始並發處理 {len(wav_files)} 個文件 (最大並發數: {max_concurrent})")
+        def on_start(path: str):
+            in_flight.add(path)
+            journal.mark_started(path, os.path.join(output_dir, Path(path).stem), batch_id)
         
-        tasks = [process_with_semaphore(file_path) for file_path in wav_files]
-        results = await asyncio.gather(*tasks, return_exceptions=True)
+        # 依過去的處理速率預估整批時間，並與依檔名排序的結果比較
+        slots = self.workers if self.workers > 0 else max_concurrent
+        audio_seconds = [self.file_durations.get(path, 0.0) for path in pending]
+        predicted_units = predict_makespan(audio_seconds, slots)
+        by_name_units = predict_makespan([self.file_durations.get(path, 0.0) for path in sorted(pending)], slots)
+        history_rate = processing_rate(journal.successful_results())
+        if history_rate and pending:
+            logger.info(f"📐 預估整批時間 {predicted_units * history_rate:.1f} 秒"
+                        f"（依檔名順序 {by_name_units * history_rate:.1f} 秒）")
         
-        # 處理結果
-        successful = 0
-        failed = 0
+        # 所有文件共用的服務商並發上限
+        limits = vars(self.config.processing.resource_limits).copy()
+        processing_started = time.perf_counter()
+        if self.workers > 0:
+            logger.info(f"\n🔄 開始以 {self.workers} 個工作行程處理 {len(pending)} 個文件")
+            completed = self._run_in_workers(pending, output_dir, limits, on_start)
+        else:
+            logger.info(f"\n🔄 開始並發處理 {len(pending)} 個文件 (最大並發數: {max_concurrent})")
+            self.scheduler = ResourceScheduler(limits, self.metrics)
+            self.processor.scheduler = self.scheduler
+            completed = self._run_in_process(pending, output_dir, max_concurrent, on_start)
+        logger.info(f"   資源上限: {', '.join(f'{name}={value}' for name, value in limits.items())}")
         
-        for result in results:
-            if isinstance(result, Exception):
-                failed += 1
-                self.results.append({
-                    'status': 'exception',
-                    'error': str(result),
-                    'processed_at': datetime.now().isoformat()
-                })
-            elif result['status'] == 'success':
-                successful += 1
-                self.results.append(result)
-            else:
-                failed += 1
-                self.results.append(result)
+        # 結果依完成順序寫入日誌，報告再由日誌依文件順序推導
+        finished = 0
+        try:
+            async for index, result in completed:
+                if isinstance(result, Exception):
+                    result = {
+                        'input_file': pending[index],
+                        'status': 'exception',
+                        'error': str(result),
+                        'processed_at': datetime.now().isoformat()
+                    }
+                result['input_duration'] = self.file_durations.get(pending[index])
+                journal.mark_finished(pending[index], result, batch_id)
+                in_flight.discard(pending[index])
+                finished += 1
+                logger.info(f"📦 已完成 {finished}/{len(pending)}: {os.path.basename(pending[index])} ({result['status']})")
+        finally:
+            # 中斷時記錄仍在處理中的文件，下次執行會重新處理
+            for path in in_flight:
+                journal.mark_interrupted(path, batch_id)
+            journal.close()
+        
+        actual_makespan = time.perf_counter() - processing_started
+        
+        self.results = journal.results(wav_files)
+        successful = sum(1 for result in self.results if result['status'] == 'success')
+        failed = len(self.results) - successful
+        
+        # 沒有歷史資料時以本次結果校正速率（預估值僅供比較排序策略）
+        run_rate = processing_rate([journal.latest(path)['result'] for path in pending
+                                    if journal.latest(path) and journal.latest(path).get('result')])
+        rate = history_rate or run_rate
+        schedule = {
+            'order': self.job_order,
+            'slots': slots,
+            'audio_seconds': round(sum(audio_seconds), 3),
+            'rate_basis': 'history' if history_rate else ('this_run' if run_rate else None),
+            'seconds_per_audio_second': round(rate, 4) if rate else None,
+            'predicted_makespan_seconds': round(predicted_units * rate, 3) if rate else None,
+            'predicted_makespan_by_name_seconds': round(by_name_units * rate, 3) if rate else None,
+            'actual_makespan_seconds': round(actual_makespan, 3)
+        }
+        if rate and pending:
+            logger.info(f"📐 整批時間: 預估 {schedule['predicted_makespan_seconds']:.1f} 秒，"
+                        f"實際 {actual_makespan:.1f} 秒（{self.job_order} 順序）")
         
         # 生成批次報告
         batch_result = {
-            'batch_id': datetime.now().strftime("%Y%m%d_%H%M%S"),
+            'batch_id': batch_id,
             'input_directory': input_dir,
             'output_directory': output_dir,
             'total_files': len(wav_files),
             'successful': successful,
             'failed': failed,
+            'resumed_files': resumed,
             'max_concurrent': max_concurrent,
-            'started_at': datetime.now().isoformat(),
-            'results': self.results
+            'workers': self.workers,
+            'resource_limits': limits,
+            'scheduler': self.scheduler.stats() if self.scheduler else self._shared_stats,
+            'schedule': schedule,
+            'started_at': started_at,
+            'journal': journal.path,
+            'results': self.results,
+            'metrics': self.metrics.to_dict()
         }
+        self._write_batch_report(batch_result, output_dir)
+        return batch_result
+    
+    def _write_batch_report(self, batch_result: Dict, output_dir: str):
+        """保存批次報告與指標，並輸出摘要"""
+        # 保存批次報告（output.create_report 關閉時略過）
+        report_path = None
+        if self.config.output.create_report:
+            report_path = os.path.join(output_dir, "batch_report.json")
+            with open(report_path, 'w', encoding='utf-8') as f:
+                json.dump(batch_result, f, ensure_ascii=False, indent=2)
+        
+        # 匯出 Prometheus 格式指標
+        prom_path = None
+        if not self.config.output.minimal_output:
+            prom_path = os.path.join(output_dir, "metrics.prom")
+            with open(prom_path, 'w', encoding='utf-8') as f:
+                f.write(self.metrics.to_prometheus())
         
-        # 保存批次報告
-        report_path = os.path.join(output_dir, "batch_report.json")
-        with open(report_path, 'w', encoding='utf-8') as f:
-            json.dump(batch_result, f, ensure_ascii=False, indent=2)
+        logger.info("\n🎉 批次處理完成！")
+        logger.info("=" * 60)
+        logger.info(f"📊 總文件數: {batch_result['total_files']}")
+        logger.info(f"✅ 成功: {batch_result['successful']}")
+        logger.info(f"❌ 失敗: {batch_result['failed']}")
+        if report_path:
+            logger.info(f"📄 批次報告: {report_path}")
+        if prom_path:
+            logger.info(f"📈 效能指標: {prom_path}")
+    
+    @staticmethod
+    def _queue_job_id(input_file: str, output_dir: str) -> str:
+        """同一個輸入文件（內容未變更）與輸出目錄對應固定的工作 ID，重複提交不會重複處理"""
+        stat = os.stat(input_file)
+        key = f"{os.path.abspath(input_file)}|{os.path.abspath(output_dir)}|{stat.st_size}|{stat.st_mtime}"
+        return hashlib.sha1(key.encode('utf-8')).hexdigest()[:16]
+    
+    async def enqueue_batch(self, input_dir: str, output_dir: str, queue: JobQueue,
+                            wait: bool = True, poll_interval: float = 2.0) -> Dict:
+        """將每個文件放入共用工作佇列，由任意節點上的工作行程（run_queue_worker）處理
+        
+        路徑以絕對路徑傳遞，輸入與輸出目錄必須在各節點上以相同路徑掛載。
+        wait 為 True 時等待所有工作結束，並以佇列中的結果更新批次日誌與報告。
+        """
+        logger.info("🚀 開始提交批次工作到共用佇列...")
+        wav_files = self.find_wav_files(input_dir)
+        if not wav_files:
+            logger.error("❌ 沒有找到音頻文件")
+            return {'status': 'no_files', 'results': []}
+        
+        os.makedirs(output_dir, exist_ok=True)
+        batch_id = datetime.now().strftime("%Y%m%d_%H%M%S")
+        started_at = datetime.now().isoformat()
+        journal = BatchJournal(os.path.join(output_dir, JOURNAL_NAME))
+        resumed = [path for path in wav_files if self.resume and journal.is_completed(path)]
         
-        print("\n🎉 批次處理完成！")
-        print("=" * 60)
-        print(f"📊 總文件數: {len(wav_files)}")
-        print(f"✅ 成功: {successful}")
-        print(f"❌ 失敗: {failed}")
-        print(f"📄 批次報告: {report_path}")
+        job_files = {}
+        for path in wav_files:
+            if path in resumed:
+                continue
+            job_id = self._queue_job_id(path, output_dir)
+            job_files[job_id] = path
+            payload = {'input_file': os.path.abspath(path), 'output_dir': os.path.abspath(output_dir)}
+            await asyncio.to_thread(queue.enqueue, job_id, payload)
+        logger.info(f"📤 已提交 {len(job_files)} 個工作（略過 {len(resumed)} 個先前已完成的文件）")
         
+        if not wait:
+            journal.close()
+            return {'status': 'queued', 'batch_id': batch_id, 'jobs': list(job_files)}
+        
+        recorded = set()
+        try:
+            while len(recorded) < len(job_files):
+                # 工作行程全部失聯時也要讓過期的租約回到佇列
+                await asyncio.to_thread(queue.requeue_expired)
+                jobs = await asyncio.to_thread(queue.jobs, list(job_files))
+                for job in jobs:
+                    if job['state'] not in FINISHED_STATES or job['id'] in recorded:
+                        continue
+                    path = job_files[job['id']]
+                    result = job['result'] or {
+                        'input_file': path,
+                        'status': 'failed',
+                        'error': job['error'],
+                        'processed_at': datetime.now().isoformat()
+                    }
+                    result['input_file'] = path
+                    result['input_duration'] = self.file_durations.get(path)
+                    result['attempts'] = job['attempts']
+                    journal.mark_finished(path, result, batch_id)
+                    self.metrics.inc('podcast_files_total', status=result['status'])
+                    recorded.add(job['id'])
+                    logger.info(f"📦 已完成 {len(recorded)}/{len(job_files)}: {os.path.basename(path)} "
+                                f"({result['status']}，嘗試 {job['attempts']} 次)")
+                if len(recorded) < len(job_files):
+                    await asyncio.sleep(poll_interval)
+        finally:
+            journal.close()
+        
+        self.results = journal.results(wav_files)
+        successful = sum(1 for result in self.results if result['status'] == 'success')
+        batch_result = {
+            'batch_id': batch_id,
+            'input_directory': input_dir,
+            'output_directory': output_dir,
+            'total_files': len(wav_files),
+            'successful': successful,
+            'failed': len(self.results) - successful,
+            'resumed_files': resumed,
+            'queue': type(queue).__name__,
+            'started_at': started_at,
+            'journal': journal.path,
+            'results': self.results,
+            'metrics': self.metrics.to_dict()
+        }
+        self._write_batch_report(batch_result, output_dir)
         return batch_result
     
+    async def run_queue_worker(self, queue: JobQueue, max_concurrent: int = None,
+                               lease_seconds: float = DEFAULT_LEASE_SECONDS, poll_interval: float = 2.0,
+                               exit_when_idle: bool = False) -> int:
+        """從共用佇列取得工作並處理，返回處理的工作數
+        
+        處理器常駐並預先建立客戶端；每個工作在處理期間以 lease_seconds / 3 的間隔續約，
+        續約失敗表示租約已被重新分配，此時會停止處理該工作。
+        """
+        if not max_concurrent:
+            max_concurrent = self.config.processing.concurrent_limit if self.config.source else 2
+        worker_id = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+        limits = vars(self.config.processing.resource_limits).copy()
+        self.scheduler = ResourceScheduler(limits, self.metrics)
+        self.processor.scheduler = self.scheduler
+        await asyncio.to_thread(self.processor.warm_up)
+        logger.info(f"👷 工作行程 {worker_id} 已啟動（並發 {max_concurrent}，租約 {lease_seconds:.0f} 秒）")
+        
+        in_flight: Dict[str, asyncio.Task] = {}
+        processed = 0
+        
+        async def work_on(job: Dict):
+            nonlocal processed
+            job_id = job['id']
+            payload = job['payload']
+            task = asyncio.create_task(self.process_single_file(payload['input_file'], payload['output_dir']))
+            try:
+                while True:
+                    done, _ = await asyncio.wait({task}, timeout=lease_seconds / 3)
+                    if done:
+                        break
+                    if not await asyncio.to_thread(queue.heartbeat, job_id, worker_id, lease_seconds):
+                        logger.warning(f"⚠️  工作 {job_id} 的租約已失效，停止處理")
+                        task.cancel()
+                        await asyncio.gather(task, return_exceptions=True)
+                        return
+                try:
+                    result = task.result()
+                except Exception as e:
+                    result = {
+                        'input_file': payload['input_file'],
+                        'status': 'exception',
+                        'error': str(e),
+                        'processed_at': datetime.now().isoformat()
+                    }
+                result['worker'] = worker_id
+                if result['status'] == 'success':
+                    accepted = await asyncio.to_thread(queue.complete, job_id, worker_id, result)
+                else:
+                    accepted = await asyncio.to_thread(queue.fail, job_id, worker_id, result)
+                if not accepted:
+                    logger.warning(f"⚠️  工作 {job_id} 的租約已失效，結果未被採用")
+                processed += 1
+            except asyncio.CancelledError:
+                # 工作行程被停止：歸還工作讓其他行程接手
+                task.cancel()
+                await asyncio.gather(task, return_exceptions=True)
+                await asyncio.to_thread(queue.release, job_id, worker_id)
+                raise
+            finally:
+                in_flight.pop(job_id, None)
+        
+        try:
+            while True:
+                job = None
+                if len(in_flight) < max_concurrent:
+                    job = await asyncio.to_thread(queue.claim, worker_id, lease_seconds)
+                if job is not None:
+                    logger.info(f"📥 取得工作 {job['id']}: {os.path.basename(job['payload']['input_file'])}"
+                                f"（第 {job['attempts']} 次嘗試）")
+                    if job['attempts'] > 1:
+                        self.metrics.inc('podcast_retries_total', stage='job')
+                    in_flight[job['id']] = asyncio.create_task(work_on(job))
+                    continue
+                if exit_when_idle and not in_flight:
+                    break
+                # 名額已滿或佇列為空時，等到有工作結束或經過 poll_interval 再嘗試
+                if in_flight:
+                    await asyncio.wait(set(in_flight.values()), timeout=poll_interval,
+                                       return_when=asyncio.FIRST_COMPLETED)
+                else:
+                    await asyncio.sleep(poll_interval)
+        finally:
+            for task in list(in_flight.values()):
+                task.cancel()
+            await asyncio.gather(*in_flight.values(), return_exceptions=True)
+            logger.info(f"👋 工作行程 {worker_id} 結束，共處理 {processed} 個工作")
+        return processed
+    
+    async def _run_in_process(self, wav_files: List[str], output_dir: str, max_concurrent: int,
+                              on_start: Callable[[str], None]) -> AsyncIterator[Tuple[int, Dict]]:
+        """在目前的事件迴圈中並發處理，依完成順序產生 (索引, 結果)"""
+        semaphore = asyncio.Semaphore(max_concurrent)
+        
+        async def process_with_semaphore(index, file_path):
+            async with semaphore:
+                on_start(file_path)
+                try:
+                    return index, await self.process_single_file(file_path, output_dir)
+                except Exception as e:
+                    return index, e
+        
+        tasks = [asyncio.create_task(process_with_semaphore(i, path)) for i, path in enumerate(wav_files)]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                yield await next_done
+        finally:
+            for task in tasks:
+                task.cancel()
+    
+    async def _run_in_workers(self, wav_files: List[str], output_dir: str, limits: Dict[str, int],
+                              on_start: Callable[[str], None]) -> AsyncIterator[Tuple[int, Dict]]:
+        """在工作行程池中處理，每個行程一次處理一個文件；結果與指標即時回傳主行程"""
+        executor = self._create_executor(limits)
+        # 送出的文件數不超過工作行程數，文件送出時即有行程接手，此時才標記為開始
+        slots = asyncio.Semaphore(self.workers)
+        
+        async def submit(index, file_path):
+            async with slots:
+                on_start(file_path)
+                try:
+                    return index, await self._process_in_executor(executor, file_path, output_dir)
+                except Exception as e:
+                    return index, e
+        
+        tasks = [asyncio.create_task(submit(i, path)) for i, path in enumerate(wav_files)]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                yield await next_done
+        finally:
+            for task in tasks:
+                task.cancel()
+            await self._shutdown_executor(executor)
+    
+    def _create_executor(self, limits: Dict[str, int]) -> ProcessPoolExecutor:
+        """建立 spawn 工作行程池，每個行程啟動時預先建立服務商客戶端
+        
+        同時啟動 manager 行程保存整批共用的資源名額，各工作行程透過代理物件取得名額。
+        """
+        self._capacity_manager, self.shared_capacity = start_shared_capacity(limits)
+        return ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context('spawn'),
+            initializer=_init_worker,
+            initargs=(self.config, self.processor_factory, logging.getLogger().getEffectiveLevel(), limits,
+                      self.shared_capacity)
+        )
+    
+    async def _shutdown_executor(self, executor: ProcessPoolExecutor):
+        """關閉工作行程池與資源名額的 manager 行程"""
+        await asyncio.to_thread(executor.shutdown, wait=True, cancel_futures=True)
+        if self._capacity_manager is not None:
+            self._shared_stats = self.shared_capacity.stats()
+            self._capacity_manager.shutdown()
+            self._capacity_manager = self.shared_capacity = None
+    
+    async def _process_in_executor(self, executor: ProcessPoolExecutor, input_file: str, output_dir: str) -> Dict:
+        """在工作行程中處理單一文件，並將該文件的指標併入主行程"""
+        loop = asyncio.get_running_loop()
+        result, metrics = await loop.run_in_executor(executor, _process_in_worker, input_file, output_dir)
+        self.metrics.merge(metrics)
+        return result
+    
+    async def watch(self, input_dir: str, output_dir: str, max_concurrent: int = None,
+                    stable_seconds: float = 2.0, poll_interval: float = 1.0, use_inotify: bool = True):
+        """監看模式：持續處理放入輸入目錄的新文件，直到被取消
+        
+        處理器（或工作行程池）在整個監看期間常駐，服務商客戶端只建立一次。
+        每個文件記錄從首次發現到處理完成的延遲（podcast_file_latency_seconds）。
+        """
+        if not max_concurrent:
+            max_concurrent = self.config.processing.concurrent_limit if self.config.source else 2
+        os.makedirs(output_dir, exist_ok=True)
+        batch_id = datetime.now().strftime("watch_%Y%m%d_%H%M%S")
+        journal = BatchJournal(os.path.join(output_dir, JOURNAL_NAME))
+        watcher = FolderWatcher(input_dir, usable_formats(self.config.audio.input_format),
+                                stable_seconds=stable_seconds, poll_interval=poll_interval,
+                                use_inotify=use_inotify)
+        
+        limits = vars(self.config.processing.resource_limits).copy()
+        executor = None
+        if self.workers > 0:
+            executor = self._create_executor(limits)
+            slots = asyncio.Semaphore(self.workers)
+            # 預先啟動所有工作行程，第一個放入的文件不必等待行程建立與客戶端初始化
+            loop = asyncio.get_running_loop()
+            await asyncio.gather(*(loop.run_in_executor(executor, os.getpid) for _ in range(self.workers)))
+        else:
+            self.scheduler = ResourceScheduler(limits, self.metrics)
+            self.processor.scheduler = self.scheduler
+            await asyncio.to_thread(self.processor.warm_up)
+            slots = asyncio.Semaphore(max_concurrent)
+        
+        in_flight: Dict[str, asyncio.Task] = {}
+        # 處理期間又被替換的文件 -> 新版本的首次發現時間，目前的處理結束後重新處理
+        replaced: Dict[str, float] = {}
+        latencies = []
+        stopping = False
+        
+        async def handle(input_file: str, first_seen: float):
+            try:
+                ready_at = time.time()
+                async with slots:
+                    try:
+                        journal.mark_started(input_file, os.path.join(output_dir, Path(input_file).stem), batch_id)
+                        if executor is not None:
+                            result = await self._process_in_executor(executor, input_file, output_dir)
+                        else:
+                            result = await self.process_single_file(input_file, output_dir)
+                    except Exception as e:
+                        result = {
+                            'input_file': input_file,
+                            'status': 'exception',
+                            'error': str(e),
+                            'processed_at': datetime.now().isoformat()
+                        }
+                finished_at = time.time()
+                latency = finished_at - first_seen
+                result['latency'] = {
+                    'detected_at': datetime.fromtimestamp(first_seen).isoformat(),
+                    'settle_seconds': round(ready_at - first_seen, 3),
+                    'total_seconds': round(latency, 3)
+                }
+                try:
+                    journal.mark_finished(input_file, result, batch_id)
+                except OSError as e:
+                    # 輸入文件在處理期間被刪除，無法記錄其指紋
+                    logger.warning(f"⚠️  無法記錄 {os.path.basename(input_file)} 的結果: {e}")
+                self.metrics.observe('podcast_file_latency_seconds', latency, status=result['status'])
+                latencies.append(latency)
+                logger.info(f"📦 {os.path.basename(input_file)} ({result['status']})，從放入到完成 {latency:.1f} 秒")
+                if not self.config.output.minimal_output:
+                    with open(os.path.join(output_dir, "metrics.prom"), 'w', encoding='utf-8') as f:
+                        f.write(self.metrics.to_prometheus())
+            finally:
+                in_flight.pop(input_file, None)
+                replaced_at = replaced.pop(input_file, None)
+                if replaced_at is not None and not stopping:
+                    logger.info(f"🔁 {os.path.basename(input_file)} 在處理期間被替換，重新處理")
+                    in_flight[input_file] = asyncio.create_task(handle(input_file, replaced_at))
+        
+        logger.info(f"🚀 監看模式啟動，輸出至 {output_dir}（Ctrl-C 結束）")
+        try:
+            async for input_file, first_seen in watcher.watch():
+                if input_file in in_flight:
+                    # 處理中的文件又被替換：監看器不會再次產生同一版本，記下來在目前的處理結束後重新處理
+                    replaced[input_file] = first_seen
+                    continue
+                if self.resume and journal.is_completed(input_file):
+                    logger.info(f"⏭️  略過已完成的文件: {os.path.basename(input_file)}")
+                    continue
+                in_flight[input_file] = asyncio.create_task(handle(input_file, first_seen))
+        finally:
+            stopping = True
+            for input_file, task in list(in_flight.items()):
+                task.cancel()
+                journal.mark_interrupted(input_file, batch_id)
+            await asyncio.gather(*in_flight.values(), return_exceptions=True)
+            journal.close()
+            if executor is not None:
+                await self._shutdown_executor(executor)
+            if latencies:
+                ordered = sorted(latencies)
+                logger.info(f"⏱️  監看結束，共處理 {len(ordered)} 個文件，延遲中位數 "
+                            f"{ordered[len(ordered) // 2]:.1f} 秒，最長 {ordered[-1]:.1f} 秒")
+    
     def generate_summary_report(self, output_dir: str):
         """生成摘要報告"""
-        if not self.results:
+        if not self.results or not self.config.output.create_report:
             return
         
         successful_results = [r for r in self.results if r['status'] == 'success']
@@ -194,7 +739,7 @@ class BatchProcessor:
         with open(summary_path, 'w', encoding='utf-8') as f:
             json.dump(summary, f, ensure_ascii=False, indent=2)
         
-        print(f"📋 摘要報告已保存: {summary_path}")
+        logger.info(f"📋 摘要報告已保存: {summary_path}")
 
 async def main():
     import argparse
@@ -207,12 +752,19 @@ async def main():
   python batch_processor.py input_folder/                    # 處理 input_folder/ 中的所有 .wav 文件
   python batch_processor.py input_folder/ -o output_batch/  # 指定輸出目錄
   python batch_processor.py input_folder/ --concurrent 4    # 設定並發數量
+  python batch_processor.py input_folder/ --workers 4       # 以 4 個工作行程平行處理
+  python batch_processor.py input_folder/ --config fast     # 使用快速處理配置
+  python batch_processor.py input_folder/ --no-resume       # 忽略批次日誌，全部重新處理
+  python batch_processor.py input_folder/ --watch           # 持續監看並處理新放入的文件
+  python batch_processor.py input_folder/ --queue-url redis # 提交到共用佇列（REDIS_URL），由工作行程處理
+  python batch_processor.py --queue-worker --queue-url redis # 在任一節點啟動工作行程
         """
     )
     
     parser.add_argument(
         'input_dir',
-        help='包含 .wav 文件的輸入目錄'
+        nargs='?',
+        help='包含 .wav 文件的輸入目錄（--queue-worker 時不需要）'
     )
     
     parser.add_argument(
@@ -224,17 +776,165 @@ async def main():
     parser.add_argument(
         '--concurrent',
         type=int,
-        default=2,
-        help='最大並發處理數量 (預設: 2)'
+        help='最大並發處理數量 (預設: processing.concurrent_limit，未使用配置時為 2)'
+    )
+    
+    parser.add_argument(
+        '--no-resume',
+        action='store_true',
+        help='忽略批次日誌，重新處理所有文件'
+    )
+    
+    parser.add_argument(
+        '--workers',
+        type=int,
+        default=0,
+        help='工作行程數，每個行程獨立處理一個文件；0 表示在主行程中處理 (預設: 0)'
+    )
+    
+    parser.add_argument(
+        '--watch',
+        action='store_true',
+        help='監看模式：持續處理新放入輸入目錄的文件，直到按 Ctrl-C'
+    )
+    
+    parser.add_argument(
+        '--stable-seconds',
+        type=float,
+        default=2.0,
+        help='監看模式下文件大小維持不變多久才視為寫入完成 (預設: 2.0)'
+    )
+    
+    parser.add_argument(
+        '--poll-interval',
+        type=float,
+        default=1.0,
+        help='監看模式的檢查間隔秒數，無法使用 inotify 時也是掃描間隔 (預設: 1.0)'
+    )
+    
+    parser.add_argument(
+        '--poll',
+        action='store_true',
+        help='監看模式一律使用定期掃描（例如網路磁碟不支援 inotify 時）'
     )
     
+    parser.add_argument(
+        '--queue-url',
+        help='共用工作佇列：sqlite:///path、redis://host:port/db，或 redis / database 表示使用 REDIS_URL / DATABASE_URL'
+    )
+    
+    parser.add_argument(
+        '--queue-worker',
+        action='store_true',
+        help='以工作行程模式執行，持續從 --queue-url 取得工作並處理'
+    )
+    
+    parser.add_argument(
+        '--no-wait',
+        action='store_true',
+        help='提交到共用佇列後立即結束，不等待處理結果'
+    )
+    
+    parser.add_argument(
+        '--lease-seconds',
+        type=float,
+        default=DEFAULT_LEASE_SECONDS,
+        help=f'工作行程的租約秒數，超過未續約的工作會重新排入佇列 (預設: {DEFAULT_LEASE_SECONDS:.0f})'
+    )
+    
+    parser.add_argument(
+        '--exit-when-idle',
+        action='store_true',
+        help='工作行程在佇列清空後結束'
+    )
+    
+    parser.add_argument(
+        '--order',
+        choices=['longest', 'shortest', 'name'],
+        help='處理順序：longest 長文件優先（縮短整批時間）、shortest 短文件優先（降低平均等待）、name 依檔名 '
+             '(預設: processing.job_order，未設定時為 longest)'
+    )
+    
+    add_config_argument(parser)
+    add_profile_arguments(parser)
+    
     args = parser.parse_args()
     
+    try:
+        config = load_config(args.config)
+    except ConfigError as e:
+        parser.error(f"配置文件無效: {e}")
+    if args.order:
+        config.processing.job_order = args.order
+    
+    if args.queue_worker and not args.queue_url:
+        parser.error("--queue-worker 需要 --queue-url")
+    if not args.queue_worker and not args.input_dir:
+        parser.error("需要輸入目錄")
+    
+    queue = None
+    if args.queue_url:
+        load_environment()
+        try:
+            queue = open_queue(args.queue_url)
+        except (ValueError, RuntimeError) as e:
+            parser.error(str(e))
+    
+    os.makedirs(args.output, exist_ok=True)
+    setup_logging_from_config(config.logging, args.output)
+    
+    if args.queue_worker:
+        worker = BatchProcessor(config)
+        try:
+            await worker.run_queue_worker(queue, args.concurrent, lease_seconds=args.lease_seconds,
+                                          exit_when_idle=args.exit_when_idle)
+        except asyncio.CancelledError:
+            logger.warning("\n⚠️  工作行程已停止")
+        finally:
+            queue.close()
+        return
+    
     if not os.path.exists(args.input_dir):
-        print(f"❌ 輸入目錄不存在: {args.input_dir}")
+        logger.error(f"❌ 輸入目錄不存在: {args.input_dir}")
+        return
+    
+    workers = args.workers if args.workers >= 0 else os.cpu_count()
+    batch_processor = BatchProcessor(config, workers=workers, resume=not args.no_resume)
+    
+    profiler = create_profiler(args, args.output)
+    if profiler and workers > 0:
+        logger.warning("⚠️  使用工作行程時，效能分析只涵蓋主行程")
+    if profiler:
+        batch_processor.processor.profiler = profiler
+        profiler.start()
+    
+    if queue is not None:
+        try:
+            await batch_processor.enqueue_batch(args.input_dir, args.output, queue, wait=not args.no_wait)
+            if not args.no_wait:
+                batch_processor.generate_summary_report(args.output)
+        except asyncio.CancelledError:
+            logger.warning("\n⚠️  已停止等待，佇列中的工作會繼續由工作行程處理")
+        finally:
+            queue.close()
         return
     
-    batch_processor = BatchProcessor()
+    if args.watch:
+        try:
+            await batch_processor.watch(
+                args.input_dir,
+                args.output,
+                args.concurrent,
+                stable_seconds=args.stable_seconds,
+                poll_interval=args.poll_interval,
+                use_inotify=not args.poll
+            )
+        except asyncio.CancelledError:
+            logger.warning("\n⚠️  監看模式已停止")
+        finally:
+            if profiler:
+                profiler.stop()
+        return
     
     try:
         result = await batch_processor.process_batch(
@@ -247,12 +947,15 @@ async def main():
         batch_processor.generate_summary_report(args.output)
         
         if result['successful'] > 0:
-            print(f"\n🎧 您可以在 {args.output} 目錄中找到所有生成的中文 Podcast！")
+            logger.info(f"\n🎧 您可以在 {args.output} 目錄中找到所有生成的中文 Podcast！")
         
     except KeyboardInterrupt:
-        print("\n⚠️  批次處理被用戶中斷")
+        logger.warning("\n⚠️  批次處理被用戶中斷")
     except Exception as e:
-        print(f"❌ 批次處理錯誤: {e}")
+        logger.error(f"❌ 批次處理錯誤: {e}")
+    finally:
+        if profiler:
+            profiler.stop()
 
 if __name__ == "__main__":
     asyncio.run(main()) 
\ No newline at end of file
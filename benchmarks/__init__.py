@@ -0,0 +1,4 @@
+"""
+離線效能基準測試
+使用合成對話與本地模擬服務（Whisper / 翻譯 / TTS）量測處理流程，不需要任何 API 金鑰
+"""
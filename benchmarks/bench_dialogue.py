@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+對話特徵分析基準測試
+
+比較改版前的子字串比對（每段多次 text.lower() 與 any(word in text ...)）與
+DialogueRules 的逐段及整批分析吞吐量，並統計兩者判斷不同的片段數
+（多半是 "also"、"whole" 這類子字串誤判）。
+
+使用方法:
+python -m benchmarks.bench_dialogue                  # 預設 100000 段
+python -m benchmarks.bench_dialogue --segments 500000 --repeat 5
+"""
+
+import argparse
+import json
+import time
+from typing import Callable, Dict, List
+
+from audio_processor import AudioProcessor
+from benchmarks.synthetic import generate_dialogue
+from dialogue_rules import QUESTION, RESPONSE, TRANSITION, DialogueRules
+from log_manager import setup_logging
+from runtime_config import load_config
+from segment_model import Segment
+
+QUESTION_WORDS = ['what', 'how', 'why', 'when', 'where', 'who']
+RESPONSE_WORDS = ['well', 'actually', 'so', 'yeah', 'right', 'exactly']
+TRANSITION_WORDS = ['speaking of', 'by the way', 'another thing', 'also']
+
+
+def substring_flags(text: str) -> int:
+    """改版前的判斷方式"""
+    text = text.strip()
+    is_question = text.endswith('?') or any(word in text.lower() for word in QUESTION_WORDS)
+    is_response = any(word in text.lower() for word in RESPONSE_WORDS)
+    is_transition = any(phrase in text.lower() for phrase in TRANSITION_WORDS)
+    return (QUESTION if is_question else 0) | (RESPONSE if is_response else 0) | (TRANSITION if is_transition else 0)
+
+
+def build_texts(segment_count: int) -> List[str]:
+    """合成對話加上容易被子字串誤判的句子"""
+    texts = [segment['text'] for segment in generate_dialogue(segment_count)]
+    tricky = [
+        "The whole team reviewed it.",
+        "There is a good reason behind it.",
+        "Somehow the wellness data looked fine.",
+    ]
+    for i in range(0, segment_count, 7):
+        texts[i] = tricky[i % len(tricky)]
+    return texts
+
+
+def best_of(repeat: int, func: Callable):
+    timings = []
+    result = None
+    for _ in range(repeat):
+        started_at = time.perf_counter()
+        result = func()
+        timings.append(time.perf_counter() - started_at)
+    return min(timings), result
+
+
+def run(segment_count: int, repeat: int) -> Dict:
+    texts = build_texts(segment_count)
+    rules = DialogueRules.from_config()
+
+    legacy_seconds, legacy = best_of(repeat, lambda: [substring_flags(text) for text in texts])
+    single_seconds, single = best_of(repeat, lambda: [rules.analyze(text) for text in texts])
+    batch_seconds, batch = best_of(repeat, lambda: rules.analyze_batch(texts))
+    if single != batch:
+        raise AssertionError("逐段與整批分析的結果不一致")
+
+    config = load_config(None)
+    config.logging.file_logging = False
+    processor = AudioProcessor(config=config)
+    detect_seconds, _ = best_of(repeat, lambda: processor.detect_speakers_and_dialogue(
+        [Segment(i * 1.5, i * 1.5 + 1.2, text) for i, text in enumerate(texts)]))
+
+    def rate(seconds: float) -> float:
+        return round(segment_count / seconds, 1)
+
+    return {
+        'segments': segment_count,
+        'segments_per_sec': {
+            'substring': rate(legacy_seconds),
+            'rules': rate(single_seconds),
+            'rules_batch': rate(batch_seconds),
+            'detect_speakers_and_dialogue': rate(detect_seconds)
+        },
+        'changed_segments': sum(1 for old, new in zip(legacy, batch) if old != new),
+        'changed_by_flag': {
+            name: sum(1 for old, new in zip(legacy, batch) if (old ^ new) & bit)
+            for name, bit in (('is_question', QUESTION), ('is_response', RESPONSE), ('is_transition', TRANSITION))
+        }
+    }
+
+
+def print_report(results: Dict):
+    rates = results['segments_per_sec']
+    baseline = rates['substring']
+    print(f"\n🗣️  對話特徵分析: {results['segments']:,} 段")
+    for name, label in (('substring', '子字串比對（改版前）'), ('rules', 'DialogueRules 逐段'),
+                        ('rules_batch', 'DialogueRules 整批'),
+                        ('detect_speakers_and_dialogue', 'detect_speakers_and_dialogue')):
+        print(f"   {rates[name]:>12,.0f} 段/秒  {rates[name] / baseline:>5.2f}x  {label}")
+    changed = results['changed_by_flag']
+    print(f"   判斷改變的片段: {results['changed_segments']:,}（問句 {changed['is_question']:,}，"
+          f"回應 {changed['is_response']:,}，轉場 {changed['is_transition']:,}）")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="對話特徵分析基準測試")
+    parser.add_argument('--segments', type=int, default=100000, help='片段數 (預設: 100000)')
+    parser.add_argument('--repeat', type=int, default=3, help='重複次數，取最短耗時 (預設: 3)')
+    parser.add_argument('--results', help='將結果寫入 JSON 文件')
+    args = parser.parse_args()
+
+    setup_logging('WARNING')
+    results = run(args.segments, args.repeat)
+    print_report(results)
+
+    if args.results:
+        with open(args.results, 'w', encoding='utf-8') as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+        print(f"\n📄 結果已保存: {args.results}")
+
+
+if __name__ == "__main__":
+    main()
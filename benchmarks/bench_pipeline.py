@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+"""
+處理流程效能基準測試
+
+以合成對話與模擬服務執行完整的 process_audio_complete 與 BatchProcessor，
+回報各階段吞吐量、首段音頻延遲、記憶體峰值與不同長度下的擴展曲線，
+並可與儲存的基準值比較，退步超過容許範圍時以非零狀態碼結束。
+
+使用方法:
+python -m benchmarks.bench_pipeline                          # 預設長度 10,100,1000
+python -m benchmarks.bench_pipeline --sizes 10,100,1000,5000
+python -m benchmarks.bench_pipeline --check                  # 與 baseline.json 比較
+python -m benchmarks.bench_pipeline --update-baseline        # 更新 baseline.json
+python -m benchmarks.bench_pipeline --config fast            # 使用快速處理配置
+"""
+
+import argparse
+import asyncio
+import functools
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Dict, List
+
+from audio_processor import _audio_segment
+from batch_processor import BatchProcessor
+from benchmarks.stubs import StubAudioProcessor, StubLatency
+from benchmarks.synthetic import write_synthetic_audio
+from log_manager import setup_logging
+from metrics import MetricsRegistry
+from runtime_config import RuntimeConfig, load_config
+
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), 'baseline.json')
+SECONDS_PER_SEGMENT = 1.5
+STAGES = ['transcription', 'dialogue', 'translation', 'tts', 'mix', 'export']
+
+
+def stage_throughput(metrics: MetricsRegistry) -> Dict[str, float]:
+    """從指標計算各階段的服務速率（片段數 / 階段忙碌秒數）"""
+    exported = metrics.to_dict()
+    segments = {
+        item['labels'].get('stage'): item['value']
+        for item in exported['counters'] if item['name'] == 'podcast_segments_total'
+    }
+    result = {}
+    for item in exported['histograms']:
+        if item['name'] != 'podcast_stage_seconds':
+            continue
+        stage = item['labels'].get('stage')
+        if item['sum'] > 0:
+            # 轉錄階段每個文件只觀測一次，改用轉錄出的片段數
+            processed = segments.get(stage, item['count']) if stage == 'transcription' else item['count']
+            result[stage] = round(processed / item['sum'], 2)
+    return {stage: result[stage] for stage in STAGES if stage in result}
+
+
+async def run_pipeline(segment_count: int, latency: StubLatency, work_dir: str,
+                       config: RuntimeConfig = None) -> Dict:
+    """對指定長度的合成 Podcast 執行一次完整處理流程"""
+    input_path = os.path.join(work_dir, f'synthetic_{segment_count}.wav')
+    write_synthetic_audio(input_path, segment_count * SECONDS_PER_SEGMENT)
+
+    processor = StubAudioProcessor(latency, SECONDS_PER_SEGMENT, config=config)
+    tracemalloc.start()
+    started_at = time.perf_counter()
+    result = await processor.process_audio_complete(input_path, os.path.join(work_dir, f'out_{segment_count}'))
+    elapsed = time.perf_counter() - started_at
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    stats = result['pipeline_stats']
+    return {
+        'segments': result['segments_count'],
+        'elapsed': round(elapsed, 3),
+        'segments_per_sec': round(result['segments_count'] / elapsed, 2),
+        'time_to_first_audio': stats['time_to_first_audio'],
+        'steady_state_segments_per_sec': stats['steady_state_segments_per_sec'],
+        'peak_memory_mb': round(peak / 1024 / 1024, 2),
+        'stage_throughput': stage_throughput(processor.metrics)
+    }
+
+
+async def run_batch(file_count: int, segment_count: int, concurrent: int,
+                    latency: StubLatency, work_dir: str, config: RuntimeConfig = None,
+                    workers: int = 0) -> Dict:
+    """以多個合成文件執行 BatchProcessor（workers 大於 0 時使用工作行程池）"""
+    input_dir = os.path.join(work_dir, 'batch_input')
+    os.makedirs(input_dir, exist_ok=True)
+    for i in range(file_count):
+        write_synthetic_audio(os.path.join(input_dir, f'episode_{i:03d}.wav'), segment_count * SECONDS_PER_SEGMENT)
+
+    batch = BatchProcessor(config, workers=workers,
+                           processor_factory=functools.partial(StubAudioProcessor, latency, SECONDS_PER_SEGMENT))
+    started_at = time.perf_counter()
+    report = await batch.process_batch(input_dir, os.path.join(work_dir, 'batch_output'), concurrent)
+    elapsed = time.perf_counter() - started_at
+
+    total_segments = file_count * segment_count
+    return {
+        'files': file_count,
+        'segments_per_file': segment_count,
+        'concurrent': concurrent,
+        'workers': workers,
+        'successful': report['successful'],
+        'elapsed': round(elapsed, 3),
+        'files_per_min': round(file_count / elapsed * 60, 2),
+        'segments_per_sec': round(total_segments / elapsed, 2),
+        'stage_throughput': stage_throughput(batch.metrics),
+        'scheduler': report.get('scheduler')
+    }
+
+
+def check_regressions(results: Dict, baseline: Dict, tolerance: float) -> List[str]:
+    """比較結果與基準值，返回退步項目的說明"""
+    problems = []
+    for size, expected in baseline.get('pipeline', {}).items():
+        actual = results['pipeline'].get(size)
+        if not actual:
+            continue
+        if actual['segments_per_sec'] < expected['segments_per_sec'] * (1 - tolerance):
+            problems.append(f"pipeline[{size}] 吞吐量 {actual['segments_per_sec']} < 基準 {expected['segments_per_sec']}")
+        for key in ('time_to_first_audio', 'peak_memory_mb'):
+            if expected.get(key) and actual.get(key) and actual[key] > expected[key] * (1 + tolerance):
+                problems.append(f"pipeline[{size}] {key} {actual[key]} > 基準 {expected[key]}")
+    expected = baseline.get('batch')
+    actual = results.get('batch')
+    if expected and actual and actual['segments_per_sec'] < expected['segments_per_sec'] * (1 - tolerance):
+        problems.append(f"batch 吞吐量 {actual['segments_per_sec']} < 基準 {expected['segments_per_sec']}")
+    return problems
+
+
+def print_report(results: Dict):
+    print("\n📊 處理流程擴展曲線")
+    print(f"{'片段數':>8} {'耗時(s)':>9} {'段/秒':>8} {'首段(s)':>8} {'穩態段/秒':>10} {'記憶體(MB)':>11}")
+    for size, item in results['pipeline'].items():
+        print(f"{size:>8} {item['elapsed']:>9.2f} {item['segments_per_sec']:>8.2f} "
+              f"{item['time_to_first_audio'] or 0:>8.3f} {item['steady_state_segments_per_sec'] or 0:>10.2f} "
+              f"{item['peak_memory_mb']:>11.2f}")
+    print("\n⚙️  各階段吞吐量（段 / 忙碌秒）")
+    for size, item in results['pipeline'].items():
+        stages = ', '.join(f"{stage}={rate}" for stage, rate in item['stage_throughput'].items())
+        print(f"   {size}: {stages}")
+    if results.get('batch'):
+        batch = results['batch']
+        print(f"\n📦 批次處理: {batch['files']} 個文件 × {batch['segments_per_file']} 段，"
+              f"並發 {batch['concurrent']}，工作行程 {batch.get('workers', 0)}，{batch['elapsed']:.2f} 秒，"
+              f"{batch['files_per_min']:.1f} 文件/分鐘，{batch['segments_per_sec']:.2f} 段/秒")
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="離線處理流程效能基準測試")
+    parser.add_argument('--sizes', default='10,100,1000', help='要測試的片段數，以逗號分隔 (預設: 10,100,1000)')
+    parser.add_argument('--batch-files', type=int, default=4, help='批次測試的文件數 (預設: 4，0 表示略過)')
+    parser.add_argument('--batch-segments', type=int, default=50, help='批次測試每個文件的片段數 (預設: 50)')
+    parser.add_argument('--concurrent', type=int, default=2, help='批次測試的並發數 (預設: 2)')
+    parser.add_argument('--workers', type=int, default=0, help='批次測試的工作行程數，0 表示在主行程中處理 (預設: 0)')
+    parser.add_argument('--latency-scale', type=float, default=0.2,
+                        help='模擬服務延遲的縮放倍數，1.0 接近實際 API (預設: 0.2)')
+    parser.add_argument('--results', help='將結果寫入 JSON 文件')
+    parser.add_argument('--check', action='store_true', help='與基準值比較，退步時以狀態碼 1 結束')
+    parser.add_argument('--update-baseline', action='store_true', help='以本次結果更新基準值')
+    parser.add_argument('--tolerance', type=float, default=None, help='容許的退步比例 (預設: 使用基準檔設定或 0.25)')
+    parser.add_argument('--config', help='使用的效能配置（fast、high_quality 或 YAML 路徑；預設: 不使用配置）')
+    parser.add_argument('--verbose', action='store_true', help='顯示處理流程的完整輸出')
+    args = parser.parse_args()
+
+    config = load_config(args.config)
+    # 基準測試一律由本程式控制日誌與輸出，不套用配置中的日誌與報告設定
+    config.logging.file_logging = False
+    config.output.create_report = True
+
+    # 預設只顯示警告，避免處理流程的日誌干擾量測結果
+    setup_logging('INFO' if args.verbose else 'WARNING')
+
+    # 預先載入延遲匯入的音頻函式庫，避免匯入時的配置計入第一次量測的記憶體峰值
+    _audio_segment()
+
+    sizes = [int(size) for size in args.sizes.split(',') if size.strip()]
+    results = {'latency_scale': args.latency_scale, 'config': args.config, 'pipeline': {}, 'batch': None}
+
+    with tempfile.TemporaryDirectory(prefix='podcast_bench_') as work_dir:
+        for size in sizes:
+            print(f"⏱️  執行處理流程: {size} 段...")
+            results['pipeline'][str(size)] = await run_pipeline(
+                size, StubLatency(scale=args.latency_scale), work_dir, config)
+        if args.batch_files > 0:
+            print(f"⏱️  執行批次處理: {args.batch_files} 個文件...")
+            results['batch'] = await run_batch(
+                args.batch_files, args.batch_segments, args.concurrent,
+                StubLatency(scale=args.latency_scale), work_dir, config, args.workers)
+
+    print_report(results)
+
+    if args.results:
+        with open(args.results, 'w', encoding='utf-8') as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+        print(f"\n📄 結果已保存: {args.results}")
+
+    if args.update_baseline:
+        results['tolerance'] = args.tolerance if args.tolerance is not None else 0.25
+        with open(BASELINE_PATH, 'w', encoding='utf-8') as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+        print(f"📌 基準值已更新: {BASELINE_PATH}")
+
+    if args.check:
+        if not os.path.exists(BASELINE_PATH):
+            print(f"❌ 找不到基準值: {BASELINE_PATH}")
+            sys.exit(1)
+        with open(BASELINE_PATH, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        if baseline.get('latency_scale') != args.latency_scale:
+            print("⚠️  延遲縮放倍數與基準值不同，比較結果僅供參考")
+        if baseline.get('config') != args.config:
+            print("⚠️  效能配置與基準值不同，比較結果僅供參考")
+        tolerance = args.tolerance if args.tolerance is not None else baseline.get('tolerance', 0.25)
+        problems = check_regressions(results, baseline, tolerance)
+        if problems:
+            print(f"\n❌ 效能退步超過 {tolerance:.0%}:")
+            for problem in problems:
+                print(f"   - {problem}")
+            sys.exit(1)
+        print(f"\n✅ 未發現超過 {tolerance:.0%} 的效能退步")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+片段資料模型基準測試
+
+比較各階段以 {**segment, ...} 複製字典與以 Segment 就地更新的記憶體與吞吐量，
+並以模擬服務執行 AudioProcessor 的對話分析、翻譯與逐字稿轉換階段。
+
+使用方法:
+python -m benchmarks.bench_segments                       # 預設片段數 10000,50000
+python -m benchmarks.bench_segments --sizes 10000,100000 --repeat 3
+"""
+
+import argparse
+import gc
+import json
+import time
+import tracemalloc
+from typing import Callable, Dict, List
+
+from benchmarks.stubs import StubAudioProcessor, StubLatency
+from benchmarks.synthetic import generate_dialogue
+from log_manager import setup_logging
+from runtime_config import load_config
+from segment_model import Segment, SegmentAudio
+
+
+def dict_stages(raw: List[Dict]) -> List:
+    """改版前的做法：每個階段複製一次片段字典"""
+    transcribed = [{'start': s['start'], 'end': s['end'], 'text': s['text'].strip(), 'words': []} for s in raw]
+    dialogue = [
+        {**s, 'speaker': 'A' if i % 2 == 0 else 'B', 'is_question': s['text'].endswith('?'),
+         'is_response': False, 'is_transition': False}
+        for i, s in enumerate(transcribed)
+    ]
+    translated = [{**s, 'original_text': s['text'], 'translated_text': s['text']} for s in dialogue]
+    audio = [
+        {'file': f"segment_{i:03d}_{s['speaker']}.wav", 'index': i, 'start': s['start'], 'end': s['end'],
+         'speaker': s['speaker'], 'duration': s['end'] - s['start']}
+        for i, s in enumerate(translated)
+    ]
+    return [translated, audio]
+
+
+def slotted_stages(raw: List[Dict]) -> List:
+    """Segment 就地更新，音頻資訊使用 SegmentAudio"""
+    segments = [Segment(s['start'], s['end'], s['text'].strip()) for s in raw]
+    for i, segment in enumerate(segments):
+        segment.speaker = 'A' if i % 2 == 0 else 'B'
+        segment.is_question = segment.text.endswith('?')
+        segment.is_response = False
+        segment.is_transition = False
+    for segment in segments:
+        segment.original_text = segment.text
+        segment.translated_text = segment.text
+    audio = [
+        SegmentAudio(f"segment_{i:03d}_{s.speaker}.wav", i, s.start, s.end, s.speaker)
+        for i, s in enumerate(segments)
+    ]
+    return [segments, audio]
+
+
+def measure(func: Callable, repeat: int) -> Dict:
+    """返回最短耗時、配置峰值與執行結束後仍保留的記憶體"""
+    timings = []
+    for _ in range(repeat):
+        gc.collect()
+        started_at = time.perf_counter()
+        result = func()
+        timings.append(time.perf_counter() - started_at)
+        del result
+
+    gc.collect()
+    tracemalloc.start()
+    result = func()
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return {
+        'seconds': round(min(timings), 4),
+        'peak_mb': round(peak / 1024 / 1024, 2),
+        'retained_mb': round(retained / 1024 / 1024, 2)
+    }
+
+
+def bench_model(segment_count: int, repeat: int) -> Dict:
+    raw = generate_dialogue(segment_count)
+    return {
+        'segments': segment_count,
+        'dict': measure(lambda: dict_stages(raw), repeat),
+        'slotted': measure(lambda: slotted_stages(raw), repeat)
+    }
+
+
+def bench_processor(segment_count: int, repeat: int) -> Dict:
+    """以模擬服務執行實際的對話分析、翻譯與逐字稿轉換"""
+    config = load_config(None)
+    config.logging.file_logging = False
+    config.processing.progress_reporting = False
+    processor = StubAudioProcessor(StubLatency(scale=0.0), config=config)
+    raw = generate_dialogue(segment_count)
+
+    def run():
+        transcribed = [Segment(s['start'], s['end'], s['text']) for s in raw]
+        translated = processor.translate_with_context(processor.detect_speakers_and_dialogue(transcribed))
+        return translated, [processor._transcript_entry(segment) for segment in translated]
+
+    result = measure(run, repeat)
+    result['segments'] = segment_count
+    result['segments_per_sec'] = round(segment_count / result['seconds'], 1)
+    return result
+
+
+def print_report(model: List[Dict], processor: List[Dict]):
+    print("\n🧩 片段資料模型：字典複製 vs Segment 就地更新（轉錄 → 對話分析 → 翻譯 → 音頻資訊）")
+    print(f"   {'片段數':>8} {'模型':<8} {'耗時(s)':>10} {'峰值(MB)':>10} {'保留(MB)':>10}")
+    for result in model:
+        for name in ('dict', 'slotted'):
+            values = result[name]
+            print(f"   {result['segments']:>8} {name:<8} {values['seconds']:>10} "
+                  f"{values['peak_mb']:>10} {values['retained_mb']:>10}")
+        dict_values, slotted = result['dict'], result['slotted']
+        print(f"   {'':>8} {'節省':<8} {dict_values['seconds'] / slotted['seconds']:>9.2f}x "
+              f"{1 - slotted['peak_mb'] / dict_values['peak_mb']:>10.0%} "
+              f"{1 - slotted['retained_mb'] / dict_values['retained_mb']:>10.0%}")
+
+    print("\n⚙️  AudioProcessor 對話分析 + 翻譯 + 逐字稿轉換（模擬服務，無延遲）")
+    for result in processor:
+        print(f"   {result['segments']:>8} 段: {result['seconds']:.3f} 秒，{result['segments_per_sec']:,.0f} 段/秒，"
+              f"峰值 {result['peak_mb']} MB，保留 {result['retained_mb']} MB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="片段資料模型基準測試")
+    parser.add_argument('--sizes', default='10000,50000', help='要測試的片段數，以逗號分隔 (預設: 10000,50000)')
+    parser.add_argument('--repeat', type=int, default=3, help='計時重複次數，取最短耗時 (預設: 3)')
+    parser.add_argument('--results', help='將結果寫入 JSON 文件')
+    args = parser.parse_args()
+
+    setup_logging('WARNING')
+    sizes = [int(size) for size in args.sizes.split(',') if size.strip()]
+    model = [bench_model(size, args.repeat) for size in sizes]
+    processor = [bench_processor(size, args.repeat) for size in sizes]
+    print_report(model, processor)
+
+    if args.results:
+        with open(args.results, 'w', encoding='utf-8') as f:
+            json.dump({'model': model, 'processor': processor}, f, ensure_ascii=False, indent=2)
+        print(f"\n📄 結果已保存: {args.results}")
+
+
+if __name__ == "__main__":
+    main()
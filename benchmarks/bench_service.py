@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+工作服務負載測試
+
+以多個並發用戶端上傳合成音頻到 service.py，量測每分鐘完成的工作數、
+佇列等待時間與端到端延遲。未指定 --url 時在本行程內以模擬服務啟動工作服務。
+
+使用方法:
+python -m benchmarks.bench_service                              # 內建服務，20 個工作
+python -m benchmarks.bench_service --jobs 50 --clients 8 --service-workers 4
+python -m benchmarks.bench_service --url http://127.0.0.1:8080  # 對已啟動的服務測試
+"""
+
+import argparse
+import asyncio
+import functools
+import json
+import os
+import statistics
+import tempfile
+import time
+from typing import Dict, List
+
+import aiohttp
+
+from benchmarks.stubs import StubAudioProcessor, StubLatency
+from benchmarks.synthetic import write_synthetic_audio
+from log_manager import setup_logging
+from runtime_config import load_config
+from service import JobService, serve
+
+SECONDS_PER_SEGMENT = 1.5
+FINISHED_STATES = ('success', 'failed')
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    if not values:
+        return None
+    ordered = sorted(values)
+    return round(ordered[min(len(ordered) - 1, int(fraction * len(ordered)))], 3)
+
+
+async def run_job(session: aiohttp.ClientSession, url: str, audio_path: str,
+                  poll_interval: float, stats: Dict) -> Dict:
+    """上傳一個文件並輪詢到完成；佇列已滿時依 Retry-After 重試"""
+    submitted_at = time.perf_counter()
+    while True:
+        with open(audio_path, 'rb') as f:
+            form = aiohttp.FormData()
+            form.add_field('file', f, filename=os.path.basename(audio_path), content_type='audio/wav')
+            async with session.post(f"{url}/jobs", data=form) as response:
+                payload = await response.json()
+                if response.status == 429:
+                    stats['rejected'] += 1
+                    await asyncio.sleep(min(float(response.headers.get('Retry-After', 1)), poll_interval * 5))
+                    continue
+                if response.status != 202:
+                    raise RuntimeError(f"提交失敗 ({response.status}): {payload}")
+                break
+    accepted_at = time.perf_counter()
+
+    job_url = f"{url}/jobs/{payload['id']}"
+    while payload['status'] not in FINISHED_STATES:
+        await asyncio.sleep(poll_interval)
+        async with session.get(job_url) as response:
+            payload = await response.json()
+    payload['client_seconds'] = time.perf_counter() - submitted_at
+    payload['submit_seconds'] = accepted_at - submitted_at
+    return payload
+
+
+async def run_load(url: str, audio_path: str, jobs: int, clients: int, poll_interval: float) -> Dict:
+    """以 clients 個並發用戶端送出 jobs 個工作"""
+    stats = {'rejected': 0}
+    pending = iter(range(jobs))
+    finished = []
+
+    async def client(session):
+        for _ in pending:
+            finished.append(await run_job(session, url, audio_path, poll_interval, stats))
+
+    started_at = time.perf_counter()
+    async with aiohttp.ClientSession() as session:
+        await asyncio.gather(*(client(session) for _ in range(clients)))
+    elapsed = time.perf_counter() - started_at
+
+    queue_waits = [job['queue_seconds'] for job in finished if job['queue_seconds'] is not None]
+    processing = [job['processing_seconds'] for job in finished if job['processing_seconds'] is not None]
+    end_to_end = [job['client_seconds'] for job in finished]
+    return {
+        'jobs': jobs,
+        'clients': clients,
+        'successful': sum(1 for job in finished if job['status'] == 'success'),
+        'rejected_submissions': stats['rejected'],
+        'elapsed': round(elapsed, 3),
+        'jobs_per_min': round(len(finished) / elapsed * 60, 2),
+        'queue_seconds': {
+            'mean': round(statistics.mean(queue_waits), 3) if queue_waits else None,
+            'p50': percentile(queue_waits, 0.5),
+            'p95': percentile(queue_waits, 0.95),
+            'max': percentile(queue_waits, 1.0)
+        },
+        'processing_seconds_p50': percentile(processing, 0.5),
+        'end_to_end_seconds': {
+            'p50': percentile(end_to_end, 0.5),
+            'p95': percentile(end_to_end, 0.95)
+        }
+    }
+
+
+def print_report(results: Dict):
+    queue = results['queue_seconds']
+    e2e = results['end_to_end_seconds']
+    print(f"\n🌐 工作服務負載測試: {results['jobs']} 個工作，{results['clients']} 個並發用戶端")
+    print(f"   完成 {results['successful']}/{results['jobs']}，{results['elapsed']:.2f} 秒，"
+          f"{results['jobs_per_min']:.1f} 工作/分鐘，佇列已滿被拒 {results['rejected_submissions']} 次")
+    print(f"   佇列等待(s): 平均 {queue['mean']}  p50 {queue['p50']}  p95 {queue['p95']}  最長 {queue['max']}")
+    print(f"   處理時間 p50(s): {results['processing_seconds_p50']}")
+    print(f"   端到端(s): p50 {e2e['p50']}  p95 {e2e['p95']}")
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="工作服務負載測試")
+    parser.add_argument('--url', help='已啟動服務的網址；未指定時在本行程內啟動模擬服務')
+    parser.add_argument('--jobs', type=int, default=20, help='送出的工作數 (預設: 20)')
+    parser.add_argument('--clients', type=int, default=4, help='並發用戶端數 (預設: 4)')
+    parser.add_argument('--segments', type=int, default=20, help='每個合成文件的片段數 (預設: 20)')
+    parser.add_argument('--service-workers', type=int, default=2, help='內建服務的工作者數 (預設: 2)')
+    parser.add_argument('--queue-size', type=int, default=8, help='內建服務的佇列上限 (預設: 8)')
+    parser.add_argument('--latency-scale', type=float, default=0.2, help='模擬服務延遲的縮放倍數 (預設: 0.2)')
+    parser.add_argument('--poll-interval', type=float, default=0.05, help='輪詢工作狀態的間隔秒數 (預設: 0.05)')
+    parser.add_argument('--config', help='內建服務使用的效能配置')
+    parser.add_argument('--results', help='將結果寫入 JSON 文件')
+    parser.add_argument('--verbose', action='store_true', help='顯示服務的完整輸出')
+    args = parser.parse_args()
+
+    setup_logging('INFO' if args.verbose else 'WARNING')
+
+    with tempfile.TemporaryDirectory(prefix='podcast_service_bench_') as work_dir:
+        audio_path = os.path.join(work_dir, 'synthetic.wav')
+        write_synthetic_audio(audio_path, args.segments * SECONDS_PER_SEGMENT)
+
+        runner = None
+        url = args.url
+        if not url:
+            config = load_config(args.config)
+            config.logging.file_logging = False
+            factory = functools.partial(StubAudioProcessor, StubLatency(scale=args.latency_scale), SECONDS_PER_SEGMENT)
+            service = JobService(config, workers=args.service_workers, queue_size=args.queue_size,
+                                 work_dir=os.path.join(work_dir, 'service'), processor_factory=factory)
+            runner = await serve(service, '127.0.0.1', 0, 100 * 1024 * 1024)
+            host, port = runner.addresses[0][:2]
+            url = f"http://{host}:{port}"
+
+        try:
+            print(f"⏱️  對 {url} 送出 {args.jobs} 個工作...")
+            results = await run_load(url, audio_path, args.jobs, args.clients, args.poll_interval)
+        finally:
+            if runner:
+                await runner.cleanup()
+
+    results['service_workers'] = None if args.url else args.service_workers
+    print_report(results)
+
+    if args.results:
+        with open(args.results, 'w', encoding='utf-8') as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+        print(f"\n📄 結果已保存: {args.results}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""
+中文口語後處理與語音標記基準測試
+
+比較改版前的 enhance_chinese_dialogue + add_speech_marks（多次 any(...) 與
+str.replace、以字串拼接 SSML 標籤）與 SpeechRewriter（enhance + plan + Edge 參數）
+在大量片段上的吞吐量，並確認口語後處理的輸出與改版前完全相同。
+
+使用方法:
+python -m benchmarks.bench_speech                    # 預設 100000 段
+python -m benchmarks.bench_speech --segments 500000 --repeat 5
+"""
+
+import argparse
+import json
+import random
+import time
+from typing import Callable, Dict, List, Tuple
+
+from log_manager import setup_logging
+from runtime_config import load_config
+from speech_markup import SpeechRewriter
+
+# 模擬翻譯輸出：(譯文, 原文, 是否問句, 是否回應, 是否轉場)
+LINES = [
+    ("你覺得這個結果代表什麼", "What do you think this result means?", True, False, False),
+    ("他們怎麼決定採用這個方法的", "How did they decide on that approach?", True, False, False),
+    ("所以重點是規模嗎？", "So is the point scale?", True, False, False),
+    ("對，這正是研究想要說明的。", "Right, that is exactly what the study shows.", False, True, False),
+    ("我認為這最終取決於信任，而且需要時間，也需要團隊在每個階段都保持透明，才能讓使用者真正放心地採用新的系統。",
+     "Well, I think it comes down to trust.", False, True, False),
+    ("另外，還有一篇研究得到相同的結論。", "Also, another study found the same thing.", False, False, True),
+    ("這個資料集包含超過一萬名參與者。", "The dataset covers more than ten thousand people!", False, False, False),
+    ("研究團隊花了三年收集資料，接著又花了一年分析，最後才發表結果，這在這個領域其實相當常見，也說明了長期追蹤的重要性。",
+     "The team spent three years collecting data.", False, False, False),
+]
+
+
+def legacy_enhance(translated_text: str, segment: Dict) -> str:
+    """改版前的 AudioProcessor.enhance_chinese_dialogue"""
+    text = translated_text
+    if segment.get('is_question'):
+        if not text.endswith('？') and not text.endswith('?'):
+            text += '？'
+        question_starters = ['那麼', '所以', '那', '嗯']
+        if not any(text.startswith(starter) for starter in question_starters):
+            if '什麼' in text or '怎麼' in text:
+                text = '那' + text
+    elif segment.get('is_response'):
+        response_starters = ['嗯', '對', '是的', '沒錯', '確實']
+        if not any(text.startswith(starter) for starter in response_starters):
+            text = '嗯，' + text
+    elif segment.get('is_transition'):
+        transition_words = ['說到這個', '順便說一下', '另外', '還有']
+        if not any(phrase in text for phrase in transition_words):
+            text = '說到這個，' + text
+    if len(text) > 50 and '，' in text:
+        parts = text.split('，')
+        if len(parts) > 1:
+            parts[0] += '呢'
+            text = '，'.join(parts)
+    return text
+
+
+def legacy_speech_marks(text: str, segment: Dict, tts) -> str:
+    """改版前的 AudioProcessor.add_speech_marks"""
+    if tts.add_pauses:
+        if segment.get('is_question'):
+            text = text.replace('？', '<break time="500ms"/>？')
+        text = text.replace('，', '，<break time="300ms"/>')
+        text = text.replace('。', '。<break time="500ms"/>')
+    if tts.prosody_adjustment:
+        if segment.get('is_question'):
+            text = f'<prosody rate="0.9" pitch="+5%">{text}</prosody>'
+        elif segment.get('is_response'):
+            text = f'<prosody rate="1.0" pitch="-2%">{text}</prosody>'
+        elif tts.emotion_enhancement and segment.get('text', '').rstrip().endswith('!'):
+            text = f'<prosody rate="1.05" pitch="+8%">{text}</prosody>'
+    return text
+
+
+def build_segments(segment_count: int, seed: int = 0) -> List[Dict]:
+    rng = random.Random(seed)
+    segments = []
+    for _ in range(segment_count):
+        translated, text, is_question, is_response, is_transition = rng.choice(LINES)
+        segments.append({'text': text, 'translated_text': translated, 'is_question': is_question,
+                         'is_response': is_response, 'is_transition': is_transition})
+    return segments
+
+
+def best_of(repeat: int, func: Callable):
+    timings = []
+    result = None
+    for _ in range(repeat):
+        started_at = time.perf_counter()
+        result = func()
+        timings.append(time.perf_counter() - started_at)
+    return min(timings), result
+
+
+def run(segment_count: int, repeat: int) -> Dict:
+    config = load_config(None)
+    config.tts.emotion_enhancement = True
+    tts = config.tts
+    rewriter = SpeechRewriter.from_config(config)
+    segments = build_segments(segment_count)
+
+    def legacy() -> List[str]:
+        output = []
+        for segment in segments:
+            text = legacy_enhance(segment['translated_text'], segment)
+            output.append(legacy_speech_marks(text, segment, tts))
+        return output
+
+    def rewritten(ssml: bool) -> Tuple[List[str], List[tuple]]:
+        enhanced, inputs = [], []
+        for segment in segments:
+            is_question, is_response = segment['is_question'], segment['is_response']
+            text = rewriter.enhance(segment['translated_text'], is_question, is_response, segment['is_transition'])
+            plan = rewriter.plan(text, is_question, is_response, segment['text'])
+            enhanced.append(text)
+            inputs.append(rewriter.to_ssml(plan, 'zh-TW-HsiaoChenNeural') if ssml else rewriter.edge_arguments(plan))
+        return enhanced, inputs
+
+    legacy_enhance_seconds, legacy_enhanced = best_of(repeat, lambda: [
+        legacy_enhance(segment['translated_text'], segment) for segment in segments])
+    legacy_seconds, _ = best_of(repeat, legacy)
+    edge_seconds, (enhanced, _) = best_of(repeat, lambda: rewritten(False))
+    ssml_seconds, _ = best_of(repeat, lambda: rewritten(True))
+    if enhanced != legacy_enhanced:
+        raise AssertionError("SpeechRewriter.enhance 的輸出與改版前不一致")
+
+    def rate(seconds: float) -> float:
+        return round(segment_count / seconds, 1)
+
+    return {
+        'segments': segment_count,
+        'segments_per_sec': {
+            'legacy_enhance': rate(legacy_enhance_seconds),
+            'legacy': rate(legacy_seconds),
+            'rewriter_edge': rate(edge_seconds),
+            'rewriter_ssml': rate(ssml_seconds)
+        }
+    }
+
+
+def print_report(results: Dict):
+    rates = results['segments_per_sec']
+    baseline = rates['legacy']
+    print(f"\n🗣️  中文口語後處理 + 語音標記: {results['segments']:,} 段（輸出與改版前相同）")
+    for name, label in (('legacy_enhance', '改版前：只有口語後處理'),
+                        ('legacy', '改版前：口語後處理 + SSML 字串標記'),
+                        ('rewriter_edge', 'SpeechRewriter → Edge 文字 / rate / pitch'),
+                        ('rewriter_ssml', 'SpeechRewriter → 完整 SSML 文件')):
+        print(f"   {rates[name]:>12,.0f} 段/秒  {rates[name] / baseline:>5.2f}x  {label}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="中文口語後處理與語音標記基準測試")
+    parser.add_argument('--segments', type=int, default=100000, help='片段數 (預設: 100000)')
+    parser.add_argument('--repeat', type=int, default=3, help='重複次數，取最短耗時 (預設: 3)')
+    parser.add_argument('--results', help='將結果寫入 JSON 文件')
+    args = parser.parse_args()
+
+    setup_logging('WARNING')
+    results = run(args.segments, args.repeat)
+    print_report(results)
+
+    if args.results:
+        with open(args.results, 'w', encoding='utf-8') as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+        print(f"\n📄 結果已保存: {args.results}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+啟動時間基準測試
+
+在獨立的子行程中量測模組匯入、CLI --help 與 AudioProcessor 建立的耗時，
+並確認這些路徑沒有提前載入服務商 SDK 或音頻函式庫。
+可與儲存的基準值比較，退步超過容許範圍時以非零狀態碼結束。
+
+使用方法:
+python -m benchmarks.bench_startup
+python -m benchmarks.bench_startup --check               # 與 startup_baseline.json 比較
+python -m benchmarks.bench_startup --update-baseline     # 更新 startup_baseline.json
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from typing import Dict, List
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), 'startup_baseline.json')
+
+# 這些模組匯入成本高，只應在實際使用對應功能時載入
+HEAVY_MODULES = ['openai', 'google.generativeai', 'edge_tts', 'pydub', 'deep_translator', 'soundfile', 'numpy',
+                 'faster_whisper']
+
+_REPORT_MODULES = (
+    "import json, sys; "
+    f"print(json.dumps([m for m in {HEAVY_MODULES!r} if m in sys.modules]))"
+)
+
+# 名稱: (量測的 Python 程式碼, 是否檢查重量級模組)
+SCENARIOS = {
+    'import_audio_processor': ("import audio_processor", True),
+    'import_batch_processor': ("import batch_processor", True),
+    'main_help': ("import sys; sys.argv = ['main.py', '--help']\n"
+                  "import runpy\n"
+                  "try:\n"
+                  "    runpy.run_path('main.py', run_name='__main__')\n"
+                  "except SystemExit:\n"
+                  "    pass", True),
+    'create_processor': ("from audio_processor import AudioProcessor; AudioProcessor()", True),
+}
+
+
+def run_scenario(code: str, check_modules: bool) -> Dict:
+    """在乾淨的子行程中執行程式碼，返回耗時與已載入的重量級模組"""
+    script = code + ("\n" + _REPORT_MODULES if check_modules else "")
+    env = dict(os.environ, LOG_LEVEL='WARNING', PYTHONDONTWRITEBYTECODE='1')
+    started_at = time.perf_counter()
+    completed = subprocess.run(
+        [sys.executable, '-c', script],
+        cwd=ROOT_DIR, env=env, capture_output=True, text=True
+    )
+    elapsed = time.perf_counter() - started_at
+    if completed.returncode != 0:
+        raise RuntimeError(completed.stderr.strip() or f"狀態碼 {completed.returncode}")
+    loaded = []
+    if check_modules:
+        loaded = json.loads(completed.stdout.strip().splitlines()[-1])
+    return {'elapsed': elapsed, 'loaded': loaded}
+
+
+def measure(repeat: int) -> Dict:
+    """每個情境執行 repeat 次，取中位數"""
+    # 以空的直譯器啟動時間作為對照，結果扣除這部分
+    interpreter = statistics.median(run_scenario('pass', False)['elapsed'] for _ in range(repeat))
+    results = {'interpreter_seconds': round(interpreter, 4), 'scenarios': {}}
+    for name, (code, check_modules) in SCENARIOS.items():
+        runs = [run_scenario(code, check_modules) for _ in range(repeat)]
+        median = statistics.median(run['elapsed'] for run in runs)
+        results['scenarios'][name] = {
+            'seconds': round(median, 4),
+            'over_interpreter': round(max(0.0, median - interpreter), 4),
+            'heavy_modules_loaded': runs[-1]['loaded']
+        }
+    return results
+
+
+def check_regressions(results: Dict, baseline: Dict, tolerance: float, slack: float) -> List[str]:
+    """比較結果與基準值，返回退步項目的說明
+
+    啟動時間很短，除比例外另允許固定的 slack 秒數，避免行程排程的雜訊造成誤判。
+    """
+    problems = []
+    for name, item in results['scenarios'].items():
+        if item['heavy_modules_loaded']:
+            problems.append(f"{name} 提前載入了 {', '.join(item['heavy_modules_loaded'])}")
+        expected = baseline.get('scenarios', {}).get(name)
+        if not expected:
+            continue
+        limit = expected['over_interpreter'] * (1 + tolerance) + slack
+        if item['over_interpreter'] > limit:
+            problems.append(f"{name} 啟動耗時 {item['over_interpreter']}s > 上限 {limit:.3f}s")
+    return problems
+
+
+def print_report(results: Dict):
+    print(f"\n🚀 啟動時間（中位數，直譯器本身 {results['interpreter_seconds']:.3f}s）")
+    print(f"{'情境':<26} {'總耗時(s)':>10} {'扣除直譯器(s)':>14}  重量級模組")
+    for name, item in results['scenarios'].items():
+        loaded = ', '.join(item['heavy_modules_loaded']) or '-'
+        print(f"{name:<26} {item['seconds']:>10.3f} {item['over_interpreter']:>14.3f}  {loaded}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="CLI 啟動時間基準測試")
+    parser.add_argument('--repeat', type=int, default=5, help='每個情境的執行次數 (預設: 5)')
+    parser.add_argument('--results', help='將結果寫入 JSON 文件')
+    parser.add_argument('--check', action='store_true', help='與基準值比較，退步時以狀態碼 1 結束')
+    parser.add_argument('--update-baseline', action='store_true', help='以本次結果更新基準值')
+    parser.add_argument('--tolerance', type=float, default=None, help='容許的退步比例 (預設: 使用基準檔設定或 0.5)')
+    parser.add_argument('--slack', type=float, default=0.05, help='額外容許的固定秒數 (預設: 0.05)')
+    args = parser.parse_args()
+
+    results = measure(max(1, args.repeat))
+    print_report(results)
+
+    if args.results:
+        with open(args.results, 'w', encoding='utf-8') as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+        print(f"\n📄 結果已保存: {args.results}")
+
+    if args.update_baseline:
+        results['tolerance'] = args.tolerance if args.tolerance is not None else 0.5
+        with open(BASELINE_PATH, 'w', encoding='utf-8') as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+        print(f"📌 基準值已更新: {BASELINE_PATH}")
+
+    if args.check:
+        if not os.path.exists(BASELINE_PATH):
+            print(f"❌ 找不到基準值: {BASELINE_PATH}")
+            sys.exit(1)
+        with open(BASELINE_PATH, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        tolerance = args.tolerance if args.tolerance is not None else baseline.get('tolerance', 0.5)
+        problems = check_regressions(results, baseline, tolerance, args.slack)
+        if problems:
+            print("\n❌ 啟動時間檢查失敗:")
+            for problem in problems:
+                print(f"   - {problem}")
+            sys.exit(1)
+        print(f"\n✅ 啟動時間未退步超過 {tolerance:.0%}，且未提前載入重量級模組")
+
+
+if __name__ == "__main__":
+    main()
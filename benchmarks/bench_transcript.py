@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+逐字稿格式基準測試
+
+比較 transcript.json 與欄式逐字稿 (transcript.ptc) 的文件大小、完整載入時間、
+隨機讀取單一片段與只讀取時間欄位（計算總時長）的耗時。
+
+使用方法:
+python -m benchmarks.bench_transcript                       # 預設片段數 100,1000,10000
+python -m benchmarks.bench_transcript --sizes 1000,50000 --repeat 5
+"""
+
+import argparse
+import json
+import os
+import random
+import tempfile
+import time
+from typing import Callable, Dict, List
+
+from benchmarks.synthetic import generate_dialogue
+from transcript_store import FLAG_NAMES, TranscriptStore, format_timestamp, parse_timestamp, write_transcript_store
+
+RANDOM_READS = 100
+
+
+def build_transcript(segment_count: int) -> Dict:
+    """以合成對話產生 transcript.json 格式的逐字稿"""
+    entries = []
+    for i, segment in enumerate(generate_dialogue(segment_count)):
+        text = segment['text']
+        entries.append({
+            'start_time': format_timestamp(segment['start']),
+            'end_time': format_timestamp(segment['end']),
+            'speaker': 'host' if i % 2 == 0 else 'guest',
+            'original_text': text,
+            'translated_text': f"（譯文）{text}",
+            'dialogue_type': {
+                'is_question': text.endswith('?'),
+                'is_response': i % 2 == 1,
+                'is_transition': text.startswith(('Speaking of', 'By the way', 'Another'))
+            }
+        })
+    return {'timestamp': '2024-01-01T00:00:00', 'total_segments': len(entries), 'segments': entries}
+
+
+def best_of(repeat: int, func: Callable) -> float:
+    """執行 repeat 次，返回最短耗時（毫秒）"""
+    timings = []
+    for _ in range(repeat):
+        started_at = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - started_at)
+    return round(min(timings) * 1000, 3)
+
+
+def bench_size(segment_count: int, work_dir: str, repeat: int) -> Dict:
+    transcript = build_transcript(segment_count)
+    json_path = os.path.join(work_dir, f'transcript_{segment_count}.json')
+    store_path = os.path.join(work_dir, f'transcript_{segment_count}.ptc')
+    with open(json_path, 'w', encoding='utf-8') as f:
+        json.dump(transcript, f, ensure_ascii=False, indent=2)
+    write_transcript_store(transcript, store_path)
+
+    rng = random.Random(0)
+    indexes = [rng.randrange(segment_count) for _ in range(RANDOM_READS)]
+
+    def json_load():
+        with open(json_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def store_load():
+        with TranscriptStore(store_path) as store:
+            return store.to_transcript()
+
+    def json_random():
+        segments = json_load()['segments']
+        return [segments[i]['translated_text'] for i in indexes]
+
+    def store_random():
+        with TranscriptStore(store_path) as store:
+            return [store.translated_text(i) for i in indexes]
+
+    def json_duration():
+        return sum(parse_timestamp(entry['end_time']) - parse_timestamp(entry['start_time'])
+                   for entry in json_load()['segments'])
+
+    def store_duration():
+        with TranscriptStore(store_path) as store:
+            return store.total_duration()
+
+    def json_flags():
+        return sum(entry['dialogue_type']['is_question'] for entry in json_load()['segments'])
+
+    def store_flags():
+        with TranscriptStore(store_path) as store:
+            return sum(store.flag(FLAG_NAMES[0], i) for i in range(len(store)))
+
+    # 轉換必須無損
+    if store_load() != json_load():
+        raise AssertionError(f"{segment_count} 個片段的欄式逐字稿與 JSON 內容不一致")
+
+    return {
+        'segments': segment_count,
+        'bytes': {'json': os.path.getsize(json_path), 'store': os.path.getsize(store_path)},
+        'full_load_ms': {'json': best_of(repeat, json_load), 'store': best_of(repeat, store_load)},
+        'random_read_ms': {'json': best_of(repeat, json_random), 'store': best_of(repeat, store_random)},
+        'duration_scan_ms': {'json': best_of(repeat, json_duration), 'store': best_of(repeat, store_duration)},
+        'flag_scan_ms': {'json': best_of(repeat, json_flags), 'store': best_of(repeat, store_flags)},
+    }
+
+
+def print_report(results: List[Dict]):
+    print(f"\n📄 逐字稿格式比較（JSON → 欄式，隨機讀取 {RANDOM_READS} 段）")
+    print(f"   {'片段數':>8} {'項目':<14} {'JSON':>12} {'欄式':>12} {'倍數':>8}")
+    labels = [
+        ('bytes', '文件大小(B)'),
+        ('full_load_ms', '完整載入(ms)'),
+        ('random_read_ms', '隨機讀取(ms)'),
+        ('duration_scan_ms', '總時長(ms)'),
+        ('flag_scan_ms', '旗標掃描(ms)'),
+    ]
+    for result in results:
+        for key, label in labels:
+            values = result[key]
+            ratio = values['json'] / values['store'] if values['store'] else float('inf')
+            print(f"   {result['segments']:>8} {label:<14} {values['json']:>12,} {values['store']:>12,} {ratio:>7.1f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="逐字稿格式基準測試")
+    parser.add_argument('--sizes', default='100,1000,10000', help='要測試的片段數，以逗號分隔 (預設: 100,1000,10000)')
+    parser.add_argument('--repeat', type=int, default=5, help='每項量測重複次數，取最短耗時 (預設: 5)')
+    parser.add_argument('--results', help='將結果寫入 JSON 文件')
+    args = parser.parse_args()
+
+    sizes = [int(size) for size in args.sizes.split(',') if size.strip()]
+    with tempfile.TemporaryDirectory(prefix='podcast_transcript_bench_') as work_dir:
+        results = [bench_size(size, work_dir, args.repeat) for size in sizes]
+
+    print_report(results)
+
+    if args.results:
+        with open(args.results, 'w', encoding='utf-8') as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+        print(f"\n📄 結果已保存: {args.results}")
+
+
+if __name__ == "__main__":
+    main()
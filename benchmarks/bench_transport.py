@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+共用 HTTP 連線池基準測試
+
+對本地 HTTPS 模擬服務（自簽憑證）送出翻譯請求，比較 deep_translator 原本的做法
+（每次 requests.get，各自建立連線與 TLS 握手）與 HttpTransport 共用連線池的
+吞吐量及伺服器端實際接受的連線數。安裝 httpx 時一併量測 OpenAI 使用的 httpx 客戶端。
+
+使用方法:
+python -m benchmarks.bench_transport                  # 預設 500 個請求
+python -m benchmarks.bench_transport --requests 2000 --threads 4
+"""
+
+import argparse
+import importlib.util
+import json
+import ssl
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict
+
+from benchmarks.https_stub import LocalHTTPSServer, openssl_available
+from http_transport import HttpTransport
+from log_manager import setup_logging
+from runtime_config import NetworkConfig
+
+
+def measure(server: LocalHTTPSServer, request_count: int, threads: int, send: Callable[[int], None]) -> Dict:
+    connections_before = server.connections
+    started_at = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        list(executor.map(send, range(request_count)))
+    seconds = time.perf_counter() - started_at
+    return {
+        'seconds': round(seconds, 3),
+        'requests_per_sec': round(request_count / seconds, 1),
+        'server_connections': server.connections - connections_before
+    }
+
+
+def run(request_count: int, threads: int) -> Dict:
+    import requests
+
+    results = {'requests': request_count, 'threads': threads}
+    network = NetworkConfig(pool_maxsize=max(threads, 1))
+    with LocalHTTPSServer() as server:
+        url = f"{server.url}/m"
+
+        def per_call(i: int):
+            session = requests.Session()
+            session.trust_env = False
+            with session:
+                session.get(url, params={'q': f'segment {i}'}, verify=server.cert_path).raise_for_status()
+
+        transport = HttpTransport(network)
+        transport.session.verify = server.cert_path
+        transport.session.trust_env = False
+        translator = transport.google_translator('en', 'zh-TW')
+        translator._base_url = url
+
+        results['per_call_requests'] = measure(server, request_count, threads, per_call)
+        results['pooled_translator'] = measure(server, request_count, threads,
+                                               lambda i: translator.translate(f'segment {i}'))
+
+        if importlib.util.find_spec('httpx') is not None:
+            import httpx
+            context = ssl.create_default_context(cafile=server.cert_path)
+
+            def per_call_httpx(i: int):
+                with httpx.Client(verify=context, trust_env=False) as client:
+                    client.post(f"{server.url}/v1/chat", json={'i': i}).raise_for_status()
+
+            class StubClient(httpx.Client):
+                def __init__(self, **kwargs):
+                    super().__init__(verify=context, trust_env=False, **kwargs)
+
+            client = transport.httpx_client(StubClient)
+            results['per_call_httpx'] = measure(server, request_count, threads, per_call_httpx)
+            results['pooled_httpx'] = measure(server, request_count, threads,
+                                              lambda i: client.post(f"{server.url}/v1/chat", json={'i': i}))
+        results['transport_stats'] = transport.stats()
+        transport.close()
+    return results
+
+
+def print_report(results: Dict):
+    print(f"\n🔌 HTTPS 請求: {results['requests']:,} 個，{results['threads']} 個執行緒（本地自簽憑證服務）")
+    print(f"   {'方式':<28} {'耗時(s)':>10} {'請求/秒':>10} {'伺服器連線數':>12}")
+    for name, label in (('per_call_requests', 'requests.get（每次新連線）'),
+                        ('pooled_translator', 'HttpTransport Google 翻譯'),
+                        ('per_call_httpx', 'httpx（每次新客戶端）'),
+                        ('pooled_httpx', 'HttpTransport httpx')):
+        if name in results:
+            item = results[name]
+            print(f"   {label:<28} {item['seconds']:>10} {item['requests_per_sec']:>10,.1f} "
+                  f"{item['server_connections']:>12}")
+    for client, counts in results['transport_stats'].items():
+        print(f"   {client}: {counts['requests']} 請求，新建 {counts['connections']} 條連線，重用 {counts['reused']} 次")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="共用 HTTP 連線池基準測試")
+    parser.add_argument('--requests', type=int, default=500, help='請求數 (預設: 500)')
+    parser.add_argument('--threads', type=int, default=1, help='並發執行緒數 (預設: 1)')
+    parser.add_argument('--results', help='將結果寫入 JSON 文件')
+    args = parser.parse_args()
+
+    if not openssl_available():
+        print("❌ 需要 openssl 指令產生本地服務的自簽憑證")
+        sys.exit(1)
+
+    setup_logging('WARNING')
+    results = run(args.requests, args.threads)
+    print_report(results)
+
+    if args.results:
+        with open(args.results, 'w', encoding='utf-8') as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+        print(f"\n📄 結果已保存: {args.results}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Edge TTS 連線池基準測試
+
+對本地 websocket 模擬服務合成大量短句，比較每段各自建立連線（與 edge_tts.Communicate 相同）
+與 TTSSessionPool 重用長駐連線的總耗時，並拆分連線建立與合成的時間。
+連線建立延遲以 --handshake-ms 模擬（實際 Edge 服務的 TLS 與 websocket 升級約 100–300 ms）。
+
+使用方法:
+python -m benchmarks.bench_tts_session                       # 預設 200 段，並發 4
+python -m benchmarks.bench_tts_session --clips 500 --concurrency 6 --handshake-ms 150
+"""
+
+import argparse
+import asyncio
+import json
+import time
+from typing import Dict
+
+from benchmarks.edge_stub import LocalEdgeServer
+from log_manager import setup_logging
+from tts_session import TTSSessionPool
+
+VOICES = ('zh-TW-HsiaoChenNeural', 'zh-TW-YunJheNeural')
+
+
+async def synthesize_all(pool_factory, clip_count: int, concurrency: int, close_each: bool = False) -> Dict:
+    """以 concurrency 個並發請求合成 clip_count 段；pool_factory 每次呼叫返回要使用的連線池，
+    close_each 時每段合成後立即關閉連線（與 edge_tts.Communicate 相同）"""
+    limit = asyncio.Semaphore(concurrency)
+    pools = []
+
+    async def one(index: int):
+        async with limit:
+            pool = pool_factory()
+            pools.append(pool)
+            await pool.synthesize(f"這是第 {index} 段的中文語音。", VOICES[index % 2], '+0%', '+0Hz')
+            if close_each:
+                await pool.close()
+
+    started_at = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(clip_count)))
+    seconds = time.perf_counter() - started_at
+
+    totals = {'connections': 0, 'requests': 0, 'connect_seconds': 0.0, 'synthesis_seconds': 0.0}
+    for pool in {id(pool): pool for pool in pools}.values():
+        stats = pool.stats()
+        for key in totals:
+            totals[key] += stats[key]
+        await pool.close()
+    return {
+        'seconds': round(seconds, 3),
+        'clips_per_sec': round(clip_count / seconds, 1),
+        'connections': totals['connections'],
+        'connect_seconds': round(totals['connect_seconds'], 3),
+        'synthesis_seconds': round(totals['synthesis_seconds'], 3)
+    }
+
+
+async def run(clip_count: int, concurrency: int, handshake_ms: float, synthesis_ms: float) -> Dict:
+    async with LocalEdgeServer(handshake_ms=handshake_ms, synthesis_ms=synthesis_ms) as server:
+        per_clip = await synthesize_all(lambda: TTSSessionPool(1, url=server.url), clip_count, concurrency,
+                                        close_each=True)
+        shared = TTSSessionPool(concurrency, url=server.url)
+        pooled = await synthesize_all(lambda: shared, clip_count, concurrency)
+    return {
+        'clips': clip_count,
+        'concurrency': concurrency,
+        'handshake_ms': handshake_ms,
+        'synthesis_ms': synthesis_ms,
+        'per_clip_connection': per_clip,
+        'session_pool': pooled
+    }
+
+
+def print_report(results: Dict):
+    print(f"\n🎤 語音合成: {results['clips']} 段，並發 {results['concurrency']}"
+          f"（模擬連線建立 {results['handshake_ms']:.0f} ms、合成 {results['synthesis_ms']:.0f} ms）")
+    print(f"   {'方式':<20} {'耗時(s)':>9} {'段/秒':>8} {'連線數':>7} {'連線建立(s)':>12} {'合成(s)':>9}")
+    baseline = results['per_clip_connection']['seconds']
+    for name, label in (('per_clip_connection', '每段各自連線'), ('session_pool', 'TTSSessionPool')):
+        item = results[name]
+        print(f"   {label:<20} {item['seconds']:>9} {item['clips_per_sec']:>8} {item['connections']:>7} "
+              f"{item['connect_seconds']:>12} {item['synthesis_seconds']:>9}")
+    print(f"   加速: {baseline / results['session_pool']['seconds']:.2f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Edge TTS 連線池基準測試")
+    parser.add_argument('--clips', type=int, default=200, help='片段數 (預設: 200)')
+    parser.add_argument('--concurrency', type=int, default=4, help='並發請求數 (預設: 4)')
+    parser.add_argument('--handshake-ms', type=float, default=120.0, help='模擬的連線建立延遲 (預設: 120)')
+    parser.add_argument('--synthesis-ms', type=float, default=60.0, help='模擬的每段合成延遲 (預設: 60)')
+    parser.add_argument('--results', help='將結果寫入 JSON 文件')
+    args = parser.parse_args()
+
+    setup_logging('WARNING')
+    results = asyncio.run(run(args.clips, args.concurrency, args.handshake_ms, args.synthesis_ms))
+    print_report(results)
+
+    if args.results:
+        with open(args.results, 'w', encoding='utf-8') as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+        print(f"\n📄 結果已保存: {args.results}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+本地 Edge TTS websocket 模擬服務 - 以與 Edge 朗讀服務相同的訊息格式回應合成請求
+
+每條連線先接收 speech.config，之後每個 ssml 請求回覆 turn.start、一段音頻（二進位訊息）
+與 turn.end，並帶回相同的 X-RequestId。handshake_ms 模擬連線建立（TLS 與升級）的延遲，
+drop_after 讓每條連線在處理指定數量的請求後斷線，用來驗證重新連線。
+"""
+
+import asyncio
+import re
+from typing import Optional
+from xml.sax.saxutils import unescape
+
+from aiohttp import WSMsgType, web
+
+from tts_session import parse_text_message
+
+_TEXT = re.compile(r"<prosody[^>]*>(.*)</prosody>", re.S)
+
+
+def _text_message(request_id: str, path: str, body: str = '') -> str:
+    return f"X-RequestId:{request_id}\r\nContent-Type:application/json; charset=utf-8\r\nPath:{path}\r\n\r\n{body}"
+
+
+def _audio_message(request_id: str, data: bytes) -> bytes:
+    headers = f"X-RequestId:{request_id}\r\nContent-Type:audio/mpeg\r\nPath:audio\r\n".encode()
+    return len(headers).to_bytes(2, 'big') + headers + data
+
+
+def stub_audio(text: str) -> bytes:
+    """模擬服務對一段文字回傳的音頻內容"""
+    return b'MP3:' + text.encode('utf-8')
+
+
+class LocalEdgeServer:
+    """在目前事件迴圈中執行的模擬服務；以 async with 使用"""
+
+    def __init__(self, handshake_ms: float = 0.0, synthesis_ms: float = 0.0, drop_after: Optional[int] = None):
+        self.handshake_ms = handshake_ms
+        self.synthesis_ms = synthesis_ms
+        self.drop_after = drop_after
+        self.connections = 0
+        self.requests = 0
+        self._runner = None
+        self.url = None
+
+    async def _handle(self, request: web.Request) -> web.WebSocketResponse:
+        await asyncio.sleep(self.handshake_ms / 1000)
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        self.connections += 1
+        served = 0
+        async for message in ws:
+            if message.type != WSMsgType.TEXT:
+                continue
+            headers, body = parse_text_message(message.data)
+            if headers.get(b'Path') != b'ssml':
+                continue
+            if self.drop_after is not None and served >= self.drop_after:
+                await ws.close()
+                break
+            request_id = headers[b'X-RequestId'].decode()
+            match = _TEXT.search(body.decode('utf-8'))
+            await ws.send_str(_text_message(request_id, 'turn.start'))
+            await asyncio.sleep(self.synthesis_ms / 1000)
+            await ws.send_bytes(_audio_message(request_id, stub_audio(unescape(match.group(1)) if match else '')))
+            await ws.send_bytes(_audio_message(request_id, b''))
+            await ws.send_str(_text_message(request_id, 'turn.end'))
+            served += 1
+            self.requests += 1
+        return ws
+
+    async def __aenter__(self) -> 'LocalEdgeServer':
+        app = web.Application()
+        app.router.add_get('/', self._handle)
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, '127.0.0.1', 0)
+        await site.start()
+        host, port = self._runner.addresses[0][:2]
+        self.url = f"ws://{host}:{port}/"
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self._runner.cleanup()
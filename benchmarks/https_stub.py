@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+本地 HTTPS 模擬服務 - 以自簽憑證在 127.0.0.1 上回應翻譯與 JSON 請求，
+並統計伺服器端接受的 TLS 連線數，用來驗證客戶端是否重用連線
+
+GET  /m?q=...   回傳與 Google 翻譯行動版相同結構的 HTML（<div class="result-container">）
+POST 其他路徑   回傳 {"ok": true}
+"""
+
+import html
+import json
+import os
+import shutil
+import ssl
+import subprocess
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+
+def openssl_available() -> bool:
+    return shutil.which('openssl') is not None
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+
+    def setup(self):
+        super().setup()
+        with self.server.lock:
+            self.server.connections += 1
+
+    def _reply(self, body: bytes, content_type: str):
+        with self.server.lock:
+            self.server.requests += 1
+        self.send_response(200)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        text = parse_qs(urlparse(self.path).query).get('q', [''])[0]
+        body = f'<html><body><div class="result-container">譯:{html.escape(text)}</div></body></html>'
+        self._reply(body.encode('utf-8'), 'text/html; charset=utf-8')
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get('Content-Length') or 0))
+        self._reply(json.dumps({'ok': True}).encode('utf-8'), 'application/json')
+
+    def log_message(self, format, *args):
+        pass
+
+
+class LocalHTTPSServer:
+    """在背景執行緒執行的本地 HTTPS 伺服器；以 with 陳述式使用"""
+
+    def __init__(self):
+        self._dir = tempfile.mkdtemp(prefix='https_stub_')
+        self.cert_path = os.path.join(self._dir, 'cert.pem')
+        key_path = os.path.join(self._dir, 'key.pem')
+        subprocess.run(
+            ['openssl', 'req', '-x509', '-newkey', 'rsa:2048', '-nodes', '-days', '1',
+             '-keyout', key_path, '-out', self.cert_path, '-subj', '/CN=localhost',
+             '-addext', 'subjectAltName=DNS:localhost,IP:127.0.0.1'],
+            check=True, capture_output=True
+        )
+        context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+        context.load_cert_chain(self.cert_path, key_path)
+
+        self._server = ThreadingHTTPServer(('127.0.0.1', 0), _Handler)
+        self._server.daemon_threads = True
+        self._server.socket = context.wrap_socket(self._server.socket, server_side=True)
+        self._server.lock = threading.Lock()
+        self._server.connections = 0
+        self._server.requests = 0
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        return f"https://localhost:{self._server.server_address[1]}"
+
+    @property
+    def connections(self) -> int:
+        return self._server.connections
+
+    @property
+    def requests(self) -> int:
+        return self._server.requests
+
+    def __enter__(self) -> 'LocalHTTPSServer':
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._server.shutdown()
+        self._server.server_close()
+        shutil.rmtree(self._dir, ignore_errors=True)
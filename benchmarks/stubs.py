@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+本地模擬服務 - 以注入延遲的假 Whisper / 翻譯 / TTS 取代外部 API
+延遲參數取自實際 API 的典型數值，可用 scale 整體縮放
+"""
+
+import asyncio
+import random
+import time
+import wave
+from types import SimpleNamespace
+
+from audio_processor import AudioProcessor
+from benchmarks.synthetic import audio_duration, generate_dialogue
+
+
+class StubLatency:
+    """模擬服務的延遲設定"""
+
+    def __init__(self, whisper_rtf: float = 0.01, translation_ms: float = 40.0,
+                 tts_ms: float = 60.0, tts_ms_per_char: float = 1.5,
+                 jitter: float = 0.2, scale: float = 1.0, seed: int = 0):
+        self.whisper_rtf = whisper_rtf            # 每秒音頻的轉錄耗時（秒）
+        self.translation_ms = translation_ms      # 每次翻譯呼叫的耗時
+        self.tts_ms = tts_ms                      # 每次語音合成的固定耗時
+        self.tts_ms_per_char = tts_ms_per_char    # 語音合成依文字長度增加的耗時
+        self.jitter = jitter                      # 隨機抖動比例
+        self.scale = scale
+        self._rng = random.Random(seed)
+
+    def delay(self, seconds: float) -> float:
+        """套用縮放與抖動後的延遲秒數"""
+        factor = 1.0 + self._rng.uniform(-self.jitter, self.jitter)
+        return max(0.0, seconds * factor * self.scale)
+
+
+class _StubTranscriptions:
+    def __init__(self, latency: StubLatency, seconds_per_segment: float):
+        self.latency = latency
+        self.seconds_per_segment = seconds_per_segment
+
+    def create(self, model, file, response_format=None, timestamp_granularities=None, **kwargs):
+        duration = audio_duration(file.name)
+        time.sleep(self.latency.delay(duration * self.latency.whisper_rtf))
+        segment_count = max(1, int(duration / self.seconds_per_segment))
+        segments = generate_dialogue(segment_count, self.seconds_per_segment)
+        return SimpleNamespace(
+            text=' '.join(seg['text'] for seg in segments),
+            segments=segments,
+            language='en'
+        )
+
+
+class _StubCompletions:
+    def __init__(self, latency: StubLatency):
+        self.latency = latency
+
+    def create(self, model, messages, **kwargs):
+        time.sleep(self.latency.delay(self.latency.translation_ms / 1000))
+        source = messages[-1]['content'].rsplit('\n\n', 1)[-1]
+        # 譯文長度大致與原文成比例，並帶有逗號以觸發後處理規則
+        content = '這是模擬的翻譯內容，' * (len(source) // 40 + 1) + '結束。'
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+
+
+class StubOpenAIClient:
+    """模擬 OpenAI 客戶端（Whisper 轉錄與對話翻譯）"""
+
+    def __init__(self, latency: StubLatency, seconds_per_segment: float = 1.5):
+        self.audio = SimpleNamespace(transcriptions=_StubTranscriptions(latency, seconds_per_segment))
+        self.chat = SimpleNamespace(completions=_StubCompletions(latency))
+
+
+class StubAudioProcessor(AudioProcessor):
+    """使用模擬服務的音頻處理器"""
+
+    def __init__(self, latency: StubLatency = None, seconds_per_segment: float = 1.5, metrics=None, config=None):
+        super().__init__(metrics=metrics, config=config)
+        self.latency = latency or StubLatency()
+        self.openai_client = StubOpenAIClient(self.latency, seconds_per_segment)
+        self.translation_provider = 'openai'
+
+    async def _synthesize_to_file(self, text: str, voice: str, output_file: str,
+                                  rate: str = None, pitch: str = None, markup: str = None):
+        """模擬 Edge TTS：等待注入的延遲後寫出與文字長度相符的 WAV"""
+        with self.metrics.provider_call('stub_edge', 'tts'):
+            await asyncio.sleep(self.latency.delay(
+                (self.latency.tts_ms + self.latency.tts_ms_per_char * len(text)) / 1000))
+            frame_rate = 16000
+            frames = int(frame_rate * min(8.0, 0.15 * len(text) / 3))
+            with wave.open(output_file, 'wb') as wav:
+                wav.setnchannels(1)
+                wav.setsampwidth(2)
+                wav.setframerate(frame_rate)
+                wav.writeframes(b'\x00\x00' * frames)
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+對話特徵規則引擎 - 以單字邊界比對問句、回應與轉場關鍵詞
+
+每段文字只轉小寫並切詞一次，關鍵詞與片語預先編譯為集合與查詢表，
+一次比對即得到全部對話旗標（位元遮罩）。批次分析時整批文字一起正規化，
+"so" 不再誤判 "also"，"who" 也不再誤判 "whole"。
+"""
+
+import string
+from typing import Dict, Iterable, List, Tuple
+
+from runtime_config import DialogueRulesConfig
+
+QUESTION = 1
+RESPONSE = 2
+TRANSITION = 4
+FLAG_BITS = {'is_question': QUESTION, 'is_response': RESPONSE, 'is_transition': TRANSITION}
+
+# 標點一律視為分隔符（撇號也是："what's" 切為 what / s）
+_SEPARATORS = string.punctuation + '’‘“”—–…\n\r\t'
+# 批次正規化時用來串接各段文字的分隔字元，批次表不轉換它，逐段表則視為空白
+_BATCH_SEPARATOR = '\x00'
+_NORMALIZE_BATCH = str.maketrans({char: ' ' for char in _SEPARATORS})
+_NORMALIZE = str.maketrans({char: ' ' for char in _SEPARATORS + _BATCH_SEPARATOR})
+
+
+def tokenize(text: str) -> List[str]:
+    """轉小寫並以空白與標點切詞"""
+    return text.lower().translate(_NORMALIZE).split()
+
+
+class DialogueRules:
+    """預先編譯的對話特徵規則"""
+
+    def __init__(self, question_words: Iterable[str], response_words: Iterable[str],
+                 transition_words: Iterable[str], question_marks: Iterable[str] = ('?',)):
+        self.question_marks = tuple(question_marks)
+        # 單字 → 遮罩；片語以第一個字索引，比對時再檢查整個片語
+        self._word_masks: Dict[str, int] = {}
+        self._phrases: Dict[str, List[Tuple[str, int]]] = {}
+        for mask, keywords in ((QUESTION, question_words), (RESPONSE, response_words),
+                               (TRANSITION, transition_words)):
+            for keyword in keywords:
+                tokens = tokenize(keyword)
+                if len(tokens) == 1:
+                    self._word_masks[tokens[0]] = self._word_masks.get(tokens[0], 0) | mask
+                elif tokens:
+                    self._phrases.setdefault(tokens[0], []).append((f" {' '.join(tokens)} ", mask))
+        self._keys = frozenset(self._word_masks) | frozenset(self._phrases)
+
+    @classmethod
+    def from_config(cls, rules: DialogueRulesConfig = None) -> 'DialogueRules':
+        rules = rules or DialogueRulesConfig()
+        return cls(rules.question_words, rules.response_words, rules.transition_words, rules.question_marks)
+
+    def _match(self, tokens: List[str]) -> int:
+        hits = self._keys.intersection(tokens)
+        mask = 0
+        joined = None
+        for token in hits:
+            mask |= self._word_masks.get(token, 0)
+            phrases = self._phrases.get(token)
+            if phrases:
+                if joined is None:
+                    joined = f" {' '.join(tokens)} "
+                for phrase, phrase_mask in phrases:
+                    if phrase in joined:
+                        mask |= phrase_mask
+        return mask
+
+    def analyze(self, text: str) -> int:
+        """返回單段文字的旗標遮罩"""
+        mask = QUESTION if text.rstrip().endswith(self.question_marks) else 0
+        tokens = text.lower().translate(_NORMALIZE).split()
+        if not self._keys.isdisjoint(tokens):
+            mask |= self._match(tokens)
+        return mask
+
+    def analyze_batch(self, texts: List[str]) -> List[int]:
+        """一次正規化整批文字並返回每段的旗標遮罩"""
+        texts = list(texts)
+        lines = _BATCH_SEPARATOR.join(texts).lower().translate(_NORMALIZE_BATCH).split(_BATCH_SEPARATOR)
+        if len(lines) != len(texts):
+            # 文字本身含有分隔字元時逐段處理
+            return [self.analyze(text) for text in texts]
+
+        marks = self.question_marks
+        isdisjoint = self._keys.isdisjoint
+        match = self._match
+        masks = []
+        for text, line in zip(texts, lines):
+            mask = QUESTION if text.rstrip().endswith(marks) else 0
+            tokens = line.split()
+            if not isdisjoint(tokens):
+                mask |= match(tokens)
+            masks.append(mask)
+        return masks
+
+    @staticmethod
+    def flags(mask: int) -> Dict[str, bool]:
+        return {name: bool(mask & bit) for name, bit in FLAG_BITS.items()}
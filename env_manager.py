@@ -24,6 +24,7 @@ class EnvManager:
             'DEFAULT_LANGUAGE': 'zh-tw',
             'DEFAULT_TTS_PROVIDER': 'edge',
             'WHISPER_MODEL': 'base',
+            'TRANSCRIPTION_BACKEND': 'openai',
             
             # 目錄設定
             'TEMP_DIR': './temp',
@@ -193,7 +194,7 @@ class EnvManager:
         print("=" * 50)
         
         print("\n🔧 基本設定:")
-        for key in ['LOG_LEVEL', 'DEFAULT_LANGUAGE', 'DEFAULT_TTS_PROVIDER', 'WHISPER_MODEL']:
+        for key in ['LOG_LEVEL', 'DEFAULT_LANGUAGE', 'DEFAULT_TTS_PROVIDER', 'WHISPER_MODEL', 'TRANSCRIPTION_BACKEND']:
             value = os.environ.get(key, 'Not Set')
             print(f"  {key}: {value}")
         
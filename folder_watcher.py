@@ -0,0 +1,250 @@
+#!/usr/bin/env python3
+"""
+資料夾監看 - 偵測輸入目錄中新放入且已寫入完成的音頻文件
+
+Linux 上以 inotify（透過 ctypes，不需額外套件）接收事件，其他平台或 inotify
+無法使用時改為定期掃描。無論哪種方式，文件的大小與修改時間在 stable_seconds
+內維持不變才視為寫入完成，避免處理仍在複製中的文件。
+"""
+
+import asyncio
+import ctypes
+import ctypes.util
+import logging
+import os
+import struct
+import sys
+import time
+from typing import AsyncIterator, Dict, Iterable, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# inotify 事件旗標（<sys/inotify.h>）
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ISDIR = 0x40000000
+
+# 寫入過程中的大小變化由定期 stat 檢查，不監看 IN_MODIFY 以免大量事件；
+# 刪除與移出的事件用來清除已產生文件的記錄
+WATCH_MASK = IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE | IN_DELETE | IN_MOVED_FROM
+
+_EVENT_HEADER = struct.Struct('iIII')
+
+
+class InotifySource:
+    """以 inotify 監看目錄（含子目錄），事件只用來提示哪些文件需要檢查"""
+
+    def __init__(self, root: str):
+        libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+        self._add_watch = libc.inotify_add_watch
+        self._add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+        self.fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            error = ctypes.get_errno()
+            raise OSError(error, os.strerror(error))
+        self._dirs: Dict[int, str] = {}
+        self.overflowed = False
+        try:
+            for directory, _, _ in os.walk(root):
+                self.add_directory(directory)
+        except OSError:
+            os.close(self.fd)
+            raise
+
+    def add_directory(self, directory: str):
+        wd = self._add_watch(self.fd, os.fsencode(directory), WATCH_MASK)
+        if wd < 0:
+            error = ctypes.get_errno()
+            raise OSError(error, f"inotify_add_watch 失敗 ({directory}): {os.strerror(error)}")
+        self._dirs[wd] = directory
+
+    def read_paths(self) -> Iterable[str]:
+        """讀取目前所有待處理的事件，返回有變動的文件路徑"""
+        paths = []
+        while True:
+            try:
+                data = os.read(self.fd, 64 * 1024)
+            except BlockingIOError:
+                break
+            offset = 0
+            while offset < len(data):
+                wd, mask, _, length = _EVENT_HEADER.unpack_from(data, offset)
+                offset += _EVENT_HEADER.size
+                name = os.fsdecode(data[offset:offset + length].rstrip(b'\0'))
+                offset += length
+                if mask & IN_Q_OVERFLOW:
+                    # 事件佇列溢位，呼叫端需重新掃描整個目錄
+                    self.overflowed = True
+                    continue
+                if mask & IN_IGNORED:
+                    self._dirs.pop(wd, None)
+                    continue
+                directory = self._dirs.get(wd)
+                if directory is None or not name:
+                    continue
+                path = os.path.join(directory, name)
+                if mask & IN_ISDIR:
+                    if mask & (IN_CREATE | IN_MOVED_TO):
+                        try:
+                            self.add_directory(path)
+                        except OSError as e:
+                            logger.warning(f"⚠️  無法監看新目錄: {e}")
+                        # 目錄在加入監看前可能已有文件
+                        for sub_dir, _, files in os.walk(path):
+                            paths.extend(os.path.join(sub_dir, file) for file in files)
+                    elif mask & IN_MOVED_FROM:
+                        # 整個目錄被移出時不會收到其中文件的事件，由呼叫端重新掃描
+                        self.overflowed = True
+                    continue
+                paths.append(path)
+        return paths
+
+    def close(self):
+        if self.fd >= 0:
+            os.close(self.fd)
+            self.fd = -1
+
+
+class FolderWatcher:
+    """持續產生輸入目錄中已寫入完成的音頻文件
+
+    每個文件以 (路徑, 首次發現時間) 的形式產生一次；之後若內容被替換
+    （大小或修改時間改變）會在再次穩定後重新產生。
+    """
+
+    def __init__(self, input_dir: str, extensions: Iterable[str] = ('wav',),
+                 stable_seconds: float = 2.0, poll_interval: float = 1.0, use_inotify: bool = True):
+        self.input_dir = input_dir
+        self.extensions = tuple(f".{ext.lower().lstrip('.')}" for ext in extensions)
+        self.stable_seconds = stable_seconds
+        self.poll_interval = poll_interval
+        self.use_inotify = use_inotify
+        self.mode = None
+        # 路徑 -> (大小, 修改時間, 最近一次變動的時間, 首次發現時間)
+        self._candidates: Dict[str, Tuple[int, float, float, float]] = {}
+        # 已產生的文件及當時的 (大小, 修改時間)
+        self._emitted: Dict[str, Tuple[int, float]] = {}
+        self._source: Optional[InotifySource] = None
+        self._wakeup: Optional[asyncio.Event] = None
+
+    def _matches(self, path: str) -> bool:
+        name = os.path.basename(path)
+        return name.lower().endswith(self.extensions) and not name.startswith('.')
+
+    def _scan(self) -> Iterable[str]:
+        """遞迴列出目錄中符合副檔名的文件"""
+        stack = [self.input_dir]
+        while stack:
+            directory = stack.pop()
+            try:
+                with os.scandir(directory) as entries:
+                    for entry in entries:
+                        if entry.is_dir(follow_symlinks=False):
+                            stack.append(entry.path)
+                        elif self._matches(entry.path):
+                            yield entry.path
+            except FileNotFoundError:
+                continue
+
+    def _touch(self, path: str, now: float):
+        """記錄文件目前的狀態；大小或修改時間改變時重新計算穩定時間"""
+        if not self._matches(path):
+            return
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            self._candidates.pop(path, None)
+            self._emitted.pop(path, None)
+            return
+        fingerprint = (stat.st_size, stat.st_mtime)
+        if self._emitted.get(path) == fingerprint:
+            return
+        previous = self._candidates.get(path)
+        if previous is None:
+            self._candidates[path] = (*fingerprint, now, now)
+        elif previous[:2] != fingerprint:
+            self._candidates[path] = (*fingerprint, now, previous[3])
+
+    def _rescan(self, now: float):
+        """掃描整個目錄，並清除已不存在的文件的記錄，長時間監看時記錄不會無限增加"""
+        present = set()
+        for path in self._scan():
+            present.add(path)
+            self._touch(path, now)
+        for path in [path for path in self._emitted if path not in present]:
+            del self._emitted[path]
+
+    def _ready(self, now: float) -> Iterable[Tuple[str, float]]:
+        """檢查候選文件，返回已穩定 stable_seconds 的文件"""
+        ready = []
+        for path in list(self._candidates):
+            self._touch(path, now)
+            candidate = self._candidates.get(path)
+            if candidate is None:
+                continue
+            size, mtime, changed_at, first_seen = candidate
+            if size > 0 and now - changed_at >= self.stable_seconds:
+                del self._candidates[path]
+                self._emitted[path] = (size, mtime)
+                ready.append((path, first_seen))
+        return sorted(ready, key=lambda item: item[1])
+
+    def _start(self):
+        loop = asyncio.get_running_loop()
+        self._wakeup = asyncio.Event()
+        self.mode = 'polling'
+        if self.use_inotify and sys.platform.startswith('linux'):
+            try:
+                self._source = InotifySource(self.input_dir)
+                loop.add_reader(self._source.fd, self._wakeup.set)
+                self.mode = 'inotify'
+            except (OSError, AttributeError) as e:
+                logger.warning(f"⚠️  無法使用 inotify，改為定期掃描: {e}")
+                self._source = None
+        now = time.time()
+        for path in self._scan():
+            self._touch(path, now)
+        logger.info(f"👀 監看 {self.input_dir}（{self.mode}，穩定時間 {self.stable_seconds}s）")
+
+    def _stop(self):
+        if self._source is not None:
+            asyncio.get_running_loop().remove_reader(self._source.fd)
+            self._source.close()
+            self._source = None
+
+    async def watch(self) -> AsyncIterator[Tuple[str, float]]:
+        """持續產生 (路徑, 首次發現時間)，直到呼叫端停止迭代"""
+        self._start()
+        try:
+            while True:
+                now = time.time()
+                if self._source is not None:
+                    for path in self._source.read_paths():
+                        self._touch(path, now)
+                    if self._source.overflowed:
+                        self._source.overflowed = False
+                        self._rescan(now)
+                else:
+                    self._rescan(now)
+
+                for item in self._ready(now):
+                    yield item
+
+                # 有候選文件時依穩定時間檢查；inotify 模式下沒有候選文件就等待事件
+                timeout = self.poll_interval
+                if self._source is not None and not self._candidates:
+                    timeout = None
+                elif self._candidates:
+                    timeout = min(self.poll_interval, self.stable_seconds)
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout)
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            self._stop()
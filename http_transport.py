@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+"""
+共用 HTTP 傳輸層 - 每個行程一組 keep-alive 連線池，供所有服務商客戶端使用
+
+- requests.Session：Google 翻譯（deep_translator 原本每段都呼叫 requests.get，每次重新握手）
+- httpx.Client：OpenAI 客戶端（Whisper 與翻譯），安裝 h2 時使用 HTTP/2
+Gemini 使用 gRPC，客戶端本身即維持一條長駐的 HTTP/2 連線，不經過此模組。
+
+連線池大小與逾時取自 network 設定；stats() 返回各客戶端的請求數、新建連線數與重用次數，
+並同步累計到 MetricsRegistry（podcast_http_requests_total / podcast_http_connections_total）。
+"""
+
+import importlib.util
+import logging
+import threading
+from typing import Dict, Optional
+
+from runtime_config import NetworkConfig
+
+logger = logging.getLogger(__name__)
+
+_shared: Optional['HttpTransport'] = None
+_shared_lock = threading.Lock()
+
+
+class HttpTransport:
+    """共用的 HTTP 連線池與連線重用統計"""
+
+    def __init__(self, network: NetworkConfig = None, metrics=None):
+        self.network = network or NetworkConfig()
+        self.metrics = metrics
+        self._lock = threading.Lock()
+        self._counts: Dict[str, Dict[str, int]] = {}
+        self._session = None
+        self._httpx_client = None
+
+    def _record(self, client: str, event: str):
+        with self._lock:
+            counts = self._counts.setdefault(client, {'requests': 0, 'connections': 0})
+            counts[event] += 1
+        if self.metrics is not None:
+            self.metrics.inc(f'podcast_http_{event}_total', client=client)
+
+    @property
+    def http2(self) -> bool:
+        return self.network.http2 and importlib.util.find_spec('h2') is not None
+
+    @property
+    def session(self):
+        """requests.Session（延遲建立），所有 https / http 請求共用同一個連線池"""
+        if self._session is None:
+            with self._lock:
+                if self._session is None:
+                    self._session = _build_session(self)
+        return self._session
+
+    def httpx_client(self, client_class=None):
+        """OpenAI 使用的 httpx.Client（延遲建立）；client_class 預設為 httpx.Client"""
+        if self._httpx_client is None:
+            import httpx
+            network = self.network
+            client_class = client_class or httpx.Client
+
+            def on_request(request):
+                self._record('httpx', 'requests')
+                request.extensions['trace'] = trace
+
+            def trace(event: str, info: Dict):
+                if event == 'connection.connect_tcp.complete':
+                    self._record('httpx', 'connections')
+
+            self._httpx_client = client_class(
+                limits=httpx.Limits(max_connections=network.pool_connections * network.pool_maxsize,
+                                    max_keepalive_connections=network.pool_maxsize,
+                                    keepalive_expiry=network.keepalive_expiry),
+                timeout=httpx.Timeout(network.read_timeout, connect=network.connect_timeout),
+                http2=self.http2,
+                event_hooks={'request': [on_request]}
+            )
+        return self._httpx_client
+
+    def openai_http_client(self):
+        """傳給 openai.OpenAI(http_client=...) 的客戶端，保留 OpenAI 預設的重新導向設定"""
+        import openai
+        return self.httpx_client(openai.DefaultHttpxClient)
+
+    def google_translator(self, source: str, target: str):
+        """使用共用連線池的 Google 翻譯器"""
+        return _pooled_google_translator()(self.session, source=source, target=target)
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        """各客戶端的請求數、新建連線數與連線重用次數"""
+        with self._lock:
+            return {
+                client: {**counts, 'reused': max(0, counts['requests'] - counts['connections'])}
+                for client, counts in self._counts.items()
+            }
+
+    def close(self):
+        """關閉連線池；之後再使用時會重新建立"""
+        with self._lock:
+            session, client = self._session, self._httpx_client
+            self._session = self._httpx_client = None
+        if session is not None:
+            session.close()
+        if client is not None:
+            client.close()
+
+
+def _build_session(transport: HttpTransport):
+    import requests
+    from requests.adapters import HTTPAdapter
+    from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+    network = transport.network
+
+    def counting_pool(base):
+        class CountingPool(base):
+            def _new_conn(self):
+                transport._record('requests', 'connections')
+                return super()._new_conn()
+        return CountingPool
+
+    pool_classes = {'http': counting_pool(HTTPConnectionPool), 'https': counting_pool(HTTPSConnectionPool)}
+
+    class PooledAdapter(HTTPAdapter):
+        """保留 keep-alive 連線、未指定逾時時套用 network 設定的逾時"""
+
+        def init_poolmanager(self, *args, **kwargs):
+            super().init_poolmanager(*args, **kwargs)
+            self.poolmanager.pool_classes_by_scheme = pool_classes
+
+        def send(self, request, timeout=None, **kwargs):
+            transport._record('requests', 'requests')
+            if timeout is None:
+                timeout = (network.connect_timeout, network.read_timeout)
+            return super().send(request, timeout=timeout, **kwargs)
+
+    session = requests.Session()
+    adapter = PooledAdapter(pool_connections=network.pool_connections, pool_maxsize=network.pool_maxsize)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
+
+_translator_class = None
+
+
+def _pooled_google_translator():
+    """deep_translator.GoogleTranslator 的子類別，以共用的 Session 送出請求"""
+    global _translator_class
+    if _translator_class is not None:
+        return _translator_class
+
+    from bs4 import BeautifulSoup
+    from deep_translator import GoogleTranslator
+    from deep_translator.exceptions import RequestError, TooManyRequests, TranslationNotFound
+    from deep_translator.validate import is_empty, is_input_valid, request_failed
+
+    class PooledGoogleTranslator(GoogleTranslator):
+        def __init__(self, session, **kwargs):
+            super().__init__(**kwargs)
+            self.session = session
+
+        def translate(self, text: str, **kwargs) -> str:
+            # 與 GoogleTranslator.translate 相同，但改用共用的 Session，
+            # 且查詢參數不寫回物件，多個執行緒可共用同一個翻譯器
+            if not is_input_valid(text, max_chars=5000):
+                return None
+            text = text.strip()
+            if self._same_source_target() or is_empty(text):
+                return text
+            params = {**self._url_params, 'tl': self._target, 'sl': self._source}
+            if self.payload_key:
+                params[self.payload_key] = text
+
+            response = self.session.get(self._base_url, params=params, proxies=self.proxies)
+            if response.status_code == 429:
+                raise TooManyRequests()
+            if request_failed(status_code=response.status_code):
+                raise RequestError()
+            soup = BeautifulSoup(response.text, 'html.parser')
+            response.close()
+
+            element = soup.find(self._element_tag, self._element_query)
+            if not element:
+                element = soup.find(self._element_tag, self._alt_element_query)
+                if not element:
+                    raise TranslationNotFound(text)
+            translated = element.get_text(strip=True)
+            if translated == text:
+                same_alpha = ''.join(ch for ch in text if ch.isalnum())
+                if same_alpha and same_alpha == ''.join(ch for ch in translated if ch.isalnum()):
+                    if 'hl' not in self._url_params:
+                        return text
+                    del self._url_params['hl']
+                    return self.translate(text)
+            return translated
+
+    _translator_class = PooledGoogleTranslator
+    return _translator_class
+
+
+def shared_transport(network: NetworkConfig = None, metrics=None) -> HttpTransport:
+    """行程共用的傳輸層；第一次呼叫時依 network 設定建立，之後返回同一個物件"""
+    global _shared
+    with _shared_lock:
+        if _shared is None:
+            _shared = HttpTransport(network, metrics)
+            logger.debug(f"🔌 建立共用 HTTP 連線池 (每主機 {_shared.network.pool_maxsize} 條連線)")
+        elif _shared.metrics is None and metrics is not None:
+            _shared.metrics = metrics
+        return _shared
@@ -0,0 +1,469 @@
+#!/usr/bin/env python3
+"""
+共用工作佇列 - 讓多台機器上的工作行程一起處理同一批文件
+
+批次處理器把每個文件放入佇列，任意數量的工作行程以租約（lease）取得工作，
+處理期間定期續約（heartbeat）；行程當機或失聯導致租約過期時，工作會重新
+排入佇列，超過嘗試次數上限則標記為失敗。
+
+後端:
+  sqlite:///path/to/queue.db   單機多行程（亦可放在支援鎖定的共用磁碟）
+  redis://host:6379/0          多台機器，需要安裝 redis 套件
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import Dict, List, Optional
+
+# 工作狀態
+QUEUED = 'queued'
+LEASED = 'leased'
+SUCCEEDED = 'success'
+FAILED = 'failed'
+FINISHED_STATES = (SUCCEEDED, FAILED)
+
+DEFAULT_LEASE_SECONDS = 60.0
+DEFAULT_MAX_ATTEMPTS = 3
+
+
+class JobQueue(ABC):
+    """共用工作佇列介面
+
+    所有方法皆為同步呼叫，非同步程式碼中以 asyncio.to_thread 執行。
+    complete / fail / heartbeat 只有在 worker_id 仍持有租約時才會生效，
+    返回 False 表示租約已過期並被重新分配。
+    """
+
+    max_attempts = DEFAULT_MAX_ATTEMPTS
+
+    @abstractmethod
+    def enqueue(self, job_id: str, payload: Dict) -> bool:
+        """加入工作；相同 ID 已在佇列中或已成功時不重複加入，已失敗的工作會重新排入"""
+
+    @abstractmethod
+    def claim(self, worker_id: str, lease_seconds: float = DEFAULT_LEASE_SECONDS) -> Optional[Dict]:
+        """取得下一個工作並持有租約；沒有工作時返回 None"""
+
+    @abstractmethod
+    def heartbeat(self, job_id: str, worker_id: str, lease_seconds: float = DEFAULT_LEASE_SECONDS) -> bool:
+        """延長租約到現在起 lease_seconds 秒後"""
+
+    @abstractmethod
+    def complete(self, job_id: str, worker_id: str, result: Dict) -> bool:
+        """處理成功並保存結果"""
+
+    @abstractmethod
+    def fail(self, job_id: str, worker_id: str, result: Dict) -> bool:
+        """處理失敗；未達嘗試上限時重新排入佇列"""
+
+    @abstractmethod
+    def release(self, job_id: str, worker_id: str) -> bool:
+        """工作行程正常結束前歸還工作，不計入嘗試次數"""
+
+    @abstractmethod
+    def requeue_expired(self) -> int:
+        """將租約已過期的工作重新排入佇列，返回處理的數量"""
+
+    @abstractmethod
+    def jobs(self, job_ids: List[str]) -> List[Dict]:
+        """返回指定工作的目前狀態，不存在的 ID 略過"""
+
+    @abstractmethod
+    def stats(self) -> Dict[str, int]:
+        """返回各狀態的工作數"""
+
+    def close(self):
+        pass
+
+
+class SQLiteJobQueue(JobQueue):
+    """以 SQLite 實作的工作佇列，適合單機測試與多個本機工作行程"""
+
+    _SCHEMA = """
+        CREATE TABLE IF NOT EXISTS jobs (
+            id TEXT PRIMARY KEY,
+            state TEXT NOT NULL,
+            payload TEXT NOT NULL,
+            attempts INTEGER NOT NULL DEFAULT 0,
+            worker TEXT,
+            lease_expires REAL,
+            enqueued_at REAL NOT NULL,
+            started_at REAL,
+            finished_at REAL,
+            result TEXT,
+            error TEXT
+        );
+        CREATE INDEX IF NOT EXISTS jobs_state ON jobs (state, enqueued_at);
+    """
+
+    def __init__(self, path: str, max_attempts: int = DEFAULT_MAX_ATTEMPTS):
+        self.path = path
+        self.max_attempts = max_attempts
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._local = threading.local()
+        self._connection().executescript(self._SCHEMA)
+
+    def _connection(self) -> sqlite3.Connection:
+        # sqlite3 連線不可跨執行緒共用，asyncio.to_thread 的每個執行緒各自建立連線
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _transaction(self):
+        return _ImmediateTransaction(self._connection())
+
+    def _requeue_expired(self, conn: sqlite3.Connection, now: float) -> int:
+        expired = conn.execute(
+            "UPDATE jobs SET state = ?, worker = NULL, lease_expires = NULL, error = ? "
+            "WHERE state = ? AND lease_expires < ? AND attempts >= ?",
+            (FAILED, 'lease expired', LEASED, now, self.max_attempts)
+        ).rowcount
+        return expired + conn.execute(
+            "UPDATE jobs SET state = ?, worker = NULL, lease_expires = NULL "
+            "WHERE state = ? AND lease_expires < ?",
+            (QUEUED, LEASED, now)
+        ).rowcount
+
+    def enqueue(self, job_id: str, payload: Dict) -> bool:
+        with self._transaction() as conn:
+            row = conn.execute("SELECT state FROM jobs WHERE id = ?", (job_id,)).fetchone()
+            if row is None:
+                conn.execute(
+                    "INSERT INTO jobs (id, state, payload, enqueued_at) VALUES (?, ?, ?, ?)",
+                    (job_id, QUEUED, json.dumps(payload, ensure_ascii=False), time.time())
+                )
+                return True
+            if row['state'] == FAILED:
+                conn.execute(
+                    "UPDATE jobs SET state = ?, payload = ?, attempts = 0, enqueued_at = ?, "
+                    "finished_at = NULL, result = NULL, error = NULL WHERE id = ?",
+                    (QUEUED, json.dumps(payload, ensure_ascii=False), time.time(), job_id)
+                )
+                return True
+            return False
+
+    def claim(self, worker_id: str, lease_seconds: float = DEFAULT_LEASE_SECONDS) -> Optional[Dict]:
+        now = time.time()
+        with self._transaction() as conn:
+            self._requeue_expired(conn, now)
+            row = conn.execute(
+                "SELECT id FROM jobs WHERE state = ? ORDER BY enqueued_at LIMIT 1", (QUEUED,)
+            ).fetchone()
+            if row is None:
+                return None
+            conn.execute(
+                "UPDATE jobs SET state = ?, worker = ?, lease_expires = ?, attempts = attempts + 1, "
+                "started_at = ? WHERE id = ?",
+                (LEASED, worker_id, now + lease_seconds, now, row['id'])
+            )
+            return self._row_to_job(conn.execute("SELECT * FROM jobs WHERE id = ?", (row['id'],)).fetchone())
+
+    def heartbeat(self, job_id: str, worker_id: str, lease_seconds: float = DEFAULT_LEASE_SECONDS) -> bool:
+        with self._transaction() as conn:
+            return conn.execute(
+                "UPDATE jobs SET lease_expires = ? WHERE id = ? AND worker = ? AND state = ?",
+                (time.time() + lease_seconds, job_id, worker_id, LEASED)
+            ).rowcount == 1
+
+    def _finish(self, job_id: str, worker_id: str, state: str, result: Dict) -> bool:
+        with self._transaction() as conn:
+            return conn.execute(
+                "UPDATE jobs SET state = ?, worker = NULL, lease_expires = NULL, finished_at = ?, "
+                "result = ?, error = ? WHERE id = ? AND worker = ? AND state = ?",
+                (state, time.time(), json.dumps(result, ensure_ascii=False, default=str),
+                 result.get('error'), job_id, worker_id, LEASED)
+            ).rowcount == 1
+
+    def complete(self, job_id: str, worker_id: str, result: Dict) -> bool:
+        return self._finish(job_id, worker_id, SUCCEEDED, result)
+
+    def fail(self, job_id: str, worker_id: str, result: Dict) -> bool:
+        with self._transaction() as conn:
+            row = conn.execute(
+                "SELECT attempts FROM jobs WHERE id = ? AND worker = ? AND state = ?",
+                (job_id, worker_id, LEASED)
+            ).fetchone()
+            if row is None:
+                return False
+            if row['attempts'] < self.max_attempts:
+                conn.execute(
+                    "UPDATE jobs SET state = ?, worker = NULL, lease_expires = NULL, error = ? WHERE id = ?",
+                    (QUEUED, result.get('error'), job_id)
+                )
+                return True
+        return self._finish(job_id, worker_id, FAILED, result)
+
+    def release(self, job_id: str, worker_id: str) -> bool:
+        with self._transaction() as conn:
+            return conn.execute(
+                "UPDATE jobs SET state = ?, worker = NULL, lease_expires = NULL, attempts = attempts - 1 "
+                "WHERE id = ? AND worker = ? AND state = ?",
+                (QUEUED, job_id, worker_id, LEASED)
+            ).rowcount == 1
+
+    def requeue_expired(self) -> int:
+        with self._transaction() as conn:
+            return self._requeue_expired(conn, time.time())
+
+    def jobs(self, job_ids: List[str]) -> List[Dict]:
+        conn = self._connection()
+        found = {}
+        # 分批查詢，避免超過 SQLite 的參數數量上限
+        for start in range(0, len(job_ids), 500):
+            chunk = job_ids[start:start + 500]
+            rows = conn.execute(
+                f"SELECT * FROM jobs WHERE id IN ({','.join('?' * len(chunk))})", chunk
+            ).fetchall()
+            found.update((row['id'], self._row_to_job(row)) for row in rows)
+        return [found[job_id] for job_id in job_ids if job_id in found]
+
+    def stats(self) -> Dict[str, int]:
+        rows = self._connection().execute("SELECT state, COUNT(*) AS count FROM jobs GROUP BY state").fetchall()
+        return {row['state']: row['count'] for row in rows}
+
+    @staticmethod
+    def _row_to_job(row: sqlite3.Row) -> Dict:
+        job = dict(row)
+        job['payload'] = json.loads(job['payload'])
+        job['result'] = json.loads(job['result']) if job['result'] else None
+        return job
+
+    def close(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+
+class _ImmediateTransaction:
+    """BEGIN IMMEDIATE 交易：取得寫入鎖後才讀取，避免多個行程取得同一個工作"""
+
+    def __init__(self, conn: sqlite3.Connection):
+        self.conn = conn
+
+    def __enter__(self) -> sqlite3.Connection:
+        self.conn.execute("BEGIN IMMEDIATE")
+        return self.conn
+
+    def __exit__(self, exc_type, exc, traceback):
+        self.conn.execute("ROLLBACK" if exc_type else "COMMIT")
+        return False
+
+
+# Redis 後端的 Lua 腳本：每個操作在伺服器端以單一原子步驟執行，時間取自 Redis 伺服器，
+# 避免各節點時鐘不一致影響租約判斷
+_REDIS_NOW = """
+if redis.replicate_commands then
+    redis.replicate_commands()
+end
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+"""
+
+_REDIS_REQUEUE = _REDIS_NOW + """
+local ns = KEYS[1]
+local max_attempts = tonumber(ARGV[1])
+local count = 0
+for _, id in ipairs(redis.call('ZRANGEBYSCORE', ns .. ':leases', '-inf', now)) do
+    local key = ns .. ':job:' .. id
+    redis.call('ZREM', ns .. ':leases', id)
+    redis.call('HDEL', key, 'worker', 'lease_expires')
+    if tonumber(redis.call('HGET', key, 'attempts') or '0') >= max_attempts then
+        redis.call('HSET', key, 'state', 'failed', 'error', 'lease expired', 'finished_at', now)
+    else
+        redis.call('HSET', key, 'state', 'queued')
+        redis.call('RPUSH', ns .. ':pending', id)
+    end
+    count = count + 1
+end
+return count
+"""
+
+_REDIS_CLAIM = _REDIS_REQUEUE.replace('return count', '') + """
+local id, key
+repeat
+    id = redis.call('LPOP', ns .. ':pending')
+    if not id then
+        return false
+    end
+    key = ns .. ':job:' .. id
+until redis.call('HGET', key, 'state') == 'queued'
+redis.call('HSET', key, 'state', 'leased', 'worker', ARGV[2], 'lease_expires', now + tonumber(ARGV[3]),
+           'started_at', now)
+redis.call('HINCRBY', key, 'attempts', 1)
+redis.call('ZADD', ns .. ':leases', now + tonumber(ARGV[3]), id)
+return id
+"""
+
+_REDIS_ENQUEUE = _REDIS_NOW + """
+local ns = KEYS[1]
+local key = ns .. ':job:' .. ARGV[1]
+local state = redis.call('HGET', key, 'state')
+if state and state ~= 'failed' then
+    return 0
+end
+redis.call('DEL', key)
+redis.call('HSET', key, 'id', ARGV[1], 'state', 'queued', 'payload', ARGV[2], 'attempts', 0, 'enqueued_at', now)
+redis.call('RPUSH', ns .. ':pending', ARGV[1])
+return 1
+"""
+
+_REDIS_HEARTBEAT = _REDIS_NOW + """
+local ns = KEYS[1]
+local key = ns .. ':job:' .. ARGV[1]
+if redis.call('HGET', key, 'state') ~= 'leased' or redis.call('HGET', key, 'worker') ~= ARGV[2] then
+    return 0
+end
+redis.call('HSET', key, 'lease_expires', now + tonumber(ARGV[3]))
+redis.call('ZADD', ns .. ':leases', now + tonumber(ARGV[3]), ARGV[1])
+return 1
+"""
+
+# ARGV: id, worker, 動作 (complete / fail / release), result, error, max_attempts
+_REDIS_FINISH = _REDIS_NOW + """
+local ns = KEYS[1]
+local key = ns .. ':job:' .. ARGV[1]
+if redis.call('HGET', key, 'state') ~= 'leased' or redis.call('HGET', key, 'worker') ~= ARGV[2] then
+    return 0
+end
+redis.call('ZREM', ns .. ':leases', ARGV[1])
+redis.call('HDEL', key, 'worker', 'lease_expires')
+local action = ARGV[3]
+if action == 'release' then
+    redis.call('HINCRBY', key, 'attempts', -1)
+end
+if action == 'release' or (action == 'fail' and tonumber(redis.call('HGET', key, 'attempts')) < tonumber(ARGV[6])) then
+    redis.call('HSET', key, 'state', 'queued', 'error', ARGV[5])
+    redis.call('LPUSH', ns .. ':pending', ARGV[1])
+    return 1
+end
+local state = 'failed'
+if action == 'complete' then
+    state = 'success'
+end
+redis.call('HSET', key, 'state', state, 'result', ARGV[4], 'error', ARGV[5], 'finished_at', now)
+return 1
+"""
+
+
+class RedisJobQueue(JobQueue):
+    """以 Redis 實作的工作佇列，供多台機器上的工作行程共用
+
+    鍵: {namespace}:pending（待處理 ID 清單）、{namespace}:leases（租約到期時間的 sorted set）、
+    {namespace}:job:{id}（工作內容的 hash）。
+    """
+
+    def __init__(self, url: str = None, namespace: str = 'podcast', max_attempts: int = DEFAULT_MAX_ATTEMPTS,
+                 client=None):
+        """client 可傳入已建立的 Redis 客戶端（必須使用 decode_responses=True），此時忽略 url"""
+        if client is None:
+            try:
+                import redis
+            except ImportError as e:
+                raise RuntimeError("使用 Redis 工作佇列需要安裝 redis 套件: pip install redis") from e
+            client = redis.Redis.from_url(url, decode_responses=True)
+        self.namespace = namespace
+        self.max_attempts = max_attempts
+        self.client = client
+        self._enqueue = self.client.register_script(_REDIS_ENQUEUE)
+        self._claim = self.client.register_script(_REDIS_CLAIM)
+        self._heartbeat = self.client.register_script(_REDIS_HEARTBEAT)
+        self._finish_script = self.client.register_script(_REDIS_FINISH)
+        self._requeue = self.client.register_script(_REDIS_REQUEUE)
+
+    def _key(self, job_id: str) -> str:
+        return f"{self.namespace}:job:{job_id}"
+
+    def enqueue(self, job_id: str, payload: Dict) -> bool:
+        return bool(self._enqueue(keys=[self.namespace], args=[job_id, json.dumps(payload, ensure_ascii=False)]))
+
+    def claim(self, worker_id: str, lease_seconds: float = DEFAULT_LEASE_SECONDS) -> Optional[Dict]:
+        job_id = self._claim(keys=[self.namespace], args=[self.max_attempts, worker_id, lease_seconds])
+        if not job_id:
+            return None
+        return self.jobs([job_id])[0]
+
+    def heartbeat(self, job_id: str, worker_id: str, lease_seconds: float = DEFAULT_LEASE_SECONDS) -> bool:
+        return bool(self._heartbeat(keys=[self.namespace], args=[job_id, worker_id, lease_seconds]))
+
+    def _finish(self, job_id: str, worker_id: str, action: str, result: Dict = None) -> bool:
+        result = result or {}
+        return bool(self._finish_script(keys=[self.namespace], args=[
+            job_id, worker_id, action, json.dumps(result, ensure_ascii=False, default=str),
+            result.get('error') or '', self.max_attempts
+        ]))
+
+    def complete(self, job_id: str, worker_id: str, result: Dict) -> bool:
+        return self._finish(job_id, worker_id, 'complete', result)
+
+    def fail(self, job_id: str, worker_id: str, result: Dict) -> bool:
+        return self._finish(job_id, worker_id, 'fail', result)
+
+    def release(self, job_id: str, worker_id: str) -> bool:
+        return self._finish(job_id, worker_id, 'release')
+
+    def requeue_expired(self) -> int:
+        return int(self._requeue(keys=[self.namespace], args=[self.max_attempts]))
+
+    def jobs(self, job_ids: List[str]) -> List[Dict]:
+        pipeline = self.client.pipeline(transaction=False)
+        for job_id in job_ids:
+            pipeline.hgetall(self._key(job_id))
+        jobs = []
+        for data in pipeline.execute():
+            if not data:
+                continue
+            jobs.append({
+                'id': data['id'],
+                'state': data['state'],
+                'payload': json.loads(data['payload']),
+                'attempts': int(data.get('attempts', 0)),
+                'worker': data.get('worker'),
+                'lease_expires': float(data['lease_expires']) if data.get('lease_expires') else None,
+                'enqueued_at': float(data['enqueued_at']),
+                'started_at': float(data['started_at']) if data.get('started_at') else None,
+                'finished_at': float(data['finished_at']) if data.get('finished_at') else None,
+                'result': json.loads(data['result']) if data.get('result') else None,
+                'error': data.get('error') or None
+            })
+        return jobs
+
+    def stats(self) -> Dict[str, int]:
+        counts = {}
+        for key in self.client.scan_iter(f"{self.namespace}:job:*"):
+            state = self.client.hget(key, 'state')
+            counts[state] = counts.get(state, 0) + 1
+        return counts
+
+    def close(self):
+        self.client.close()
+
+
+def open_queue(url: str, max_attempts: int = DEFAULT_MAX_ATTEMPTS) -> JobQueue:
+    """依網址建立工作佇列
+
+    url 可為 sqlite:///path、redis://...，或 redis / database 表示使用
+    環境變數 REDIS_URL / DATABASE_URL 的設定。
+    """
+    if url in ('redis', 'database'):
+        env_name = 'REDIS_URL' if url == 'redis' else 'DATABASE_URL'
+        url = os.getenv(env_name)
+        if not url:
+            raise ValueError(f"未設定環境變數 {env_name}")
+    if url.startswith(('redis://', 'rediss://', 'unix://')):
+        return RedisJobQueue(url, max_attempts=max_attempts)
+    if url.startswith('sqlite:///'):
+        return SQLiteJobQueue(url[len('sqlite:///'):], max_attempts=max_attempts)
+    if url.endswith(('.db', '.sqlite', '.sqlite3')):
+        return SQLiteJobQueue(url, max_attempts=max_attempts)
+    raise ValueError(f"不支援的工作佇列網址: {url}（可用 sqlite:///path 或 redis://host:port/db）")
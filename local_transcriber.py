@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+本地語音識別 - 以 faster-whisper（CTranslate2）在 CPU 上執行 Whisper 模型，不需網路與按分鐘計費
+
+模型只從本地載入：whisper.model 可為模型目錄，或在 whisper.model_dir（WHISPER_MODEL_DIR）中
+已下載的模型大小名稱（tiny、base、small ...）；一律以 local_files_only 載入，不會連線下載。
+預設以 int8 量化在 CPU 上推論。模型依 (路徑, 裝置, 精度, 執行緒數) 快取在行程中，
+批次處理時同一工作行程處理的所有文件共用同一個模型實例。
+壓縮格式經 ffmpeg 管道解碼成 16 kHz 單聲道陣列後送入模型（見 audio_decode）。
+"""
+
+import logging
+import os
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+from audio_decode import decode_whisper_input, ffmpeg_available, needs_decoding
+from segment_model import Segment
+
+logger = logging.getLogger(__name__)
+
+_models: Dict[Tuple, object] = {}
+_models_lock = threading.Lock()
+
+
+class LocalModelError(RuntimeError):
+    """faster-whisper 未安裝或找不到本地模型文件"""
+
+
+def faster_whisper_available() -> bool:
+    """檢查 faster-whisper 是否已安裝（不實際匯入）"""
+    import importlib.util
+    return importlib.util.find_spec('faster_whisper') is not None
+
+
+def resolve_model(model: str, model_dir: Optional[str] = None) -> Tuple[str, Optional[str]]:
+    """將 whisper.model 解析為 (模型路徑或大小名稱, 下載快取目錄)
+
+    model 本身是目錄時直接使用；model_dir/<model> 是目錄時使用該目錄；
+    否則視為大小名稱，從 model_dir 中的 Hugging Face 快取載入。
+    """
+    if os.path.isdir(model):
+        return model, None
+    if model_dir:
+        candidate = os.path.join(model_dir, model)
+        if os.path.isdir(candidate):
+            return candidate, None
+    return model, model_dir
+
+
+def load_model(model: str, model_dir: Optional[str] = None, device: str = 'cpu', compute_type: str = 'int8',
+               cpu_threads: int = 0, num_workers: int = 1):
+    """載入（或取得已快取的）WhisperModel；同一組參數在行程中只載入一次"""
+    path, download_root = resolve_model(model, model_dir)
+    key = (path, download_root, device, compute_type, cpu_threads)
+    with _models_lock:
+        cached = _models.get(key)
+        if cached is not None:
+            return cached
+        if not faster_whisper_available():
+            raise LocalModelError("未安裝 faster-whisper，請執行 pip install faster-whisper")
+        from faster_whisper import WhisperModel
+        started_at = time.perf_counter()
+        try:
+            instance = WhisperModel(path, device=device, compute_type=compute_type, cpu_threads=cpu_threads,
+                                    num_workers=num_workers, download_root=download_root, local_files_only=True)
+        except Exception as e:
+            raise LocalModelError(f"無法載入本地 Whisper 模型 {path}: {e}") from e
+        logger.info(f"✅ 本地 Whisper 模型載入完成: {path} ({device}/{compute_type}，"
+                    f"{time.perf_counter() - started_at:.1f}s)")
+        _models[key] = instance
+        return instance
+
+
+def clear_models():
+    """釋放行程中快取的模型"""
+    with _models_lock:
+        _models.clear()
+
+
+class LocalTranscriber:
+    """以本地 Whisper 模型轉錄單一文件；模型在首次使用時載入並跨文件重用"""
+
+    def __init__(self, whisper_config, model_dir: Optional[str] = None, num_workers: int = 1, model=None):
+        self.config = whisper_config
+        self.model_dir = model_dir
+        self.num_workers = max(1, num_workers)
+        self._model = model
+
+    @property
+    def model(self):
+        if self._model is None:
+            whisper = self.config
+            self._model = load_model(whisper.model, self.model_dir, whisper.device, whisper.compute_type,
+                                     whisper.cpu_threads, self.num_workers)
+        return self._model
+
+    def _options(self) -> Dict:
+        whisper = self.config
+        options = {'temperature': whisper.temperature, 'word_timestamps': whisper.word_timestamps}
+        if whisper.language:
+            options['language'] = whisper.language
+        if whisper.beam_size:
+            options['beam_size'] = whisper.beam_size
+        return options
+
+    def transcribe(self, audio_path: str) -> Dict:
+        """轉錄文件，返回與 OpenAI 路徑相同的結構，另含音頻長度、耗時與即時率（RTF）"""
+        model = self.model
+        started_at = time.perf_counter()
+        source = audio_path
+        if needs_decoding(audio_path) and ffmpeg_available():
+            source = decode_whisper_input(audio_path)
+        # faster-whisper 返回產生器，實際解碼在迭代時進行
+        results, info = model.transcribe(source, **self._options())
+        segments = [Segment(item.start, item.end, item.text.strip()) for item in results]
+        elapsed = time.perf_counter() - started_at
+        duration = info.duration
+        return {
+            'text': ' '.join(segment.text for segment in segments if segment.text),
+            'segments': segments,
+            'language': info.language or 'en',
+            'duration': duration,
+            'elapsed': elapsed,
+            'rtf': elapsed / duration if duration else None
+        }
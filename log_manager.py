@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+"""
+結構化日誌管理 - 背景執行緒輸出、工作上下文欄位與限速進度回報
+"""
+
+import atexit
+import contextvars
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict
+
+# 目前工作的上下文欄位（例如 job、file），會附加到每一筆日誌
+_JOB_CONTEXT: contextvars.ContextVar = contextvars.ContextVar('job_context', default={})
+
+# 目前工作的進度接收者（例如服務模式的工作狀態），由 progress_sink 設定
+_PROGRESS_SINK: contextvars.ContextVar = contextvars.ContextVar('progress_sink', default=None)
+
+# 進度回報的最小間隔（秒），即每個工作每秒最多數次更新
+PROGRESS_MIN_INTERVAL = float(os.getenv('PROGRESS_MIN_INTERVAL', '0.25'))
+
+_listener = None
+_listener_lock = threading.Lock()
+
+
+@contextmanager
+def job_context(**fields):
+    """在區塊內為日誌附加工作上下文欄位
+
+    上下文存放於 contextvars，asyncio 任務與 asyncio.to_thread 會各自繼承。
+    """
+    token = _JOB_CONTEXT.set({**_JOB_CONTEXT.get(), **fields})
+    try:
+        yield
+    finally:
+        _JOB_CONTEXT.reset(token)
+
+
+def current_job_context() -> Dict:
+    return dict(_JOB_CONTEXT.get())
+
+
+@contextmanager
+def progress_sink(callback: Callable[[str, int, int], None]):
+    """在區塊內將每次進度更新以 callback(label, done, total) 回報，不受日誌限速影響"""
+    token = _PROGRESS_SINK.set(callback)
+    try:
+        yield
+    finally:
+        _PROGRESS_SINK.reset(token)
+
+
+class JobContextFilter(logging.Filter):
+    """在產生日誌的執行緒上擷取工作上下文（必須在進入佇列前執行）"""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if not hasattr(record, 'job_context'):
+            record.job_context = _JOB_CONTEXT.get()
+        if not hasattr(record, 'fields'):
+            record.fields = {}
+        return True
+
+
+class StructuredFormatter(logging.Formatter):
+    """輸出 text（預設）或 json 格式，並附帶工作上下文"""
+
+    def __init__(self, fmt: str = 'text'):
+        super().__init__()
+        self.fmt = fmt
+
+    def format(self, record: logging.LogRecord) -> str:
+        context = getattr(record, 'job_context', {}) or {}
+        fields = getattr(record, 'fields', {}) or {}
+        if self.fmt == 'json':
+            payload = {
+                'time': self.formatTime(record, '%Y-%m-%dT%H:%M:%S'),
+                'level': record.levelname,
+                'logger': record.name,
+                'message': record.getMessage(),
+                **context,
+                **fields
+            }
+            if record.exc_info:
+                payload['exception'] = self.formatException(record.exc_info)
+            return json.dumps(payload, ensure_ascii=False, default=str)
+
+        # 文字格式只附加上下文前綴；額外欄位僅輸出於 json 格式
+        message = record.getMessage()
+        if context:
+            prefix = ' '.join(f"{key}={value}" for key, value in context.items())
+            message = f"[{prefix}] {message}"
+        if record.exc_info:
+            message += '\n' + self.formatException(record.exc_info)
+        return message
+
+
+def setup_logging(level: str = None, fmt: str = None, log_file: str = None, console: bool = True,
+                  max_bytes: int = 0, backup_count: int = 0) -> logging.handlers.QueueListener:
+    """設定根日誌器：呼叫端只把紀錄放入佇列，由背景執行緒負責格式化與寫出
+
+    level 預設讀取 LOG_LEVEL，fmt 預設讀取 LOG_FORMAT（text 或 json）。
+    log_file 以 json 格式寫入，max_bytes 大於 0 時依大小輪替。
+    重複呼叫會更新等級並沿用既有的背景執行緒。
+    """
+    global _listener
+    level = (level or os.getenv('LOG_LEVEL', 'INFO')).upper()
+    fmt = (fmt or os.getenv('LOG_FORMAT', 'text')).lower()
+
+    root = logging.getLogger()
+    root.setLevel(getattr(logging, level, logging.INFO))
+
+    with _listener_lock:
+        if _listener is not None:
+            return _listener
+
+        handlers = []
+        if console:
+            console_handler = logging.StreamHandler(sys.stdout)
+            console_handler.setFormatter(StructuredFormatter(fmt))
+            handlers.append(console_handler)
+        if log_file:
+            os.makedirs(os.path.dirname(os.path.abspath(log_file)), exist_ok=True)
+            if max_bytes > 0:
+                file_handler = logging.handlers.RotatingFileHandler(
+                    log_file, maxBytes=max_bytes, backupCount=backup_count, encoding='utf-8')
+            else:
+                file_handler = logging.FileHandler(log_file, encoding='utf-8')
+            file_handler.setFormatter(StructuredFormatter('json'))
+            handlers.append(file_handler)
+
+        log_queue = queue.SimpleQueue()
+        # QueueHandler 會在呼叫端先合併訊息參數，上下文欄位則由過濾器附加在紀錄上
+        queue_handler = logging.handlers.QueueHandler(log_queue)
+        queue_handler.addFilter(JobContextFilter())
+
+        for handler in list(root.handlers):
+            root.removeHandler(handler)
+        root.addHandler(queue_handler)
+
+        _listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+        _listener.start()
+        atexit.register(shutdown_logging)
+        return _listener
+
+
+def setup_logging_from_config(logging_config, log_dir: str = None) -> logging.handlers.QueueListener:
+    """依執行期配置的 logging 區段設定日誌，文件日誌寫入 log_dir/processing.log"""
+    log_file = None
+    if logging_config.file_logging and log_dir:
+        log_file = os.path.join(log_dir, 'processing.log')
+    return setup_logging(
+        logging_config.level,
+        log_file=log_file,
+        console=logging_config.console_logging,
+        max_bytes=logging_config.max_bytes,
+        backup_count=logging_config.backup_count
+    )
+
+
+def shutdown_logging():
+    """停止背景執行緒並寫出所有待處理的日誌"""
+    global _listener
+    with _listener_lock:
+        if _listener is not None:
+            _listener.stop()
+            _listener = None
+
+
+def set_log_level(level: str):
+    """調整根日誌器的等級"""
+    logging.getLogger().setLevel(getattr(logging, level.upper(), logging.INFO))
+
+
+class ProgressReporter:
+    """限速的進度回報器：每個工作在 min_interval 內最多輸出一次，結束時一定輸出"""
+
+    def __init__(self, logger: logging.Logger, label: str, total: int = None,
+                 enabled: bool = True, min_interval: float = None):
+        self.logger = logger
+        self.label = label
+        self.total = total
+        self.enabled = enabled
+        self.min_interval = PROGRESS_MIN_INTERVAL if min_interval is None else min_interval
+        self.count = 0
+        self._reported = 0
+        self._last_report = 0.0
+        self._lock = threading.Lock()
+        self._sink = _PROGRESS_SINK.get()
+
+    def update(self, count: int = 1):
+        """記錄完成 count 個項目，必要時輸出進度"""
+        with self._lock:
+            self.count += count
+            if self._sink is not None:
+                self._sink(self.label, self.count, self.total)
+            now = time.monotonic()
+            finished = self.total is not None and self.count >= self.total
+            if not self.enabled or (not finished and now - self._last_report < self.min_interval):
+                return
+            self._last_report = now
+            self._reported = done = self.count
+        self._emit(done)
+
+    def _emit(self, done: int):
+        progress = f"{done}/{self.total}" if self.total else str(done)
+        self.logger.info(f"   {self.label} {progress}",
+                         extra={'fields': {'progress': done, 'total': self.total}})
+
+    def finish(self):
+        """輸出最後的進度（若最近一次更新因限速而未輸出）"""
+        with self._lock:
+            pending = self.enabled and self.count != self._reported
+            self._reported = done = self.count
+        if pending:
+            self._emit(done)
@@ -6,23 +6,71 @@ NotebookLM 英文音頻轉中文 Podcast 處理器
 
 import asyncio
 import argparse
+import logging
 import os
 import sys
 from pathlib import Path
 from audio_processor import AudioProcessor
+from audio_decode import ffmpeg_available
+from log_manager import setup_logging_from_config
+from profiling import add_profile_arguments, create_profiler
+from runtime_config import ConfigError, add_config_argument, load_config
 
-def validate_input_file(file_path: str) -> bool:
+logger = logging.getLogger(__name__)
+
+def validate_input_file(file_path: str, input_formats=('wav',), skip_validation: bool = False) -> bool:
     """驗證輸入文件"""
     if not os.path.exists(file_path):
-        print(f"❌ 文件不存在: {file_path}")
+        logger.error(f"❌ 文件不存在: {file_path}")
         return False
     
-    if not file_path.lower().endswith('.wav'):
-        print(f"❌ 僅支援 .wav 格式文件")
+    if skip_validation:
+        return True
+    
+    extension = os.path.splitext(file_path)[1].lower().lstrip('.')
+    if extension not in input_formats:
+        logger.error(f"❌ 僅支援 {', '.join('.' + fmt for fmt in input_formats)} 格式文件")
+        return False
+    if extension != 'wav' and not ffmpeg_available():
+        logger.error(f"❌ 處理 .{extension} 文件需要 ffmpeg，請先安裝或改用 WAV")
         return False
     
     return True
 
+def apply_voice_arguments(processor: AudioProcessor, args):
+    """以命令列指定的聲音覆蓋配置與環境變數"""
+    if args.voice_female:
+        processor.chinese_voices['female'] = args.voice_female
+    if args.voice_male:
+        processor.chinese_voices['male'] = args.voice_male
+
+def apply_preview_arguments(config, args):
+    """以命令列指定的預覽上限覆蓋配置"""
+    preview = config.preview
+    if args.preview_segments is not None:
+        preview.segments = args.preview_segments
+    if args.preview_seconds is not None:
+        preview.seconds = args.preview_seconds
+    if args.preview_window is not None:
+        preview.window_seconds = args.preview_window
+    config.validate()
+
+async def rerender_output(args, config):
+    """增量重新渲染既有輸出"""
+    if not os.path.isdir(args.rerender):
+        logger.error(f"❌ 輸出目錄不存在: {args.rerender}")
+        sys.exit(1)
+    
+    processor = AudioProcessor(config=config)
+    apply_voice_arguments(processor, args)
+    
+    result = await processor.rerender(args.rerender)
+    if not result:
+        sys.exit(1)
+    
+    logger.info(f"🎵 中文音頻: {result['chinese_audio']}")
+    logger.info(f"✏️  重新合成片段數: {len(result['changed_segments'])}")
+
 async def main():
     parser = argparse.ArgumentParser(
         description="將 NotebookLM 英文音頻概覽轉換為中文 Podcast",
@@ -31,7 +79,11 @@ async def main():
 使用範例:
   python main.py input.wav                    # 處理 input.wav，輸出到 output/ 目錄
   python main.py input.wav -o my_output/     # 指定輸出目錄
-  python main.py input.wav --preview         # 僅生成逐字稿預覽
+  python main.py input.wav --preview         # 僅生成逐字稿預覽（前 5 段）
+  python main.py input.wav --preview --preview-seconds 30 --preview-window 45
+                                             # 只轉錄開頭 45 秒，預覽前 30 秒內的片段
+  python main.py --rerender output/          # 編輯 output/transcript.json 後增量重新渲染
+  python main.py input.wav --config fast     # 使用快速處理配置
   
 處理流程:
   1. 🎯 語音識別 (Whisper)
@@ -44,7 +96,8 @@ async def main():
     
     parser.add_argument(
         'input_file',
-        help='輸入的 .wav 音頻文件路徑'
+        nargs='?',
+        help='輸入音頻文件路徑（.wav，安裝 ffmpeg 後也接受 .mp3、.m4a 等）'
     )
     
     parser.add_argument(
@@ -59,77 +112,117 @@ async def main():
         help='僅生成逐字稿預覽，不生成音頻'
     )
     
+    parser.add_argument(
+        '--preview-segments',
+        type=int,
+        help='預覽的片段數上限 (預設: 配置文件的 preview.segments，否則 5)'
+    )
+    
+    parser.add_argument(
+        '--preview-seconds',
+        type=float,
+        help='只預覽開始於此秒數之前的片段 (預設: 不限)'
+    )
+    
+    parser.add_argument(
+        '--preview-window',
+        type=float,
+        metavar='SECONDS',
+        help='預覽時只轉錄音頻開頭的秒數 (預設: 轉錄整個文件)'
+    )
+    
     parser.add_argument(
         '--voice-female',
-        default='zh-TW-HsiaoChenNeural',
-        help='女性聲音 (預設: zh-TW-HsiaoChenNeural)'
+        help='女性聲音 (預設: 配置文件或 EDGE_TTS_VOICE_FEMALE，否則 zh-TW-HsiaoChenNeural)'
     )
     
     parser.add_argument(
         '--voice-male',
-        default='zh-TW-YunJheNeural',
-        help='男性聲音 (預設: zh-TW-YunJheNeural)'
+        help='男性聲音 (預設: 配置文件或 EDGE_TTS_VOICE_MALE，否則 zh-TW-YunJheNeural)'
     )
     
+    parser.add_argument(
+        '--rerender',
+        metavar='OUTPUT_DIR',
+        help='依據編輯後的 transcript.json，只重新合成有變更的片段'
+    )
+    
+    add_config_argument(parser)
+    add_profile_arguments(parser)
+    
     args = parser.parse_args()
     
-    # 驗證輸入文件
-    if not validate_input_file(args.input_file):
-        sys.exit(1)
+    try:
+        config = load_config(args.config)
+        apply_preview_arguments(config, args)
+    except ConfigError as e:
+        parser.error(f"配置文件無效: {e}")
+    
+    if args.rerender:
+        setup_logging_from_config(config.logging, args.rerender)
+        await rerender_output(args, config)
+        return
+    
+    if not args.input_file:
+        parser.error('請提供輸入音頻文件，或使用 --rerender 指定輸出目錄')
     
     # 建立輸出目錄
     output_dir = Path(args.output)
     output_dir.mkdir(parents=True, exist_ok=True)
+    setup_logging_from_config(config.logging, str(output_dir))
+    
+    # 驗證輸入文件
+    if not validate_input_file(args.input_file, config.audio.input_format, config.processing.skip_validation):
+        sys.exit(1)
+    
+    logger.info("🎙️  NotebookLM 英文音頻轉中文 Podcast 處理器")
+    logger.info("=" * 50)
+    logger.info(f"📁 輸入文件: {args.input_file}")
+    logger.info(f"📁 輸出目錄: {output_dir}")
+    if config.source:
+        logger.info(f"⚙️  配置文件: {config.source}")
+    logger.info("=" * 50)
     
-    print("🎙️  NotebookLM 英文音頻轉中文 Podcast 處理器")
-    print("=" * 50)
-    print(f"📁 輸入文件: {args.input_file}")
-    print(f"📁 輸出目錄: {output_dir}")
-    print(f"🎤 女性聲音: {args.voice_female}")
-    print(f"🎤 男性聲音: {args.voice_male}")
-    print("=" * 50)
+    profiler = create_profiler(args, str(output_dir))
+    if profiler:
+        profiler.start()
     
     try:
         # 初始化處理器
-        processor = AudioProcessor()
+        processor = AudioProcessor(config=config)
+        processor.profiler = profiler
         
         # 自定義聲音設定
-        processor.chinese_voices['female'] = args.voice_female
-        processor.chinese_voices['male'] = args.voice_male
+        apply_voice_arguments(processor, args)
+        logger.info(f"🎤 女性聲音: {processor.chinese_voices['female']}")
+        logger.info(f"🎤 男性聲音: {processor.chinese_voices['male']}")
         
         if args.preview:
-            # 僅預覽模式
-            print("📋 預覽模式：僅生成逐字稿...")
-            
-            # 語音識別
-            transcription = processor.transcribe_with_timestamps(args.input_file)
-            if not transcription:
-                print("❌ 語音識別失敗")
-                sys.exit(1)
+            # 僅預覽模式：邊翻譯邊顯示，達到上限即停止
+            preview = config.preview
+            limits = [f"{preview.segments} 段"]
+            if preview.seconds is not None:
+                limits.append(f"前 {preview.seconds:g} 秒")
+            logger.info(f"📋 預覽模式：僅生成逐字稿（上限: {'、'.join(limits)}）...")
             
-            # 對話分析
-            dialogue_segments = processor.detect_speakers_and_dialogue(transcription['segments'])
-            
-            # 翻譯
-            translated_segments = processor.translate_with_context(dialogue_segments)
-            
-            # 保存逐字稿
             transcript_path = output_dir / "transcript_preview.json"
-            processor.save_transcript(translated_segments, str(transcript_path))
-            
-            # 顯示預覽
-            print("\n📋 逐字稿預覽:")
-            print("-" * 40)
-            for i, segment in enumerate(translated_segments[:5]):  # 顯示前5段
-                print(f"[{segment['start']:.1f}s-{segment['end']:.1f}s] 說話者{segment['speaker']}:")
-                print(f"  英文: {segment['original_text']}")
-                print(f"  中文: {segment['translated_text']}")
-                print()
+            logger.info("\n📋 逐字稿預覽:")
+            logger.info("-" * 40)
+            count = 0
+            async for segment in processor.stream_preview(args.input_file, str(transcript_path)):
+                count += 1
+                logger.info(f"[{segment['start']:.1f}s-{segment['end']:.1f}s] 說話者{segment['speaker']}:")
+                logger.info(f"  英文: {segment['original_text']}")
+                logger.info(f"  中文: {segment['translated_text']}")
+                logger.info("")
             
-            if len(translated_segments) > 5:
-                print(f"... 還有 {len(translated_segments) - 5} 段內容")
+            if count == 0:
+                logger.error("❌ 語音識別失敗")
+                sys.exit(1)
             
-            print(f"✅ 完整逐字稿已保存至: {transcript_path}")
+            logger.info(f"✅ 預覽逐字稿已保存至: {transcript_path}（{count} 段）")
+            if not config.output.minimal_output:
+                processor.metrics.write(str(output_dir))
             
         else:
             # 完整處理模式
@@ -138,24 +231,30 @@ async def main():
                 str(output_dir)
             )
             
+            if not config.output.minimal_output:
+                processor.metrics.write(str(output_dir))
+            
             if result:
-                print("\n🎉 處理完成！")
-                print("=" * 50)
-                print(f"📄 逐字稿: {result['transcript']}")
-                print(f"🎵 中文音頻: {result['chinese_audio']}")
-                print(f"📊 片段數量: {result['segments_count']}")
-                print(f"⏱️  總時長: {result['total_duration']:.2f} 秒")
-                print("\n🎧 您現在可以播放生成的中文 Podcast 了！")
+                logger.info("\n🎉 處理完成！")
+                logger.info("=" * 50)
+                logger.info(f"📄 逐字稿: {result['transcript']}")
+                logger.info(f"🎵 中文音頻: {result['chinese_audio']}")
+                logger.info(f"📊 片段數量: {result['segments_count']}")
+                logger.info(f"⏱️  總時長: {result['total_duration']:.2f} 秒")
+                logger.info("\n🎧 您現在可以播放生成的中文 Podcast 了！")
             else:
-                print("❌ 處理失敗")
+                logger.error("❌ 處理失敗")
                 sys.exit(1)
     
     except KeyboardInterrupt:
-        print("\n⚠️  處理被用戶中斷")
+        logger.warning("\n⚠️  處理被用戶中斷")
         sys.exit(1)
     except Exception as e:
-        print(f"❌ 處理過程中發生錯誤: {e}")
+        logger.error(f"❌ 處理過程中發生錯誤: {e}")
         sys.exit(1)
+    finally:
+        if profiler:
+            profiler.stop()
 
 if __name__ == "__main__":
     asyncio.run(main()) 
\ No newline at end of file
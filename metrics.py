@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+"""
+處理指標收集 - 計數器與延遲直方圖
+可匯出為 Prometheus 文字格式或 JSON，用於追蹤各版本間的吞吐量變化
+"""
+
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterable, List, Tuple
+
+# 預設延遲分桶（秒），涵蓋單次 API 呼叫到整個文件的處理時間
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0, 600.0)
+
+METRIC_HELP = {
+    'podcast_stage_seconds': '各處理階段的耗時（秒）',
+    'podcast_provider_call_seconds': '外部服務呼叫的耗時（秒）',
+    'podcast_provider_calls_total': '外部服務呼叫次數',
+    'podcast_provider_errors_total': '外部服務呼叫失敗次數',
+    'podcast_http_requests_total': '經由共用連線池送出的 HTTP 請求數',
+    'podcast_tts_connect_seconds': 'Edge TTS websocket 連線建立的耗時（秒）',
+    'podcast_tts_synthesis_seconds': '在已建立的連線上合成一個片段的耗時（秒）',
+    'podcast_tts_reconnects_total': 'Edge TTS 連線中斷後重新連線的次數',
+    'podcast_http_connections_total': '共用連線池新建的連線數（請求數減去此值即為重用次數）',
+    'podcast_transcription_rtf': '本地語音識別的即時率（處理秒數 ÷ 音頻秒數）',
+    'podcast_fallbacks_total': '改用備用方案的次數',
+    'podcast_retries_total': '重試次數（Edge TTS 斷線後重送、佇列工作重新嘗試）',
+    'podcast_cache_hits_total': '翻譯與語音合成快取命中次數',
+    'podcast_scheduler_wait_seconds': '等待共用資源名額的時間（秒）',
+    'podcast_file_latency_seconds': '監看模式下文件從放入到處理完成的時間（秒）',
+    'podcast_jobs_total': '服務模式接收、拒絕與完成的工作數',
+    'podcast_job_queue_seconds': '服務模式工作在佇列中等待的時間（秒）',
+    'podcast_job_seconds': '服務模式工作的處理時間（秒）',
+    'podcast_segments_total': '各階段處理的片段數',
+    'podcast_bytes_in_total': '讀入的位元組數',
+    'podcast_bytes_out_total': '寫出的位元組數',
+    'podcast_time_to_first_audio_seconds': '從開始處理到首段音頻寫入的延遲（秒）',
+    'podcast_file_seconds': '單一文件的完整處理時間（秒）',
+    'podcast_files_total': '依狀態統計的處理文件數',
+}
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+def _label_key(labels: Dict) -> LabelKey:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _escape_label_value(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(labels: Iterable[Tuple[str, str]]) -> str:
+    labels = list(labels)
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{k}="{_escape_label_value(v)}"' for k, v in labels) + '}'
+
+
+def _format_number(value: float) -> str:
+    if value == float('inf'):
+        return '+Inf'
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class Histogram:
+    """固定分桶的直方圖"""
+
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        self.counts = [0] * len(self.buckets)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.sum += value
+        self.count += 1
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+
+    def cumulative(self) -> List[Tuple[float, int]]:
+        """返回累計分桶 [(上界, 數量)]，最後一項為 +Inf"""
+        result = []
+        running = 0
+        for bound, count in zip(self.buckets, self.counts):
+            running += count
+            result.append((bound, running))
+        result.append((float('inf'), self.count))
+        return result
+
+    def quantile(self, q: float) -> float:
+        """以分桶上界估計分位數"""
+        if not self.count:
+            return None
+        target = q * self.count
+        for bound, running in self.cumulative():
+            if running >= target:
+                return bound if bound != float('inf') else self.buckets[-1]
+        return self.buckets[-1]
+
+    def merge(self, data: Dict):
+        """合併另一個直方圖的 JSON 表示（分桶必須相同）"""
+        previous = 0
+        for i, (bound, running) in enumerate(data['buckets']):
+            if i < len(self.counts):
+                self.counts[i] += running - previous
+            previous = running
+        self.sum += data['sum']
+        self.count += data['count']
+
+
+class MetricsRegistry:
+    """執行緒安全的指標註冊表"""
+
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self._lock = threading.Lock()
+        self._buckets = buckets
+        self.counters: Dict[str, Dict[LabelKey, float]] = {}
+        self.histograms: Dict[str, Dict[LabelKey, Histogram]] = {}
+
+    def inc(self, name: str, value: float = 1, **labels):
+        """增加計數器"""
+        key = _label_key(labels)
+        with self._lock:
+            series = self.counters.setdefault(name, {})
+            series[key] = series.get(key, 0) + value
+
+    def observe(self, name: str, value: float, **labels):
+        """記錄一次直方圖觀測值"""
+        key = _label_key(labels)
+        with self._lock:
+            series = self.histograms.setdefault(name, {})
+            histogram = series.get(key)
+            if histogram is None:
+                histogram = series[key] = Histogram(self._buckets)
+            histogram.observe(value)
+
+    @contextmanager
+    def time(self, name: str, **labels):
+        """計時區塊並記錄到直方圖"""
+        started_at = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - started_at, **labels)
+
+    def provider_call(self, provider: str, operation: str):
+        """計時一次外部服務呼叫並計數"""
+        self.inc('podcast_provider_calls_total', provider=provider, operation=operation)
+        return self.time('podcast_provider_call_seconds', provider=provider, operation=operation)
+
+    def to_dict(self) -> Dict:
+        """匯出為可嵌入報告的 JSON 結構"""
+        with self._lock:
+            counters = [
+                {'name': name, 'labels': dict(key), 'value': value}
+                for name, series in sorted(self.counters.items())
+                for key, value in sorted(series.items())
+            ]
+            histograms = []
+            for name, series in sorted(self.histograms.items()):
+                for key, histogram in sorted(series.items()):
+                    histograms.append({
+                        'name': name,
+                        'labels': dict(key),
+                        'count': histogram.count,
+                        'sum': round(histogram.sum, 6),
+                        'mean': round(histogram.sum / histogram.count, 6) if histogram.count else None,
+                        'p50': histogram.quantile(0.5),
+                        'p95': histogram.quantile(0.95),
+                        'buckets': [
+                            [_format_number(bound), running]
+                            for bound, running in histogram.cumulative()
+                        ]
+                    })
+        return {'counters': counters, 'histograms': histograms}
+
+    def merge(self, data: Dict):
+        """合併其他註冊表匯出的 JSON（例如來自工作行程）"""
+        for counter in data.get('counters', []):
+            self.inc(counter['name'], counter['value'], **counter['labels'])
+        with self._lock:
+            for item in data.get('histograms', []):
+                series = self.histograms.setdefault(item['name'], {})
+                key = _label_key(item['labels'])
+                histogram = series.get(key)
+                if histogram is None:
+                    histogram = series[key] = Histogram(self._buckets)
+                histogram.merge(item)
+
+    def to_prometheus(self) -> str:
+        """匯出為 Prometheus 文字格式"""
+        lines = []
+        with self._lock:
+            for name, series in sorted(self.counters.items()):
+                if name in METRIC_HELP:
+                    lines.append(f'# HELP {name} {METRIC_HELP[name]}')
+                lines.append(f'# TYPE {name} counter')
+                for key, value in sorted(series.items()):
+                    lines.append(f'{name}{_format_labels(key)} {_format_number(value)}')
+            for name, series in sorted(self.histograms.items()):
+                if name in METRIC_HELP:
+                    lines.append(f'# HELP {name} {METRIC_HELP[name]}')
+                lines.append(f'# TYPE {name} histogram')
+                for key, histogram in sorted(series.items()):
+                    for bound, running in histogram.cumulative():
+                        labels = key + (('le', _format_number(bound)),)
+                        lines.append(f'{name}_bucket{_format_labels(labels)} {running}')
+                    lines.append(f'{name}_sum{_format_labels(key)} {_format_number(round(histogram.sum, 6))}')
+                    lines.append(f'{name}_count{_format_labels(key)} {histogram.count}')
+        return '\n'.join(lines) + '\n'
+
+    def write(self, output_dir: str, basename: str = 'metrics'):
+        """將指標寫入 output_dir 中的 .prom 與 .json 文件"""
+        prom_path = os.path.join(output_dir, f"{basename}.prom")
+        with open(prom_path, 'w', encoding='utf-8') as f:
+            f.write(self.to_prometheus())
+        json_path = os.path.join(output_dir, f"{basename}.json")
+        with open(json_path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f, ensure_ascii=False, indent=2)
+        return prom_path, json_path
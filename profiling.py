@@ -0,0 +1,240 @@
+#!/usr/bin/env python3
+"""
+效能分析模式 - 各階段 cProfile、tracemalloc 記憶體統計與取樣式堆疊
+輸出的 stacks.collapsed 可直接交給 flamegraph.pl / speedscope 等工具繪製火焰圖
+"""
+
+import cProfile
+import json
+import logging
+import os
+import pstats
+import random
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from contextlib import contextmanager
+from typing import Dict, List, Tuple
+
+logger = logging.getLogger(__name__)
+
+# 預設取樣間隔（秒）；每次取樣只走訪各執行緒的堆疊，負擔很低
+DEFAULT_SAMPLE_INTERVAL = 0.02
+
+
+def should_profile(rate: float) -> bool:
+    """依比例決定本次執行是否啟用分析，方便只對部分正式工作開啟"""
+    return rate >= 1.0 or random.random() < rate
+
+
+def add_profile_arguments(parser):
+    """為 CLI 加入效能分析相關參數"""
+    parser.add_argument(
+        '--profile',
+        action='store_true',
+        help='啟用效能分析，結果寫入輸出目錄的 profile/ 子目錄'
+    )
+    parser.add_argument(
+        '--profile-interval',
+        type=float,
+        default=DEFAULT_SAMPLE_INTERVAL * 1000,
+        help=f'堆疊取樣間隔毫秒數 (預設: {DEFAULT_SAMPLE_INTERVAL * 1000:.0f})'
+    )
+    parser.add_argument(
+        '--profile-rate',
+        type=float,
+        default=1.0,
+        help='啟用分析的機率 0-1，用於只分析部分正式工作 (預設: 1.0)'
+    )
+
+
+def create_profiler(args, output_dir: str):
+    """依 CLI 參數建立分析器；未啟用或未被抽中時返回 None"""
+    if not args.profile or not should_profile(args.profile_rate):
+        return None
+    return Profiler(os.path.join(output_dir, 'profile'), interval=args.profile_interval / 1000)
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    label = f"{os.path.basename(code.co_filename)}:{code.co_name}"
+    # collapsed 格式以 ';' 分隔框架、以空白分隔計數
+    return label.replace(';', ':').replace(' ', '_')
+
+
+class Profiler:
+    """收集各階段的 cProfile 資料、記憶體配置與取樣堆疊"""
+
+    def __init__(self, output_dir: str, interval: float = DEFAULT_SAMPLE_INTERVAL,
+                 tracemalloc_frames: int = 1, top_allocations: int = 20):
+        self.output_dir = output_dir
+        self.interval = interval
+        self.tracemalloc_frames = tracemalloc_frames
+        self.top_allocations = top_allocations
+
+        self._lock = threading.Lock()
+        self._profiles: Dict[Tuple[str, int], cProfile.Profile] = {}
+        self._thread_stages: Dict[int, List[str]] = {}
+        self._thread_profiling: Dict[int, bool] = {}
+        self._stage_seconds: Counter = Counter()
+        self._stage_calls: Counter = Counter()
+        self._samples: Counter = Counter()
+        self._sample_count = 0
+        self._sampler = None
+        self._stop_event = threading.Event()
+        self._started_at = None
+
+    def start(self):
+        """開始記憶體追蹤與堆疊取樣"""
+        self._started_at = time.perf_counter()
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(self.tracemalloc_frames)
+        self._stop_event.clear()
+        self._sampler = threading.Thread(target=self._sample_loop, name='profiler-sampler', daemon=True)
+        self._sampler.start()
+
+    def _sample_loop(self):
+        own_id = threading.get_ident()
+        names = {}
+        while not self._stop_event.wait(self.interval):
+            frames = sys._current_frames()
+            for thread in threading.enumerate():
+                names[thread.ident] = thread.name
+            with self._lock:
+                for thread_id, frame in frames.items():
+                    if thread_id == own_id:
+                        continue
+                    stack = []
+                    while frame is not None:
+                        stack.append(_frame_label(frame))
+                        frame = frame.f_back
+                    stages = self._thread_stages.get(thread_id)
+                    root = stages[-1] if stages else names.get(thread_id, str(thread_id))
+                    stack.append(root.replace(' ', '_'))
+                    self._samples[';'.join(reversed(stack))] += 1
+                self._sample_count += 1
+
+    @contextmanager
+    def stage(self, name: str):
+        """標記一段同步程式碼屬於某個處理階段
+
+        同一執行緒上巢狀的階段只由最外層啟用 cProfile。
+        """
+        thread_id = threading.get_ident()
+        profile = None
+        with self._lock:
+            self._thread_stages.setdefault(thread_id, []).append(name)
+            if not self._thread_profiling.get(thread_id):
+                profile = self._profiles.get((name, thread_id))
+                if profile is None:
+                    profile = self._profiles[(name, thread_id)] = cProfile.Profile()
+                self._thread_profiling[thread_id] = True
+
+        if profile is not None:
+            try:
+                profile.enable()
+            except ValueError:
+                # Python 3.12+ 同時只允許一個分析器啟用，此時僅保留取樣資料
+                profile = None
+                with self._lock:
+                    self._thread_profiling[thread_id] = False
+
+        started_at = time.perf_counter()
+        try:
+            yield
+        finally:
+            if profile is not None:
+                profile.disable()
+            elapsed = time.perf_counter() - started_at
+            with self._lock:
+                self._thread_stages[thread_id].pop()
+                if profile is not None:
+                    self._thread_profiling[thread_id] = False
+                self._stage_seconds[name] += elapsed
+                self._stage_calls[name] += 1
+
+    def stop(self) -> str:
+        """停止分析並寫出所有結果，返回輸出目錄"""
+        self._stop_event.set()
+        if self._sampler:
+            self._sampler.join()
+
+        os.makedirs(self.output_dir, exist_ok=True)
+        summary = {
+            'elapsed': round(time.perf_counter() - self._started_at, 3) if self._started_at else None,
+            'sample_interval': self.interval,
+            'samples': self._sample_count,
+            'stages': {},
+            'memory': self._write_memory_report()
+        }
+
+        self._write_collapsed_stacks()
+        stage_samples = Counter()
+        for stack, count in self._samples.items():
+            stage_samples[stack.split(';', 1)[0]] += count
+
+        for stage in sorted(self._stage_calls):
+            summary['stages'][stage] = {
+                'calls': self._stage_calls[stage],
+                'seconds': round(self._stage_seconds[stage], 3),
+                'samples': stage_samples.get(stage, 0),
+                'pstats': self._write_stage_profile(stage)
+            }
+
+        summary_path = os.path.join(self.output_dir, 'profile_summary.json')
+        with open(summary_path, 'w', encoding='utf-8') as f:
+            json.dump(summary, f, ensure_ascii=False, indent=2)
+
+        logger.info(f"🔬 效能分析結果已保存: {self.output_dir}")
+        return self.output_dir
+
+    def _write_collapsed_stacks(self):
+        path = os.path.join(self.output_dir, 'stacks.collapsed')
+        with open(path, 'w', encoding='utf-8') as f:
+            for stack, count in self._samples.most_common():
+                f.write(f"{stack} {count}\n")
+
+    def _write_stage_profile(self, stage: str) -> str:
+        profiles = [p for (name, _), p in self._profiles.items() if name == stage]
+        if not profiles:
+            return None
+        stats = None
+        for profile in profiles:
+            try:
+                if stats is None:
+                    stats = pstats.Stats(profile)
+                else:
+                    stats.add(profile)
+            except TypeError:
+                # 該執行緒沒有收集到任何呼叫
+                continue
+        if stats is None:
+            return None
+
+        path = os.path.join(self.output_dir, f'{stage}.pstats')
+        stats.dump_stats(path)
+        with open(os.path.join(self.output_dir, f'{stage}.txt'), 'w', encoding='utf-8') as f:
+            stats.stream = f
+            stats.sort_stats('cumulative').print_stats(30)
+        return os.path.basename(path)
+
+    def _write_memory_report(self) -> Dict:
+        if not tracemalloc.is_tracing():
+            return None
+        current, peak = tracemalloc.get_traced_memory()
+        snapshot = tracemalloc.take_snapshot()
+        tracemalloc.stop()
+
+        top = snapshot.statistics('lineno')[:self.top_allocations]
+        allocations = [
+            {'location': str(stat.traceback[0]), 'size': stat.size, 'count': stat.count}
+            for stat in top
+        ]
+        with open(os.path.join(self.output_dir, 'memory.txt'), 'w', encoding='utf-8') as f:
+            f.write(f"current: {current / 1024 / 1024:.2f} MB\n")
+            f.write(f"peak: {peak / 1024 / 1024:.2f} MB\n\n")
+            for stat in top:
+                f.write(f"{stat}\n")
+        return {'current_bytes': current, 'peak_bytes': peak, 'top_allocations': allocations}
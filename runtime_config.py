@@ -0,0 +1,432 @@
+#!/usr/bin/env python3
+"""
+執行期配置 - 將 examples/configs/*.yaml 載入為經過驗證的型別化配置
+
+未在 YAML 中設定的欄位使用預設值，預設值與不使用 --config 時的行為一致；
+值為 None 的欄位表示沿用環境變數（.env）的設定。
+"""
+
+import logging
+import os
+import typing
+from dataclasses import dataclass, field, fields, is_dataclass, asdict
+from typing import Dict, List, Optional
+
+CONFIG_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'examples', 'configs')
+
+# --config 可直接使用的設定檔名稱
+PROFILES = {
+    'default': 'default_config.yaml',
+    'fast': 'fast_processing_config.yaml',
+    'high_quality': 'high_quality_config.yaml',
+}
+
+TRANSLATION_PROVIDERS = ('google', 'openai', 'gemini')
+TRANSCRIPTION_BACKENDS = ('openai', 'local')
+JOB_ORDERS = ('longest', 'shortest', 'name')
+TRANSCRIPT_FORMATS = ('json', 'columnar', 'both')
+TTS_PROVIDERS = ('edge',)
+LOG_LEVELS = ('DEBUG', 'INFO', 'WARNING', 'ERROR')
+
+# 只做驗證、尚未影響處理流程的設定；設定為非預設值時載入配置會記錄警告
+UNSUPPORTED_SETTINGS = (
+    'audio.quality',
+    'whisper.fp16',
+    'dialogue.advanced_analysis',
+    'dialogue.intonation_adjustment',
+    'processing.quality_check',
+    'output.create_detailed_analysis',
+    'output.audio_normalization',
+    'performance.memory_optimization',
+    'performance.cpu_optimization',
+    'performance.io_optimization',
+    'quality.min_confidence',
+    'quality.audio_validation',
+    'quality.transcript_validation',
+    'quality.output_verification',
+)
+
+logger = logging.getLogger(__name__)
+
+
+class ConfigError(ValueError):
+    """配置文件內容無效"""
+
+
+@dataclass
+class AudioConfig:
+    input_format: List[str] = field(default_factory=lambda: ['wav', 'mp3', 'm4a', 'aac', 'flac', 'ogg', 'opus'])
+    output_format: str = 'wav'
+    sample_rate: Optional[int] = None      # None 表示沿用合成音頻的採樣率
+    channels: Optional[int] = None
+    quality: str = 'standard'
+
+
+@dataclass
+class WhisperConfig:
+    backend: Optional[str] = None          # openai 或 local；None 表示使用 TRANSCRIPTION_BACKEND（預設 openai）
+    model: str = 'base'                    # 本地模型大小或模型目錄；OpenAI API 固定使用 whisper-1
+    model_dir: Optional[str] = None        # 本地模型目錄，None 表示使用 WHISPER_MODEL_DIR
+    device: str = 'cpu'
+    compute_type: str = 'int8'             # 本地模型精度：int8、int8_float32、float32（GPU 可用 float16）
+    cpu_threads: int = 0                   # 0 表示由 CTranslate2 決定
+    language: Optional[str] = None
+    word_timestamps: bool = False
+    temperature: float = 0.0
+    fp16: bool = False
+    beam_size: Optional[int] = None
+
+
+@dataclass
+class TranslationConfig:
+    provider: Optional[str] = None         # None 表示使用 TRANSLATION_PROVIDER
+    source_language: str = 'en'
+    target_language: str = 'zh-TW'
+    preserve_dialogue: bool = True
+    enhance_naturalness: bool = True
+    batch_translate: bool = False
+    context_aware: bool = False
+
+
+@dataclass
+class VoicesConfig:
+    female: Optional[str] = None           # None 表示使用 EDGE_TTS_VOICE_FEMALE
+    male: Optional[str] = None
+
+
+@dataclass
+class TTSConfig:
+    provider: str = 'edge'
+    voices: VoicesConfig = field(default_factory=VoicesConfig)
+    speech_rate: float = 1.0
+    speech_pitch: int = 0
+    add_pauses: bool = True
+    prosody_adjustment: bool = True
+    emotion_enhancement: bool = False
+    session_pool_size: int = 4             # 長駐的 Edge TTS 連線數，0 表示每個片段各自連線
+
+
+@dataclass
+class PauseDurationConfig:
+    short: int = 300
+    medium: int = 500
+    long: int = 1000
+
+
+@dataclass
+class DialogueRulesConfig:
+    """對話特徵關鍵詞，以單字邊界比對且不分大小寫；含空白的項目視為片語"""
+    question_marks: List[str] = field(default_factory=lambda: ['?'])
+    question_words: List[str] = field(default_factory=lambda: ['what', 'how', 'why', 'when', 'where', 'who'])
+    response_words: List[str] = field(default_factory=lambda: ['well', 'actually', 'so', 'yeah', 'right', 'exactly'])
+    transition_words: List[str] = field(default_factory=lambda: ['speaking of', 'by the way', 'another thing', 'also'])
+
+
+@dataclass
+class DialogueConfig:
+    speaker_detection: bool = True
+    dialogue_enhancement: bool = True
+    natural_flow: bool = True
+    advanced_analysis: bool = False
+    pause_duration: PauseDurationConfig = field(default_factory=PauseDurationConfig)
+    intonation_adjustment: bool = False
+    rules: DialogueRulesConfig = field(default_factory=DialogueRulesConfig)
+
+
+@dataclass
+class ResourceLimitsConfig:
+    """批次處理時全部文件共用的服務商並發上限"""
+    transcription: int = 2
+    translation: int = 8
+    tts: int = 6
+
+
+@dataclass
+class ProcessingConfig:
+    concurrent_limit: int = 1
+    temp_cleanup: bool = True
+    progress_reporting: Optional[bool] = None   # None 表示使用 PROGRESS_REPORTING
+    error_recovery: bool = True
+    skip_validation: bool = False
+    quality_check: bool = False
+    job_order: str = 'longest'                 # longest 縮短整批時間，shortest 降低平均等待，name 依檔名
+    resource_limits: ResourceLimitsConfig = field(default_factory=ResourceLimitsConfig)
+
+
+@dataclass
+class OutputConfig:
+    create_transcript: bool = True
+    create_segments: bool = True
+    create_report: bool = True
+    create_detailed_analysis: bool = False
+    timestamp_format: str = 'seconds'
+    transcript_format: str = 'json'            # json、columnar（transcript.ptc）或 both
+    search_index: Optional[str] = None         # 全文檢索索引路徑，None 表示使用 SEARCH_INDEX（未設定則不索引）
+    minimal_output: bool = False
+    audio_normalization: bool = False
+
+
+@dataclass
+class LoggingConfig:
+    level: Optional[str] = None            # None 表示使用 LOG_LEVEL
+    file_logging: bool = False
+    console_logging: bool = True
+    max_log_size: str = '10MB'
+    backup_count: int = 5
+
+    @property
+    def max_bytes(self) -> int:
+        return parse_size(self.max_log_size)
+
+
+@dataclass
+class PerformanceConfig:
+    memory_optimization: bool = False
+    cpu_optimization: bool = False
+    io_optimization: bool = False
+    cache_enabled: bool = False
+
+
+@dataclass
+class NetworkConfig:
+    """各服務商共用的 HTTP 連線池（每個行程一個）"""
+    pool_connections: int = 10             # 保留連線池的主機數
+    pool_maxsize: int = 10                 # 每個主機保留的 keep-alive 連線數
+    connect_timeout: float = 10.0
+    read_timeout: float = 120.0
+    keepalive_expiry: float = 30.0         # 閒置連線保留秒數（httpx）
+    http2: bool = True                     # 安裝 h2 時 OpenAI 客戶端使用 HTTP/2
+
+
+@dataclass
+class PreviewConfig:
+    """main.py --preview：翻譯到任一上限即停止"""
+    segments: int = 5                      # 最多預覽的片段數
+    seconds: Optional[float] = None        # 只預覽開始於此秒數之前的片段，None 表示不限
+    window_seconds: Optional[float] = None # 只轉錄音頻開頭的秒數，None 表示轉錄整個文件
+
+
+@dataclass
+class QualityConfig:
+    min_confidence: float = 0.0
+    audio_validation: bool = False
+    transcript_validation: bool = False
+    output_verification: bool = False
+
+
+@dataclass
+class RuntimeConfig:
+    audio: AudioConfig = field(default_factory=AudioConfig)
+    whisper: WhisperConfig = field(default_factory=WhisperConfig)
+    translation: TranslationConfig = field(default_factory=TranslationConfig)
+    tts: TTSConfig = field(default_factory=TTSConfig)
+    dialogue: DialogueConfig = field(default_factory=DialogueConfig)
+    processing: ProcessingConfig = field(default_factory=ProcessingConfig)
+    output: OutputConfig = field(default_factory=OutputConfig)
+    logging: LoggingConfig = field(default_factory=LoggingConfig)
+    performance: PerformanceConfig = field(default_factory=PerformanceConfig)
+    network: NetworkConfig = field(default_factory=NetworkConfig)
+    preview: PreviewConfig = field(default_factory=PreviewConfig)
+    quality: QualityConfig = field(default_factory=QualityConfig)
+    source: Optional[str] = None           # 載入的配置文件路徑
+
+    def to_dict(self) -> Dict:
+        return asdict(self)
+
+    def validate(self):
+        """檢查數值範圍與選項，無效時拋出 ConfigError"""
+        _check(self.audio.output_format == 'wav', 'audio.output_format 目前只支援 wav')
+        _check(self.audio.sample_rate is None or 8000 <= self.audio.sample_rate <= 48000,
+               'audio.sample_rate 必須介於 8000 與 48000 之間')
+        _check(self.audio.channels in (None, 1, 2), 'audio.channels 必須為 1 或 2')
+        _check(bool(self.audio.input_format), 'audio.input_format 不可為空')
+        _check(0.0 <= self.whisper.temperature <= 1.0, 'whisper.temperature 必須介於 0 與 1 之間')
+        _check(self.whisper.backend is None or self.whisper.backend in TRANSCRIPTION_BACKENDS,
+               f"whisper.backend 必須為 {', '.join(TRANSCRIPTION_BACKENDS)} 之一")
+        _check(self.whisper.cpu_threads >= 0, 'whisper.cpu_threads 不可為負數')
+        _check(self.translation.provider is None or self.translation.provider in TRANSLATION_PROVIDERS,
+               f"translation.provider 必須為 {', '.join(TRANSLATION_PROVIDERS)} 之一")
+        _check(self.tts.provider in TTS_PROVIDERS, f"tts.provider 必須為 {', '.join(TTS_PROVIDERS)} 之一")
+        _check(0.5 <= self.tts.speech_rate <= 2.0, 'tts.speech_rate 必須介於 0.5 與 2.0 之間')
+        _check(-50 <= self.tts.speech_pitch <= 50, 'tts.speech_pitch 必須介於 -50 與 50 之間 (Hz)')
+        _check(self.tts.session_pool_size >= 0, 'tts.session_pool_size 不可為負數')
+        pause = self.dialogue.pause_duration
+        _check(0 <= pause.short <= pause.medium <= pause.long,
+               'dialogue.pause_duration 必須滿足 0 <= short <= medium <= long')
+        _check(self.processing.concurrent_limit >= 1, 'processing.concurrent_limit 必須至少為 1')
+        _check(self.processing.job_order in JOB_ORDERS,
+               f"processing.job_order 必須為 {', '.join(JOB_ORDERS)} 之一")
+        _check(all(value >= 1 for value in asdict(self.processing.resource_limits).values()),
+               'processing.resource_limits 的每項上限必須至少為 1')
+        _check(self.output.timestamp_format in ('seconds', 'milliseconds'),
+               'output.timestamp_format 必須為 seconds 或 milliseconds')
+        rules = self.dialogue.rules
+        _check(all(keyword.strip() for keyword in rules.question_marks + rules.question_words
+                   + rules.response_words + rules.transition_words),
+               'dialogue.rules 的關鍵詞不可為空字串')
+        network = self.network
+        _check(network.pool_connections >= 1 and network.pool_maxsize >= 1,
+               'network.pool_connections 與 network.pool_maxsize 必須至少為 1')
+        _check(network.connect_timeout > 0 and network.read_timeout > 0 and network.keepalive_expiry >= 0,
+               'network 的逾時秒數必須為正數')
+        preview = self.preview
+        _check(preview.segments >= 1, 'preview.segments 必須至少為 1')
+        _check(all(value is None or value > 0 for value in (preview.seconds, preview.window_seconds)),
+               'preview.seconds 與 preview.window_seconds 必須為正數')
+        _check(self.output.transcript_format in TRANSCRIPT_FORMATS,
+               f"output.transcript_format 必須為 {', '.join(TRANSCRIPT_FORMATS)} 之一")
+        _check(self.logging.level is None or self.logging.level in LOG_LEVELS,
+               f"logging.level 必須為 {', '.join(LOG_LEVELS)} 之一")
+        _check(self.logging.backup_count >= 0, 'logging.backup_count 不可為負數')
+        parse_size(self.logging.max_log_size)
+        _check(0.0 <= self.quality.min_confidence <= 1.0, 'quality.min_confidence 必須介於 0 與 1 之間')
+        return self
+
+    def unsupported_settings(self) -> List[str]:
+        """返回設定為非預設值、但目前不會生效的項目"""
+        defaults = RuntimeConfig()
+        changed = []
+        for path in UNSUPPORTED_SETTINGS:
+            section, name = path.split('.')
+            if getattr(getattr(self, section), name) != getattr(getattr(defaults, section), name):
+                changed.append(path)
+        return changed
+
+    @property
+    def edge_rate(self) -> str:
+        """Edge TTS 的語速參數，例如 1.1 → '+10%'"""
+        return f"{round((self.tts.speech_rate - 1.0) * 100):+d}%"
+
+    @property
+    def edge_pitch(self) -> str:
+        """Edge TTS 的音高參數，例如 0 → '+0Hz'"""
+        return f"{self.tts.speech_pitch:+d}Hz"
+
+
+def _check(condition: bool, message: str):
+    if not condition:
+        raise ConfigError(message)
+
+
+def parse_size(value: str) -> int:
+    """將 '10MB' 這類大小字串轉換為位元組數"""
+    text = str(value).strip().upper()
+    for unit, factor in (('GB', 1024 ** 3), ('MB', 1024 ** 2), ('KB', 1024), ('B', 1)):
+        if text.endswith(unit):
+            number = text[:-len(unit)].strip()
+            try:
+                return int(float(number) * factor)
+            except ValueError:
+                break
+    raise ConfigError(f"無效的大小設定: {value}")
+
+
+def _normalize_language(code: str) -> str:
+    """將 zh-tw 等語言代碼轉為翻譯服務接受的大小寫（zh-TW）"""
+    if '-' in code:
+        language, region = code.split('-', 1)
+        return f"{language.lower()}-{region.upper()}"
+    return code.lower()
+
+
+def _coerce(value, annotation, path: str):
+    """依欄位型別檢查並轉換 YAML 值"""
+    origin = typing.get_origin(annotation)
+    args = typing.get_args(annotation)
+
+    if origin is typing.Union:
+        if value is None:
+            return None
+        inner = [arg for arg in args if arg is not type(None)][0]
+        return _coerce(value, inner, path)
+    if is_dataclass(annotation):
+        if not isinstance(value, dict):
+            raise ConfigError(f"{path} 必須是區段（mapping）")
+        return _build(annotation, value, path)
+    if origin in (list, List):
+        if isinstance(value, str):
+            value = [value]
+        if not isinstance(value, list):
+            raise ConfigError(f"{path} 必須是列表")
+        return [_coerce(item, args[0], f"{path}[]") for item in value]
+    if annotation is bool:
+        if not isinstance(value, bool):
+            raise ConfigError(f"{path} 必須是 true 或 false")
+        return value
+    if annotation is int:
+        if isinstance(value, bool) or not isinstance(value, int):
+            raise ConfigError(f"{path} 必須是整數")
+        return value
+    if annotation is float:
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            raise ConfigError(f"{path} 必須是數值")
+        return float(value)
+    if annotation is str:
+        if not isinstance(value, (str, int, float)) or isinstance(value, bool):
+            raise ConfigError(f"{path} 必須是字串")
+        return str(value)
+    return value
+
+
+def _build(cls, data: Dict, path: str = ''):
+    """以 YAML 區段建立 dataclass，未知的鍵視為錯誤以便發現拼字錯誤"""
+    hints = typing.get_type_hints(cls)
+    known = {f.name for f in fields(cls) if f.name != 'source'}
+    unknown = sorted(set(data) - known)
+    if unknown:
+        location = f"{path} 區段" if path else "最上層"
+        raise ConfigError(f"{location}包含未知的設定: {', '.join(unknown)}")
+    values = {}
+    for name, value in data.items():
+        values[name] = _coerce(value, hints[name], f"{path}.{name}" if path else name)
+    return cls(**values)
+
+
+def resolve_config_path(name_or_path: str) -> str:
+    """將設定檔名稱（fast、high_quality、default）或路徑轉為實際路徑"""
+    if name_or_path in PROFILES:
+        return os.path.join(CONFIG_DIR, PROFILES[name_or_path])
+    return name_or_path
+
+
+def load_config(name_or_path: str = None) -> RuntimeConfig:
+    """載入並驗證配置；未指定時返回預設配置"""
+    if not name_or_path:
+        return RuntimeConfig()
+
+    path = resolve_config_path(name_or_path)
+    if not os.path.exists(path):
+        raise ConfigError(f"找不到配置文件: {name_or_path}")
+
+    import yaml
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            data = yaml.safe_load(f) or {}
+    except yaml.YAMLError as e:
+        raise ConfigError(f"無法解析配置文件 {path}: {e}")
+    if not isinstance(data, dict):
+        raise ConfigError(f"配置文件 {path} 的最上層必須是 mapping")
+
+    config = _build(RuntimeConfig, data)
+    config.source = path
+    if config.translation.provider:
+        config.translation.provider = config.translation.provider.lower()
+    if config.logging.level:
+        config.logging.level = config.logging.level.upper()
+    config.translation.source_language = _normalize_language(config.translation.source_language)
+    config.translation.target_language = _normalize_language(config.translation.target_language)
+    config.audio.input_format = [fmt.lower().lstrip('.') for fmt in config.audio.input_format]
+    config.validate()
+    unsupported = config.unsupported_settings()
+    if unsupported:
+        logger.warning(f"配置文件 {path} 中的下列設定目前不會生效: {', '.join(unsupported)}")
+    return config
+
+
+def add_config_argument(parser):
+    """為 CLI 加入 --config 參數"""
+    parser.add_argument(
+        '--config',
+        metavar='PROFILE_OR_PATH',
+        help=f"效能配置文件路徑，或內建設定檔名稱 ({', '.join(PROFILES)})"
+    )
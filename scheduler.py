@@ -0,0 +1,246 @@
+#!/usr/bin/env python3
+"""
+資源排程器 - 批次處理時跨文件共用的語音識別、翻譯與語音合成並發上限
+
+每種資源有獨立的容量，等待中的工作依文件輪流取得名額（公平佇列），
+避免長文件佔滿服務商額度而讓其他文件長時間等待。
+使用工作行程池時，各行程的排程器另外向 manager 行程中的 SharedCapacity
+取得名額，整批的並發上限與依文件輪流分配因此跨行程成立。
+"""
+
+import asyncio
+import multiprocessing
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from multiprocessing.managers import BaseManager
+from typing import Dict, Tuple
+
+from log_manager import current_job_context
+
+# 預設容量：Whisper 上傳大文件，並發數較低；翻譯與 TTS 為短請求
+DEFAULT_LIMITS = {
+    'transcription': 2,
+    'translation': 8,
+    'tts': 6,
+}
+
+
+class ResourcePool:
+    """單一資源的並發名額，等待者依工作輪流分配"""
+
+    def __init__(self, name: str, capacity: int):
+        self.name = name
+        self.capacity = max(1, capacity)
+        self.in_use = 0
+        self.max_in_use = 0
+        self.granted = 0
+        self.wait_seconds = 0.0
+        self.granted_by_job: Dict[str, int] = {}
+        self._queues: Dict[str, deque] = {}
+        self._order = deque()
+
+    @property
+    def waiting(self) -> int:
+        return sum(len(queue) for queue in self._queues.values())
+
+    async def acquire(self, job_id: str):
+        """取得一個名額；名額已滿時排入該工作的佇列"""
+        started_at = time.perf_counter()
+        if self.in_use < self.capacity and not self._order:
+            self._take(job_id)
+        else:
+            future = asyncio.get_running_loop().create_future()
+            queue = self._queues.get(job_id)
+            if queue is None:
+                queue = self._queues[job_id] = deque()
+                self._order.append(job_id)
+            queue.append((job_id, future))
+            try:
+                await future
+            except asyncio.CancelledError:
+                if future.done() and not future.cancelled():
+                    # 已分配名額但呼叫端被取消，歸還名額
+                    self.release()
+                else:
+                    self._discard(job_id, future)
+                raise
+        wait = time.perf_counter() - started_at
+        self.wait_seconds += wait
+        return wait
+
+    def release(self):
+        """歸還名額並分配給下一個輪到的工作"""
+        self.in_use -= 1
+        self._grant()
+
+    def _take(self, job_id: str):
+        self.in_use += 1
+        self.granted += 1
+        self.max_in_use = max(self.max_in_use, self.in_use)
+        self.granted_by_job[job_id] = self.granted_by_job.get(job_id, 0) + 1
+
+    def _grant(self):
+        while self.in_use < self.capacity and self._order:
+            job_id = self._order.popleft()
+            queue = self._queues[job_id]
+            _, future = queue.popleft()
+            if queue:
+                # 還有等待項目的工作排到隊尾，輪流分配
+                self._order.append(job_id)
+            else:
+                del self._queues[job_id]
+            if future.cancelled():
+                continue
+            self._take(job_id)
+            future.set_result(None)
+
+    def _discard(self, job_id: str, future):
+        queue = self._queues.get(job_id)
+        if queue is None:
+            return
+        for item in list(queue):
+            if item[1] is future:
+                queue.remove(item)
+                break
+        if not queue:
+            del self._queues[job_id]
+            self._order.remove(job_id)
+
+    def stats(self) -> Dict:
+        return {
+            'capacity': self.capacity,
+            'granted': self.granted,
+            'max_in_use': self.max_in_use,
+            'mean_wait_seconds': round(self.wait_seconds / self.granted, 4) if self.granted else None,
+            'granted_by_job': dict(self.granted_by_job)
+        }
+
+
+class SharedCapacity:
+    """跨行程共用的資源名額，在 manager 行程中執行
+
+    每個呼叫由 manager 的獨立執行緒處理，acquire 會阻塞到取得名額；
+    等待者與 ResourcePool 相同依工作輪流分配。
+    """
+
+    def __init__(self, limits: Dict[str, int] = None):
+        limits = {**DEFAULT_LIMITS, **(limits or {})}
+        self._lock = threading.Lock()
+        self.capacity = {name: max(1, capacity) for name, capacity in limits.items()}
+        self.in_use = dict.fromkeys(limits, 0)
+        self.max_in_use = dict.fromkeys(limits, 0)
+        self.granted = dict.fromkeys(limits, 0)
+        self._queues: Dict[str, Dict[str, deque]] = {name: {} for name in limits}
+        self._order: Dict[str, deque] = {name: deque() for name in limits}
+
+    def acquire(self, resource: str, job_id: str):
+        with self._lock:
+            if self.in_use[resource] < self.capacity[resource] and not self._order[resource]:
+                self._take(resource)
+                return
+            event = threading.Event()
+            queue = self._queues[resource].get(job_id)
+            if queue is None:
+                queue = self._queues[resource][job_id] = deque()
+                self._order[resource].append(job_id)
+            queue.append(event)
+        event.wait()
+
+    def release(self, resource: str):
+        with self._lock:
+            self.in_use[resource] -= 1
+            order = self._order[resource]
+            while self.in_use[resource] < self.capacity[resource] and order:
+                job_id = order.popleft()
+                queue = self._queues[resource][job_id]
+                event = queue.popleft()
+                if queue:
+                    order.append(job_id)
+                else:
+                    del self._queues[resource][job_id]
+                self._take(resource)
+                event.set()
+
+    def _take(self, resource: str):
+        self.in_use[resource] += 1
+        self.granted[resource] += 1
+        self.max_in_use[resource] = max(self.max_in_use[resource], self.in_use[resource])
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {name: {'capacity': self.capacity[name], 'granted': self.granted[name],
+                           'max_in_use': self.max_in_use[name]} for name in self.capacity}
+
+
+class _CapacityManager(BaseManager):
+    pass
+
+
+_CapacityManager.register('SharedCapacity', SharedCapacity)
+
+
+def start_shared_capacity(limits: Dict[str, int]) -> Tuple[BaseManager, SharedCapacity]:
+    """啟動 manager 行程並建立共用名額，返回 (manager, 可傳給工作行程的代理物件)"""
+    manager = _CapacityManager(ctx=multiprocessing.get_context('spawn'))
+    manager.start()
+    return manager, manager.SharedCapacity(limits)
+
+
+class ResourceScheduler:
+    """批次範圍的資源排程器，供同一事件迴圈中的所有文件共用
+
+    shared 為 SharedCapacity 代理物件時，取得本地名額後再取得跨行程名額。
+    """
+
+    def __init__(self, limits: Dict[str, int] = None, metrics=None, shared=None):
+        limits = {**DEFAULT_LIMITS, **(limits or {})}
+        self.pools = {name: ResourcePool(name, capacity) for name, capacity in limits.items()}
+        self.metrics = metrics
+        self.shared = shared
+        # 阻塞等待跨行程名額的專用執行緒，不佔用 asyncio.to_thread 的預設執行緒池
+        self._shared_threads = ThreadPoolExecutor(max_workers=sum(limits.values()),
+                                                  thread_name_prefix='shared-capacity') if shared else None
+
+    async def _acquire_shared(self, resource: str, job_id: str):
+        loop = asyncio.get_running_loop()
+        future = loop.run_in_executor(self._shared_threads, self.shared.acquire, resource, job_id)
+        try:
+            await asyncio.shield(future)
+        except asyncio.CancelledError:
+            # 執行緒仍會取得名額，取得後立即歸還
+            future.add_done_callback(
+                lambda done: done.cancelled() or done.exception() or self._shared_threads.submit(
+                    self.shared.release, resource))
+            raise
+
+    def capacity(self, resource: str) -> int:
+        return self.pools[resource].capacity
+
+    @asynccontextmanager
+    async def slot(self, resource: str, job_id: str = None):
+        """在區塊執行期間佔用一個資源名額；job_id 預設取自目前的工作上下文"""
+        pool = self.pools[resource]
+        job_id = job_id or current_job_context().get('job', 'default')
+        wait = await pool.acquire(job_id)
+        if self.shared is not None:
+            started_at = time.perf_counter()
+            try:
+                await self._acquire_shared(resource, job_id)
+            except BaseException:
+                pool.release()
+                raise
+            wait += time.perf_counter() - started_at
+        if self.metrics is not None:
+            self.metrics.observe('podcast_scheduler_wait_seconds', wait, resource=resource)
+        try:
+            yield
+        finally:
+            if self.shared is not None:
+                self._shared_threads.submit(self.shared.release, resource)
+            pool.release()
+
+    def stats(self) -> Dict:
+        return {name: pool.stats() for name, pool in self.pools.items()}
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+片段資料模型 - 以 __slots__ 儲存在各處理階段間流動的片段
+
+Segment 從語音識別一路傳到逐字稿，對話分析與翻譯直接更新同一個物件，
+不再於每個階段以 {**segment, ...} 複製整個字典。兩個類別都實作 MutableMapping，
+segment['speaker']、segment.get('is_question') 與 dict(segment) 等既有寫法照常可用；
+尚未設定的欄位視為不存在的鍵，因此 dict(segment) 與原本各階段輸出的字典相同。
+"""
+
+from collections.abc import MutableMapping
+from typing import Dict, Iterator
+
+DIALOGUE_FLAGS = ('is_question', 'is_response', 'is_transition')
+
+
+class _SlottedRecord(MutableMapping):
+    """以固定欄位儲存的紀錄；欄位以外的鍵存放在 extra"""
+
+    __slots__ = ('extra',)
+    _fields = ()
+    _field_set = frozenset()
+
+    @classmethod
+    def from_dict(cls, values) -> '_SlottedRecord':
+        record = cls.__new__(cls)
+        record.extra = None
+        for key, value in values.items():
+            record[key] = value
+        return record
+
+    def __getitem__(self, key):
+        if key in self._field_set:
+            try:
+                return getattr(self, key)
+            except AttributeError:
+                raise KeyError(key) from None
+        if self.extra is None:
+            raise KeyError(key)
+        return self.extra[key]
+
+    def __setitem__(self, key, value):
+        if key in self._field_set:
+            setattr(self, key, value)
+        else:
+            if self.extra is None:
+                self.extra = {}
+            self.extra[key] = value
+
+    def __delitem__(self, key):
+        if key in self._field_set:
+            try:
+                delattr(self, key)
+            except AttributeError:
+                raise KeyError(key) from None
+        elif self.extra is None:
+            raise KeyError(key)
+        else:
+            del self.extra[key]
+
+    def __iter__(self) -> Iterator[str]:
+        for name in self._fields:
+            if hasattr(self, name):
+                yield name
+        if self.extra:
+            yield from self.extra
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({dict(self)!r})"
+
+    def to_dict(self) -> Dict:
+        return dict(self)
+
+    def copy(self) -> '_SlottedRecord':
+        return self.from_dict(self)
+
+
+class Segment(_SlottedRecord):
+    """一個對話片段：語音識別填入時間與原文，對話分析與翻譯就地補上其餘欄位"""
+
+    _fields = ('start', 'end', 'text', 'words', 'speaker', *DIALOGUE_FLAGS, 'original_text', 'translated_text')
+    _field_set = frozenset(_fields)
+    __slots__ = _fields
+
+    def __init__(self, start: float, end: float, text: str, words: list = None, **extra):
+        self.start = start
+        self.end = end
+        self.text = text
+        self.words = [] if words is None else words
+        self.extra = None
+        # 關鍵字參數與 segment[key] = value 相同：欄位名稱存入欄位，其他鍵存入 extra
+        for key, value in extra.items():
+            self[key] = value
+
+    @property
+    def duration(self) -> float:
+        return self.end - self.start
+
+    def dialogue_type(self) -> Dict[str, bool]:
+        """對話類型旗標（尚未分析時皆為 False）"""
+        return {name: getattr(self, name, False) for name in DIALOGUE_FLAGS}
+
+
+class SegmentAudio(_SlottedRecord):
+    """合成後的片段音頻；混音時補上在輸出音頻中的幀位置"""
+
+    _fields = ('file', 'index', 'start', 'end', 'speaker', 'duration', 'offset_frames', 'length_frames')
+    _field_set = frozenset(_fields)
+    __slots__ = _fields
+
+    def __init__(self, file: str, index: int, start: float, end: float, speaker: str):
+        self.file = file
+        self.index = index
+        self.start = start
+        self.end = end
+        self.speaker = speaker
+        self.duration = end - start
+        self.extra = None
+
+
+def as_segment(segment) -> Segment:
+    """將字典片段轉換為 Segment；已是 Segment 時直接返回同一個物件"""
+    return segment if isinstance(segment, Segment) else Segment.from_dict(segment)
+
+
+def as_segment_audio(audio_info) -> SegmentAudio:
+    return audio_info if isinstance(audio_info, SegmentAudio) else SegmentAudio.from_dict(audio_info)
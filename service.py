@@ -0,0 +1,418 @@
+#!/usr/bin/env python3
+"""
+本機 HTTP 工作服務 - 常駐預熱的 AudioProcessor，以有界佇列接收轉換工作
+
+其他工具可直接上傳音頻或指定伺服器上的路徑提交工作，不必每次啟動 main.py
+重新載入函式庫與建立服務商客戶端。
+
+端點:
+  POST /jobs                       提交工作（multipart 欄位 file，或 JSON {"path": ...}）
+  GET  /jobs                       列出工作
+  GET  /jobs/{id}                  工作狀態與結果
+  GET  /jobs/{id}/progress         各階段進度
+  GET  /jobs/{id}/artifacts/{name} 下載成品（audio 或 transcript）
+  GET  /health                     佇列與工作者狀態
+  GET  /metrics                    Prometheus 格式指標
+
+使用方法:
+python service.py --port 8080 --workers 2 --queue-size 16
+"""
+
+import asyncio
+import logging
+import os
+import re
+import time
+import uuid
+from collections import OrderedDict
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+from aiohttp import web
+
+from audio_processor import AudioProcessor
+from log_manager import job_context, progress_sink, setup_logging_from_config
+from metrics import MetricsRegistry
+from runtime_config import ConfigError, RuntimeConfig, add_config_argument, load_config
+from scheduler import ResourceScheduler
+
+logger = logging.getLogger(__name__)
+
+# 工作狀態
+QUEUED = 'queued'
+RUNNING = 'running'
+SUCCEEDED = 'success'
+FAILED = 'failed'
+FINISHED_STATES = (SUCCEEDED, FAILED)
+
+# 可下載的成品名稱 -> 結果中的欄位
+ARTIFACTS = {
+    'audio': 'chinese_audio',
+    'transcript': 'transcript',
+}
+
+# 記憶體中最多保留的已完成工作數，超過時移除最舊的紀錄
+MAX_FINISHED_JOBS = 1000
+
+UPLOAD_CHUNK_SIZE = 256 * 1024
+
+
+class QueueFullError(Exception):
+    """工作佇列已滿"""
+
+
+class Job:
+    """單一轉換工作的狀態"""
+
+    def __init__(self, job_id: str, input_file: str, output_dir: str, uploaded: bool = False):
+        self.id = job_id
+        self.input_file = input_file
+        self.output_dir = output_dir
+        self.uploaded = uploaded
+        self.status = QUEUED
+        self.created_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.progress: Dict[str, Dict] = {}
+        self.result: Optional[Dict] = None
+        self.error: Optional[str] = None
+
+    def update_progress(self, label: str, done: int, total: int = None):
+        self.progress[label] = {'done': done, 'total': total}
+
+    @property
+    def queue_seconds(self) -> Optional[float]:
+        if self.started_at is None:
+            return None
+        return self.started_at - self.created_at
+
+    @property
+    def processing_seconds(self) -> Optional[float]:
+        if self.started_at is None or self.finished_at is None:
+            return None
+        return self.finished_at - self.started_at
+
+    def to_dict(self) -> Dict:
+        def timestamp(value):
+            return datetime.fromtimestamp(value).isoformat() if value else None
+
+        def seconds(value):
+            return round(value, 3) if value is not None else None
+
+        return {
+            'id': self.id,
+            'status': self.status,
+            'input_file': os.path.basename(self.input_file),
+            'created_at': timestamp(self.created_at),
+            'started_at': timestamp(self.started_at),
+            'finished_at': timestamp(self.finished_at),
+            'queue_seconds': seconds(self.queue_seconds),
+            'processing_seconds': seconds(self.processing_seconds),
+            'progress': self.progress,
+            'error': self.error,
+            'artifacts': [name for name, key in ARTIFACTS.items() if self.result and self.result.get(key)],
+            'result': {
+                key: self.result.get(key)
+                for key in ('segments_count', 'total_duration', 'pipeline_stats')
+            } if self.result else None
+        }
+
+
+class JobService:
+    """工作佇列與常駐的工作者
+
+    所有工作者共用同一個預熱的處理器與資源排程器，服務商呼叫的並發上限
+    與批次處理相同（processing.resource_limits）。
+    """
+
+    def __init__(self, config: RuntimeConfig = None, workers: int = 2, queue_size: int = 16,
+                 work_dir: str = 'service_output', processor_factory: Callable = AudioProcessor,
+                 path_roots: List[str] = None):
+        self.config = config or RuntimeConfig()
+        self.workers = max(1, workers)
+        self.work_dir = work_dir
+        self.path_roots = [os.path.realpath(root) for root in (path_roots or [])]
+        self.metrics = MetricsRegistry()
+        self.processor = processor_factory(metrics=self.metrics, config=self.config)
+        self.jobs: 'OrderedDict[str, Job]' = OrderedDict()
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=max(1, queue_size))
+        self.running = 0
+        self._tasks: List[asyncio.Task] = []
+
+    async def start(self):
+        """預先載入函式庫與客戶端，並啟動工作者"""
+        os.makedirs(self.work_dir, exist_ok=True)
+        await asyncio.to_thread(self.processor.warm_up)
+        limits = vars(self.config.processing.resource_limits).copy()
+        self.processor.scheduler = ResourceScheduler(limits, self.metrics)
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+        logger.info(f"🚀 工作服務啟動：{self.workers} 個工作者，佇列上限 {self.queue.maxsize}")
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def is_allowed_path(self, path: str) -> bool:
+        """路徑提交只接受 path_roots 之下的文件"""
+        real_path = os.path.realpath(path)
+        return any(os.path.commonpath([real_path, root]) == root for root in self.path_roots)
+
+    def new_job(self, input_file: str, uploaded: bool = False, job_id: str = None) -> Job:
+        job_id = job_id or uuid.uuid4().hex[:12]
+        return Job(job_id, input_file, os.path.join(self.work_dir, 'jobs', job_id), uploaded)
+
+    def submit(self, job: Job) -> Job:
+        """將工作放入佇列；佇列已滿時拋出 QueueFullError"""
+        try:
+            self.queue.put_nowait(job)
+        except asyncio.QueueFull:
+            self.metrics.inc('podcast_jobs_total', status='rejected')
+            raise QueueFullError(f"工作佇列已滿（{self.queue.maxsize}）")
+        self.jobs[job.id] = job
+        self._evict_finished()
+        self.metrics.inc('podcast_jobs_total', status='accepted')
+        logger.info(f"📥 已接收工作 {job.id}: {os.path.basename(job.input_file)}（佇列 {self.queue.qsize()}）")
+        return job
+
+    def _evict_finished(self):
+        finished = [job_id for job_id, job in self.jobs.items() if job.status in FINISHED_STATES]
+        for job_id in finished[:max(0, len(finished) - MAX_FINISHED_JOBS)]:
+            del self.jobs[job_id]
+
+    async def _worker(self):
+        while True:
+            job = await self.queue.get()
+            try:
+                await self._run(job)
+            finally:
+                self.queue.task_done()
+
+    async def _run(self, job: Job):
+        job.status = RUNNING
+        job.started_at = time.time()
+        self.running += 1
+        self.metrics.observe('podcast_job_queue_seconds', job.queue_seconds)
+        logger.info(f"▶️  開始工作 {job.id}（排隊 {job.queue_seconds:.2f} 秒）")
+        try:
+            with job_context(job=job.id), progress_sink(job.update_progress):
+                result = await self.processor.process_audio_complete(job.input_file, job.output_dir)
+            if result:
+                job.result = result
+                job.status = SUCCEEDED
+            else:
+                job.status = FAILED
+                job.error = 'Processing failed'
+        except Exception as e:
+            job.status = FAILED
+            job.error = str(e)
+            logger.error(f"❌ 工作 {job.id} 處理錯誤: {e}")
+        finally:
+            job.finished_at = time.time()
+            self.running -= 1
+            if job.uploaded:
+                # 上傳的原始音頻只在處理期間需要
+                try:
+                    os.remove(job.input_file)
+                except OSError:
+                    pass
+        self.metrics.observe('podcast_job_seconds', job.processing_seconds, status=job.status)
+        self.metrics.inc('podcast_jobs_total', status=job.status)
+        logger.info(f"📦 工作 {job.id} 結束: {job.status}（處理 {job.processing_seconds:.2f} 秒）")
+
+    def health(self) -> Dict:
+        return {
+            'status': 'ok',
+            'workers': self.workers,
+            'running': self.running,
+            'queued': self.queue.qsize(),
+            'queue_size': self.queue.maxsize,
+            'jobs': len(self.jobs)
+        }
+
+
+def _json_error(status: int, message: str, **headers) -> web.Response:
+    return web.json_response({'error': message}, status=status, headers=headers or None)
+
+
+def _safe_filename(name: str) -> str:
+    name = re.sub(r'[^\w.\-]', '_', os.path.basename(name or ''))
+    return name or 'upload.wav'
+
+
+async def _receive_upload(request: web.Request, service: JobService, max_bytes: int) -> Job:
+    """將 multipart 上傳以串流方式寫入工作目錄"""
+    reader = await request.multipart()
+    field = await reader.next()
+    while field is not None and field.name != 'file':
+        field = await reader.next()
+    if field is None:
+        raise web.HTTPBadRequest(text="缺少 file 欄位")
+
+    job = service.new_job('', uploaded=True)
+    upload_dir = os.path.join(service.work_dir, 'uploads')
+    os.makedirs(upload_dir, exist_ok=True)
+    job.input_file = os.path.join(upload_dir, f"{job.id}_{_safe_filename(field.filename)}")
+    size = 0
+    try:
+        with open(job.input_file, 'wb') as f:
+            while True:
+                chunk = await field.read_chunk(UPLOAD_CHUNK_SIZE)
+                if not chunk:
+                    break
+                size += len(chunk)
+                if size > max_bytes:
+                    raise web.HTTPRequestEntityTooLarge(max_size=max_bytes, actual_size=size)
+                f.write(chunk)
+    except BaseException:
+        if os.path.exists(job.input_file):
+            os.remove(job.input_file)
+        raise
+    service.metrics.inc('podcast_bytes_in_total', size, kind='upload')
+    return job
+
+
+def create_app(service: JobService, max_upload_bytes: int = 500 * 1024 * 1024) -> web.Application:
+    """建立 HTTP 應用程式；啟動與關閉時一併管理工作者"""
+    routes = web.RouteTableDef()
+    input_formats = tuple(f".{fmt}" for fmt in service.config.audio.input_format)
+
+    def get_job(request: web.Request) -> Job:
+        job = service.jobs.get(request.match_info['job_id'])
+        if job is None:
+            raise web.HTTPNotFound(text="找不到工作")
+        return job
+
+    @routes.post('/jobs')
+    async def submit_job(request: web.Request) -> web.Response:
+        if request.content_type.startswith('multipart/'):
+            job = await _receive_upload(request, service, max_upload_bytes)
+        else:
+            try:
+                payload = await request.json()
+            except ValueError:
+                return _json_error(400, "請以 multipart 上傳 file，或提交 JSON {\"path\": ...}")
+            path = payload.get('path') if isinstance(payload, dict) else None
+            if not path:
+                return _json_error(400, "缺少 path")
+            if not service.is_allowed_path(path):
+                return _json_error(403, "路徑不在允許的目錄中")
+            if not os.path.isfile(path):
+                return _json_error(404, f"找不到文件: {path}")
+            job = service.new_job(path)
+
+        if not job.input_file.lower().endswith(input_formats):
+            if job.uploaded:
+                os.remove(job.input_file)
+            return _json_error(400, f"不支援的格式，僅接受: {', '.join(input_formats)}")
+        try:
+            service.submit(job)
+        except QueueFullError as e:
+            if job.uploaded:
+                os.remove(job.input_file)
+            return _json_error(429, str(e), **{'Retry-After': '5'})
+        return web.json_response(job.to_dict(), status=202, headers={'Location': f"/jobs/{job.id}"})
+
+    @routes.get('/jobs')
+    async def list_jobs(request: web.Request) -> web.Response:
+        return web.json_response([job.to_dict() for job in service.jobs.values()])
+
+    @routes.get('/jobs/{job_id}')
+    async def job_status(request: web.Request) -> web.Response:
+        return web.json_response(get_job(request).to_dict())
+
+    @routes.get('/jobs/{job_id}/progress')
+    async def job_progress(request: web.Request) -> web.Response:
+        job = get_job(request)
+        return web.json_response({'id': job.id, 'status': job.status, 'progress': job.progress})
+
+    @routes.get('/jobs/{job_id}/artifacts/{name}')
+    async def job_artifact(request: web.Request) -> web.StreamResponse:
+        job = get_job(request)
+        key = ARTIFACTS.get(request.match_info['name'])
+        if key is None:
+            return _json_error(404, f"未知的成品，可用: {', '.join(ARTIFACTS)}")
+        path = job.result.get(key) if job.result else None
+        if not path or not os.path.exists(path):
+            return _json_error(409 if job.status not in FINISHED_STATES else 404, "成品尚未產生")
+        return web.FileResponse(path, headers={
+            'Content-Disposition': f'attachment; filename="{job.id}_{os.path.basename(path)}"'
+        })
+
+    @routes.get('/health')
+    async def health(request: web.Request) -> web.Response:
+        return web.json_response(service.health())
+
+    @routes.get('/metrics')
+    async def metrics(request: web.Request) -> web.Response:
+        return web.Response(text=service.metrics.to_prometheus(), content_type='text/plain')
+
+    async def lifecycle(app: web.Application):
+        await service.start()
+        yield
+        await service.stop()
+
+    app = web.Application()
+    app.add_routes(routes)
+    app.cleanup_ctx.append(lifecycle)
+    return app
+
+
+async def serve(service: JobService, host: str, port: int, max_upload_bytes: int) -> web.AppRunner:
+    """啟動 HTTP 伺服器並返回 runner（呼叫端負責 runner.cleanup()）"""
+    runner = web.AppRunner(create_app(service, max_upload_bytes), access_log=None)
+    await runner.setup()
+    site = web.TCPSite(runner, host, port)
+    await site.start()
+    return runner
+
+
+async def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description="NotebookLM Podcast 轉換工作服務",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+使用範例:
+  python service.py                                  # 於 127.0.0.1:8080 啟動
+  python service.py --workers 4 --queue-size 32      # 4 個工作者，最多 32 個排隊工作
+  curl -F file=@podcast.wav http://127.0.0.1:8080/jobs
+  curl -H 'Content-Type: application/json' -d '{"path": "input/podcast.wav"}' http://127.0.0.1:8080/jobs
+        """
+    )
+    parser.add_argument('--host', default='127.0.0.1', help='監聽位址 (預設: 127.0.0.1)')
+    parser.add_argument('--port', type=int, default=8080, help='監聽埠號 (預設: 8080)')
+    parser.add_argument('--workers', type=int, help='同時處理的工作數 (預設: processing.concurrent_limit，未使用配置時為 2)')
+    parser.add_argument('--queue-size', type=int, default=16, help='排隊中工作的上限，超過時回應 429 (預設: 16)')
+    parser.add_argument('-o', '--output', default='service_output', help='工作輸出目錄 (預設: service_output/)')
+    parser.add_argument('--path-root', action='append', default=None,
+                        help='允許以路徑提交的目錄，可重複指定 (預設: input/)')
+    parser.add_argument('--max-upload-mb', type=int, default=500, help='上傳文件大小上限 MB (預設: 500)')
+    add_config_argument(parser)
+    args = parser.parse_args()
+
+    try:
+        config = load_config(args.config)
+    except ConfigError as e:
+        parser.error(f"配置文件無效: {e}")
+
+    os.makedirs(args.output, exist_ok=True)
+    setup_logging_from_config(config.logging, args.output)
+
+    workers = args.workers or (config.processing.concurrent_limit if config.source else 2)
+    service = JobService(config, workers=workers, queue_size=args.queue_size, work_dir=args.output,
+                         path_roots=args.path_root or ['input'])
+    runner = await serve(service, args.host, args.port, args.max_upload_mb * 1024 * 1024)
+    logger.info(f"🌐 服務已啟動: http://{args.host}:{args.port}（Ctrl-C 結束）")
+    try:
+        await asyncio.Event().wait()
+    except asyncio.CancelledError:
+        logger.info("\n👋 服務已停止")
+    finally:
+        await runner.cleanup()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
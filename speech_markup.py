@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+中文口語後處理與語音標記 - 規則預先編譯，每段只處理一次
+
+SpeechRewriter 將譯文依對話類型調整為口語（問句補問號、回應加語氣詞、轉場加連接語），
+再產生 SpeechPlan：純文字、停頓位置與語速 / 音高調整的結構化表示。
+SpeechPlan 依服務商一次轉換為輸入：edge_tts.Communicate 只接受純文字與 rate / pitch 參數
+（文字中的 SSML 標籤會被跳脫後念出來），停頓交由中文標點自然產生；
+自行產生 SSML 的 Edge TTS 長駐連線（tts_session）使用 ssml_body() 以 <break> 插入停頓，
+其他支援 SSML 的服務商使用 to_ssml()，文字一律經過 XML 跳脫。
+"""
+
+import re
+from typing import Dict, List, Tuple
+from xml.sax.saxutils import escape, quoteattr
+
+# 口語化規則
+QUESTION_STARTERS = ('那麼', '所以', '那', '嗯')
+QUESTION_CUES = ('什麼', '怎麼')
+QUESTION_ENDINGS = ('？', '?')
+RESPONSE_STARTERS = ('嗯', '對', '是的', '沒錯', '確實')
+TRANSITION_WORDS = ('說到這個', '順便說一下', '另外', '還有')
+QUESTION_PREFIX = '那'
+RESPONSE_PREFIX = '嗯，'
+TRANSITION_PREFIX = '說到這個，'
+LONG_SENTENCE_CHARS = 50           # 超過此長度的句子在第一個逗號前加上「呢」
+
+# 停頓規則：標點 → (是否只用於問句, 停頓在標點之前, 毫秒)
+BREAK_RULES = {
+    '，': (False, False, 300),
+    '。': (False, False, 500),
+    '？': (True, True, 500),
+}
+
+# 語調規則：(語速 %, 音高 Hz)；音高以 Hz 表示，Edge TTS 只接受 Hz（約為一般女聲的 +5% / -2% / +8%）
+QUESTION_PROSODY = (-10, 10)
+RESPONSE_PROSODY = (0, -4)
+EXCITED_PROSODY = (5, 16)
+
+_QUESTION_CUE = re.compile('|'.join(map(re.escape, QUESTION_CUES)))
+_TRANSITION = re.compile('|'.join(map(re.escape, TRANSITION_WORDS)))
+_BREAK = re.compile('[' + ''.join(map(re.escape, BREAK_RULES)) + ']')
+
+
+class SpeechPlan:
+    """一段語音的結構化表示：純文字、停頓與相對語調"""
+
+    __slots__ = ('text', 'rate', 'pitch', 'pauses', 'question', '_breaks')
+
+    def __init__(self, text: str, rate: int = 0, pitch: int = 0, pauses: bool = True, question: bool = False):
+        self.text = text
+        self.rate = rate              # 相對語速（%）
+        self.pitch = pitch            # 相對音高（Hz）
+        self.pauses = pauses
+        self.question = question
+        self._breaks = None
+
+    @property
+    def breaks(self) -> List[Tuple[int, int]]:
+        """停頓位置 [(文字位置, 毫秒)]，需要時才計算"""
+        if self._breaks is None:
+            breaks = []
+            if self.pauses:
+                for match in _BREAK.finditer(self.text):
+                    question_only, before, duration = BREAK_RULES[match.group()]
+                    if question_only and not self.question:
+                        continue
+                    breaks.append((match.start() if before else match.end(), duration))
+            self._breaks = breaks
+        return self._breaks
+
+    def __repr__(self) -> str:
+        return f"SpeechPlan(text={self.text!r}, rate={self.rate:+d}%, pitch={self.pitch:+d}Hz, breaks={self.breaks})"
+
+
+class SpeechRewriter:
+    """依 tts 設定編譯的口語後處理與語音標記規則"""
+
+    def __init__(self, add_pauses: bool = True, prosody_adjustment: bool = True,
+                 emotion_enhancement: bool = False, base_rate: int = 0, base_pitch: int = 0):
+        self.add_pauses = add_pauses
+        self.prosody_adjustment = prosody_adjustment
+        self.emotion_enhancement = emotion_enhancement
+        self.base_rate = base_rate
+        self.base_pitch = base_pitch
+        # 各種語調的 Edge 參數字串預先格式化
+        self._edge_prosody: Dict[Tuple[int, int], Tuple[str, str]] = {}
+        for rate, pitch in ((0, 0), QUESTION_PROSODY, RESPONSE_PROSODY, EXCITED_PROSODY):
+            self._edge_prosody[rate, pitch] = self._format_prosody(rate, pitch)
+        # SSML 停頓以標點替換一次插入（問句多一條「？」前的停頓）
+        self._ssml_breaks = {}
+        for question in (False, True):
+            rules = {mark: rule for mark, rule in BREAK_RULES.items() if question or not rule[0]}
+            replacements = {
+                mark: (f'<break time="{duration}ms"/>{mark}' if before else f'{mark}<break time="{duration}ms"/>')
+                for mark, (_, before, duration) in rules.items()
+            }
+            pattern = re.compile('[' + ''.join(map(re.escape, rules)) + ']')
+            self._ssml_breaks[question] = (pattern, replacements)
+
+    @classmethod
+    def from_config(cls, config) -> 'SpeechRewriter':
+        tts = config.tts
+        return cls(tts.add_pauses, tts.prosody_adjustment, tts.emotion_enhancement,
+                   round((tts.speech_rate - 1.0) * 100), tts.speech_pitch)
+
+    def enhance(self, text: str, is_question: bool = False, is_response: bool = False,
+                is_transition: bool = False) -> str:
+        """依對話類型調整譯文，使其更接近口語"""
+        if is_question:
+            if not text.endswith(QUESTION_ENDINGS):
+                text += '？'
+            if not text.startswith(QUESTION_STARTERS) and _QUESTION_CUE.search(text):
+                text = QUESTION_PREFIX + text
+        elif is_response:
+            if not text.startswith(RESPONSE_STARTERS):
+                text = RESPONSE_PREFIX + text
+        elif is_transition:
+            if not _TRANSITION.search(text):
+                text = TRANSITION_PREFIX + text
+
+        # 長句在第一個子句後加上語氣詞
+        if len(text) > LONG_SENTENCE_CHARS:
+            text = text.replace('，', '呢，', 1)
+        return text
+
+    def plan(self, text: str, is_question: bool = False, is_response: bool = False,
+             source_text: str = '') -> SpeechPlan:
+        """產生語音計畫；語調依問句、回應或（emotion_enhancement 時）驚嘆句調整"""
+        rate = pitch = 0
+        if self.prosody_adjustment:
+            if is_question:
+                rate, pitch = QUESTION_PROSODY
+            elif is_response:
+                rate, pitch = RESPONSE_PROSODY
+            elif self.emotion_enhancement and source_text.rstrip().endswith('!'):
+                rate, pitch = EXCITED_PROSODY
+        return SpeechPlan(text, rate, pitch, self.add_pauses, is_question)
+
+    def _format_prosody(self, rate: int, pitch: int) -> Tuple[str, str]:
+        return f"{self.base_rate + rate:+d}%", f"{self.base_pitch + pitch:+d}Hz"
+
+    def edge_arguments(self, plan: SpeechPlan) -> Tuple[str, str, str]:
+        """Edge TTS 的輸入：(純文字, rate, pitch)，停頓由標點自然產生"""
+        prosody = self._edge_prosody.get((plan.rate, plan.pitch))
+        if prosody is None:
+            prosody = self._format_prosody(plan.rate, plan.pitch)
+        return (plan.text, *prosody)
+
+    def ssml_body(self, plan: SpeechPlan) -> str:
+        """經過跳脫並插入 <break> 停頓的文字，放在 <prosody> 內"""
+        body = escape(plan.text)
+        if plan.pauses:
+            # 停頓標點不受 XML 跳脫影響，直接在跳脫後的文字上插入
+            pattern, replacements = self._ssml_breaks[plan.question]
+            body = pattern.sub(lambda match: replacements[match.group()], body)
+        return body
+
+    def to_ssml(self, plan: SpeechPlan, voice: str, language: str = 'zh-TW') -> str:
+        """產生完整且經過跳脫的 SSML 文件，供支援 SSML 的服務商使用"""
+        body = self.ssml_body(plan)
+        _, rate, pitch = self.edge_arguments(plan)
+        return (
+            f'<speak version="1.0" xmlns="http://www.w3.org/2001/10/synthesis" xml:lang={quoteattr(language)}>'
+            f'<voice name={quoteattr(voice)}><prosody rate="{rate}" pitch="{pitch}">'
+            f"{body}</prosody></voice></speak>"
+        )
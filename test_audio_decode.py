@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+壓縮音頻串流解碼測試
+確認 ffmpeg 命令、格式篩選與長度探測、stderr 不會阻塞 stdout，以及解碼直接寫入預先配置的陣列；
+實際解碼只在安裝 ffmpeg 時執行
+"""
+
+import array
+import os
+import sys
+import tempfile
+import wave
+
+import audio_decode
+from audio_decode import (WHISPER_SAMPLE_RATE, AudioDecodeError, decode_command, decode_whisper_input,
+                          ffmpeg_available, iter_output, iter_pcm, needs_decoding, usable_formats)
+from audio_probe import probe_duration
+
+
+def _write_wav(path: str, seconds: float, rate: int = 44100):
+    with wave.open(path, 'wb') as wav_file:
+        wav_file.setnchannels(2)
+        wav_file.setsampwidth(2)
+        wav_file.setframerate(rate)
+        wav_file.writeframes(b'\x01\x00' * 2 * int(seconds * rate))
+
+
+def test_decode_command():
+    command = decode_command('episode.m4a')
+    assert command[command.index('-i') + 1] == 'episode.m4a'
+    assert command[command.index('-ar') + 1] == str(WHISPER_SAMPLE_RATE)
+    assert command[command.index('-ac') + 1] == '1'
+    assert command[-3:] == ['-f', 's16le', 'pipe:1']
+    assert needs_decoding('a/Episode.MP3') and not needs_decoding('a/episode.WAV')
+    formats = usable_formats(['wav', 'mp3', 'm4a'])
+    assert formats == (['wav', 'mp3', 'm4a'] if ffmpeg_available() else ['wav'])
+
+
+def test_probe_estimates_without_header():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'episode.m4a')
+        with open(path, 'wb') as f:
+            f.write(b'\x00' * 16000)
+        duration, method = probe_duration(path)
+        assert method == 'estimate' and duration == 1.0
+
+
+def test_streams_resampled_pcm():
+    if not ffmpeg_available():
+        return
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'episode.wav')
+        _write_wav(path, 2.0)
+        pcm = b''.join(iter_pcm(path, 8000, 1, chunk_bytes=1024))
+        assert len(pcm) == 2 * 8000 * 2
+        audio = decode_whisper_input(path)
+        assert len(audio) == 2 * WHISPER_SAMPLE_RATE and audio.dtype.name == 'float32'
+
+
+def test_stderr_does_not_block_stdout():
+    # 子行程先寫出超過管道緩衝區的 stderr，再寫 stdout
+    script = ("import sys; sys.stderr.write('x' * 1000000); sys.stderr.flush(); "
+              "sys.stdout.buffer.write(b'\\0' * 200000)")
+    output = b''.join(iter_output([sys.executable, '-c', script], chunk_bytes=4096))
+    assert len(output) == 200000
+    try:
+        list(iter_output([sys.executable, '-c', "import sys; sys.stderr.write('x' * 1000000 + 'bad input'); "
+                                                "sys.exit(3)"]))
+    except AudioDecodeError as e:
+        assert 'bad input' in str(e) and '(3)' in str(e)
+    else:
+        raise AssertionError("ffmpeg 失敗時應該拋出 AudioDecodeError")
+
+
+def test_decode_whisper_input_preallocates():
+    samples = array.array('h', (i % 2000 - 1000 for i in range(WHISPER_SAMPLE_RATE * 3))).tobytes()
+    expected = [i % 2000 - 1000 for i in range(WHISPER_SAMPLE_RATE * 3)]
+    original = audio_decode.iter_pcm
+
+    def fake_pcm(path, sample_rate, channels):
+        # 奇數長度的分塊會把樣本切在中間
+        for start in range(0, len(samples), 4097):
+            yield samples[start:start + 4097]
+
+    audio_decode.iter_pcm = fake_pcm
+    try:
+        for duration in (3.0, 1.0, None):
+            audio = decode_whisper_input('episode.m4a', duration=duration)
+            assert audio.dtype.name == 'float32' and len(audio) == len(expected), duration
+            assert [round(value * 32768) for value in audio[:4000]] == expected[:4000]
+            assert round(float(audio[-1]) * 32768) == expected[-1]
+    finally:
+        audio_decode.iter_pcm = original
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+批次處理日誌測試
+確認當機留下不完整的最後一行時仍可恢復、新紀錄不會接在該行之後，以及輸入或輸出變更時不視為已完成
+"""
+
+import os
+import tempfile
+
+from batch_journal import INTERRUPTED, BatchJournal
+
+
+def _success(tmp: str, name: str):
+    audio = os.path.join(tmp, f"{name}_zh.wav")
+    with open(audio, 'wb') as f:
+        f.write(b'RIFF')
+    return {'input_file': name, 'status': 'success', 'chinese_audio': audio}
+
+
+def test_resume_after_torn_last_line():
+    with tempfile.TemporaryDirectory() as tmp:
+        inputs = []
+        for name in ('a.wav', 'b.wav'):
+            path = os.path.join(tmp, name)
+            with open(path, 'wb') as f:
+                f.write(b'\x00' * 10)
+            inputs.append(path)
+        journal_path = os.path.join(tmp, 'journal.jsonl')
+
+        journal = BatchJournal(journal_path)
+        journal.mark_started(inputs[0], tmp, 'batch1')
+        journal.mark_finished(inputs[0], _success(tmp, 'a'), 'batch1')
+        journal.mark_started(inputs[1], tmp, 'batch1')
+        journal.close()
+        # 模擬寫入第二個結果時當機
+        with open(journal_path, 'a', encoding='utf-8') as f:
+            f.write('{"time": "2024-01-01T00:00:00", "file": "')
+
+        resumed = BatchJournal(journal_path)
+        assert resumed.is_completed(inputs[0])
+        assert resumed.latest(inputs[1])['state'] == 'started'
+        resumed.mark_interrupted(inputs[1], 'batch2')
+        resumed.close()
+
+        reloaded = BatchJournal(journal_path)
+        assert reloaded.latest(inputs[1])['state'] == INTERRUPTED
+        assert [result['status'] for result in reloaded.results(inputs)] == ['success', INTERRUPTED]
+
+        # 輸入被替換或輸出被刪除時需要重新處理
+        with open(inputs[0], 'ab') as f:
+            f.write(b'\x01')
+        assert not reloaded.is_completed(inputs[0])
+        reloaded.close()
+
+
+def test_missing_output_not_completed():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'a.wav')
+        with open(path, 'wb') as f:
+            f.write(b'\x00')
+        journal = BatchJournal(os.path.join(tmp, 'journal.jsonl'))
+        result = _success(tmp, 'a')
+        journal.mark_finished(path, result, 'batch1')
+        assert journal.is_completed(path)
+        os.remove(result['chinese_audio'])
+        assert not journal.is_completed(path)
+        journal.close()
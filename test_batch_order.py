@@ -0,0 +1,38 @@
+#!/usr/bin/env python3
+"""
+批次排序與整批時間預估測試
+確認 predict_makespan 依最早空出的名額分配、長文件優先可縮短整批時間，以及處理速率的估算
+"""
+
+from batch_processor import BatchProcessor, predict_makespan, processing_rate
+from runtime_config import RuntimeConfig
+
+
+def test_predict_makespan():
+    assert predict_makespan([], 2) == 0.0
+    assert predict_makespan([5.0, 3.0], 0) == 8.0
+    assert predict_makespan([1.0, 1.0, 1.0, 1.0], 2) == 2.0
+    # 依檔名排序時長文件排在最後，長文件優先則縮短整批時間
+    assert predict_makespan([1.0, 1.0, 1.0, 1.0, 4.0], 2) == 6.0
+    assert predict_makespan([4.0, 1.0, 1.0, 1.0, 1.0], 2) == 4.0
+
+
+def test_order_files_and_rate():
+    durations = {'b.wav': 60.0, 'a.wav': 60.0, 'c.wav': 300.0, 'd.wav': 10.0}
+    config = RuntimeConfig()
+    config.logging.file_logging = False
+    batch = BatchProcessor(config, resume=False)
+
+    assert batch.order_files(durations) == ['c.wav', 'a.wav', 'b.wav', 'd.wav']
+    batch.job_order = 'shortest'
+    assert batch.order_files(durations) == ['d.wav', 'a.wav', 'b.wav', 'c.wav']
+    batch.job_order = 'name'
+    assert batch.order_files(durations) == ['a.wav', 'b.wav', 'c.wav', 'd.wav']
+
+    results = [
+        {'processing_seconds': 30.0, 'input_duration': 60.0},
+        {'processing_seconds': 90.0, 'input_duration': 180.0},
+        {'processing_seconds': 5.0},
+    ]
+    assert processing_rate(results) == 0.5
+    assert processing_rate([]) is None
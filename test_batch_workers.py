@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+工作行程池排程測試
+確認文件在有工作行程接手時才標記為開始，而不是在送出時全部標記，
+以及工作行程回傳的每個文件指標包含 HTTP 連線計數
+"""
+
+import asyncio
+
+import batch_processor
+from batch_processor import BatchProcessor
+from runtime_config import RuntimeConfig
+from scheduler import ResourceScheduler
+
+
+class _FakeExecutor:
+    def shutdown(self, wait=True, cancel_futures=False):
+        pass
+
+
+class _RecordingBatch(BatchProcessor):
+    def __init__(self, config, workers):
+        super().__init__(config, workers=workers, resume=False)
+        self.events = []
+        self.running = 0
+
+    def _create_executor(self, limits):
+        return _FakeExecutor()
+
+    async def _process_in_executor(self, executor, input_file, output_dir):
+        self.running += 1
+        self.events.append(('run', input_file, self.running))
+        await asyncio.sleep(0.02)
+        self.running -= 1
+        return {'input_file': input_file, 'status': 'success'}
+
+
+def test_on_start_when_worker_picks_up():
+    config = RuntimeConfig()
+    config.logging.file_logging = False
+    batch = _RecordingBatch(config, workers=2)
+    files = [f"episode{i}.wav" for i in range(5)]
+
+    def on_start(path):
+        batch.events.append(('start', path, batch.running))
+
+    async def run():
+        return [item async for item in batch._run_in_workers(files, 'output', {}, on_start)]
+
+    completed = asyncio.run(run())
+    assert sorted(index for index, _ in completed) == list(range(5))
+    started = [event for event in batch.events if event[0] == 'start']
+    # 每次標記開始時，正在處理的文件都少於工作行程數
+    assert len(started) == 5 and all(running < 2 for _, _, running in started)
+    assert max(running for kind, _, running in batch.events if kind == 'run') == 2
+
+
+class _HttpBatch(BatchProcessor):
+    async def process_single_file(self, input_file: str, output_base_dir: str):
+        self.processor.http._record('openai', 'requests')
+        return {'input_file': input_file, 'status': 'success'}
+
+
+def test_worker_metrics_include_http_counters():
+    config = RuntimeConfig()
+    config.logging.file_logging = False
+    batch = batch_processor._worker_batch = _HttpBatch(config, resume=False)
+    batch.scheduler = ResourceScheduler()
+    original_metrics = batch.processor.http.metrics
+    try:
+        for name in ('episode1.wav', 'episode2.wav'):
+            _, metrics = batch_processor._process_in_worker(name, 'output')
+            counters = {(entry['name'], entry['labels'].get('client')): entry['value']
+                        for entry in metrics['counters']}
+            assert counters[('podcast_http_requests_total', 'openai')] == 1
+    finally:
+        batch.processor.http.metrics = original_metrics
+        batch_processor._worker_batch = None
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+對話特徵規則測試
+確認關鍵詞以單字邊界比對、多字片語依完整單字序列比對、自訂規則正確，且批次分析與逐段分析結果一致
+"""
+
+from dialogue_rules import QUESTION, RESPONSE, TRANSITION, DialogueRules
+from runtime_config import ConfigError, DialogueRulesConfig, RuntimeConfig
+
+# (文字, 預期旗標)
+CASES = [
+    ("What do you think?", QUESTION),
+    ("How did the team decide on that approach", QUESTION),
+    ("I wonder why.", QUESTION),
+    ("Is this the end?", QUESTION),
+    ("Is this the end?  ", QUESTION),
+    ("WHO knows", QUESTION),
+    ("What's the plan", QUESTION),
+    ("The whole point is scale.", 0),                     # who ⊄ whole
+    ("Somehow it worked.", 0),                            # how ⊄ somehow
+    ("Whatever happens, we ship.", 0),                    # what ⊄ whatever
+    ("Well, I think it comes down to trust.", RESPONSE),
+    ("Yeah, exactly.", RESPONSE),
+    ("So the short answer is no.", RESPONSE),
+    ("It is also worth noting.", TRANSITION),             # so ⊄ also
+    ("The reason is simple.", 0),                         # so ⊄ reason
+    ("That was a wellness study.", 0),                    # well ⊄ wellness
+    ("Copyright notices apply.", 0),                      # right ⊄ copyright
+    ("Speaking of which, there was another study.", TRANSITION),
+    ("By the way, this connects to earlier.", TRANSITION),
+    ("by-the-way, a quick note", TRANSITION),
+    ("Stand by the door.", 0),                            # 片語不完整
+    ("Another thing worth mentioning is cost.", TRANSITION),
+    ("Another study found the same thing.", 0),
+    ("Right, and what about cost?", QUESTION | RESPONSE),
+    ("Well, speaking of cost, why does it matter?", QUESTION | RESPONSE | TRANSITION),
+    ("", 0),
+    ("   ", 0),
+]
+
+
+def test_default_rules():
+    rules = DialogueRules.from_config()
+    for text, expected in CASES:
+        assert rules.analyze(text) == expected, text
+
+
+def test_batch_matches_single():
+    rules = DialogueRules.from_config()
+    texts = [text for text, _ in CASES]
+    assert rules.analyze_batch(texts) == [rules.analyze(text) for text in texts]
+    assert rules.analyze_batch(texts) == [expected for _, expected in CASES]
+    assert rules.analyze_batch([]) == []
+
+
+def test_batch_with_separator_in_text():
+    rules = DialogueRules.from_config()
+    texts = ["What\x00 now", "also fine"]
+    assert rules.analyze_batch(texts) == [QUESTION, TRANSITION]
+
+
+def test_custom_rules():
+    config = DialogueRulesConfig(
+        question_marks=['?', '？'],
+        question_words=['which'],
+        response_words=['of course'],
+        transition_words=['moving on', "let's talk about"],
+    )
+    rules = DialogueRules.from_config(config)
+    assert rules.analyze("這是問題嗎？") == QUESTION
+    assert rules.analyze("Which one") == QUESTION
+    assert rules.analyze("What now") == 0
+    assert rules.analyze("Of course, it works") == RESPONSE
+    assert rules.analyze("Of the courses, one") == 0
+    assert rules.analyze("Moving on to the next topic") == TRANSITION
+    assert rules.analyze("Let's talk about pricing") == TRANSITION
+
+
+def test_phrase_matching():
+    config = DialogueRulesConfig(
+        question_words=['how about'],
+        response_words=['by the way'],
+        transition_words=['by the way side', 'on the other hand', 'on top of that'],
+    )
+    rules = DialogueRules.from_config(config)
+    cases = [
+        ("by the way", RESPONSE),
+        ("And by the way", RESPONSE),                             # 片語在句尾
+        ("Stand by, by the way.", RESPONSE),                      # 第一個字重複出現
+        ("Bye the way", 0),
+        ("By the wayside", 0),                                    # 片語只以完整單字比對
+        ("by the way side", RESPONSE | TRANSITION),               # 共用第一個字的片語各自比對
+        ("On the other hand, how about cost?", QUESTION | TRANSITION),
+        ("On top of that... on the other-hand", TRANSITION),
+        ("On the top of that hill", 0),
+        ("HOW ABOUT now", QUESTION),
+        ("about how", 0),                                         # 順序不同
+    ]
+    for text, expected in cases:
+        assert rules.analyze(text) == expected, text
+    texts = [text for text, _ in cases]
+    assert rules.analyze_batch(texts) == [expected for _, expected in cases]
+
+
+def test_flags():
+    assert DialogueRules.flags(QUESTION | TRANSITION) == {
+        'is_question': True, 'is_response': False, 'is_transition': True
+    }
+
+
+def test_empty_keyword_rejected():
+    config = RuntimeConfig()
+    config.dialogue.rules.response_words = ['well', ' ']
+    try:
+        config.validate()
+    except ConfigError:
+        return
+    raise AssertionError("空白關鍵詞應該無法通過驗證")
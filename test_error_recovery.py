@@ -0,0 +1,35 @@
+#!/usr/bin/env python3
+"""
+錯誤恢復設定測試
+確認翻譯失敗時 processing.error_recovery 開啟則保留原文，關閉則拋出例外
+"""
+
+from audio_processor import AudioProcessor
+from runtime_config import RuntimeConfig
+from segment_model import Segment
+
+
+class _FailingTranslator(AudioProcessor):
+    def translate_with_ai(self, text, context=None):
+        raise RuntimeError("translation service unavailable")
+
+
+def _processor(error_recovery: bool) -> AudioProcessor:
+    config = RuntimeConfig()
+    config.logging.file_logging = False
+    config.processing.error_recovery = error_recovery
+    return _FailingTranslator(config=config)
+
+
+def test_translation_keeps_source_when_recovering():
+    segment = _processor(True)._translate_segment(Segment(0.0, 1.0, "Hello there."), 0)
+    assert segment.translated_text == segment.original_text == "Hello there."
+
+
+def test_translation_error_raised_without_recovery():
+    try:
+        _processor(False)._translate_segment(Segment(0.0, 1.0, "Hello there."), 0)
+    except RuntimeError as e:
+        assert 'unavailable' in str(e)
+    else:
+        raise AssertionError("translation failure should propagate when error_recovery is off")
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+資料夾監看測試
+確認仍在寫入的文件要穩定後才產生一次、被替換的文件會重新產生，
+監看模式會重新處理在處理期間被替換的文件，
+以及已刪除或移出的文件不再保留記錄
+"""
+
+import asyncio
+import os
+import tempfile
+import time
+
+from batch_processor import BatchProcessor
+from folder_watcher import FolderWatcher
+from runtime_config import RuntimeConfig
+
+
+async def _collect(watcher: FolderWatcher, seconds: float):
+    emitted = []
+
+    async def run():
+        async for path, _ in watcher.watch():
+            emitted.append((os.path.basename(path), time.time()))
+
+    task = asyncio.create_task(run())
+    await asyncio.sleep(seconds)
+    task.cancel()
+    await asyncio.gather(task, return_exceptions=True)
+    return emitted
+
+
+def test_debounces_growing_file():
+    with tempfile.TemporaryDirectory() as tmp:
+        watcher = FolderWatcher(tmp, ['wav'], stable_seconds=0.3, poll_interval=0.05, use_inotify=False)
+
+        async def run():
+            collecting = asyncio.create_task(_collect(watcher, 1.6))
+            path = os.path.join(tmp, 'episode.wav')
+            for i in range(5):
+                with open(path, 'ab') as f:
+                    f.write(b'\x00' * (i + 1) * 100)
+                last_write = time.time()
+                await asyncio.sleep(0.1)
+            with open(os.path.join(tmp, 'notes.txt'), 'w') as f:
+                f.write('ignored')
+            await asyncio.sleep(0.6)
+            # 內容被替換後再次穩定，重新產生
+            with open(path, 'wb') as f:
+                f.write(b'\x01' * 50)
+            return last_write, await collecting
+
+        last_write, emitted = asyncio.run(run())
+    assert [name for name, _ in emitted] == ['episode.wav', 'episode.wav']
+    assert emitted[0][1] - last_write >= 0.3
+
+
+class _SlowBatch(BatchProcessor):
+    def __init__(self, config):
+        super().__init__(config, resume=False)
+        self.calls = []
+
+    async def process_single_file(self, input_file: str, output_base_dir: str):
+        with open(input_file, 'rb') as f:
+            self.calls.append(len(f.read()))
+        await asyncio.sleep(0.4)
+        if len(self.calls) == 2:
+            # 處理中的文件被刪除，記錄結果時無法取得指紋
+            os.remove(input_file)
+        return {'input_file': input_file, 'status': 'success'}
+
+
+def test_watch_reprocesses_replaced_file():
+    config = RuntimeConfig()
+    config.logging.file_logging = False
+    config.output.minimal_output = True
+    batch = _SlowBatch(config)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        input_dir = os.path.join(tmp, 'input')
+        os.mkdir(input_dir)
+        path = os.path.join(input_dir, 'episode.wav')
+
+        async def run():
+            watching = asyncio.create_task(batch.watch(input_dir, os.path.join(tmp, 'output'), max_concurrent=1,
+                                                       stable_seconds=0.1, poll_interval=0.05,
+                                                       use_inotify=False))
+            with open(path, 'wb') as f:
+                f.write(b'\x00' * 100)
+            await asyncio.sleep(0.25)
+            assert batch.calls == [100]
+            # 第一次處理期間放入新版本
+            with open(path + '.part', 'wb') as f:
+                f.write(b'\x00' * 200)
+            os.replace(path + '.part', path)
+            await asyncio.sleep(1.0)
+            assert batch.calls == [100, 200] and not os.path.exists(path)
+            # 刪除後再放入的文件仍會被處理（前一次的處理沒有卡在處理中）
+            with open(path, 'wb') as f:
+                f.write(b'\x00' * 300)
+            await asyncio.sleep(0.8)
+            watching.cancel()
+            await asyncio.gather(watching, return_exceptions=True)
+
+        asyncio.run(run())
+    assert batch.calls == [100, 200, 300]
+
+
+def test_forgets_removed_files():
+    for use_inotify in (False, True):
+        with tempfile.TemporaryDirectory() as tmp, tempfile.TemporaryDirectory() as archive:
+            os.mkdir(os.path.join(tmp, 'season1'))
+            watcher = FolderWatcher(tmp, ['wav'], stable_seconds=0.1, poll_interval=0.05, use_inotify=use_inotify)
+            paths = [os.path.join(tmp, name) for name in ('a.wav', 'b.wav', os.path.join('season1', 'c.wav'))]
+
+            async def run():
+                collecting = asyncio.create_task(_collect(watcher, 1.2))
+                await asyncio.sleep(0.05)
+                for path in paths:
+                    with open(path, 'wb') as f:
+                        f.write(b'\x00' * 100)
+                await asyncio.sleep(0.5)
+                emitted = len(watcher._emitted)
+                # 刪除文件並移出整個子目錄後不再保留記錄
+                os.remove(paths[0])
+                os.rename(os.path.join(tmp, 'season1'), os.path.join(archive, 'season1'))
+                await asyncio.sleep(0.4)
+                remaining = set(watcher._emitted)
+                await collecting
+                return emitted, remaining
+
+            emitted, remaining = asyncio.run(run())
+            assert emitted == 3, watcher.mode
+            assert remaining == {paths[1]}, watcher.mode
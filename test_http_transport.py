@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+"""
+共用 HTTP 傳輸層測試
+以本地 HTTPS 模擬服務確認 Google 翻譯請求重用同一條連線，且重用次數正確累計到指標
+"""
+
+from benchmarks.https_stub import LocalHTTPSServer, openssl_available
+from http_transport import HttpTransport, shared_transport
+from metrics import MetricsRegistry
+from runtime_config import ConfigError, RuntimeConfig
+
+
+def test_translator_reuses_connection():
+    if not openssl_available():
+        return
+    metrics = MetricsRegistry()
+    with LocalHTTPSServer() as server:
+        transport = HttpTransport(metrics=metrics)
+        transport.session.verify = server.cert_path
+        transport.session.trust_env = False
+        translator = transport.google_translator('en', 'zh-TW')
+        translator._base_url = f"{server.url}/m"
+
+        assert [translator.translate(f"line {i} & more") for i in range(20)] == [
+            f"譯:line {i} & more" for i in range(20)
+        ]
+        assert server.connections == 1
+        assert server.requests == 20
+        assert transport.stats() == {'requests': {'requests': 20, 'connections': 1, 'reused': 19}}
+        transport.close()
+
+    prometheus = metrics.to_prometheus()
+    assert 'podcast_http_requests_total{client="requests"} 20' in prometheus
+    assert 'podcast_http_connections_total{client="requests"} 1' in prometheus
+
+
+def test_shared_transport():
+    metrics = MetricsRegistry()
+    transport = shared_transport()
+    assert shared_transport(metrics=metrics) is transport
+    assert transport.metrics is not None
+
+
+def test_network_validation():
+    config = RuntimeConfig()
+    config.network.pool_maxsize = 0
+    try:
+        config.validate()
+    except ConfigError:
+        return
+    raise AssertionError("network.pool_maxsize 為 0 應該無法通過驗證")
@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+"""
+共用工作佇列測試（SQLite 與 Redis 後端）
+確認租約過期後重新分配、心跳延長租約、失敗依嘗試上限重新排入，以及歸還工作不計入嘗試次數；
+Redis 後端使用 REDIS_URL 指定的伺服器，未設定時使用 fakeredis，兩者皆無則略過。
+另以兩個工作行程處理整批工作，其中一個在處理途中被終止
+"""
+
+import asyncio
+import os
+import tempfile
+import time
+import uuid
+import wave
+from datetime import datetime
+
+import pytest
+
+from audio_processor import AudioProcessor
+from batch_processor import BatchProcessor
+from job_queue import FAILED, LEASED, QUEUED, SUCCEEDED, JobQueue, RedisJobQueue, SQLiteJobQueue
+from runtime_config import RuntimeConfig
+
+
+def _redis_queue(max_attempts: int = 3) -> RedisJobQueue:
+    url = os.getenv('REDIS_URL')
+    try:
+        if url:
+            import redis
+            client = redis.Redis.from_url(url, decode_responses=True)
+            client.ping()
+        else:
+            import fakeredis
+            client = fakeredis.FakeRedis(decode_responses=True)
+            client.eval("return 1", 0)
+    except Exception as e:
+        pytest.skip(f"沒有可用的 Redis（{e}）")
+    return RedisJobQueue(namespace=f"test-{uuid.uuid4().hex[:8]}", max_attempts=max_attempts, client=client)
+
+
+def _cleanup_redis(queue: RedisJobQueue):
+    keys = list(queue.client.scan_iter(f"{queue.namespace}:*"))
+    if keys:
+        queue.client.delete(*keys)
+    queue.close()
+
+
+def _lease_expiry_and_heartbeat(queue: JobQueue):
+    assert queue.enqueue('a', {'input_file': 'a.wav'})
+    assert not queue.enqueue('a', {'input_file': 'a.wav'})
+
+    job = queue.claim('worker1', lease_seconds=0.05)
+    assert job['id'] == 'a' and job['attempts'] == 1 and job['payload'] == {'input_file': 'a.wav'}
+    assert queue.claim('worker2') is None
+    time.sleep(0.1)
+
+    # 租約過期後由其他工作行程取得，原工作行程的結果不再被採用
+    job = queue.claim('worker2', lease_seconds=0.5)
+    assert job['id'] == 'a' and job['attempts'] == 2
+    assert not queue.heartbeat('a', 'worker1')
+    assert not queue.complete('a', 'worker1', {'status': 'success'})
+    time.sleep(0.3)
+    # 心跳延長租約，超過原本的到期時間後仍由 worker2 持有
+    assert queue.heartbeat('a', 'worker2', lease_seconds=0.5)
+    time.sleep(0.35)
+    assert queue.requeue_expired() == 0
+    assert queue.complete('a', 'worker2', {'status': 'success'})
+    assert queue.stats() == {SUCCEEDED: 1}
+    assert queue.jobs(['a'])[0]['result'] == {'status': 'success'}
+
+
+def _fail_requeues_until_max_attempts(queue: JobQueue):
+    queue.enqueue('a', {})
+    queue.enqueue('b', {})
+
+    job = queue.claim('worker1')
+    assert job['id'] == 'a'
+    # 歸還的工作回到佇列且不計入嘗試次數
+    assert queue.release('a', 'worker1')
+    assert queue.jobs(['a'])[0]['attempts'] == 0
+
+    assert queue.claim('worker1')['id'] == 'a'
+    assert queue.fail('a', 'worker1', {'status': 'failed', 'error': 'boom'})
+    assert queue.jobs(['a'])[0]['state'] == QUEUED
+    # 重新排入的工作保留原本的排隊順序
+    job = queue.claim('worker2')
+    assert job['id'] == 'a' and job['attempts'] == 2
+    assert queue.claim('worker1')['id'] == 'b'
+    assert queue.fail('a', 'worker2', {'status': 'failed', 'error': 'boom'})
+    assert queue.jobs(['a'])[0]['state'] == FAILED
+    assert queue.stats() == {FAILED: 1, LEASED: 1}
+
+    # 已失敗的工作可重新排入，嘗試次數歸零
+    assert queue.enqueue('a', {'retry': True})
+    assert queue.jobs(['a'])[0]['attempts'] == 0
+
+    # 租約過期時未達上限的工作重新排入，已達上限的工作標記為失敗
+    assert queue.claim('worker1', lease_seconds=0.05)['id'] == 'a'
+    time.sleep(0.1)
+    assert queue.requeue_expired() == 1
+    assert queue.claim('worker2', lease_seconds=0.05)['attempts'] == 2
+    time.sleep(0.1)
+    assert queue.claim('worker3') is None
+    assert {job['id']: job['state'] for job in queue.jobs(['a', 'b'])} == {'a': FAILED, 'b': LEASED}
+
+
+def test_sqlite_lease_expiry_and_heartbeat():
+    with tempfile.TemporaryDirectory() as tmp:
+        queue = SQLiteJobQueue(os.path.join(tmp, 'jobs.db'))
+        _lease_expiry_and_heartbeat(queue)
+        queue.close()
+
+
+def test_sqlite_fail_requeues_until_max_attempts():
+    with tempfile.TemporaryDirectory() as tmp:
+        queue = SQLiteJobQueue(os.path.join(tmp, 'jobs.db'), max_attempts=2)
+        _fail_requeues_until_max_attempts(queue)
+        queue.close()
+
+
+def test_redis_lease_expiry_and_heartbeat():
+    queue = _redis_queue()
+    try:
+        _lease_expiry_and_heartbeat(queue)
+    finally:
+        _cleanup_redis(queue)
+
+
+def test_redis_fail_requeues_until_max_attempts():
+    queue = _redis_queue(max_attempts=2)
+    try:
+        _fail_requeues_until_max_attempts(queue)
+    finally:
+        _cleanup_redis(queue)
+
+
+class _StubProcessor(AudioProcessor):
+    def warm_up(self):
+        pass
+
+
+class _QueueBatch(BatchProcessor):
+    """以固定延遲取代實際處理的批次處理器"""
+
+    def __init__(self, config, delay: float):
+        super().__init__(config, processor_factory=_StubProcessor, resume=False)
+        self.delay = delay
+        self.started = []
+
+    async def process_single_file(self, input_file: str, output_base_dir: str):
+        self.started.append(os.path.basename(input_file))
+        await asyncio.sleep(self.delay)
+        return {'input_file': input_file, 'status': 'success', 'processed_at': datetime.now().isoformat()}
+
+
+class _CrashedQueue(SQLiteJobQueue):
+    """模擬工作行程當機：停止時無法歸還工作，只能等租約過期"""
+
+    def release(self, job_id: str, worker_id: str) -> bool:
+        return False
+
+
+def test_queue_workers_end_to_end():
+    config = RuntimeConfig()
+    config.logging.file_logging = False
+    with tempfile.TemporaryDirectory() as tmp:
+        input_dir = os.path.join(tmp, 'input')
+        os.makedirs(input_dir)
+        for name in ('a.wav', 'b.wav', 'c.wav'):
+            with wave.open(os.path.join(input_dir, name), 'wb') as wav:
+                wav.setnchannels(1)
+                wav.setsampwidth(2)
+                wav.setframerate(8000)
+                wav.writeframes(b'\0\0' * 800)
+        db_path = os.path.join(tmp, 'jobs.db')
+        output_dir = os.path.join(tmp, 'output')
+        submitter = BatchProcessor(config, processor_factory=_StubProcessor, resume=False)
+        crashed = _QueueBatch(config, delay=60.0)
+        survivor = _QueueBatch(config, delay=0.3)
+
+        async def run():
+            batch = asyncio.create_task(submitter.enqueue_batch(
+                input_dir, output_dir, SQLiteJobQueue(db_path), poll_interval=0.05))
+            lease = 0.3
+            first = asyncio.create_task(crashed.run_queue_worker(
+                _CrashedQueue(db_path), max_concurrent=1, lease_seconds=lease, poll_interval=0.05,
+                exit_when_idle=True))
+            while not crashed.started:
+                await asyncio.sleep(0.01)
+            second = asyncio.create_task(survivor.run_queue_worker(
+                SQLiteJobQueue(db_path), max_concurrent=1, lease_seconds=lease, poll_interval=0.05,
+                exit_when_idle=True))
+            # 第一個工作行程在處理途中被終止，它持有的工作在租約過期後由第二個工作行程重新處理
+            await asyncio.sleep(0.05)
+            first.cancel()
+            await asyncio.gather(first, return_exceptions=True)
+            processed = await asyncio.wait_for(second, timeout=30)
+            return await asyncio.wait_for(batch, timeout=30), processed
+
+        batch_result, processed = asyncio.run(run())
+        assert processed == 3
+        assert batch_result['successful'] == 3 and batch_result['failed'] == 0
+        assert sorted(survivor.started) == ['a.wav', 'b.wav', 'c.wav']
+        killed, = crashed.started
+        attempts = {os.path.basename(result['input_file']): result['attempts'] for result in batch_result['results']}
+        assert attempts == {name: 2 if name == killed else 1 for name in ('a.wav', 'b.wav', 'c.wav')}
+        assert len({result['worker'] for result in batch_result['results']}) == 1
+        assert survivor.metrics.counters['podcast_retries_total'] == {(('stage', 'job'),): 1}
+        assert SQLiteJobQueue(db_path).stats() == {SUCCEEDED: 3}
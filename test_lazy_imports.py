@@ -0,0 +1,13 @@
+#!/usr/bin/env python3
+"""
+延遲載入測試
+在乾淨的子行程中匯入主要模組、顯示 CLI 說明與建立處理器，確認不會提前載入服務商 SDK 等重量級模組
+"""
+
+from benchmarks.bench_startup import SCENARIOS, run_scenario
+
+
+def test_heavy_modules_not_loaded_at_startup():
+    for name, (code, check_modules) in SCENARIOS.items():
+        loaded = run_scenario(code, check_modules)['loaded']
+        assert loaded == [], f"{name} loaded {loaded}"
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+本地語音識別測試
+以替代的模型物件確認片段轉換與即時率計算，並檢查模型路徑解析與後端設定
+"""
+
+import os
+import tempfile
+from types import SimpleNamespace
+
+from audio_processor import AudioProcessor
+from local_transcriber import LocalModelError, LocalTranscriber, faster_whisper_available, resolve_model
+from runtime_config import ConfigError, RuntimeConfig, WhisperConfig
+
+
+class _Model:
+    def __init__(self):
+        self.calls = []
+
+    def transcribe(self, audio_path, **options):
+        self.calls.append((audio_path, options))
+        segments = (SimpleNamespace(start=i * 2.0, end=i * 2.0 + 1.5, text=f" line {i} ") for i in range(3))
+        return segments, SimpleNamespace(duration=6.0, language='en')
+
+
+def test_transcribe_reports_rtf():
+    model = _Model()
+    transcriber = LocalTranscriber(WhisperConfig(language='en', beam_size=5), model=model)
+    for _ in range(2):
+        result = transcriber.transcribe('episode.wav')
+    assert [(s.start, s.end, s.text) for s in result['segments']] == [
+        (0.0, 1.5, 'line 0'), (2.0, 3.5, 'line 1'), (4.0, 5.5, 'line 2')
+    ]
+    assert result['text'] == 'line 0 line 1 line 2'
+    assert result['duration'] == 6.0 and result['rtf'] == result['elapsed'] / 6.0
+    assert model.calls[0] == ('episode.wav', {'temperature': 0.0, 'word_timestamps': False,
+                                              'language': 'en', 'beam_size': 5})
+    assert len(model.calls) == 2
+
+
+def test_resolve_model():
+    with tempfile.TemporaryDirectory() as tmp:
+        os.mkdir(os.path.join(tmp, 'base'))
+        assert resolve_model(tmp) == (tmp, None)
+        assert resolve_model('base', tmp) == (os.path.join(tmp, 'base'), None)
+        assert resolve_model('small', tmp) == ('small', tmp)
+
+
+def test_backend_config():
+    config = RuntimeConfig()
+    config.logging.file_logging = False
+    config.whisper.backend = 'local'
+    # 未安裝 faster-whisper 時直接報錯，不改為上傳到 OpenAI Whisper API
+    try:
+        processor = AudioProcessor(config=config)
+    except LocalModelError:
+        assert not faster_whisper_available()
+    else:
+        assert faster_whisper_available() and processor.transcription_backend == 'local'
+
+    config.whisper.backend = 'cloud'
+    try:
+        config.validate()
+    except ConfigError:
+        return
+    raise AssertionError("whisper.backend 為 cloud 應該無法通過驗證")
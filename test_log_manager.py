@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+結構化日誌測試
+確認進度回報依間隔限速但一定輸出最後進度、進度接收者收到每次更新，以及 json 格式附帶工作上下文
+"""
+
+import json
+import logging
+
+from log_manager import JobContextFilter, ProgressReporter, StructuredFormatter, job_context, progress_sink
+
+
+class _ListHandler(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.records = []
+
+    def emit(self, record):
+        self.records.append(record)
+
+
+def _logger(name: str):
+    logger = logging.getLogger(name)
+    logger.propagate = False
+    logger.setLevel(logging.INFO)
+    handler = _ListHandler()
+    handler.addFilter(JobContextFilter())
+    logger.handlers = [handler]
+    return logger, handler
+
+
+def test_progress_throttled_and_finished():
+    logger, handler = _logger('test_log_manager.progress')
+    updates = []
+    with progress_sink(lambda label, done, total: updates.append(done)):
+        progress = ProgressReporter(logger, "翻譯完成", total=None, min_interval=60.0)
+    for _ in range(50):
+        progress.update()
+    progress.finish()
+    assert [record.fields['progress'] for record in handler.records] == [1, 50]
+    assert updates == list(range(1, 51))
+
+    # 達到總數時不受限速影響
+    bounded = ProgressReporter(logger, "語音生成完成", total=3, min_interval=60.0)
+    handler.records.clear()
+    for _ in range(3):
+        bounded.update()
+    bounded.finish()
+    assert [record.getMessage() for record in handler.records] == ["   語音生成完成 1/3", "   語音生成完成 3/3"]
+
+
+def test_json_format_includes_context():
+    logger, handler = _logger('test_log_manager.context')
+    with job_context(job='episode.wav'):
+        logger.info("處理中", extra={'fields': {'segments': 3}})
+    logger.info("結束")
+
+    payload = json.loads(StructuredFormatter('json').format(handler.records[0]))
+    assert payload['message'] == "處理中" and payload['job'] == 'episode.wav' and payload['segments'] == 3
+    text = StructuredFormatter().format(handler.records[0])
+    assert text == "[job=episode.wav] 處理中"
+    assert 'job' not in json.loads(StructuredFormatter('json').format(handler.records[1]))
@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""
+離線完整流程測試
+以模擬服務執行 process_audio_complete，確認輸出音頻、逐字稿、渲染清單與各階段指標一致
+"""
+
+import asyncio
+import json
+import os
+import tempfile
+import wave
+
+from benchmarks.bench_pipeline import STAGES, stage_throughput
+from benchmarks.stubs import StubAudioProcessor, StubLatency
+from benchmarks.synthetic import write_synthetic_audio
+from runtime_config import RuntimeConfig
+from transcript_store import parse_timestamp
+
+
+def test_process_audio_complete_offline():
+    config = RuntimeConfig()
+    config.logging.file_logging = False
+    processor = StubAudioProcessor(StubLatency(scale=0.0), 1.5, config=config)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        input_path = os.path.join(tmp, 'episode.wav')
+        output_dir = os.path.join(tmp, 'output')
+        write_synthetic_audio(input_path, 15.0)
+        result = asyncio.run(processor.process_audio_complete(input_path, output_dir))
+
+        assert result['segments_count'] == 10
+        assert result['pipeline_stats']['time_to_first_audio'] is not None
+        with wave.open(result['chinese_audio'], 'rb') as wav:
+            frames = wav.getnframes()
+        with open(result['transcript'], encoding='utf-8') as f:
+            transcript = json.load(f)
+        with open(os.path.join(output_dir, 'render_manifest.json'), encoding='utf-8') as f:
+            manifest = json.load(f)
+
+    assert transcript['total_segments'] == 10
+    assert all(entry['translated_text'] for entry in transcript['segments'])
+    starts = [parse_timestamp(entry['start_time']) for entry in transcript['segments']]
+    assert starts == [i * 1.5 for i in range(10)]
+    # 片段依序排列在輸出音頻中，互不重疊
+    placements = [(entry['offset_frames'], entry['length_frames']) for entry in manifest['segments']]
+    assert all(offset + length <= next_offset
+               for (offset, length), (next_offset, _) in zip(placements, placements[1:]))
+    assert placements[-1][0] + placements[-1][1] == frames
+
+    counters = processor.metrics.counters['podcast_segments_total']
+    assert all(counters[(('stage', stage),)] == 10 for stage in ('translation', 'tts', 'mix'))
+    assert set(stage_throughput(processor.metrics)) <= set(STAGES)
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+串流管線階段測試
+確認有界佇列限制上游領先的片段數、上游錯誤傳到下游、並行處理仍依原順序輸出，以及混音不阻塞事件迴圈
+"""
+
+import asyncio
+import random
+import threading
+import time
+
+from audio_processor import AudioProcessor, buffered_stage, ordered_concurrent
+from runtime_config import RuntimeConfig
+
+
+async def _numbers(count: int, produced: list = None):
+    for i in range(count):
+        if produced is not None:
+            produced.append(i)
+        yield i
+        await asyncio.sleep(0)
+
+
+def test_buffered_stage_backpressure():
+    produced = []
+
+    async def run():
+        stage = buffered_stage(_numbers(20, produced), maxsize=2)
+        first = await stage.__anext__()
+        await asyncio.sleep(0.05)
+        # 下游只取走一個，上游最多再領先佇列大小加上手上的一個
+        ahead = len(produced)
+        rest = [item async for item in stage]
+        return first, ahead, rest
+
+    first, ahead, rest = asyncio.run(run())
+    assert first == 0 and ahead <= 4
+    assert rest == list(range(1, 20))
+
+
+def test_buffered_stage_propagates_errors():
+    async def failing():
+        yield 1
+        raise ValueError("stage failed")
+
+    async def run():
+        received = []
+        try:
+            async for item in buffered_stage(failing()):
+                received.append(item)
+        except ValueError as e:
+            return received, str(e)
+
+    assert asyncio.run(run()) == ([1], "stage failed")
+
+
+def test_ordered_concurrent_keeps_order():
+    running = 0
+    peak = 0
+
+    async def work(index: int, item: int) -> int:
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(random.uniform(0, 0.01))
+        running -= 1
+        return item * 10
+
+    async def run():
+        return [result async for result in ordered_concurrent(_numbers(30), work, limit=4)]
+
+    assert asyncio.run(run()) == [i * 10 for i in range(30)]
+    assert 1 < peak <= 4
+
+
+class _SlowMix(AudioProcessor):
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.mix_threads = []
+
+    def _mix_segment(self, writer, audio_info, previous_info):
+        self.mix_threads.append(threading.get_ident())
+        time.sleep(0.1)
+
+
+def test_mix_runs_off_event_loop():
+    config = RuntimeConfig()
+    config.logging.file_logging = False
+    processor = _SlowMix(config=config)
+
+    async def run():
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        task = asyncio.create_task(ticker())
+        await processor._mix_in_thread(None, None, None)
+        task.cancel()
+        return ticks
+
+    # 混音期間事件迴圈仍可執行其他階段的工作
+    assert asyncio.run(run()) >= 5
+    assert processor.mix_threads and processor.mix_threads[0] != threading.get_ident()
@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""
+預覽模式測試
+以模擬服務確認達到片段數或秒數上限後停止翻譯、只轉錄開頭的音頻，且部分逐字稿是有效的 JSON
+"""
+
+import asyncio
+import json
+import os
+import tempfile
+
+from benchmarks.stubs import StubAudioProcessor, StubLatency
+from benchmarks.synthetic import write_synthetic_audio
+from runtime_config import RuntimeConfig
+
+
+def _run_preview(segments: int = 5, seconds: float = None, window_seconds: float = None):
+    config = RuntimeConfig()
+    config.logging.file_logging = False
+    config.preview.segments = segments
+    config.preview.seconds = seconds
+    config.preview.window_seconds = window_seconds
+    processor = StubAudioProcessor(StubLatency(scale=0.0), config=config)
+
+    async def collect(input_path: str, transcript_path: str):
+        return [segment async for segment in processor.stream_preview(input_path, transcript_path)]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        input_path = os.path.join(tmp, 'episode.wav')
+        transcript_path = os.path.join(tmp, 'transcript_preview.json')
+        write_synthetic_audio(input_path, 60.0)
+        previews = asyncio.run(collect(input_path, transcript_path))
+        with open(transcript_path, encoding='utf-8') as f:
+            transcript = json.load(f)
+        leftovers = sorted(name for name in os.listdir(tmp) if name not in ('episode.wav', 'transcript_preview.json'))
+    translated = processor.metrics.counters['podcast_segments_total'][(('stage', 'translation'),)]
+    return previews, transcript, translated, leftovers
+
+
+def test_stops_after_segments():
+    previews, transcript, translated, leftovers = _run_preview(segments=3)
+    assert len(previews) == 3 and translated == 3
+    assert transcript['total_segments'] == 3
+    assert [entry['translated_text'] for entry in transcript['segments']] == [s.translated_text for s in previews]
+    assert transcript['preview']['complete'] is False
+    assert leftovers == []
+
+
+def test_stops_at_seconds_and_window():
+    previews, transcript, translated, _ = _run_preview(segments=100, seconds=3.0)
+    assert [segment.start for segment in previews] == [0.0, 1.5]
+    assert translated == 2
+
+    previews, transcript, translated, leftovers = _run_preview(segments=100, window_seconds=6.0)
+    assert len(previews) == 4 and translated == 4
+    assert transcript['preview'] == {'segments': 100, 'seconds': None, 'window_seconds': 6.0, 'complete': True}
+    assert leftovers == []
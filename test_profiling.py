@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""
+效能分析模式測試
+確認各階段的 cProfile、記憶體報告與取樣堆疊都寫入輸出目錄
+"""
+
+import json
+import os
+import tempfile
+import time
+
+from profiling import Profiler, should_profile
+
+
+def _busy(seconds: float) -> int:
+    total = 0
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        total += sum(range(100))
+    return total
+
+
+def test_writes_stage_reports():
+    with tempfile.TemporaryDirectory() as tmp:
+        profiler = Profiler(os.path.join(tmp, 'profile'), interval=0.005)
+        profiler.start()
+        with profiler.stage('translation'):
+            _busy(0.1)
+            # 巢狀階段只計時，cProfile 由最外層負責
+            with profiler.stage('tts'):
+                _busy(0.05)
+        output_dir = profiler.stop()
+
+        with open(os.path.join(output_dir, 'profile_summary.json'), encoding='utf-8') as f:
+            summary = json.load(f)
+        stages = summary['stages']
+        assert stages['translation']['calls'] == 1 and stages['translation']['seconds'] >= 0.15
+        assert stages['translation']['pstats'] == 'translation.pstats'
+        assert stages['tts']['pstats'] is None
+        assert summary['samples'] > 0 and summary['memory']['peak_bytes'] > 0
+        with open(os.path.join(output_dir, 'stacks.collapsed'), encoding='utf-8') as f:
+            stacks = f.read().splitlines()
+        assert any(line.startswith('translation;') and '_busy' in line for line in stacks)
+        assert os.path.exists(os.path.join(output_dir, 'memory.txt'))
+
+
+def test_should_profile_rate():
+    assert should_profile(1.0)
+    assert not should_profile(0.0)
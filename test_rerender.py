@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+增量重新渲染拼接測試
+確認拼接補上先前失敗或替換的片段後，輸出音頻與幀位置都與完整重新渲染相同，
+以及重新渲染依 processing.concurrent_limit 限制同時合成數，且只修改起訖時間也會重新渲染
+"""
+
+import asyncio
+import json
+import os
+import tempfile
+import wave
+
+from audio_processor import RENDER_MANIFEST_NAME, AudioProcessor
+from runtime_config import RuntimeConfig
+from segment_model import Segment, SegmentAudio
+
+
+def _write_segment(path: str, seconds: float, value: int):
+    with wave.open(path, 'wb') as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(16000)
+        wav.writeframes(value.to_bytes(2, 'little') * int(16000 * seconds))
+
+
+def _render(processor: AudioProcessor, path: str, audio_files):
+    writer = processor._create_writer(path)
+    previous = None
+    for audio_info in audio_files:
+        processor._mix_segment(writer, audio_info, previous)
+        previous = audio_info
+    writer.close()
+
+
+def _frames(path: str) -> bytes:
+    with wave.open(path, 'rb') as wav:
+        return wav.readframes(wav.getnframes())
+
+
+def _placements(processor: AudioProcessor, audio_files, count: int):
+    mixed = {audio_info.index: audio_info for audio_info in audio_files}
+    placements = []
+    for i in range(count):
+        audio_info = mixed.get(i)
+        placements.append({
+            'index': i,
+            'offset_frames': audio_info.offset_frames if audio_info else None,
+            'length_frames': audio_info.length_frames if audio_info else None,
+            'pause_after_ms': processor._pause_after(audio_info) if audio_info else None
+        })
+    return placements
+
+
+def test_splice_matches_full_render():
+    config = RuntimeConfig()
+    config.logging.file_logging = False
+    config.output.create_segments = True
+    processor = AudioProcessor(config=config)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        timings = [(0.0, 4.0), (4.0, 10.0), (10.0, 12.0), (12.0, 20.0)]
+
+        def audio(index: int, seconds: float, value: int) -> SegmentAudio:
+            path = os.path.join(tmp, f"segment_{index}_{value}.wav")
+            _write_segment(path, seconds, value)
+            return SegmentAudio(path, index, *timings[index], 'A')
+
+        original = [audio(0, 0.5, 1), audio(2, 0.3, 3), audio(3, 0.4, 4)]
+        source_path = os.path.join(tmp, 'source.wav')
+        _render(processor, source_path, original)
+        placements = _placements(processor, original, 4)
+
+        # 片段 1 先前合成失敗，片段 2 的文字被修改
+        new_audio = {1: audio(1, 0.7, 2), 2: audio(2, 0.2, 5)}
+        spliced_path = os.path.join(tmp, 'spliced.wav')
+        processor._splice_segments(source_path, spliced_path, placements, new_audio)
+
+        full = [original[0], new_audio[1], new_audio[2], audio(3, 0.4, 4)]
+        full_path = os.path.join(tmp, 'full.wav')
+        _render(processor, full_path, full)
+
+        assert _frames(spliced_path) == _frames(full_path)
+        assert placements == _placements(processor, full, 4)
+
+
+class _StubSynthesis(AudioProcessor):
+    """以固定長度的 WAV 取代語音合成，並記錄同時進行的合成數"""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.running = 0
+        self.max_running = 0
+        self.synthesized = []
+
+    async def _synthesize_segment(self, segment, index, output_dir):
+        self.running += 1
+        self.max_running = max(self.max_running, self.running)
+        await asyncio.sleep(0.02)
+        self.running -= 1
+        self.synthesized.append(index)
+        path = os.path.join(output_dir, f"segment_{index:03d}_{segment.speaker}.wav")
+        _write_segment(path, 0.1 + 0.1 * index, index + 1)
+        return SegmentAudio(path, index, segment.start, segment.end, segment.speaker)
+
+
+def test_rerender_bounded_and_timing_aware():
+    config = RuntimeConfig()
+    config.logging.file_logging = False
+    config.tts.session_pool_size = 0
+    config.processing.concurrent_limit = 2
+    processor = _StubSynthesis(config=config)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        segments = []
+        for i in range(5):
+            segment = Segment(i * 4.0, i * 4.0 + 2.0, f"line {i}", speaker='AB'[i % 2])
+            segment.original_text = segment.text
+            segment.translated_text = f"第 {i} 句"
+            segments.append(segment)
+        original = asyncio.run(_synthesize_all(processor, segments, tmp))
+        writer = processor._create_writer(os.path.join(tmp, 'chinese.wav'))
+        previous = None
+        for audio_info in original:
+            processor._mix_segment(writer, audio_info, previous)
+            previous = audio_info
+        writer.close()
+        processor.save_render_manifest(segments, {a.index: a for a in original}, writer, tmp)
+        transcript = processor._transcript_data(segments)
+        transcript_path = os.path.join(tmp, 'transcript.json')
+
+        def save():
+            with open(transcript_path, 'w', encoding='utf-8') as f:
+                json.dump(transcript, f, ensure_ascii=False)
+
+        save()
+        assert asyncio.run(processor.rerender(tmp))['changed_segments'] == []
+
+        # 修改三段文字，並只修改一段的結束時間（影響其後的停頓）
+        for i in (0, 1, 4):
+            transcript['segments'][i]['translated_text'] += '（修訂）'
+        transcript['segments'][2]['end_time'] = processor._format_timestamp(20.0)
+        save()
+        processor.synthesized.clear()
+        processor.max_running = 0
+        result = asyncio.run(processor.rerender(tmp))
+        assert result['changed_segments'] == [0, 1, 2, 4] and result['failed_segments'] == []
+        assert sorted(processor.synthesized) == [0, 1, 2, 4]
+        assert processor.max_running == 2
+
+        with open(os.path.join(tmp, RENDER_MANIFEST_NAME), encoding='utf-8') as f:
+            manifest = json.load(f)
+        assert manifest['segments'][2]['pause_after_ms'] == config.dialogue.pause_duration.long
+        assert asyncio.run(processor.rerender(tmp))['changed_segments'] == []
+
+
+async def _synthesize_all(processor, segments, output_dir):
+    return [await processor._synthesize_segment(segment, i, output_dir) for i, segment in enumerate(segments)]
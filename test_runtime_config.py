@@ -0,0 +1,40 @@
+#!/usr/bin/env python3
+"""
+執行期配置測試
+確認內建設定檔可載入，且只做驗證、不會生效的設定在載入時記錄警告
+"""
+
+import logging
+
+from runtime_config import PROFILES, RuntimeConfig, load_config
+
+
+class _Records(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.messages = []
+
+    def emit(self, record):
+        self.messages.append(record.getMessage())
+
+
+def test_unsupported_settings_warned():
+    assert RuntimeConfig().unsupported_settings() == []
+    handler = _Records()
+    logger = logging.getLogger('runtime_config')
+    logger.addHandler(handler)
+    try:
+        configs = {name: load_config(name) for name in PROFILES}
+    finally:
+        logger.removeHandler(handler)
+
+    assert configs['default'].unsupported_settings() == []
+    fast = configs['fast'].unsupported_settings()
+    assert 'performance.io_optimization' in fast and 'whisper.fp16' in fast
+    assert 'performance.cache_enabled' not in fast
+    high_quality = configs['high_quality'].unsupported_settings()
+    for path in ('dialogue.advanced_analysis', 'processing.quality_check', 'output.audio_normalization',
+                 'quality.min_confidence'):
+        assert path in high_quality, path
+    assert len(handler.messages) == 2
+    assert all('目前不會生效' in message for message in handler.messages)
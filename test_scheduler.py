@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+資源排程器測試
+確認等待中的文件輪流取得名額，以及多個工作行程共用名額時整批的並發上限成立
+"""
+
+import asyncio
+import multiprocessing
+
+from scheduler import ResourceScheduler, start_shared_capacity
+
+
+def test_round_robin_between_jobs():
+    scheduler = ResourceScheduler({'translation': 1})
+    order = []
+
+    async def segment(job_id: str):
+        async with scheduler.slot('translation', job_id):
+            order.append(job_id)
+            await asyncio.sleep(0.01)
+
+    async def run():
+        # 長文件先排入大量片段，短文件仍每隔一個名額輪到一次
+        tasks = [asyncio.create_task(segment('long')) for _ in range(6)]
+        await asyncio.sleep(0)
+        tasks += [asyncio.create_task(segment('short')) for _ in range(2)]
+        await asyncio.gather(*tasks)
+
+    asyncio.run(run())
+    assert order[:5] == ['long', 'long', 'short', 'long', 'short']
+    stats = scheduler.stats()['translation']
+    assert stats['max_in_use'] == 1 and stats['granted'] == 8
+
+
+def _hold_slots(shared, job_id: str, segments: int):
+    scheduler = ResourceScheduler({'tts': 2}, shared=shared)
+
+    async def segment():
+        async with scheduler.slot('tts', job_id):
+            await asyncio.sleep(0.05)
+
+    async def run():
+        await asyncio.gather(*(segment() for _ in range(segments)))
+
+    asyncio.run(run())
+
+
+def test_shared_capacity_caps_all_workers():
+    manager, shared = start_shared_capacity({'tts': 2})
+    try:
+        context = multiprocessing.get_context('spawn')
+        # 每個行程本地上限都是 2，三個行程合計仍不可超過 2
+        processes = [context.Process(target=_hold_slots, args=(shared, f"episode{i}", 4)) for i in range(3)]
+        for process in processes:
+            process.start()
+        for process in processes:
+            process.join(60)
+        assert all(process.exitcode == 0 for process in processes)
+        stats = shared.stats()['tts']
+    finally:
+        manager.shutdown()
+    assert stats['granted'] == 12
+    assert stats['max_in_use'] == 2
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+片段資料模型測試
+確認 Segment 與 SegmentAudio 的 MutableMapping 行為與原本各階段輸出的字典相同
+"""
+
+import copy
+import json
+import pickle
+
+from segment_model import Segment, SegmentAudio, as_segment, as_segment_audio
+
+
+def test_segment_behaves_like_dict():
+    segment = Segment(1.0, 2.5, "Is it?", speaker='A', confidence=0.9)
+    assert dict(segment) == {'start': 1.0, 'end': 2.5, 'text': "Is it?", 'words': [], 'speaker': 'A',
+                             'confidence': 0.9}
+    assert segment['speaker'] == segment.speaker == 'A'
+    assert segment.get('is_question') is None and 'is_question' not in segment
+    assert segment.dialogue_type() == {'is_question': False, 'is_response': False, 'is_transition': False}
+
+    segment['is_question'] = True
+    segment['source'] = 'whisper'
+    assert segment.is_question and segment['source'] == 'whisper'
+    assert list(segment)[-2:] == ['confidence', 'source']
+    assert len(segment) == 8 and segment.duration == 1.5
+
+    del segment['is_question']
+    del segment['source']
+    for key in ('is_question', 'missing'):
+        try:
+            del segment[key]
+        except KeyError:
+            pass
+        else:
+            raise AssertionError(f"deleting {key} should raise KeyError")
+    try:
+        segment['translated_text']
+    except KeyError:
+        pass
+    else:
+        raise AssertionError("unset field should raise KeyError")
+
+    # 字典寫法與序列化
+    segment.update(translated_text='是嗎？', original_text="Is it?")
+    assert {**segment, 'index': 3}['translated_text'] == '是嗎？'
+    assert json.loads(json.dumps(segment.to_dict())) == dict(segment)
+    assert dict(pickle.loads(pickle.dumps(segment))) == dict(segment)
+    duplicate = segment.copy()
+    duplicate['speaker'] = 'B'
+    assert segment['speaker'] == 'A' and dict(copy.deepcopy(segment)) == dict(segment)
+
+
+def test_conversion_helpers():
+    raw = {'start': 0.0, 'end': 1.0, 'text': 'Hi', 'speaker': 'B', 'custom': 1}
+    segment = as_segment(raw)
+    assert isinstance(segment, Segment) and dict(segment) == {**raw}
+    assert as_segment(segment) is segment
+    assert segment == raw
+
+    audio = SegmentAudio('segment_000_A.wav', 0, 0.0, 1.2, 'A')
+    audio['offset_frames'] = 0
+    assert audio['duration'] == 1.2 and 'length_frames' not in audio
+    assert as_segment_audio(dict(audio)) == audio
+    assert as_segment_audio(audio) is audio
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+工作服務測試
+以本地 HTTP 伺服器確認佇列已滿時回應 429、路徑限制在允許的目錄，以及排隊的工作依序完成
+"""
+
+import asyncio
+import os
+import tempfile
+
+from aiohttp.test_utils import TestClient, TestServer
+
+from benchmarks.stubs import StubAudioProcessor, StubLatency
+from runtime_config import RuntimeConfig
+from service import JobService, create_app
+
+
+class _GatedProcessor(StubAudioProcessor):
+    """等到測試放行才完成的處理器"""
+
+    def __init__(self, metrics=None, config=None):
+        super().__init__(StubLatency(scale=0.0), metrics=metrics, config=config)
+        self.gate = asyncio.Event()
+
+    async def process_audio_complete(self, input_wav_path: str, output_dir: str = "output"):
+        await self.gate.wait()
+        return {'segments_count': 1, 'total_duration': 1.5, 'pipeline_stats': {}}
+
+
+async def _wait_for(condition, timeout: float = 5.0):
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not condition():
+        assert asyncio.get_running_loop().time() < deadline
+        await asyncio.sleep(0.01)
+
+
+def test_bounded_queue_rejects_when_full():
+    config = RuntimeConfig()
+    config.logging.file_logging = False
+
+    with tempfile.TemporaryDirectory() as tmp:
+        inputs = os.path.join(tmp, 'inputs')
+        os.mkdir(inputs)
+        paths = []
+        for i in range(4):
+            path = os.path.join(inputs, f"episode{i}.wav")
+            with open(path, 'wb') as f:
+                f.write(b'RIFF')
+            paths.append(path)
+
+        async def run():
+            service = JobService(config, workers=1, queue_size=2, work_dir=os.path.join(tmp, 'service'),
+                                 processor_factory=_GatedProcessor, path_roots=[inputs])
+            async with TestClient(TestServer(create_app(service))) as client:
+                first = await client.post('/jobs', json={'path': paths[0]})
+                assert first.status == 202
+                await _wait_for(lambda: service.running == 1)
+
+                queued = [await client.post('/jobs', json={'path': path}) for path in paths[1:3]]
+                assert [response.status for response in queued] == [202, 202]
+                rejected = await client.post('/jobs', json={'path': paths[3]})
+                assert rejected.status == 429 and rejected.headers['Retry-After'] == '5'
+                outside = await client.post('/jobs', json={'path': os.path.join(tmp, 'other.wav')})
+                assert outside.status == 403
+
+                health = await (await client.get('/health')).json()
+                assert health['running'] == 1 and health['queued'] == 2
+
+                service.processor.gate.set()
+                await _wait_for(lambda: all(job.status == 'success' for job in service.jobs.values()))
+                jobs = await (await client.get('/jobs')).json()
+                metrics = await (await client.get('/metrics')).text()
+            return jobs, metrics
+
+        jobs, metrics = asyncio.run(run())
+    assert [job['input_file'] for job in jobs] == ['episode0.wav', 'episode1.wav', 'episode2.wav']
+    assert 'podcast_jobs_total{status="rejected"} 1' in metrics
@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+"""
+中文口語後處理與語音標記測試
+確認口語化規則、Edge TTS 參數與 SSML 輸出（含 XML 跳脫）正確
+"""
+
+from runtime_config import RuntimeConfig
+from speech_markup import SpeechRewriter
+
+LONG_TEXT = "研究團隊花了三年收集資料，接著又花了一年分析，最後才發表結果，這在這個領域其實相當常見，也說明了長期追蹤的重要性。"
+
+
+def test_enhance():
+    rewriter = SpeechRewriter()
+    assert rewriter.enhance("你覺得這代表什麼", is_question=True) == "那你覺得這代表什麼？"
+    assert rewriter.enhance("所以重點是規模?", is_question=True) == "所以重點是規模?"
+    assert rewriter.enhance("這正是重點。", is_response=True) == "嗯，這正是重點。"
+    assert rewriter.enhance("對，沒錯。", is_response=True) == "對，沒錯。"
+    assert rewriter.enhance("還有一篇研究。", is_transition=True) == "還有一篇研究。"
+    assert rewriter.enhance("一篇研究。", is_transition=True) == "說到這個，一篇研究。"
+    assert rewriter.enhance(LONG_TEXT) == LONG_TEXT.replace('，', '呢，', 1)
+
+
+def test_edge_arguments():
+    config = RuntimeConfig()
+    config.tts.speech_rate = 1.1
+    config.tts.speech_pitch = 2
+    rewriter = SpeechRewriter.from_config(config)
+    assert rewriter.edge_arguments(rewriter.plan("好。")) == ("好。", "+10%", "+2Hz")
+    assert rewriter.edge_arguments(rewriter.plan("真的嗎？", is_question=True)) == ("真的嗎？", "+0%", "+12Hz")
+    assert rewriter.edge_arguments(rewriter.plan("對。", is_response=True)) == ("對。", "+10%", "-2Hz")
+
+    config.tts.prosody_adjustment = False
+    rewriter = SpeechRewriter.from_config(config)
+    assert rewriter.edge_arguments(rewriter.plan("真的嗎？", is_question=True)) == ("真的嗎？", "+10%", "+2Hz")
+
+
+def test_ssml():
+    rewriter = SpeechRewriter()
+    plan = rewriter.plan("A<B & C，真的嗎？", is_question=True)
+    assert plan.breaks == [(8, 300), (11, 500)]
+    ssml = rewriter.to_ssml(plan, 'zh-TW-HsiaoChenNeural')
+    assert '<prosody rate="-10%" pitch="+10Hz">' in ssml
+    assert 'A&lt;B &amp; C，<break time="300ms"/>真的嗎<break time="500ms"/>？</prosody>' in ssml
+
+    quiet = SpeechRewriter(add_pauses=False)
+    assert '<break' not in quiet.to_ssml(quiet.plan("好，走吧。"), 'zh-TW-YunJheNeural')
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+逐字稿全文檢索測試
+確認回填索引 JSON 與欄式逐字稿、未變更的集數略過、已刪除的集數移除、無法讀取的逐字稿記錄警告，以及中英文子字串與短查詢
+"""
+
+import json
+import logging
+import os
+import shutil
+import tempfile
+
+from transcript_index import TranscriptIndex
+from transcript_store import json_to_store
+
+
+def _write_episode(root: str, name: str, lines, columnar: bool = False):
+    directory = os.path.join(root, name)
+    os.makedirs(directory)
+    transcript = {'segments': [{
+        'start_time': f"{i * 2.0:.2f}s",
+        'end_time': f"{i * 2.0 + 1.5:.2f}s",
+        'speaker': 'AB'[i % 2],
+        'original_text': original,
+        'translated_text': translated,
+        'dialogue_type': {}
+    } for i, (original, translated) in enumerate(lines)]}
+    path = os.path.join(directory, 'transcript.json')
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(transcript, f, ensure_ascii=False)
+    if columnar:
+        json_to_store(path)
+        os.remove(path)
+    return directory
+
+
+def test_backfill_and_search():
+    with tempfile.TemporaryDirectory() as tmp:
+        root = os.path.join(tmp, 'output')
+        _write_episode(root, 'episode1', [("We talk about model alignment.", "我們談談模型對齊。"),
+                                          ("Is it safe?", "它安全嗎？")])
+        second = _write_episode(root, 'episode2', [("Alignment research takes years.", "對齊研究需要多年。"),
+                                                   ("Scaling laws matter.", "規模定律很重要。")], columnar=True)
+        index = TranscriptIndex(os.path.join(tmp, 'search.db'))
+
+        summary = index.backfill(root)
+        assert summary == {'episodes': 2, 'indexed': 2, 'unchanged': 0, 'segments': 4, 'failed': 0, 'removed': 0}
+        assert index.backfill(root)['unchanged'] == 2
+
+        hits = index.search('alignment')
+        assert sorted(hit['episode'] for hit in hits) == ['episode1', 'episode2']
+        assert index.search('lignmen', field='translated') == []
+        if index.trigram:
+            hit, = index.search('模型對齊', field='translated')
+            assert (hit['episode'], hit['start_ms'], hit['end_ms']) == ('episode1', 0, 1500)
+            assert {hit['episode'] for hit in index.search('對齊')} == {'episode1', 'episode2'}
+        hit, = index.search('Scaling', episode='episode2')
+        assert hit['speaker'] == 'B' and hit['segment_index'] == 1
+        assert index.search('"unbalanced', raw=False) == []
+
+        shutil.rmtree(second)
+        assert index.backfill(root)['removed'] == 1
+        assert index.stats() == {'episodes': 1, 'segments': 2}
+
+
+class _Records(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.messages = []
+
+    def emit(self, record):
+        self.messages.append(record.getMessage())
+
+
+def test_backfill_logs_unreadable_transcript():
+    with tempfile.TemporaryDirectory() as tmp:
+        root = os.path.join(tmp, 'output')
+        _write_episode(root, 'episode1', [("Hello.", "你好。")])
+        broken = os.path.join(root, 'episode2')
+        os.makedirs(broken)
+        with open(os.path.join(broken, 'transcript.json'), 'w', encoding='utf-8') as f:
+            f.write('{"segments": [')
+        handler = _Records()
+        logger = logging.getLogger('transcript_index')
+        logger.addHandler(handler)
+        try:
+            summary = TranscriptIndex(os.path.join(tmp, 'search.db')).backfill(root)
+        finally:
+            logger.removeHandler(handler)
+        assert summary['indexed'] == 1 and summary['failed'] == 1
+        assert len(handler.messages) == 1 and 'episode2' in handler.messages[0]
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+欄式逐字稿存放格式測試
+確認 transcript.json 與 .ptc 互相轉換後內容不變，以及 mmap 讀取個別片段與負索引
+"""
+
+import json
+import os
+import tempfile
+
+from transcript_store import STORE_SUFFIX, TranscriptStore, json_to_store, load_transcript, store_to_json
+
+
+def _transcript(count: int, timestamp_format: str = 'seconds'):
+    def stamp(seconds):
+        return f"{int(round(seconds * 1000))}ms" if timestamp_format == 'milliseconds' else f"{seconds:.2f}s"
+
+    return {
+        'timestamp': '2024-01-01T00:00:00',
+        'total_segments': count,
+        'segments': [{
+            'start_time': stamp(i * 1.5),
+            'end_time': stamp(i * 1.5 + 1.25),
+            'speaker': 'AB'[i % 2] if i != 7 else 'C',
+            'original_text': f"Sentence {i} & <tags>",
+            'translated_text': f"第 {i} 句，中文「測試」😀" if i % 3 else '',
+            'dialogue_type': {'is_question': i % 2 == 0, 'is_response': i % 3 == 0, 'is_transition': i == 9}
+        } for i in range(count)]
+    }
+
+
+def test_round_trip():
+    with tempfile.TemporaryDirectory() as tmp:
+        for timestamp_format in ('seconds', 'milliseconds'):
+            transcript = _transcript(11, timestamp_format)
+            json_path = os.path.join(tmp, f"{timestamp_format}.json")
+            with open(json_path, 'w', encoding='utf-8') as f:
+                json.dump(transcript, f, ensure_ascii=False)
+
+            store_path = json_to_store(json_path)
+            assert store_path.endswith(STORE_SUFFIX)
+            assert load_transcript(store_path) == transcript
+            restored = store_to_json(store_path, os.path.join(tmp, 'restored.json'))
+            with open(restored, encoding='utf-8') as f:
+                assert json.load(f) == transcript
+
+        empty_path = os.path.join(tmp, 'empty.json')
+        with open(empty_path, 'w', encoding='utf-8') as f:
+            json.dump(_transcript(0), f)
+        assert load_transcript(json_to_store(empty_path))['segments'] == []
+
+
+def test_mmap_slicing():
+    transcript = _transcript(20)
+    with tempfile.TemporaryDirectory() as tmp:
+        json_path = os.path.join(tmp, 'transcript.json')
+        with open(json_path, 'w', encoding='utf-8') as f:
+            json.dump(transcript, f, ensure_ascii=False)
+        with TranscriptStore(json_to_store(json_path)) as store:
+            assert len(store) == 20
+            assert store[7] == transcript['segments'][7]
+            assert store[-1] == transcript['segments'][-1]
+            assert store.translated_text(4) == "第 4 句，中文「測試」😀"
+            assert store.speaker(7) == 'C' and store.flag('is_transition', 9)
+            assert abs(store.total_duration() - 20 * 1.25) < 1e-9
+            try:
+                store[20]
+            except IndexError:
+                pass
+            else:
+                raise AssertionError("index past the end should raise IndexError")
+
+        # 不是存放格式的文件
+        with open(os.path.join(tmp, 'bad' + STORE_SUFFIX), 'wb') as f:
+            f.write(b'NOPE' + b'\0' * 16)
+        try:
+            TranscriptStore(os.path.join(tmp, 'bad' + STORE_SUFFIX))
+        except ValueError:
+            pass
+        else:
+            raise AssertionError("invalid store should raise ValueError")
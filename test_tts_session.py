@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Edge TTS 連線池測試
+以本地 websocket 模擬服務確認請求重用連線、斷線後自動重新連線，以及 AudioProcessor 的整合
+（包括停頓以 SSML <break> 送出）
+"""
+
+import asyncio
+import os
+import tempfile
+
+from audio_processor import AudioProcessor
+from benchmarks.edge_stub import LocalEdgeServer, stub_audio
+from metrics import MetricsRegistry
+from runtime_config import RuntimeConfig
+from segment_model import Segment
+from speech_markup import SpeechRewriter
+from tts_session import TTSSessionPool, full_voice_name
+
+
+def test_reuses_connections():
+    async def run():
+        async with LocalEdgeServer() as server:
+            pool = TTSSessionPool(2, url=server.url)
+            texts = [f"第 {i} 段 & <測試>" for i in range(8)]
+            audio = await asyncio.gather(*(pool.synthesize(text, 'zh-TW-HsiaoChenNeural') for text in texts))
+            await pool.close()
+            return server, pool.stats(), texts, audio
+
+    server, stats, texts, audio = asyncio.run(run())
+    assert audio == [stub_audio(text) for text in texts]
+    assert server.connections == 2
+    assert stats['connections'] == 2 and stats['requests'] == 8 and stats['reconnects'] == 0
+
+
+def test_reconnects_after_drop():
+    metrics = MetricsRegistry()
+
+    async def run():
+        async with LocalEdgeServer(drop_after=2) as server:
+            pool = TTSSessionPool(1, url=server.url, metrics=metrics)
+            audio = [await pool.synthesize(f"句子 {i}", 'zh-TW-YunJheNeural') for i in range(5)]
+            await pool.close()
+            return server, pool.stats(), audio
+
+    server, stats, audio = asyncio.run(run())
+    assert audio == [stub_audio(f"句子 {i}") for i in range(5)]
+    assert server.requests == 5
+    assert stats['reconnects'] == 2 and stats['connections'] == 3
+    assert metrics.counters['podcast_retries_total'][(('stage', 'tts'),)] == 2
+
+
+def test_processor_uses_pool():
+    config = RuntimeConfig()
+    config.logging.file_logging = False
+    processor = AudioProcessor(config=config)
+
+    async def run(output_file: str):
+        async with LocalEdgeServer() as server:
+            async with processor.tts_sessions() as pool:
+                pool.url, pool.headers = server.url, None
+                for _ in range(3):
+                    await processor._synthesize_to_file("你好", 'zh-TW-HsiaoChenNeural', output_file)
+            return server
+
+    with tempfile.TemporaryDirectory() as tmp:
+        output_file = os.path.join(tmp, 'segment.wav')
+        server = asyncio.run(run(output_file))
+        with open(output_file, 'rb') as f:
+            assert f.read() == stub_audio("你好")
+    assert server.connections == 1
+    assert processor._tts_pool is None
+
+
+def test_pauses_sent_as_ssml():
+    config = RuntimeConfig()
+    config.logging.file_logging = False
+    config.performance.cache_enabled = False
+    processor = AudioProcessor(config=config)
+    segment = Segment(0.0, 2.0, "Well, let's go.", speaker='A', translated_text='好，走吧。')
+
+    async def run(output_dir: str):
+        async with LocalEdgeServer() as server:
+            async with processor.tts_sessions() as pool:
+                pool.url, pool.headers = server.url, None
+                first = await processor._synthesize_segment(segment, 0, output_dir)
+                config.tts.add_pauses = False
+                processor.speech_rewriter = SpeechRewriter.from_config(config)
+                second = await processor._synthesize_segment(segment, 1, output_dir)
+            return first, second
+
+    with tempfile.TemporaryDirectory() as tmp:
+        first, second = asyncio.run(run(tmp))
+        with open(first.file, 'rb') as f:
+            assert f.read() == stub_audio('好，<break time="300ms"/>走吧。<break time="500ms"/>')
+        with open(second.file, 'rb') as f:
+            assert f.read() == stub_audio('好，走吧。')
+
+
+def test_full_voice_name():
+    assert full_voice_name('zh-TW-HsiaoChenNeural') == \
+        'Microsoft Server Speech Text to Speech Voice (zh-TW, HsiaoChenNeural)'
+    assert full_voice_name('zh-CN-liaoning-XiaobeiNeural') == \
+        'Microsoft Server Speech Text to Speech Voice (zh-CN-liaoning, XiaobeiNeural)'
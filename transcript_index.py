@@ -0,0 +1,315 @@
+#!/usr/bin/env python3
+"""
+逐字稿全文檢索 - 以 SQLite FTS5 索引所有已處理集數的原文與譯文
+
+每個輸出目錄（內含 transcript.json 或 transcript.ptc）視為一集。片段存放在一般資料表中，
+FTS5 以 external content 方式索引原文與譯文，查詢結果返回集數、說話者與毫秒時間位置。
+使用 trigram 分詞器，英文與中文都能以子字串查詢；少於三個字的查詢改以 LIKE 比對。
+
+使用方法:
+python transcript_index.py backfill output/ --index search.db     # 索引 output/ 下所有逐字稿
+python transcript_index.py search "alignment" --index search.db
+python transcript_index.py search "對齊" --field translated --limit 50
+"""
+
+import logging
+import os
+import sqlite3
+import time
+from typing import Dict, Iterator, List, Optional
+
+from transcript_store import STORE_SUFFIX, load_transcript, parse_timestamp
+
+DEFAULT_INDEX_PATH = 'transcript_index.db'
+TRANSCRIPT_NAMES = ('transcript.json', 'transcript' + STORE_SUFFIX)
+SEARCH_FIELDS = ('both', 'original', 'translated')
+TRIGRAM_MIN_LENGTH = 3
+
+logger = logging.getLogger(__name__)
+
+
+class TranscriptIndex:
+    """逐字稿全文檢索索引
+
+    每次操作各自開啟連線並在單一交易中完成，批次處理的多個工作行程可以同時寫入同一個索引。
+    """
+
+    _SCHEMA = """
+        CREATE TABLE IF NOT EXISTS episodes (
+            id INTEGER PRIMARY KEY,
+            directory TEXT NOT NULL UNIQUE,
+            episode TEXT NOT NULL,
+            transcript_path TEXT NOT NULL,
+            source TEXT,
+            fingerprint TEXT NOT NULL,
+            segment_count INTEGER NOT NULL,
+            indexed_at REAL NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS segments (
+            id INTEGER PRIMARY KEY,
+            episode_id INTEGER NOT NULL REFERENCES episodes (id),
+            segment_index INTEGER NOT NULL,
+            start_ms INTEGER NOT NULL,
+            end_ms INTEGER NOT NULL,
+            speaker TEXT,
+            original_text TEXT NOT NULL,
+            translated_text TEXT NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS segments_episode ON segments (episode_id);
+        CREATE TRIGGER IF NOT EXISTS segments_insert AFTER INSERT ON segments BEGIN
+            INSERT INTO segments_fts (rowid, original_text, translated_text)
+            VALUES (new.id, new.original_text, new.translated_text);
+        END;
+        CREATE TRIGGER IF NOT EXISTS segments_delete AFTER DELETE ON segments BEGIN
+            INSERT INTO segments_fts (segments_fts, rowid, original_text, translated_text)
+            VALUES ('delete', old.id, old.original_text, old.translated_text);
+        END;
+    """
+
+    _FTS_SCHEMA = (
+        "CREATE VIRTUAL TABLE IF NOT EXISTS segments_fts USING fts5("
+        "original_text, translated_text, content='segments', content_rowid='id', tokenize='{tokenizer}')"
+    )
+
+    def __init__(self, path: str = DEFAULT_INDEX_PATH):
+        self.path = path
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        conn = self._connect()
+        try:
+            try:
+                conn.execute(self._FTS_SCHEMA.format(tokenizer='trigram'))
+            except sqlite3.OperationalError:
+                # SQLite 3.34 以前沒有 trigram 分詞器，中文只能以整段詞組比對
+                conn.execute(self._FTS_SCHEMA.format(tokenizer='unicode61'))
+            conn.executescript(self._SCHEMA)
+            sql = conn.execute("SELECT sql FROM sqlite_master WHERE name = 'segments_fts'").fetchone()[0]
+        finally:
+            conn.close()
+        self.trigram = 'trigram' in sql
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level='IMMEDIATE')
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def index_transcript(self, transcript_path: str, episode: str = None, source: str = None,
+                         force: bool = False) -> int:
+        """索引一集逐字稿，返回寫入的片段數；逐字稿未變更時略過並返回 0"""
+        transcript_path = os.path.abspath(transcript_path)
+        directory = os.path.dirname(transcript_path)
+        stat = os.stat(transcript_path)
+        fingerprint = f"{stat.st_size}:{stat.st_mtime_ns}"
+
+        conn = self._connect()
+        try:
+            row = conn.execute(
+                "SELECT fingerprint, transcript_path FROM episodes WHERE directory = ?", (directory,)
+            ).fetchone()
+            if not force and row and row['fingerprint'] == fingerprint and row['transcript_path'] == transcript_path:
+                return 0
+
+            # 讀取在交易外進行，避免大型逐字稿長時間持有寫入鎖
+            entries = load_transcript(transcript_path)['segments']
+            rows = [
+                (i, round(parse_timestamp(entry['start_time']) * 1000), round(parse_timestamp(entry['end_time']) * 1000),
+                 entry.get('speaker'), entry.get('original_text', ''), entry.get('translated_text', ''))
+                for i, entry in enumerate(entries)
+            ]
+            with conn:
+                episode_id = self._delete_episode(conn, directory)
+                episode_id = conn.execute(
+                    "INSERT INTO episodes (id, directory, episode, transcript_path, source, fingerprint, "
+                    "segment_count, indexed_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    (episode_id, directory, episode or os.path.basename(directory), transcript_path,
+                     source, fingerprint, len(rows), time.time())
+                ).lastrowid
+                conn.executemany(
+                    "INSERT INTO segments (episode_id, segment_index, start_ms, end_ms, speaker, "
+                    "original_text, translated_text) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    [(episode_id, *values) for values in rows]
+                )
+            return len(rows)
+        finally:
+            conn.close()
+
+    def _delete_episode(self, conn: sqlite3.Connection, directory: str) -> Optional[int]:
+        """刪除一集的片段與紀錄，返回原本的 ID（重新索引時沿用）"""
+        row = conn.execute("SELECT id FROM episodes WHERE directory = ?", (directory,)).fetchone()
+        if row is None:
+            return None
+        conn.execute("DELETE FROM segments WHERE episode_id = ?", (row['id'],))
+        conn.execute("DELETE FROM episodes WHERE id = ?", (row['id'],))
+        return row['id']
+
+    def remove(self, directory: str) -> bool:
+        conn = self._connect()
+        try:
+            with conn:
+                return self._delete_episode(conn, os.path.abspath(directory)) is not None
+        finally:
+            conn.close()
+
+    def prune(self, root: str = None) -> int:
+        """移除逐字稿已不存在的集數（可限定在 root 之下），返回移除數量"""
+        prefix = os.path.join(os.path.abspath(root), '') if root else ''
+        conn = self._connect()
+        try:
+            with conn:
+                missing = [
+                    row['directory'] for row in conn.execute("SELECT directory, transcript_path FROM episodes")
+                    if (row['directory'] + os.sep).startswith(prefix) and not os.path.exists(row['transcript_path'])
+                ]
+                for directory in missing:
+                    self._delete_episode(conn, directory)
+            return len(missing)
+        finally:
+            conn.close()
+
+    def backfill(self, root: str, force: bool = False) -> Dict[str, int]:
+        """索引 root 之下所有逐字稿，並移除已刪除的集數"""
+        summary = {'episodes': 0, 'indexed': 0, 'unchanged': 0, 'segments': 0, 'failed': 0}
+        for transcript_path in find_transcripts(root):
+            summary['episodes'] += 1
+            try:
+                count = self.index_transcript(transcript_path, force=force)
+            except (OSError, ValueError, KeyError) as e:
+                logger.warning(f"⚠️ 無法索引 {transcript_path}: {e}")
+                summary['failed'] += 1
+                continue
+            if count or force:
+                summary['indexed'] += 1
+                summary['segments'] += count
+            else:
+                summary['unchanged'] += 1
+        summary['removed'] = self.prune(root)
+        return summary
+
+    def search(self, query: str, field: str = 'both', limit: int = 20, episode: str = None,
+               raw: bool = False) -> List[Dict]:
+        """查詢逐字稿，返回依相關性排序的片段
+
+        query 預設視為字面詞組；raw=True 時直接使用 FTS5 查詢語法（AND / OR / NEAR / 前綴*）。
+        """
+        if field not in SEARCH_FIELDS:
+            raise ValueError(f"field 必須為 {', '.join(SEARCH_FIELDS)} 之一")
+        query = query.strip()
+        if not query:
+            return []
+
+        columns = ['original_text', 'translated_text'] if field == 'both' else [f'{field}_text']
+        filters = []
+        params = []
+        if episode:
+            filters.append("e.episode = ?")
+            params.append(episode)
+
+        if self.trigram and not raw and len(query) < TRIGRAM_MIN_LENGTH:
+            # trigram 分詞器無法索引少於三個字的查詢，改以 LIKE 逐段比對
+            pattern = '%' + query.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_') + '%'
+            filters.append('(' + ' OR '.join(f"s.{column} LIKE ? ESCAPE '\\'" for column in columns) + ')')
+            params[len(params):] = [pattern] * len(columns)
+            sql = ("SELECT e.episode, e.directory, e.source, s.* FROM segments s "
+                   "JOIN episodes e ON e.id = s.episode_id WHERE " + ' AND '.join(filters) +
+                   " ORDER BY e.episode, s.start_ms LIMIT ?")
+        else:
+            expression = query if raw else '"' + query.replace('"', '""') + '"'
+            if field != 'both':
+                expression = f"{columns[0]} : ({expression})"
+            filters.insert(0, "segments_fts MATCH ?")
+            params.insert(0, expression)
+            sql = ("SELECT e.episode, e.directory, e.source, s.* FROM segments_fts "
+                   "JOIN segments s ON s.id = segments_fts.rowid JOIN episodes e ON e.id = s.episode_id "
+                   "WHERE " + ' AND '.join(filters) + " ORDER BY bm25(segments_fts) LIMIT ?")
+        params.append(limit)
+
+        conn = self._connect()
+        try:
+            return [
+                {
+                    'episode': row['episode'],
+                    'directory': row['directory'],
+                    'source': row['source'],
+                    'segment_index': row['segment_index'],
+                    'start_ms': row['start_ms'],
+                    'end_ms': row['end_ms'],
+                    'speaker': row['speaker'],
+                    'original_text': row['original_text'],
+                    'translated_text': row['translated_text']
+                }
+                for row in conn.execute(sql, params)
+            ]
+        finally:
+            conn.close()
+
+    def stats(self) -> Dict[str, int]:
+        conn = self._connect()
+        try:
+            row = conn.execute("SELECT COUNT(*), COALESCE(SUM(segment_count), 0) FROM episodes").fetchone()
+            return {'episodes': row[0], 'segments': row[1]}
+        finally:
+            conn.close()
+
+
+def find_transcripts(root: str) -> Iterator[str]:
+    """找出 root 之下每個輸出目錄的逐字稿（同時存在時優先使用 transcript.json）"""
+    for directory, subdirs, files in os.walk(root):
+        subdirs.sort()
+        for name in TRANSCRIPT_NAMES:
+            if name in files:
+                yield os.path.join(directory, name)
+                break
+
+
+def format_offset(milliseconds: int) -> str:
+    seconds, ms = divmod(milliseconds, 1000)
+    minutes, seconds = divmod(seconds, 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours:d}:{minutes:02d}:{seconds:02d}.{ms:03d}"
+
+
+def main():
+    import argparse
+
+    from log_manager import setup_logging
+
+    parser = argparse.ArgumentParser(description="逐字稿全文檢索")
+    parser.add_argument('--index', default=os.getenv('SEARCH_INDEX', DEFAULT_INDEX_PATH),
+                        help=f'索引資料庫路徑 (預設: SEARCH_INDEX 或 {DEFAULT_INDEX_PATH})')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    backfill = subparsers.add_parser('backfill', help='索引目錄下所有已處理的逐字稿')
+    backfill.add_argument('root')
+    backfill.add_argument('--force', action='store_true', help='即使逐字稿未變更也重新索引')
+    search = subparsers.add_parser('search', help='查詢原文或譯文')
+    search.add_argument('query')
+    search.add_argument('--field', choices=SEARCH_FIELDS, default='both', help='查詢欄位 (預設: both)')
+    search.add_argument('--episode', help='只查詢指定集數')
+    search.add_argument('--limit', type=int, default=20, help='最多顯示筆數 (預設: 20)')
+    search.add_argument('--raw', action='store_true', help='使用 FTS5 查詢語法')
+    args = parser.parse_args()
+    setup_logging()
+
+    index = TranscriptIndex(args.index)
+    if args.command == 'backfill':
+        started_at = time.perf_counter()
+        summary = index.backfill(args.root, force=args.force)
+        print(f"✅ 已索引 {summary['indexed']}/{summary['episodes']} 集（{summary['segments']:,} 個片段），"
+              f"未變更 {summary['unchanged']}，失敗 {summary['failed']}，移除 {summary['removed']}，"
+              f"{time.perf_counter() - started_at:.2f} 秒")
+        stats = index.stats()
+        print(f"📚 索引共 {stats['episodes']} 集、{stats['segments']:,} 個片段: {args.index}")
+    else:
+        results = index.search(args.query, field=args.field, limit=args.limit, episode=args.episode, raw=args.raw)
+        if not results:
+            print("🔍 沒有符合的片段")
+        for result in results:
+            print(f"🎙️ {result['episode']}  {format_offset(result['start_ms'])}–{format_offset(result['end_ms'])}"
+                  f"  [{result['speaker']}]  (start_ms={result['start_ms']})")
+            print(f"   {result['original_text']}")
+            print(f"   {result['translated_text']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,314 @@
+#!/usr/bin/env python3
+"""
+欄式逐字稿存放格式 - 緊湊的二進位逐字稿，可透過 mmap 延遲讀取個別片段
+
+與 transcript.json 相同的內容，改以欄位分開存放：
+  開始 / 結束時間     float64 陣列
+  說話者             uint8 代碼（對應說話者表）
+  對話類型旗標        每種旗標一個位元集合
+  原文 / 譯文         字串表（uint32 偏移索引 + UTF-8 資料）
+
+讀取時只解析標頭，各欄位以 memoryview 直接對應 mmap，存取第 N 段只讀取該段的資料。
+所有數值以 little-endian 儲存。
+
+使用方法:
+python transcript_store.py to-store output/transcript.json          # 產生 output/transcript.ptc
+python transcript_store.py to-json output/transcript.ptc out.json
+python transcript_store.py info output/transcript.ptc
+"""
+
+import json
+import mmap
+import os
+import struct
+import sys
+from array import array
+from typing import Dict, Iterator, List
+
+STORE_SUFFIX = '.ptc'
+STORE_MAGIC = b'PTRS'
+STORE_VERSION = 1
+
+# 對話類型旗標，順序即位元集合在文件中的順序
+FLAG_NAMES = ('is_question', 'is_response', 'is_transition')
+
+_HEADER = struct.Struct('<4sHHI')
+_SECTION = struct.Struct('<QQ')
+_ALIGNMENT = 8
+
+# 區段順序
+(_STARTS, _ENDS, _SPEAKERS, _FLAGS, _ORIGINAL_INDEX, _ORIGINAL_DATA,
+ _TRANSLATED_INDEX, _TRANSLATED_DATA, _SPEAKER_TABLE, _METADATA) = range(10)
+_SECTION_COUNT = 10
+
+_NATIVE_LITTLE = sys.byteorder == 'little'
+
+
+def format_timestamp(seconds: float, timestamp_format: str = 'seconds') -> str:
+    """格式化逐字稿時間（'12.34s' 或 '12340ms'）"""
+    if timestamp_format == 'milliseconds':
+        return f"{int(round(seconds * 1000))}ms"
+    return f"{seconds:.2f}s"
+
+
+def parse_timestamp(value: str) -> float:
+    """解析逐字稿時間（支援 '12.34s' 與 '12340ms'）"""
+    if value.endswith('ms'):
+        return float(value[:-2]) / 1000
+    return float(value.rstrip('s'))
+
+
+def _timestamp_format_of(value: str) -> str:
+    return 'milliseconds' if value.endswith('ms') else 'seconds'
+
+
+def _little_endian(values: array) -> bytes:
+    if not _NATIVE_LITTLE:
+        values = array(values.typecode, values)
+        values.byteswap()
+    return values.tobytes()
+
+
+def _pack_bitset(values: List[bool]) -> bytes:
+    bits = bytearray((len(values) + 7) // 8)
+    for i, value in enumerate(values):
+        if value:
+            bits[i >> 3] |= 1 << (i & 7)
+    return bytes(bits)
+
+
+def _string_table(texts: List[str]) -> List[bytes]:
+    """返回 [偏移索引, UTF-8 資料]；第 i 段為 data[offsets[i]:offsets[i + 1]]"""
+    offsets = array('I', [0])
+    chunks = []
+    position = 0
+    for text in texts:
+        encoded = text.encode('utf-8')
+        chunks.append(encoded)
+        position += len(encoded)
+        offsets.append(position)
+    return [_little_endian(offsets), b''.join(chunks)]
+
+
+def write_transcript_store(transcript: Dict, path: str) -> str:
+    """將 transcript.json 格式的逐字稿寫成欄式格式（先寫入暫存檔再取代）
+
+    片段中逐字稿格式以外的欄位不會保存；最上層的其他欄位保存在中繼資料中。
+    """
+    entries = transcript['segments']
+    speakers = []
+    codes = bytearray()
+    for entry in entries:
+        if entry['speaker'] not in speakers:
+            speakers.append(entry['speaker'])
+        codes.append(speakers.index(entry['speaker']))
+        if len(speakers) > 255:
+            raise ValueError("說話者數量超過 255，無法以 uint8 代碼儲存")
+
+    dialogue_types = [entry.get('dialogue_type', {}) for entry in entries]
+    metadata = {key: value for key, value in transcript.items() if key not in ('segments', 'total_segments')}
+    metadata['timestamp_format'] = _timestamp_format_of(entries[0]['start_time']) if entries else 'seconds'
+
+    sections = [
+        _little_endian(array('d', (parse_timestamp(entry['start_time']) for entry in entries))),
+        _little_endian(array('d', (parse_timestamp(entry['end_time']) for entry in entries))),
+        bytes(codes),
+        b''.join(_pack_bitset([bool(kind.get(name, False)) for kind in dialogue_types]) for name in FLAG_NAMES),
+        *_string_table([entry['original_text'] for entry in entries]),
+        *_string_table([entry['translated_text'] for entry in entries]),
+        json.dumps(speakers, ensure_ascii=False).encode('utf-8'),
+        json.dumps(metadata, ensure_ascii=False).encode('utf-8'),
+    ]
+
+    # 每個區段對齊 8 位元組，讓數值欄位可以直接轉換為 memoryview
+    position = _HEADER.size + _SECTION.size * _SECTION_COUNT
+    table = []
+    body = []
+    for data in sections:
+        padding = -position % _ALIGNMENT
+        body.append(b'\0' * padding)
+        position += padding
+        table.append(_SECTION.pack(position, len(data)))
+        body.append(data)
+        position += len(data)
+
+    temp_path = path + '.tmp'
+    with open(temp_path, 'wb') as f:
+        f.write(_HEADER.pack(STORE_MAGIC, STORE_VERSION, 0, len(entries)))
+        f.writelines(table)
+        f.writelines(body)
+    os.replace(temp_path, path)
+    return path
+
+
+class TranscriptStore:
+    """以 mmap 開啟的欄式逐字稿，各欄位與片段皆延遲讀取"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._views = []
+        with open(path, 'rb') as f:
+            if os.fstat(f.fileno()).st_size < _HEADER.size:
+                raise ValueError(f"不是有效的逐字稿存放檔: {path}")
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._buffer = memoryview(self._mmap)
+        magic, version, _, count = _HEADER.unpack_from(self._buffer)
+        if magic != STORE_MAGIC or version != STORE_VERSION:
+            self.close()
+            raise ValueError(f"不支援的逐字稿存放格式: {path}")
+        self._count = count
+        self._sections = [
+            _SECTION.unpack_from(self._buffer, _HEADER.size + i * _SECTION.size)
+            for i in range(_SECTION_COUNT)
+        ]
+
+        self.starts = self._column(_STARTS, 'd')
+        self.ends = self._column(_ENDS, 'd')
+        self.speaker_codes = self._section(_SPEAKERS)
+        self._flags = self._section(_FLAGS)
+        self._flag_bytes = (count + 7) // 8
+        self._original = (self._column(_ORIGINAL_INDEX, 'I'), self._section(_ORIGINAL_DATA))
+        self._translated = (self._column(_TRANSLATED_INDEX, 'I'), self._section(_TRANSLATED_DATA))
+        self.speakers: List[str] = json.loads(str(self._section(_SPEAKER_TABLE), 'utf-8'))
+        self.metadata: Dict = json.loads(str(self._section(_METADATA), 'utf-8'))
+        self.timestamp_format = self.metadata.get('timestamp_format', 'seconds')
+
+    def _section(self, index: int) -> memoryview:
+        offset, length = self._sections[index]
+        view = self._buffer[offset:offset + length]
+        self._views.append(view)
+        return view
+
+    def _column(self, index: int, typecode: str):
+        view = self._section(index)
+        if _NATIVE_LITTLE:
+            column = view.cast(typecode)
+            self._views.append(column)
+            return column
+        values = array(typecode)
+        values.frombytes(view)
+        values.byteswap()
+        return values
+
+    def __len__(self) -> int:
+        return self._count
+
+    def _check_index(self, index: int) -> int:
+        if index < 0:
+            index += self._count
+        if not 0 <= index < self._count:
+            raise IndexError("片段索引超出範圍")
+        return index
+
+    def _text(self, table, index: int) -> str:
+        offsets, data = table
+        return str(data[offsets[index]:offsets[index + 1]], 'utf-8')
+
+    def original_text(self, index: int) -> str:
+        return self._text(self._original, self._check_index(index))
+
+    def translated_text(self, index: int) -> str:
+        return self._text(self._translated, self._check_index(index))
+
+    def speaker(self, index: int) -> str:
+        return self.speakers[self.speaker_codes[self._check_index(index)]]
+
+    def flag(self, name: str, index: int) -> bool:
+        index = self._check_index(index)
+        byte = self._flags[FLAG_NAMES.index(name) * self._flag_bytes + (index >> 3)]
+        return bool(byte >> (index & 7) & 1)
+
+    def __getitem__(self, index: int) -> Dict:
+        """返回第 index 段，格式與 transcript.json 的片段相同"""
+        index = self._check_index(index)
+        return {
+            'start_time': format_timestamp(self.starts[index], self.timestamp_format),
+            'end_time': format_timestamp(self.ends[index], self.timestamp_format),
+            'speaker': self.speakers[self.speaker_codes[index]],
+            'original_text': self._text(self._original, index),
+            'translated_text': self._text(self._translated, index),
+            'dialogue_type': {name: self.flag(name, index) for name in FLAG_NAMES}
+        }
+
+    def __iter__(self) -> Iterator[Dict]:
+        for index in range(self._count):
+            yield self[index]
+
+    def total_duration(self) -> float:
+        """各片段長度總和（只讀取時間欄位）"""
+        return sum(self.ends) - sum(self.starts)
+
+    def to_transcript(self) -> Dict:
+        """轉換回 transcript.json 的完整格式"""
+        transcript = {key: value for key, value in self.metadata.items() if key != 'timestamp_format'}
+        transcript['total_segments'] = self._count
+        transcript['segments'] = list(self)
+        return transcript
+
+    def close(self):
+        # 必須先釋放所有 memoryview，mmap 才能關閉
+        for view in reversed(self._views):
+            view.release()
+        self._views = []
+        self._buffer.release()
+        self._mmap.close()
+
+    def __enter__(self) -> 'TranscriptStore':
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        self.close()
+
+
+def load_transcript(path: str) -> Dict:
+    """讀取 transcript.json 或欄式逐字稿，返回 transcript.json 格式"""
+    if path.endswith(STORE_SUFFIX):
+        with TranscriptStore(path) as store:
+            return store.to_transcript()
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def json_to_store(json_path: str, store_path: str = None) -> str:
+    store_path = store_path or os.path.splitext(json_path)[0] + STORE_SUFFIX
+    return write_transcript_store(load_transcript(json_path), store_path)
+
+
+def store_to_json(store_path: str, json_path: str = None) -> str:
+    json_path = json_path or os.path.splitext(store_path)[0] + '.json'
+    with open(json_path, 'w', encoding='utf-8') as f:
+        json.dump(load_transcript(store_path), f, ensure_ascii=False, indent=2)
+    return json_path
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="逐字稿格式轉換")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    to_store = subparsers.add_parser('to-store', help='transcript.json 轉換為欄式格式')
+    to_store.add_argument('source')
+    to_store.add_argument('target', nargs='?')
+    to_json = subparsers.add_parser('to-json', help='欄式格式轉換為 transcript.json')
+    to_json.add_argument('source')
+    to_json.add_argument('target', nargs='?')
+    info = subparsers.add_parser('info', help='顯示欄式逐字稿摘要')
+    info.add_argument('source')
+    args = parser.parse_args()
+
+    if args.command == 'to-store':
+        target = json_to_store(args.source, args.target)
+        print(f"✅ 已轉換: {target}（{os.path.getsize(args.source):,} → {os.path.getsize(target):,} 位元組）")
+    elif args.command == 'to-json':
+        print(f"✅ 已轉換: {store_to_json(args.source, args.target)}")
+    else:
+        with TranscriptStore(args.source) as store:
+            print(f"📄 {args.source}")
+            print(f"   片段數: {len(store)}")
+            print(f"   說話者: {', '.join(store.speakers)}")
+            print(f"   總時長: {store.total_duration():.2f} 秒")
+            print(f"   建立時間: {store.metadata.get('timestamp', '-')}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,323 @@
+#!/usr/bin/env python3
+"""
+Edge TTS 連線池 - 少量長駐的 websocket 連線，依序在同一條連線上送出多個合成請求
+
+edge_tts.Communicate 每個片段都重新建立 websocket（TLS 握手、升級與 speech.config 交換），
+一句話的片段中連線建立往往佔了大部分延遲。TTSSessionPool 保留最多 size 條連線，
+每條連線一次處理一個請求（以 X-RequestId 對應回應），連線中斷時自動重新連線並重送請求。
+連線建立與合成的耗時分別記錄在 stats() 與 MetricsRegistry
+（podcast_tts_connect_seconds / podcast_tts_synthesis_seconds / podcast_tts_reconnects_total）。
+"""
+
+import asyncio
+import logging
+import re
+import time
+from typing import Callable, Dict, List, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+# 關閉邊界中繼資料，只接收音頻
+SPEECH_CONFIG = (
+    '{"context":{"synthesis":{"audio":{"metadataoptions":{'
+    '"sentenceBoundaryEnabled":"false","wordBoundaryEnabled":"false"},'
+    '"outputFormat":"audio-24khz-48kbitrate-mono-mp3"}}}}'
+)
+MAX_REQUEST_BYTES = 4096
+
+_SHORT_VOICE = re.compile(r'^([a-z]{2,})-([A-Z]{2,})-(.+Neural)$')
+
+
+class TTSConnectionError(ConnectionError):
+    """websocket 連線建立失敗或在合成途中中斷"""
+
+
+def edge_url() -> str:
+    """Edge 朗讀服務的 websocket 位址（每次連線產生新的連線 ID 與 Sec-MS-GEC）"""
+    from edge_tts.communicate import connect_id
+    from edge_tts.constants import WSS_URL
+    url = f"{WSS_URL}&ConnectionId={connect_id()}"
+    try:
+        from edge_tts.constants import SEC_MS_GEC_VERSION
+        from edge_tts.drm import DRM
+    except ImportError:
+        return url
+    return f"{url}&Sec-MS-GEC={DRM.generate_sec_ms_gec()}&Sec-MS-GEC-Version={SEC_MS_GEC_VERSION}"
+
+
+def edge_headers() -> Dict[str, str]:
+    from edge_tts.constants import WSS_HEADERS
+    try:
+        from edge_tts.drm import DRM
+    except ImportError:
+        return dict(WSS_HEADERS)
+    return DRM.headers_with_muid(WSS_HEADERS)
+
+
+def full_voice_name(voice: str) -> str:
+    """zh-TW-HsiaoChenNeural → Microsoft Server Speech Text to Speech Voice (zh-TW, HsiaoChenNeural)"""
+    match = _SHORT_VOICE.match(voice)
+    if match is None:
+        return voice
+    language, region, name = match.groups()
+    if '-' in name:
+        extra, name = name.split('-', 1)
+        region = f"{region}-{extra}"
+    return f"Microsoft Server Speech Text to Speech Voice ({language}-{region}, {name})"
+
+
+def _parse_headers(block: bytes) -> Dict[bytes, bytes]:
+    headers = {}
+    for line in block.split(b'\r\n'):
+        key, _, value = line.partition(b':')
+        headers[key] = value
+    return headers
+
+
+def parse_text_message(data: str) -> Tuple[Dict[bytes, bytes], bytes]:
+    encoded = data.encode('utf-8')
+    header_end = encoded.find(b'\r\n\r\n')
+    return _parse_headers(encoded[:header_end]), encoded[header_end + 4:]
+
+
+def parse_binary_message(data: bytes) -> Tuple[Dict[bytes, bytes], bytes]:
+    """二進位訊息：前 2 位元組為標頭長度，接著是標頭與音頻資料"""
+    header_length = int.from_bytes(data[:2], 'big')
+    return _parse_headers(data[2:2 + header_length]), data[2 + header_length:]
+
+
+def _timestamp() -> str:
+    return time.strftime('%a %b %d %Y %H:%M:%S GMT+0000 (Coordinated Universal Time)', time.gmtime())
+
+
+class TTSSession:
+    """一條 Edge TTS websocket 連線"""
+
+    def __init__(self, url: Union[str, Callable[[], str]], headers: Callable[[], Dict[str, str]] = None,
+                 ssl=None, connect_timeout: float = 10.0, receive_timeout: float = 60.0):
+        self.url = url
+        self.headers = headers
+        self.ssl = ssl
+        self.connect_timeout = connect_timeout
+        self.receive_timeout = receive_timeout
+        self.requests = 0
+        self._http = None
+        self._ws = None
+
+    @property
+    def connected(self) -> bool:
+        return self._ws is not None and not self._ws.closed
+
+    async def connect(self):
+        import aiohttp
+        await self.close()
+        url = self.url() if callable(self.url) else self.url
+        self._http = aiohttp.ClientSession(
+            trust_env=True,
+            timeout=aiohttp.ClientTimeout(total=None, sock_connect=self.connect_timeout)
+        )
+        try:
+            for attempt in range(2):
+                try:
+                    self._ws = await self._http.ws_connect(
+                        url, compress=15, headers=self.headers() if self.headers else None,
+                        ssl=self.ssl if self.ssl is not None else True
+                    )
+                    break
+                except aiohttp.WSServerHandshakeError as e:
+                    # 403 通常是本機時鐘偏差造成 Sec-MS-GEC 失效，校正後重試一次
+                    if e.status != 403 or attempt or not callable(self.url):
+                        raise
+                    from edge_tts.drm import DRM
+                    DRM.handle_client_response_error(e)
+                    url = self.url()
+            await self._ws.send_str(
+                f"X-Timestamp:{_timestamp()}\r\n"
+                "Content-Type:application/json; charset=utf-8\r\n"
+                f"Path:speech.config\r\n\r\n{SPEECH_CONFIG}\r\n"
+            )
+        except (aiohttp.ClientError, asyncio.TimeoutError, OSError) as e:
+            await self.close()
+            raise TTSConnectionError(f"無法連線到語音合成服務: {e}") from e
+
+    async def synthesize(self, text: str, voice: str, rate: str = '+0%', pitch: str = '+0Hz',
+                         markup: bool = False) -> bytes:
+        """在目前的連線上合成文字，返回 MP3 音頻
+
+        markup 為 True 時 text 是已跳脫、含 <break> 標記的 SSML 內容（不超過 MAX_REQUEST_BYTES），
+        直接放進 <prosody> 送出，不再跳脫或切割。
+        """
+        from xml.sax.saxutils import escape
+        from edge_tts.communicate import connect_id, remove_incompatible_characters, split_text_by_byte_length
+
+        voice = full_voice_name(voice)
+        audio: List[bytes] = []
+        if markup:
+            parts = [text]
+        else:
+            parts = split_text_by_byte_length(escape(remove_incompatible_characters(text)), MAX_REQUEST_BYTES)
+        for part in parts:
+            if isinstance(part, bytes):
+                part = part.decode('utf-8')
+            request_id = connect_id()
+            ssml = (
+                "<speak version='1.0' xmlns='http://www.w3.org/2001/10/synthesis' xml:lang='en-US'>"
+                f"<voice name='{voice}'><prosody pitch='{pitch}' rate='{rate}' volume='+0%'>"
+                f"{part}</prosody></voice></speak>"
+            )
+            await self._send(
+                f"X-RequestId:{request_id}\r\nContent-Type:application/ssml+xml\r\n"
+                f"X-Timestamp:{_timestamp()}Z\r\nPath:ssml\r\n\r\n{ssml}"
+            )
+            await self._receive_turn(request_id.encode(), audio)
+            self.requests += 1
+
+        if not audio:
+            from edge_tts.exceptions import NoAudioReceived
+            raise NoAudioReceived("No audio was received. Please verify that your parameters are correct.")
+        return b''.join(audio)
+
+    async def _send(self, message: str):
+        if not self.connected:
+            raise TTSConnectionError("websocket 連線已關閉")
+        try:
+            await self._ws.send_str(message)
+        except (ConnectionError, RuntimeError) as e:
+            raise TTSConnectionError(f"送出合成請求失敗: {e}") from e
+
+    async def _receive_turn(self, request_id: bytes, audio: List[bytes]):
+        """接收一個請求的回應直到 turn.end；其他請求遺留的訊息直接略過"""
+        import aiohttp
+        from edge_tts.exceptions import UnexpectedResponse
+
+        while True:
+            try:
+                message = await self._ws.receive(timeout=self.receive_timeout)
+            except asyncio.TimeoutError as e:
+                raise TTSConnectionError(f"等待語音合成回應逾時 ({self.receive_timeout} 秒)") from e
+
+            if message.type == aiohttp.WSMsgType.TEXT:
+                headers, _ = parse_text_message(message.data)
+                if headers.get(b'X-RequestId') != request_id:
+                    continue
+                if headers.get(b'Path') == b'turn.end':
+                    return
+            elif message.type == aiohttp.WSMsgType.BINARY:
+                if len(message.data) < 2:
+                    raise UnexpectedResponse("Binary message is missing the header length.")
+                headers, data = parse_binary_message(message.data)
+                if headers.get(b'X-RequestId') != request_id or headers.get(b'Path') != b'audio':
+                    continue
+                if data:
+                    audio.append(data)
+            else:
+                # CLOSE / CLOSING / CLOSED / ERROR
+                raise TTSConnectionError(f"websocket 連線中斷 ({message.type.name})")
+
+    async def close(self):
+        ws, http = self._ws, self._http
+        self._ws = self._http = None
+        if ws is not None and not ws.closed:
+            await ws.close()
+        if http is not None:
+            await http.close()
+
+
+class TTSSessionPool:
+    """最多 size 條長駐連線；請求取用閒置連線，全部忙碌時等待"""
+
+    def __init__(self, size: int = 4, url: Union[str, Callable[[], str]] = None,
+                 headers: Callable[[], Dict[str, str]] = None, ssl=None,
+                 connect_timeout: float = 10.0, receive_timeout: float = 60.0, metrics=None):
+        self.size = size
+        self.url = url or edge_url
+        self.headers = headers if headers is not None or url is not None else edge_headers
+        self.ssl = ssl
+        self.connect_timeout = connect_timeout
+        self.receive_timeout = receive_timeout
+        self.metrics = metrics
+        self._idle: List[TTSSession] = []
+        self._sessions: List[TTSSession] = []
+        self._available = asyncio.Semaphore(size)
+        self._stats = {'connections': 0, 'reconnects': 0, 'requests': 0,
+                       'connect_seconds': 0.0, 'synthesis_seconds': 0.0}
+
+    @classmethod
+    def from_config(cls, config, metrics=None) -> 'TTSSessionPool':
+        network = config.network
+        return cls(config.tts.session_pool_size, connect_timeout=network.connect_timeout,
+                   receive_timeout=network.read_timeout, metrics=metrics)
+
+    def _ssl_context(self):
+        if self.ssl is None and not callable(self.url) and self.url.startswith('ws://'):
+            return False
+        if self.ssl is None:
+            import ssl
+            import certifi
+            self.ssl = ssl.create_default_context(cafile=certifi.where())
+        return self.ssl
+
+    async def _connect(self, session: TTSSession):
+        started_at = time.perf_counter()
+        await session.connect()
+        elapsed = time.perf_counter() - started_at
+        self._stats['connections'] += 1
+        self._stats['connect_seconds'] += elapsed
+        if self.metrics is not None:
+            self.metrics.observe('podcast_tts_connect_seconds', elapsed)
+
+    async def synthesize(self, text: str, voice: str, rate: str = '+0%', pitch: str = '+0Hz',
+                         markup: bool = False) -> bytes:
+        """合成文字（markup 時為 SSML 內容）並返回 MP3 音頻；連線中斷時重新連線並重送一次"""
+        async with self._available:
+            if self._idle:
+                session = self._idle.pop()
+            else:
+                session = TTSSession(self.url, self.headers, self._ssl_context(),
+                                     self.connect_timeout, self.receive_timeout)
+                self._sessions.append(session)
+            try:
+                for attempt in range(2):
+                    try:
+                        if not session.connected:
+                            await self._connect(session)
+                        started_at = time.perf_counter()
+                        audio = await session.synthesize(text, voice, rate, pitch, markup)
+                    except TTSConnectionError as e:
+                        await session.close()
+                        if attempt:
+                            raise
+                        self._stats['reconnects'] += 1
+                        if self.metrics is not None:
+                            self.metrics.inc('podcast_tts_reconnects_total')
+                            self.metrics.inc('podcast_retries_total', stage='tts')
+                        logger.debug(f"🔄 語音合成連線中斷，重新連線: {e}")
+                        continue
+                    elapsed = time.perf_counter() - started_at
+                    self._stats['requests'] += 1
+                    self._stats['synthesis_seconds'] += elapsed
+                    if self.metrics is not None:
+                        self.metrics.observe('podcast_tts_synthesis_seconds', elapsed)
+                    return audio
+            except BaseException:
+                # 回應狀態不明的連線不再重用
+                await session.close()
+                raise
+            finally:
+                self._idle.append(session)
+
+    def stats(self) -> Dict:
+        """連線數、重新連線次數、請求數，以及連線建立與合成的平均耗時（毫秒）"""
+        stats = dict(self._stats)
+        stats['mean_connect_ms'] = round(stats['connect_seconds'] * 1000 / stats['connections'], 2) \
+            if stats['connections'] else None
+        stats['mean_synthesis_ms'] = round(stats['synthesis_seconds'] * 1000 / stats['requests'], 2) \
+            if stats['requests'] else None
+        stats['connect_seconds'] = round(stats['connect_seconds'], 4)
+        stats['synthesis_seconds'] = round(stats['synthesis_seconds'], 4)
+        return stats
+
+    async def close(self):
+        sessions, self._sessions, self._idle = self._sessions, [], []
+        for session in sessions:
+            await session.close()